@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Adiciona campo generator_provider ao modelo Video
+Provider escolhido para o gerador (ex.: elevenlabs, heygen), reusado ao
+retomar um vídeo pausado para aprovação
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from src.config.database import engine
+
+
+def add_generator_provider_column():
+    """Adiciona coluna generator_provider na tabela videos"""
+    
+    print("🔧 Adicionando coluna 'generator_provider' na tabela 'videos'...")
+    
+    try:
+        with engine.connect() as conn:
+            # Verificar se coluna já existe
+            result = conn.execute(text("""
+                SELECT column_name 
+                FROM information_schema.columns 
+                WHERE table_name = 'videos' 
+                AND column_name = 'generator_provider'
+            """))
+            
+            if result.fetchone():
+                print("⚠️  Coluna 'generator_provider' já existe. Nada a fazer.")
+                return
+            
+            # Adicionar coluna
+            conn.execute(text("""
+                ALTER TABLE videos 
+                ADD COLUMN generator_provider VARCHAR(50)
+            """))
+            
+            conn.commit()
+            
+            print("✅ Coluna 'generator_provider' adicionada com sucesso!")
+            print("   NULL = provider padrão do gerador")
+            
+    except Exception as e:
+        print(f"❌ Erro ao adicionar coluna: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+def main():
+    print("\n" + "="*60)
+    print("🎬 VIDEO GENERATOR PROVIDER MIGRATION")
+    print("="*60 + "\n")
+    
+    add_generator_provider_column()
+    
+    print("\n" + "="*60)
+    print("✅ MIGRAÇÃO COMPLETA!")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
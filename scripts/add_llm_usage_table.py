@@ -0,0 +1,22 @@
+"""
+Script de migração: Cria tabela llm_usage (consumo de tokens/latência por chamada LLM)
+"""
+from sqlalchemy import inspect
+from src.config.database import engine
+from src.models.llm_usage import LLMUsage
+
+def add_llm_usage_table():
+    """Cria tabela llm_usage se ainda não existir"""
+
+    print("🔄 Criando tabela llm_usage...")
+
+    if inspect(engine).has_table(LLMUsage.__tablename__):
+        print("ℹ️  Tabela llm_usage já existe. Nada a fazer.")
+        return
+
+    LLMUsage.__table__.create(bind=engine, checkfirst=True)
+
+    print("✅ Tabela llm_usage criada com sucesso!")
+
+if __name__ == "__main__":
+    add_llm_usage_table()
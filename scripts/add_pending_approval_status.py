@@ -0,0 +1,26 @@
+"""
+Script de migração: Adiciona PENDING_APPROVAL ao enum videostatus (PostgreSQL)
+
+Necessário para VIDEO_REQUIRE_HUMAN_APPROVAL=true (vídeos pausados aguardando
+aprovação). SQLite guarda o enum como VARCHAR e não precisa de migração.
+"""
+from sqlalchemy import text
+from src.config.database import engine
+
+def add_pending_approval_status():
+    """Adiciona o valor PENDING_APPROVAL ao tipo videostatus"""
+
+    print("🔄 Adicionando PENDING_APPROVAL ao enum videostatus...")
+
+    if engine.dialect.name != "postgresql":
+        print(f"ℹ️  Banco {engine.dialect.name}: enum armazenado como texto. Nada a fazer.")
+        return
+
+    # ALTER TYPE ... ADD VALUE não pode rodar dentro de transação em versões antigas
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ALTER TYPE videostatus ADD VALUE IF NOT EXISTS 'PENDING_APPROVAL'"))
+
+    print("✅ Status PENDING_APPROVAL disponível!")
+
+if __name__ == "__main__":
+    add_pending_approval_status()
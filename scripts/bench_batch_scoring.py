@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do scoring de opções (filtro + ranker)
+
+Mede os agentes no modo "legacy" (opção a opção, o padrão) e nos modos
+"bm25"/"tfidf" (similaridade em lote com o BatchScorer), ao lado da
+implementação de referência opção a opção, para lotes de 4 a 50 opções,
+e confere que o modo "legacy" reproduz exatamente os scores de referência.
+
+Uso:
+    python scripts/bench_batch_scoring.py --sizes 4,20,50 --iterations 2000
+"""
+import os
+import sys
+import random
+import argparse
+import timeit
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.workflows.briefing_agents import ContentFilterAgent, ContentRankerAgent
+
+BRIEFING = {
+    'title': 'Gestão de Conflitos em Sala de Aula',
+    'training_goal': 'Desenvolver habilidades de mediação e resolução de conflitos entre alunos',
+    'duration_minutes': 5,
+    'tone': 'prático'
+}
+
+WORDS = (
+    "mediação conflitos alunos escuta ativa acordos turma professor estratégias casos reais "
+    "resolução habilidades convivência rotina diálogo regras combinados prática reflexão"
+).split()
+
+
+def make_options(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            'title': f"Opção {i}: " + " ".join(rng.sample(WORDS, 3)),
+            'summary': " ".join(rng.choices(WORDS, k=rng.randint(6, 20))),
+            'script_outline': " → ".join(rng.choices(WORDS, k=rng.randint(8, 30))),
+            'key_points': "; ".join(rng.sample(WORDS, rng.randint(2, 5))),
+            'estimated_duration': rng.choice([180, 240, 300, 330, 420]),
+            'tone': rng.choice(['prático', 'formal', 'inspiracional'])
+        }
+        for i in range(size)
+    ]
+
+
+def legacy_pipeline(options, briefing, filter_agent, ranker):
+    """Referência: filtro e ranker opção a opção (interseções de conjuntos)"""
+    filtered = []
+    for option in options:
+        option = dict(option)
+        if not filter_agent._safety_check(option) or not filter_agent._completeness_check(option):
+            continue
+
+        alignment = 0.5
+        diff = abs(briefing.get('duration_minutes', 5) * 60 - option.get('estimated_duration', 300))
+        if diff < 60:
+            alignment += 0.3
+        elif diff < 120:
+            alignment += 0.15
+        if briefing.get('tone') == option.get('tone'):
+            alignment += 0.2
+        if min(alignment, 1.0) < 0.5:
+            continue
+        option['alignment_score'] = min(alignment, 1.0)
+        option['passed_filters'] = True
+        filtered.append(option)
+
+    for option in filtered:
+        relevance = 0.5
+        if briefing.get('training_goal'):
+            goal_words = set(briefing['training_goal'].lower().split())
+            summary_words = set(option.get('summary', '').lower().split())
+            relevance += min(len(goal_words & summary_words) * 0.1, 0.3)
+        if briefing.get('tone') == option.get('tone'):
+            relevance += 0.2
+
+        quality = 0.5
+        if len(option.get('summary', '')) > 50:
+            quality += 0.15
+        if len(option.get('script_outline', '')) > 100:
+            quality += 0.15
+        if 'key_points' in option and len(option['key_points'].split(';')) >= 3:
+            quality += 0.2
+
+        option['relevance_score'] = min(relevance, 1.0)
+        option['quality_score'] = min(quality, 1.0)
+        option['overall_score'] = option['relevance_score'] * 0.6 + option['quality_score'] * 0.4
+        option['ranking_rationale'] = ranker._generate_rationale(option, briefing)
+
+    return sorted(filtered, key=lambda x: x['overall_score'], reverse=True)
+
+
+def batch_pipeline(options, briefing, filter_agent, ranker):
+    """Agentes atuais (modo de relevância em ranker.relevance_mode)"""
+    filtered = filter_agent.filter_options([dict(o) for o in options], briefing)
+    return ranker.rank_options(filtered, briefing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do scoring de opções")
+    parser.add_argument('--sizes', default="4,20,50")
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    filter_agent = ContentFilterAgent(router=object())
+    ranker = ContentRankerAgent(router=object())
+
+    # Conferir reprodutibilidade do modo legacy
+    options = make_options(50)
+    assert batch_pipeline(options, BRIEFING, filter_agent, ranker) == \
+        legacy_pipeline(options, BRIEFING, filter_agent, ranker)
+    print("✅ Modo legacy reproduz os scores e a ordem de referência (50 opções)")
+
+    for mode in ("bm25", "tfidf"):
+        ranker.relevance_mode = mode
+        top = batch_pipeline(options[:5], BRIEFING, filter_agent, ranker)[0]
+        print(f"   {mode}: melhor opção '{top['title']}' (relevância {top['relevance_score']:.2f})")
+    ranker.relevance_mode = "legacy"
+
+    print(f"\n⏱️  {'opções':>7} {'referência':>10} {'legacy':>10} {'bm25':>10} {'tfidf':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        options = make_options(size)
+        timings = [
+            timeit.timeit(lambda: legacy_pipeline(options, BRIEFING, filter_agent, ranker), number=args.iterations)
+        ]
+        for mode in ("legacy", "bm25", "tfidf"):
+            ranker.relevance_mode = mode
+            timings.append(timeit.timeit(
+                lambda: batch_pipeline(options, BRIEFING, filter_agent, ranker), number=args.iterations
+            ))
+        ranker.relevance_mode = "legacy"
+        print(f"   {size:>7} " + " ".join(f"{t / args.iterations * 1e6:>8.1f}µs" for t in timings))
+
+if __name__ == "__main__":
+    main()
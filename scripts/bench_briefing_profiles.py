@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos perfis do BriefingAnalysisWorkflow
+
+Compara latência, número de chamadas LLM e tokens entre:
+- standard: Analyzer → Generator (2 chamadas)
+- fast: Analyzer+Generator (1 chamada estruturada)
+
+Uso:
+    python scripts/bench_briefing_profiles.py --runs 3
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.workflows.briefing_workflow import BriefingAnalysisWorkflow, PIPELINE_PROFILES
+
+BRIEFING_DATA = {
+    'title': 'Gestão de Conflitos em Sala de Aula',
+    'description': 'Como mediar conflitos entre alunos de forma eficaz e construtiva',
+    'target_audience': 'Professores de Ensino Fundamental',
+    'subject_area': 'Gestão de Sala de Aula',
+    'teacher_experience_level': 'intermediário',
+    'training_goal': 'Desenvolver habilidades de mediação e resolução de conflitos',
+    'duration_minutes': 5,
+    'tone': 'prático'
+}
+
+
+def bench_profile(profile: str, runs: int) -> dict:
+    """Executa o workflow N vezes com o perfil informado"""
+    workflow = BriefingAnalysisWorkflow(profile=profile)
+
+    latencies, llm_calls, input_tokens, output_tokens, options = [], [], [], [], []
+
+    for i in range(runs):
+        start = time.perf_counter()
+        result = workflow.run(briefing_id=i + 1, briefing_data=BRIEFING_DATA)
+        latencies.append(time.perf_counter() - start)
+
+        usage = result['metadata']['llm_usage']
+        llm_calls.append(usage['llm_calls'])
+        input_tokens.append(usage['input_tokens'])
+        output_tokens.append(usage['output_tokens'])
+        options.append(result['metadata']['final_count'])
+
+    return {
+        'profile': profile,
+        'latency_mean': statistics.mean(latencies),
+        'latency_p50': statistics.median(latencies),
+        'llm_calls': statistics.mean(llm_calls),
+        'input_tokens': statistics.mean(input_tokens),
+        'output_tokens': statistics.mean(output_tokens),
+        'options': statistics.mean(options)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos perfis standard vs fast")
+    parser.add_argument('--runs', type=int, default=3, help="Execuções por perfil")
+    args = parser.parse_args()
+
+    results = [bench_profile(profile, args.runs) for profile in PIPELINE_PROFILES]
+
+    print("\n" + "=" * 80)
+    print(f"📊 Perfis do BriefingAnalysisWorkflow ({args.runs} execuções cada)")
+    print("=" * 80)
+    print(f"{'perfil':<10} {'lat. média':>11} {'p50':>8} {'chamadas':>9} {'tokens in':>10} {'tokens out':>11} {'opções':>7}")
+    for r in results:
+        print(
+            f"{r['profile']:<10} {r['latency_mean']:>10.2f}s {r['latency_p50']:>7.2f}s "
+            f"{r['llm_calls']:>9.1f} {r['input_tokens']:>10.0f} {r['output_tokens']:>11.0f} {r['options']:>7.1f}"
+        )
+
+    standard, fast = results
+    if standard['latency_mean'] > 0:
+        gain = 1 - fast['latency_mean'] / standard['latency_mean']
+        print(f"\n⚡ Redução de latência do perfil fast: {gain:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark do volume gravado pelo SQLiteCheckpointer
+
+Roda o workflow de vídeo (LLM fake sem latência, gerador falso) até a pausa
+de aprovação humana para N vídeos e compara o formato anterior (valores
+inline, checkpoints completos) com conteúdo endereçado por hash + deltas.
+
+Uso:
+    python scripts/bench_checkpoint_storage.py --videos 50
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+
+from src.ml.llm_service import LLMService
+from src.workflows.checkpointer import SQLiteCheckpointer
+from src.workflows.registry import clear_compiled_graphs
+from src.workflows.video_workflow import VideoGenerationWorkflow
+
+
+class StubGenerator:
+    """Gerador sem renderização (só o volume de estado importa aqui)"""
+
+    def prepare_audio(self, script, metadata, video_id):
+        return {"audio_path": f"/tmp/audio_{video_id}.mp3"}
+
+    def prepare_assets(self, script, title, metadata, video_id):
+        return {"slide_paths": [f"/tmp/slide_{video_id}_01.png"]}
+
+    def render(self, script, title, metadata, video_id, audio=None, assets=None):
+        return {"success": True, "file_path": f"/tmp/video_{video_id}.mp4", "duration": 180.0,
+                "file_size": 1024, "metadata": {}}
+
+
+def run(videos: int, **saver_options) -> dict:
+    clear_compiled_graphs()
+    saver = SQLiteCheckpointer(os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite"), **saver_options)
+    workflow = VideoGenerationWorkflow(checkpointer=saver, require_human_approval=True)
+    workflow.video_generator, workflow.llm_service = StubGenerator(), LLMService()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for video_id in range(1, videos + 1):
+            briefing = {
+                'title': f'Gestão de Conflitos em Sala de Aula #{video_id}',
+                'description': 'Como mediar conflitos entre alunos de forma eficaz e construtiva, '
+                               'com exemplos de rotina, acordos de turma e escuta ativa. ' * 2,
+                'target_audience': 'Professores de Ensino Fundamental',
+                'training_goal': 'Desenvolver habilidades de mediação e resolução de conflitos',
+                'duration_minutes': 3,
+                'tone': 'prático'
+            }
+            outline = f"Abertura {video_id} → Caso real → Estratégias de mediação → Acordos → Síntese"
+            workflow.run(video_id, video_id, briefing, outline)
+    elapsed = time.perf_counter() - start
+
+    stats = saver.storage_stats()
+    start = time.perf_counter()
+    for video_id in range(1, videos + 1):
+        saver.get_tuple({"configurable": {"thread_id": f"video_{video_id}"}})
+    read_ms = (time.perf_counter() - start) * 1000 / videos
+    return {"stats": stats, "total": sum(s["bytes"] for s in stats.values()), "seconds": elapsed, "read_ms": read_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Volume gravado pelo checkpointer")
+    parser.add_argument('--videos', type=int, default=50, help="Vídeos pausados aguardando aprovação")
+    args = parser.parse_args()
+
+    before = run(args.videos, blob_min_bytes=0, snapshot_every=1)
+    after = run(args.videos)
+
+    print(f"\n💾 {args.videos} vídeos aguardando aprovação")
+    print(f"   {'tabela':<12} {'antes':>10} {'depois':>10}")
+    for table in before["stats"]:
+        print(f"   {table:<12} {before['stats'][table]['bytes'] / 1024:>8.1f}KB {after['stats'][table]['bytes'] / 1024:>8.1f}KB")
+    print(f"   {'total':<12} {before['total'] / 1024:>8.1f}KB {after['total'] / 1024:>8.1f}KB "
+          f"({(before['total'] - after['total']) / before['total']:.0%} menos)")
+    print(f"   por vídeo    {before['total'] / args.videos / 1024:>8.1f}KB {after['total'] / args.videos / 1024:>8.1f}KB")
+    print(f"   execução     {before['seconds']:>8.2f}s  {after['seconds']:>8.2f}s")
+    print(f"   get_tuple    {before['read_ms']:>8.2f}ms {after['read_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do matcher de palavras-chave dos guardrails
+
+Compara o teste original (`keyword in text` para cada keyword) com o
+KeywordMatcher compilado, no texto típico de um briefing.
+
+Uso:
+    python scripts/bench_keyword_matcher.py --iterations 20000
+"""
+import os
+import sys
+import argparse
+import timeit
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.ml.content_guardrails import ContentGuardrails
+from src.ml.keyword_matcher import KeywordMatcher
+
+BRIEFING_TEXT = (
+    "Gestão de Conflitos em Sala de Aula. Como mediar conflitos entre alunos de forma eficaz "
+    "e construtiva, com exemplos do cotidiano escolar e estratégias de escuta ativa. "
+    "Área: Gestão de Sala de Aula. Público: Professores de Ensino Fundamental e coordenadores "
+    "pedagógicos que desejam aprimorar a convivência e a avaliação formativa da turma."
+)
+
+
+def legacy_check(text: str):
+    """Implementação anterior: uma busca de substring por keyword"""
+    text = text.lower()
+    forbidden = [k for k in ContentGuardrails.FORBIDDEN_KEYWORDS if k in text]
+    matches = sum(1 for k in ContentGuardrails.EDUCATIONAL_KEYWORDS if k in text)
+    return forbidden, matches
+
+
+def matcher_check(text: str):
+    """Implementação atual: uma passada do matcher compilado"""
+    found = ContentGuardrails.KEYWORD_MATCHER.matched_keywords(text)
+    forbidden = [k for k in found if k in ContentGuardrails.FORBIDDEN_KEYWORDS]
+    matches = sum(1 for k in found if k in ContentGuardrails.EDUCATIONAL_KEYWORDS)
+    return forbidden, matches
+
+
+def false_positive_examples():
+    """Textos em que a busca por substring acusava keywords inexistentes"""
+    samples = [
+        "Episódio 3: rotina de leitura com a turma",  # 'ódio' em 'episódio'
+        "Compartilhar partes do planejamento com a equipe",  # 'artes' em 'partes'
+        "O que o professor deseja ensinar",  # 'eja' em 'deseja'
+    ]
+    for sample in samples:
+        print(f"   '{sample}': legado={legacy_check(sample)}, matcher={matcher_check(sample)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do KeywordMatcher")
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--repeat-text', type=int, default=1, help="Multiplica o tamanho do texto")
+    args = parser.parse_args()
+
+    text = " ".join([BRIEFING_TEXT] * args.repeat_text)
+
+    print(f"\n📏 Texto: {len(text)} caracteres, "
+          f"{len(ContentGuardrails.EDUCATIONAL_KEYWORDS) + len(ContentGuardrails.FORBIDDEN_KEYWORDS)} keywords")
+    print(f"   legado:  proibidas={legacy_check(text)[0]}, educacionais={legacy_check(text)[1]}")
+    print(f"   matcher: proibidas={matcher_check(text)[0]}, educacionais={matcher_check(text)[1]}")
+
+    print("\n🔎 Falsos positivos do legado:")
+    false_positive_examples()
+    print()
+
+    for name, fn in (("legado (substring)", legacy_check), ("KeywordMatcher", matcher_check)):
+        seconds = timeit.timeit(lambda: fn(text), number=args.iterations)
+        print(f"⏱️  {name:<20} {seconds / args.iterations * 1e6:8.1f} µs/briefing")
+
+    # Escala com o número de keywords: legado é O(keywords × texto), matcher é O(texto)
+    print()
+    for count in (100, 1000, 5000):
+        keywords = [f"termo{i} composto{i % 7}" for i in range(count)]
+        matcher = KeywordMatcher(keywords)
+        lowered = text.lower()
+        legacy = timeit.timeit(lambda: [k for k in keywords if k in lowered], number=max(args.iterations // 20, 1))
+        compiled = timeit.timeit(lambda: matcher.matched_keywords(text), number=max(args.iterations // 20, 1))
+        runs = max(args.iterations // 20, 1)
+        print(
+            f"⏱️  {count:>5} keywords: legado {legacy / runs * 1e6:8.1f} µs, "
+            f"matcher {compiled / runs * 1e6:8.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
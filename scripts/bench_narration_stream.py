@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark da narração em streaming (src/video/narration_stream.py)
+
+Compara o caminho sequencial (enhance_script completo → TTS do roteiro
+inteiro) com o streaming (parágrafos vão ao TTS enquanto o LLM escreve),
+usando o provider LLM fake com latência e um TTS simulado cuja latência
+cresce com o tamanho do texto (como a API do ElevenLabs).
+
+Uso:
+    python scripts/bench_narration_stream.py --llm-ms 6000 --tts-base-ms 400 --tts-ms-per-char 2
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+
+class SimulatedTTS:
+    """TTS com latência base + proporcional aos caracteres (sem rede)"""
+
+    def __init__(self, base_ms: float, ms_per_char: float):
+        self.base_ms = base_ms
+        self.ms_per_char = ms_per_char
+
+    def generate(self, text, output_path, voice="pt-BR-FranciscaNeural", speed=1.0, previous_text=None):
+        time.sleep((self.base_ms + self.ms_per_char * len(text)) / 1000)
+        with open(output_path, "wb") as f:
+            f.write(text.encode("utf-8"))
+        return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da narração em streaming")
+    parser.add_argument('--llm-ms', type=float, default=6000, help="Latência total da resposta do LLM fake")
+    parser.add_argument('--tts-base-ms', type=float, default=400, help="Latência fixa por requisição TTS")
+    parser.add_argument('--tts-ms-per-char', type=float, default=2.0, help="Latência TTS por caractere")
+    parser.add_argument('--workers', type=int, default=2, help="Requisições TTS simultâneas")
+    args = parser.parse_args()
+
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_ms)
+    os.environ["FAKE_LLM_LATENCY_JITTER_MS"] = "0"
+
+    from src.ml.llm_service import LLMService
+    from src.video.narration_stream import NarrationStream
+
+    llm = LLMService()
+    tts = SimulatedTTS(args.tts_base_ms, args.tts_ms_per_char)
+    context = {'duration_minutes': 3, 'tone': 'prático', 'target_audience': 'Professores'}
+    outline = "Abertura → Caso real → Estratégias de mediação → Síntese"
+    output_dir = tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    script = llm.enhance_script(outline, context)
+    llm_done = time.perf_counter() - start
+    tts.generate(script, os.path.join(output_dir, "sequential.mp3"))
+    sequential = time.perf_counter() - start
+
+    stream = NarrationStream(
+        tts,
+        os.path.join(output_dir, "streaming.mp3"),
+        "pt-BR-FranciscaNeural",
+        {"min_segment_chars": 200, "tts_workers": args.workers}
+    )
+    result = stream.run(llm.stream_enhance_script(outline, context))
+
+    print(f"\n⏱️  Roteiro de {len(script)} caracteres, LLM {args.llm_ms / 1000:.1f}s, "
+          f"TTS {args.tts_base_ms:.0f}ms + {args.tts_ms_per_char}ms/caractere")
+    print(f"   sequencial: roteiro {llm_done:.2f}s | narração pronta {sequential:.2f}s")
+    print(f"   streaming:  roteiro {result['llm_seconds']:.2f}s | narração pronta {result['total_seconds']:.2f}s "
+          f"({len(result['paragraph_timings'])} trechos, {args.workers} workers)")
+    print(f"   espera após o roteiro: {sequential - llm_done:.2f}s → "
+          f"{result['total_seconds'] - result['llm_seconds']:.2f}s")
+    print(f"   economia total: {sequential - result['total_seconds']:.2f}s "
+          f"({(sequential - result['total_seconds']) / sequential:.0%})")
+
+
+if __name__ == "__main__":
+    main()
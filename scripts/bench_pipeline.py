@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end do pipeline com o provider LLM fake
+
+Executa os workflows usados pelas tasks generate_options, refine_content e
+generate_video sem chamar a OpenAI (LLM_PROVIDER=fake), com latência e
+taxa de falha configuráveis.
+
+Uso:
+    python scripts/bench_pipeline.py --runs 5 --latency-ms 800 --jitter-ms 400
+    python scripts/bench_pipeline.py --stages options,refine --failure-rate 0.05
+    python scripts/bench_pipeline.py --stages video --duration 1
+
+Requer ffmpeg no PATH para o estágio video (áudio fallback do TTS).
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+STAGES = ("options", "refine", "video")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end com LLM fake")
+    parser.add_argument('--runs', type=int, default=3, help="Execuções por estágio")
+    parser.add_argument('--stages', default="options,refine", help=f"Estágios: {','.join(STAGES)}")
+    parser.add_argument('--profile', default=None, help="Perfil do briefing workflow (standard/fast)")
+    parser.add_argument('--duration', type=int, default=1, help="Duração do briefing em minutos")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Latência simulada por chamada")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Jitter simulado por chamada")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Taxa de falha simulada (0-1)")
+    parser.add_argument('--seed', type=int, default=42, help="Semente do provider fake")
+    return parser.parse_args()
+
+
+def briefing_data(duration: int) -> dict:
+    return {
+        'title': 'Gestão de Conflitos em Sala de Aula',
+        'description': 'Como mediar conflitos entre alunos de forma eficaz e construtiva',
+        'target_audience': 'Professores de Ensino Fundamental',
+        'subject_area': 'Gestão de Sala de Aula',
+        'teacher_experience_level': 'intermediário',
+        'training_goal': 'Desenvolver habilidades de mediação e resolução de conflitos',
+        'duration_minutes': duration,
+        'tone': 'prático',
+        'video_orientation': 'horizontal'
+    }
+
+
+def run_stage(name: str, fn, runs: int) -> dict:
+    """Executa um estágio N vezes medindo latência, sucesso e chamadas LLM"""
+    from src.ml import usage_tracker
+
+    latencies, successes, calls, tokens = [], 0, [], []
+    for i in range(runs):
+        usage_tracker._buffer.clear()
+        start = time.perf_counter()
+        try:
+            ok = fn(i)
+        except Exception as e:
+            print(f"   ⚠️ {name} #{i + 1} falhou: {e}")
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        successes += int(bool(ok))
+
+        records = usage_tracker.pending_records()
+        calls.append(len(records))
+        tokens.append(sum(r['prompt_tokens'] + r['completion_tokens'] for r in records))
+
+    return {
+        'stage': name,
+        'mean': statistics.mean(latencies),
+        'p50': statistics.median(latencies),
+        'max': max(latencies),
+        'success': successes / runs,
+        'calls': statistics.mean(calls),
+        'tokens': statistics.mean(tokens)
+    }
+
+
+def main():
+    args = parse_args()
+
+    # Provider fake configurado antes de importar settings
+    os.environ['LLM_PROVIDER'] = 'fake'
+    os.environ['FAKE_LLM_LATENCY_MS'] = str(args.latency_ms)
+    os.environ['FAKE_LLM_LATENCY_JITTER_MS'] = str(args.jitter_ms)
+    os.environ['FAKE_LLM_FAILURE_RATE'] = str(args.failure_rate)
+    os.environ['FAKE_LLM_SEED'] = str(args.seed)
+
+    from src.workflows.briefing_workflow import BriefingAnalysisWorkflow
+    from src.workflows.refinement_workflow import ContentRefinementWorkflow
+
+    data = briefing_data(args.duration)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    results = []
+
+    if "options" in stages:
+        workflow = BriefingAnalysisWorkflow(profile=args.profile)
+        results.append(run_stage(
+            "options",
+            lambda i: workflow.run(briefing_id=i + 1, briefing_data=data)['success'],
+            args.runs
+        ))
+
+    if "refine" in stages:
+        from src.ml.llm_service import LLMService
+        script = LLMService().enhance_script("Introdução → Conceitos → Prática → Conclusão", data)
+        workflow = ContentRefinementWorkflow()
+        results.append(run_stage(
+            "refine",
+            lambda i: workflow.run(content=script, content_type="script")['success'],
+            args.runs
+        ))
+
+    if "video" in stages:
+        from src.workflows.video_workflow import VideoGenerationWorkflow
+        workflow = VideoGenerationWorkflow(generator_type='simple')
+        results.append(run_stage(
+            "video",
+            lambda i: workflow.run(
+                video_id=10_000 + i,
+                option_id=i + 1,
+                briefing_data=data,
+                script_outline="Introdução → Conceitos → Prática → Conclusão"
+            )['success'],
+            args.runs
+        ))
+
+    print("\n" + "=" * 80)
+    print(
+        f"📊 Pipeline com LLM fake ({args.runs} execuções, latência {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, "
+        f"falhas {args.failure_rate:.0%})"
+    )
+    print("=" * 80)
+    print(f"{'estágio':<9} {'média':>8} {'p50':>8} {'máx':>8} {'sucesso':>8} {'chamadas':>9} {'tokens':>8}")
+    for r in results:
+        print(
+            f"{r['stage']:<9} {r['mean']:>7.2f}s {r['p50']:>7.2f}s {r['max']:>7.2f}s "
+            f"{r['success']:>8.0%} {r['calls']:>9.1f} {r['tokens']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
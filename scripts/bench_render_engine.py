@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark das engines de renderização do SimpleVideoGenerator
+
+Gera uma narração sintética (tom de --seconds) e renderiza o mesmo
+roteiro de exemplo com MoviePy, com uma passada do ffmpeg (slides em
+memória pelo pipe) e com segmentos em paralelo (src/video/ffmpeg_renderer.py).
+O tempo inclui desenhar os slides (e gravar os PNGs, nas engines que os leem).
+Cada engine roda num processo próprio para medir tempo e pico de memória
+(Python e ffmpeg) isolados.
+
+Uso:
+    python scripts/bench_render_engine.py --seconds 180 --orientation horizontal
+    python scripts/bench_render_engine.py --engines ffmpeg segmented --segment-workers 2
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+SCRIPT = """CENA 1: Abertura
+Conflitos fazem parte da rotina escolar e podem virar oportunidades de aprendizagem.
+
+CENA 2: Caso real
+Dois alunos discutem durante o trabalho em grupo; a turma inteira para e observa.
+
+CENA 3: Escuta ativa
+Ouça cada lado sem interromper e repita o que entendeu antes de propor saídas.
+
+CENA 4: Acordos de turma
+Construa combinados com os alunos e retome-os sempre que um conflito surgir.
+
+CENA 5: Síntese
+Mediar é ensinar a conversar: modele a postura que você espera da turma."""
+
+
+def render(engine: str, seconds: float, orientation: str, workdir: str) -> dict:
+    """Roda uma engine (no processo filho) e devolve tempo e memória"""
+    from src.video.ffmpeg_renderer import FFmpegSlideRenderer
+    from src.video.simple_generator import FFMPEG_RENDERERS, FRAME_STREAM_ENGINES, SimpleVideoGenerator
+    from src.video.slide_raster import SlideRasterizer
+    from src.video.slide_templates import draw_slide
+
+    generator = SimpleVideoGenerator(tts_provider='auto', render_engine=engine)
+    metadata = {'video_orientation': orientation}
+
+    audio_path = os.path.join(workdir, "narration.mp3")
+    if not os.path.exists(audio_path):
+        subprocess.run([FFmpegSlideRenderer().binary, "-y", "-loglevel", "error", "-f", "lavfi",
+                        "-i", f"sine=frequency=220:duration={seconds}", "-c:a", "libmp3lame", audio_path],
+                       check=True)
+
+    output_path = os.path.join(workdir, f"video_{engine}.mp4")
+    start = time.perf_counter()
+    assets = generator.prepare_assets(SCRIPT, "Mediação de Conflitos", metadata, video_id=9000)
+    try:
+        if engine in FRAME_STREAM_ENGINES:
+            frames = SlideRasterizer().frames(draw_slide, assets['slides'])
+            FFmpegSlideRenderer().render_frames(frames, len(assets['slides']), audio_path, output_path)
+        elif engine in FFMPEG_RENDERERS:
+            FFMPEG_RENDERERS[engine]().render(assets['slide_paths'], audio_path, output_path)
+        else:
+            generator._render_moviepy(assets['slide_paths'], audio_path, output_path)
+    finally:
+        for slide_path in assets.get('slide_paths', []):
+            os.remove(slide_path)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seconds": elapsed,
+        "python_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "ffmpeg_peak_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "cpu_seconds": sum(resource.getrusage(who).ru_utime + resource.getrusage(who).ru_stime
+                           for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)),
+        "file_size_kb": os.path.getsize(output_path) / 1024,
+        "slides": len(assets['slides'])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MoviePy vs ffmpeg no SimpleVideoGenerator")
+    parser.add_argument('--seconds', type=float, default=180, help="Duração da narração")
+    parser.add_argument('--orientation', default='horizontal', choices=['horizontal', 'vertical'])
+    parser.add_argument('--engines', nargs='+', default=['moviepy', 'ffmpeg', 'segmented'],
+                        choices=['moviepy', 'ffmpeg', 'segmented'])
+    parser.add_argument('--segment-workers', type=int, default=0, help="0 = cota de CPU do container")
+    parser.add_argument('--engine', help=argparse.SUPPRESS)  # Processo filho
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        import io
+        import contextlib
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = render(args.engine, args.seconds, args.orientation, args.workdir)
+        print(json.dumps(result))
+        return
+
+    workdir = tempfile.mkdtemp()
+    environment = dict(os.environ, VIDEO_SEGMENT_WORKERS=str(args.segment_workers))
+    results = {}
+    for engine in args.engines:
+        process = subprocess.run(
+            [sys.executable, __file__, '--engine', engine, '--workdir', workdir,
+             '--seconds', str(args.seconds), '--orientation', args.orientation],
+            capture_output=True, text=True, check=True, env=environment
+        )
+        results[engine] = json.loads(process.stdout.strip().splitlines()[-1])
+
+    first = results[args.engines[0]]
+    rows = [
+        ('tempo', lambda r: f"{r['seconds']:>9.2f}s"),
+        ('CPU total', lambda r: f"{r['cpu_seconds']:>9.2f}s"),
+        ('pico Python', lambda r: f"{r['python_peak_mb']:>8.0f}MB"),
+        ('pico ffmpeg', lambda r: f"{r['ffmpeg_peak_mb']:>8.0f}MB"),
+        ('arquivo', lambda r: f"{r['file_size_kb']:>8.0f}KB"),
+    ]
+    print(f"\n🎬 {first['slides']} slides, {args.seconds:.0f}s de narração ({args.orientation})")
+    print(f"   {'':<16}" + "".join(f" {engine:>10}" for engine in args.engines))
+    for label, fmt in rows:
+        print(f"   {label:<16}" + "".join(f" {fmt(results[engine])}" for engine in args.engines))
+
+
+if __name__ == "__main__":
+    main()
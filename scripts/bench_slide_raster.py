@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark da rasterização de slides (src/video/slide_raster.py)
+
+Renderiza os slides de um vídeo com 1 worker (no próprio processo) e com
+o pool de processos, medindo tempo de parede e o pico de memória do
+processo principal. O pool padrão usa a cota de CPU do container.
+
+Uso:
+    python scripts/bench_slide_raster.py --slides 12 --workers 1 2 4
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.video import slide_raster
+from src.video.slide_raster import SlideRasterizer, cpu_quota
+from src.video.slide_templates import render_slide
+
+CONTENT = ("Ouça cada lado sem interromper e repita o que entendeu antes de propor saídas. "
+           "Construa combinados com a turma e retome-os sempre que um conflito surgir. ")
+
+
+def run(workers: int, slides: int, orientation: str) -> float:
+    output_dir = tempfile.mkdtemp()
+    jobs = [
+        {
+            'slide_path': os.path.join(output_dir, f"slide_1_{index:02d}.png"),
+            'title': f"Seção {index}: Mediação de conflitos",
+            'content': CONTENT * (1 + index % 3),
+            'slide_num': index,
+            'total_slides': slides,
+            'orientation': orientation
+        }
+        for index in range(1, slides + 1)
+    ]
+    rasterizer = SlideRasterizer(max_workers=workers)
+    rasterizer.render(render_slide, jobs[:workers])  # Aquecer pool/templates fora da medição
+
+    start = time.perf_counter()
+    paths = rasterizer.render(render_slide, jobs)
+    elapsed = time.perf_counter() - start
+
+    assert paths == [job['slide_path'] for job in jobs]
+    for path in paths:
+        os.remove(path)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterização de slides: sequencial vs pool")
+    parser.add_argument('--slides', type=int, default=12, help="Slides por vídeo")
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help="Tamanhos de pool a comparar")
+    parser.add_argument('--orientation', default='horizontal', choices=['horizontal', 'vertical'])
+    args = parser.parse_args()
+
+    quota = cpu_quota()
+    workers_list = args.workers or sorted({1, quota})
+    print(f"\n🖼️  {args.slides} slides ({args.orientation}), cota de CPU: {quota}")
+
+    baseline = None
+    for workers in workers_list:
+        elapsed = run(workers, args.slides, args.orientation)
+        baseline = baseline or elapsed
+        print(f"   {workers} worker(s): {elapsed:.2f}s ({elapsed / args.slides * 1000:.0f}ms/slide, "
+              f"{baseline / elapsed:.2f}x)")
+        slide_raster._shutdown_pool()
+
+    print(f"   pico do processo principal: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark do registro de grafos compilados (src/workflows/registry.py)
+
+Mede o custo de instanciar cada workflow como as tasks fazem (uma instância
+por execução) com o registro frio (grafo recompilado a cada instância, como
+antes) e quente (grafo compilado reaproveitado), e o tempo de uma execução
+completa do briefing com o provider LLM fake sem latência.
+
+Uso:
+    python scripts/bench_workflow_registry.py --iterations 50 --runs 20
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+
+from src.workflows.registry import clear_compiled_graphs, compiled_graph_count
+from src.workflows.briefing_workflow import BriefingAnalysisWorkflow
+from src.workflows.refinement_workflow import ContentRefinementWorkflow
+from src.workflows.video_workflow import VideoGenerationWorkflow
+from src.workflows.checkpointer import SQLiteCheckpointer
+
+BRIEFING = {
+    'title': 'Gestão de Conflitos em Sala de Aula',
+    'description': 'Como mediar conflitos entre alunos de forma eficaz e construtiva',
+    'target_audience': 'Professores de Ensino Fundamental',
+    'training_goal': 'Desenvolver habilidades de mediação e resolução de conflitos',
+    'duration_minutes': 3,
+    'tone': 'prático'
+}
+
+
+def timed(fn, iterations: int, cold: bool) -> float:
+    """Mediana em ms; cold=True descarta os grafos antes de cada chamada"""
+    samples = []
+    for _ in range(iterations):
+        if cold:
+            clear_compiled_graphs()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+class _Quiet:
+    """Silencia os prints dos workflows durante as medições"""
+
+    def __enter__(self):
+        self._stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+
+    def __exit__(self, *exc):
+        sys.stdout.close()
+        sys.stdout = self._stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do registro de grafos compilados")
+    parser.add_argument('--iterations', type=int, default=50, help="Instâncias por workflow")
+    parser.add_argument('--runs', type=int, default=20, help="Execuções completas do briefing")
+    args = parser.parse_args()
+
+    checkpointer = SQLiteCheckpointer(os.path.join(tempfile.mkdtemp(), "checkpoints.sqlite"))
+    factories = {
+        "briefing_analysis": BriefingAnalysisWorkflow,
+        "content_refinement": ContentRefinementWorkflow,
+        "video_generation": lambda: VideoGenerationWorkflow(checkpointer=checkpointer),
+    }
+
+    print(f"⏱️  Instanciação por execução (mediana de {args.iterations})")
+    print(f"   {'workflow':<20} {'frio':>10} {'quente':>10} {'economia':>10}")
+    with _Quiet():
+        rows = []
+        for name, factory in factories.items():
+            factory()  # aquecer imports/clientes
+            cold = timed(factory, args.iterations, cold=True)
+            warm = timed(factory, args.iterations, cold=False)
+            rows.append((name, cold, warm))
+    for name, cold, warm in rows:
+        print(f"   {name:<20} {cold:>8.2f}ms {warm:>8.2f}ms {cold - warm:>8.2f}ms")
+
+    print(f"\n⏱️  Execução completa do briefing, LLM fake sem latência (mediana de {args.runs})")
+    run = lambda: BriefingAnalysisWorkflow().run(1, BRIEFING)
+    with _Quiet():
+        run()
+        cold = timed(run, args.runs, cold=True)
+        warm = timed(run, args.runs, cold=False)
+    print(f"   frio {cold:.2f}ms | quente {warm:.2f}ms | economia {cold - warm:.2f}ms ({(cold - warm) / cold:.0%})")
+    print(f"\n✅ Grafos compilados no processo: {compiled_graph_count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Reconstrói o estado de uma thread a partir dos checkpoints (SQLiteCheckpointer)
+
+Mostra, passo a passo, o nó que gravou e os canais que mudaram; com --state,
+imprime o estado completo reconstruído no fim (ou no checkpoint pedido).
+
+Uso:
+    python scripts/replay_checkpoints.py video_42
+    python scripts/replay_checkpoints.py video_42 --state --until <checkpoint_id>
+    python scripts/replay_checkpoints.py --stats
+"""
+import os
+import sys
+import json
+import argparse
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config.workflows import VIDEO_WORKFLOW_CONFIG
+from src.workflows.checkpointer import SQLiteCheckpointer
+
+
+def preview(value, limit: int = 80) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+    text = text.replace("\n", " ")
+    return text if len(text) <= limit else f"{text[:limit]}… ({len(text)} caracteres)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay dos checkpoints de uma thread")
+    parser.add_argument('thread_id', nargs='?', help="Thread (ex.: video_42)")
+    parser.add_argument('--db', default=str(VIDEO_WORKFLOW_CONFIG["checkpoint_dir"] / "checkpoints.sqlite"),
+                        help="Arquivo SQLite de checkpoints")
+    parser.add_argument('--until', help="Para no checkpoint com este ID")
+    parser.add_argument('--state', action='store_true', help="Imprime o estado completo reconstruído")
+    parser.add_argument('--stats', action='store_true', help="Linhas e bytes por tabela")
+    args = parser.parse_args()
+
+    saver = SQLiteCheckpointer(args.db)
+
+    if args.stats:
+        for table, stats in saver.storage_stats().items():
+            print(f"   {table:<12} {stats['rows']:>8} linhas {stats['bytes'] / 1024:>10.1f} KB")
+    if not args.thread_id:
+        return
+
+    step = None
+    for step in saver.replay(args.thread_id):
+        print(f"📍 passo {step['step']} [{step['source']}] {step['node'] or '-'} ({step['checkpoint_id']})")
+        for channel, value in step['changed'].items():
+            if not channel.startswith(("__", "branch:", "join:")):
+                print(f"   {channel}: {preview(value)}")
+        if step['checkpoint_id'] == args.until:
+            break
+
+    if step is None:
+        print(f"❌ Nenhum checkpoint para a thread {args.thread_id}")
+        sys.exit(1)
+
+    if args.state:
+        print(json.dumps(step['values'], ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Rotas administrativas
+Consumo de LLM (tokens, latência, cache, retries) por agente/nó/briefing/vídeo
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from src.config.database import get_db
+from src.models.user import User
+from src.services.auth_service import require_admin
+from src.utils.hashid import encode_id, decode_id
+from src.ml.usage_tracker import summarize_usage, GROUP_BY_FIELDS
+
+router = APIRouter()
+
+@router.get("/admin/llm-usage")
+async def get_llm_usage(
+    group_by: str = Query("agent", description=f"Agrupamento: {', '.join(GROUP_BY_FIELDS)}"),
+    since_hours: Optional[int] = Query(24, ge=1, le=24 * 90, description="Janela em horas"),
+    briefing_id: Optional[str] = Query(None, description="Hash do briefing"),
+    video_id: Optional[str] = Query(None, description="Hash do vídeo"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """
+    Agrega consumo de LLM
+
+    **Requer admin**
+
+    Retorna por grupo: chamadas, tokens (prompt/completion/cache),
+    latência média/máxima, taxa de cache hit, retries e falhas.
+    """
+    if group_by not in GROUP_BY_FIELDS:
+        raise HTTPException(400, f"group_by inválido. Use um de: {', '.join(GROUP_BY_FIELDS)}")
+
+    filters = {}
+    for name, hash_str in (("briefing_id", briefing_id), ("video_id", video_id)):
+        if hash_str:
+            decoded = decode_id(hash_str)
+            if not decoded:
+                raise HTTPException(404, f"{name} não encontrado")
+            filters[name] = decoded
+
+    rows = summarize_usage(db, group_by=group_by, since_hours=since_hours, **filters)
+
+    # IDs internos nunca são expostos
+    if group_by in ("briefing_id", "video_id"):
+        for row in rows:
+            row[group_by] = encode_id(row[group_by]) if row[group_by] else None
+
+    return {
+        "group_by": group_by,
+        "since_hours": since_hours,
+        "totals": {
+            "calls": sum(r["calls"] for r in rows),
+            "total_tokens": sum(r["total_tokens"] for r in rows),
+            "cached_tokens": sum(r["cached_tokens"] for r in rows),
+            "total_latency_ms": sum(r["total_latency_ms"] for r in rows)
+        },
+        "groups": rows
+    }
@@ -2,10 +2,13 @@
 Rotas para Briefings
 Gestores enviam briefings simplificados aqui
 """
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from src.config.database import get_db
+from src.config.settings import settings
 from src.models.briefing import Briefing, BriefingStatus
 from src.models.user import User
 from src.schemas.briefing import BriefingCreate, BriefingResponse
@@ -13,7 +16,8 @@ from src.services.briefing_service import BriefingService
 from src.services.auth_service import get_current_user
 from src.utils.hashid import decode_id
 from src.utils.logger import log_security_event
-from src.ml.content_guardrails import ContentGuardrails
+from src.ml.content_guardrails import get_guardrails
+from src.ml.usage_tracker import usage_context, flush_usage
 
 router = APIRouter()
 
@@ -42,25 +46,42 @@ async def create_briefing(
     """
     
     # 🛡️ GUARDRAIL: Validar conteúdo educacional
-    guardrails = ContentGuardrails()
-    is_valid, reason, confidence = guardrails.validate_briefing(
-        title=briefing_data.title,
-        description=briefing_data.description,
-        subject_area=briefing_data.subject_area,
-        target_audience=briefing_data.target_audience
+    # Keywords no request; o LLM (só para baixa relevância) roda em thread pool
+    # com timeout e, se estourar, é adiado para o worker antes de gerar opções
+    guardrails = get_guardrails()
+    guardrail_args = (
+        briefing_data.title,
+        briefing_data.description,
+        briefing_data.subject_area or "",
+        briefing_data.target_audience or ""
     )
+    validate_content = False
+    verdict = guardrails.screen_briefing(*guardrail_args)
+    
+    if verdict is None:
+        try:
+            with usage_context(workflow="briefing_guardrails", node="validate_briefing"):
+                verdict = await asyncio.wait_for(
+                    run_in_threadpool(guardrails.confirm_with_llm, *guardrail_args),
+                    timeout=settings.GUARDRAILS_LLM_TIMEOUT_SECONDS
+                )
+        except asyncio.TimeoutError:
+            # A chamada continua no threadpool e grava o veredito no Redis; o worker o reaproveita
+            print(f"⏱️ Validação LLM excedeu {settings.GUARDRAILS_LLM_TIMEOUT_SECONDS}s, adiando para o worker")
+            validate_content = True
+            verdict = (True, "Validação contextual adiada para o processamento", 0.5)
+        flush_usage(db)
+    
+    is_valid, reason, confidence = verdict
     
     if not is_valid:
         # Log tentativa rejeitada
-        log_security_event(
-            event_type="content_guardrail_rejection",
-            user_id=current_user.id,
-            details={
-                "reason": reason,
-                "confidence": confidence,
-                "title": briefing_data.title[:100]
-            }
-        )
+        log_security_event("content_guardrail_rejection", {
+            "user_id": current_user.id,
+            "reason": reason,
+            "confidence": confidence,
+            "title": briefing_data.title[:100]
+        })
         
         # Retornar erro 422 (Unprocessable Entity)
         raise HTTPException(
@@ -102,7 +123,7 @@ async def create_briefing(
     
     # Disparar task Celery para gerar opções
     from src.workers.tasks import generate_options
-    generate_options.delay(briefing.id)
+    generate_options.delay(briefing.id, validate_content=validate_content)
     
     print(f"✅ Briefing {briefing.id} criado por {current_user.email}")
     
@@ -10,6 +10,8 @@ from src.models.user import User
 from src.models.briefing import Briefing
 from src.schemas.option import OptionResponse, OptionSelect
 from src.services.option_service import OptionService
+from src.services.speculation_service import SpeculationService
+from src.config.workflows import SPECULATION_CONFIG
 from src.services.auth_service import get_current_user
 from src.utils.hashid import decode_id
 from src.utils.logger import log_security_event
@@ -75,9 +77,9 @@ async def select_option(
     **Requer autenticação** e **ownership** do briefing
     
     Flow:
-    1. Marca opção como selecionada
+    1. Marca opção como selecionada (e cancela a especulação das demais)
     2. Cria registro de Video
-    3. Dispara task Celery generate_video
+    3. Dispara task Celery generate_video (usa o roteiro especulativo, se pronto)
     
     Returns:
         Video criado com status QUEUED
@@ -109,6 +111,10 @@ async def select_option(
     # 2. Marcar opção como selecionada
     option_service.select_option(option_id, selection.notes if selection else None)
     
+    # Cancelar o aprimoramento especulativo das opções não escolhidas
+    if SPECULATION_CONFIG["enabled"]:
+        SpeculationService().cancel_others(option.briefing_id, option_id)
+    
     # 3. Criar registro de vídeo
     video_data = {
         'option_id': option_id,
@@ -2,13 +2,15 @@
 Rotas para Videos
 Gestão de vídeos gerados
 """
+from celery import group
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import List
 from src.config.database import get_db
 from src.models.user import User
-from src.schemas.video import VideoResponse
+from src.models.video import VideoStatus
+from src.schemas.video import VideoResponse, VideoBatchReview, VideoBatchReviewItem, VideoBatchReviewResponse
 from src.services.video_service import VideoService
 from src.services.auth_service import get_current_user
 from src.utils.hashid import decode_id
@@ -219,7 +221,7 @@ async def get_video_status(
         "status": video.status,
         "progress": video.progress,
         "message": video.error_message if video.status == "failed" else None,
-        "awaiting_approval": video.status == "pending_approval"
+        "awaiting_approval": video.status == VideoStatus.PENDING_APPROVAL
     }
 
 
@@ -238,6 +240,10 @@ async def approve_video(
     """
     from src.workers.tasks import resume_video_generation
     
+    video_id = decode_id(video_hash)
+    if not video_id:
+        raise HTTPException(404, "Vídeo não encontrado")
+    
     service = VideoService(db)
     video = service.get_video(video_id)
     
@@ -253,7 +259,7 @@ async def approve_video(
         })
         raise HTTPException(404, "Vídeo não encontrado")
     
-    if video.status != "pending_approval":
+    if video.status != VideoStatus.PENDING_APPROVAL:
         raise HTTPException(
             status_code=400,
             detail=f"Vídeo não está aguardando aprovação. Status: {video.status}"
@@ -282,13 +288,17 @@ async def reject_video(
     **Requer autenticação** e **ownership** do vídeo
     
     Args:
-        video_id: ID do vídeo
+        video_hash: ID ofuscado do vídeo
         feedback: Feedback opcional para melhorias
     
     O workflow voltará para o estágio de enhancement com o feedback
     """
     from src.workers.tasks import resume_video_generation
     
+    video_id = decode_id(video_hash)
+    if not video_id:
+        raise HTTPException(404, "Vídeo não encontrado")
+    
     service = VideoService(db)
     video = service.get_video(video_id)
     
@@ -304,7 +314,7 @@ async def reject_video(
         })
         raise HTTPException(404, "Vídeo não encontrado")
     
-    if video.status != "pending_approval":
+    if video.status != VideoStatus.PENDING_APPROVAL:
         raise HTTPException(
             status_code=400,
             detail=f"Vídeo não está aguardando aprovação. Status: {video.status}"
@@ -325,6 +335,83 @@ async def reject_video(
     }
 
 
+@router.post("/videos/review-batch", response_model=VideoBatchReviewResponse)
+async def review_videos_batch(
+    review: VideoBatchReview,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Aprova ou rejeita vários vídeos aguardando revisão humana de uma vez
+    
+    **Requer autenticação** e **ownership** de cada vídeo
+    
+    Ownership e status de todos os vídeos vêm de uma única consulta; os
+    válidos são retomados como um grupo Celery. Cada hash recebe seu
+    resultado (queued, not_found ou not_pending): um vídeo inválido não
+    impede os demais.
+    """
+    from src.workers.tasks import resume_video_generation
+    
+    # Hashes repetidos contam uma vez (ordem preservada)
+    video_hashes = list(dict.fromkeys(review.video_ids))
+    video_ids = {video_hash: decode_id(video_hash) for video_hash in video_hashes}
+    
+    service = VideoService(db)
+    found = service.get_owners_and_statuses([video_id for video_id in video_ids.values() if video_id])
+    
+    results, queued, unauthorized = [], [], []
+    for video_hash in video_hashes:
+        video_id = video_ids[video_hash]
+        owner_id, status = found.get(video_id, (None, None))
+        
+        if owner_id != current_user.id:
+            if owner_id is not None:
+                unauthorized.append(video_id)
+            results.append(VideoBatchReviewItem(id=video_hash, status="not_found", detail="Vídeo não encontrado"))
+        elif status != VideoStatus.PENDING_APPROVAL:
+            results.append(VideoBatchReviewItem(
+                id=video_hash,
+                status="not_pending",
+                detail=f"Vídeo não está aguardando aprovação. Status: {getattr(status, 'value', status)}"
+            ))
+        else:
+            item = VideoBatchReviewItem(id=video_hash, status="queued")
+            results.append(item)
+            queued.append((item, video_id))
+    
+    if unauthorized:
+        log_security_event("unauthorized_video_access", {
+            "user_id": current_user.id,
+            "video_ids": unauthorized,
+            "action": f"batch_{review.action}"
+        })
+    
+    group_id = None
+    if queued:
+        approved = review.action == "approve"
+        group_result = group(
+            resume_video_generation.s(
+                video_id=video_id,
+                approved=approved,
+                feedback=None if approved else review.feedback
+            )
+            for _, video_id in queued
+        ).apply_async()
+        group_id = group_result.id
+        for (item, _), task in zip(queued, group_result.children):
+            item.task_id = task.id
+    
+    print(f"📦 Revisão em lote ({review.action}): {len(queued)}/{len(video_hashes)} vídeo(s) retomado(s)")
+    
+    return VideoBatchReviewResponse(
+        action=review.action,
+        group_id=group_id,
+        queued=len(queued),
+        results=results
+    )
+
+
 @router.post("/videos/{video_hash}/cancel")
 async def cancel_video(
     video_hash: str,  # Hash ofuscado
@@ -7,13 +7,14 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from src.config.settings import settings
 from src.config.rate_limit import limiter
-from src.api.routes import auth, briefings, options, videos, health, tasks
+from src.api.routes import auth, briefings, options, videos, health, tasks, admin
 
 # Importar models para registrá-los no SQLAlchemy Base
 from src.models.user import User
 from src.models.briefing import Briefing
 from src.models.option import Option
 from src.models.video import Video
+from src.models.llm_usage import LLMUsage
 
 app = FastAPI(
     title="EnsinaLab Content Engine API",
@@ -46,6 +47,7 @@ app.include_router(briefings.router, prefix="/api/v1", tags=["Briefings"])
 app.include_router(options.router, prefix="/api/v1", tags=["Options"])
 app.include_router(videos.router, prefix="/api/v1", tags=["Videos"])
 app.include_router(tasks.router, prefix="/api/v1", tags=["Tasks"])
+app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
 
 @app.on_event("startup")
 async def startup_event():
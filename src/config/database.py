@@ -39,8 +39,9 @@ def import_all_models():
     from src.models.briefing import Briefing
     from src.models.option import Option
     from src.models.video import Video
+    from src.models.llm_usage import LLMUsage
     # Retorna os models para evitar warning de "unused import"
-    return User, Briefing, Option, Video
+    return User, Briefing, Option, Video, LLMUsage
 
 def init_db():
     """Inicializa o banco de dados criando todas as tabelas"""
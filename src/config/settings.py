@@ -53,6 +53,19 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4"
     
+    # Provider de LLM: "openai" ou "fake" (local e determinístico, para testes de carga)
+    LLM_PROVIDER: str = "openai"
+    FAKE_LLM_LATENCY_MS: float = 0.0  # Latência base por chamada
+    FAKE_LLM_LATENCY_JITTER_MS: float = 0.0  # Jitter uniforme somado à latência
+    FAKE_LLM_FAILURE_RATE: float = 0.0  # Probabilidade de falha por chamada (0-1)
+    FAKE_LLM_SEED: int = 42
+    
+    # Guardrails de briefing
+    GUARDRAILS_LLM_TIMEOUT_SECONDS: float = 3.0  # Acima disso, a validação LLM é adiada para o worker
+    GUARDRAILS_VERDICT_CACHE_SIZE: int = 1024  # Vereditos LLM cacheados por hash do conteúdo (no processo)
+    GUARDRAILS_VERDICT_TTL_SECONDS: int = 7 * 24 * 3600  # Vereditos no Redis, compartilhados com os workers
+    GUARDRAILS_PENDING_WAIT_SECONDS: float = 30.0  # Espera máxima pelo veredito de uma chamada LLM em andamento
+    
     # Text-to-Speech (TTS)
     ELEVENLABS_API_KEY: Optional[str] = None
     TTS_SERVICE: str = "elevenlabs"  # elevenlabs, google, amazon, azure, fallback
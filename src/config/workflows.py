@@ -8,18 +8,86 @@ from pathlib import Path
 CHECKPOINT_BASE_DIR = Path(os.getenv("CHECKPOINT_DIR", "/tmp/langgraph_checkpoints"))
 CHECKPOINT_BASE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Checkpointer persistente (SQLite em CHECKPOINT_BASE_DIR, ver src/workflows/checkpointer.py)
+CHECKPOINT_CONFIG = {
+    # Threads sem checkpoint novo há mais dias que isso são removidas
+    # (menos as pausadas aguardando aprovação humana, que ainda podem ser retomadas)
+    "retention_days": float(os.getenv("CHECKPOINT_RETENTION_DAYS", "7")),
+    # Strings/bytes a partir desse tamanho ficam fora do checkpoint, endereçadas
+    # por hash (roteiros e briefing gravados uma vez, compartilhados entre threads)
+    "blob_min_bytes": int(os.getenv("CHECKPOINT_BLOB_MIN_BYTES", "256")),
+    # Checkpoints gravam só as versões que mudaram; a cada N, um completo
+    # (limita a cadeia lida para reconstruir um checkpoint)
+    "snapshot_every": int(os.getenv("CHECKPOINT_SNAPSHOT_EVERY", "16")),
+}
+
 # Video Generation Workflow
 VIDEO_WORKFLOW_CONFIG = {
     "checkpoint_dir": CHECKPOINT_BASE_DIR / "video_generation",
     "max_retries": 3,
     "review_threshold": 0.7,  # Score mínimo para auto-aprovar
-    "require_human_approval": True,  # Se True, sempre aguarda aprovação humana
+    # Se True, pausa após a revisão até aprovação humana (rotas approve/reject)
+    "require_human_approval": os.getenv("VIDEO_REQUIRE_HUMAN_APPROVAL", "false").lower() == "true",
+    # Validação barata do roteiro antes de TTS/renderização (src/video/script_validator.py):
+    # roteiros reprovados voltam para enhance_script com o feedback
+    "pre_render_validation": {
+        "enabled": os.getenv("VIDEO_PRE_RENDER_VALIDATION", "true").lower() == "true",
+        "words_per_minute": 150,  # Mesma velocidade de TTSService.estimate_duration
+        "min_duration_seconds": 10,  # Mesmo limite da revisão
+        "duration_ratio": (0.5, 1.6),  # Narração estimada / duration_minutes do briefing
+        "min_sections": 2,
+        "max_overflow_ratio": 0.5  # Fração máxima de slides com texto cortado/transbordando
+    },
+    # Narração em streaming (src/video/narration_stream.py): o aprimoramento do
+    # roteiro chega em parágrafos e cada trecho vai para o TTS assim que fica
+    # pronto; generate_audio reaproveita o áudio se o roteiro validado for o mesmo.
+    # Custo: o TTS começa antes da validação pré-renderização. O roteiro completo é
+    # validado assim que o modelo termina e, se reprovado, os trechos pendentes são
+    # cancelados, mas os já sintetizados durante a escrita são pagos e descartados.
+    # Vale a pena quando a validação costuma aprovar na primeira iteração
+    "streaming_narration": {
+        "enabled": os.getenv("VIDEO_STREAMING_NARRATION", "false").lower() == "true",
+        "min_segment_chars": 200,  # Parágrafos curtos (ex.: "CENA 1:") seguem junto com o próximo
+        "tts_workers": int(os.getenv("VIDEO_STREAMING_TTS_WORKERS", "2"))  # Requisições TTS simultâneas
+    },
+}
+
+# Renderização do SimpleVideoGenerator (src/video/simple_generator.py)
+VIDEO_RENDER_CONFIG = {
+    # "moviepy": clips compostos em Python; "ffmpeg": slides + narração numa
+    # única passada do ffmpeg; "segmented": um segmento por slide codificado em
+    # paralelo e unido por cópia de stream (src/video/ffmpeg_renderer.py). Mesmo formato de saída
+    "engine": os.getenv("VIDEO_RENDER_ENGINE", "moviepy").lower(),
+    "fps": 24,
+    "transition_seconds": 0.5,  # Fade do/para preto entre slides
+    "preset": "ultrafast",  # Menos RAM no encode
+    "video_bitrate": "1000k",
+    "audio_bitrate": "128k",
+    "threads": 2,
+    # Processos rasterizando slides em paralelo (src/video/slide_raster.py); 0 = cota de CPU do container
+    "slide_workers": int(os.getenv("VIDEO_SLIDE_WORKERS", "0")),
+    # Segmentos codificados ao mesmo tempo na engine "segmented"; 0 = cota de CPU do container
+    "segment_workers": int(os.getenv("VIDEO_SEGMENT_WORKERS", "0"))
 }
 
 # Briefing Analysis Workflow (Multi-Agent)
 BRIEFING_WORKFLOW_CONFIG = {
-    "num_options": 5,  # Número de opções a gerar
+    # "standard": analyze → generate (2 chamadas LLM)
+    # "fast": análise + opções em uma única resposta estruturada (1 chamada LLM)
+    "pipeline_profile": os.getenv("BRIEFING_PIPELINE_PROFILE", "standard"),
+    "num_options": int(os.getenv("BRIEFING_NUM_OPTIONS", "4")),  # Número de opções a gerar (e a entregar)
     "filter_threshold": 0.6,  # Score mínimo para passar no filtro
+    # Relevância no ranker: "legacy" (palavras em comum com o objetivo), "bm25" ou "tfidf"
+    "relevance_mode": os.getenv("BRIEFING_RELEVANCE_MODE", "legacy"),
+    # Reposição das opções descartadas pelo filtro: pede só as que faltam para
+    # num_options, com os motivos do descarte, dentro do prazo (contado do
+    # início do workflow) e do orçamento de tokens das rodadas de reposição
+    "regeneration": {
+        "enabled": os.getenv("BRIEFING_REGENERATION_ENABLED", "true").lower() == "true",
+        "max_rounds": int(os.getenv("BRIEFING_REGENERATION_MAX_ROUNDS", "2")),
+        "deadline_seconds": float(os.getenv("BRIEFING_REGENERATION_DEADLINE_SECONDS", "60")),
+        "token_budget": int(os.getenv("BRIEFING_REGENERATION_TOKEN_BUDGET", "6000"))
+    },
     "temperature": {
         "analyzer": 0.3,
         "generator": 0.8,
@@ -28,18 +96,99 @@ BRIEFING_WORKFLOW_CONFIG = {
     }
 }
 
+# Roteamento de modelos por agente e por complexidade do briefing
+# (complexidade calculada em ModelRouter.assess_complexity: simples/médio/complexo)
+# "small"/"large" são aliases resolvidos em "models"; large=None usa settings.OPENAI_MODEL
+# "repair": correção de campos inválidos de saídas estruturadas (ver structured_output.py)
+MODEL_ROUTING_CONFIG = {
+    "enabled": os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true",
+    "models": {
+        "small": os.getenv("OPENAI_SMALL_MODEL", "gpt-4o-mini"),
+        "large": os.getenv("OPENAI_LARGE_MODEL") or None
+    },
+    "default_tier": "médio",
+    "tiers": {
+        "simples": {
+            "analyzer": {"model": "small", "max_tokens": 600},
+            "generator": {"model": "small", "max_tokens": 2000},
+            "filter": {"model": "small", "max_tokens": 300},
+            "ranker": {"model": "small", "max_tokens": 300},
+            "evaluator": {"model": "small", "max_tokens": 700},
+            "refiner": {"model": "small", "max_tokens": 1200},
+            "repair": {"model": "small", "max_tokens": 600}
+        },
+        "médio": {
+            "analyzer": {"model": "small", "max_tokens": 800},
+            "generator": {"model": "large", "max_tokens": 2500},
+            "filter": {"model": "small", "max_tokens": 300},
+            "ranker": {"model": "small", "max_tokens": 300},
+            "evaluator": {"model": "small", "max_tokens": 800},
+            "refiner": {"model": "large", "max_tokens": 1500},
+            "repair": {"model": "small", "max_tokens": 600}
+        },
+        "complexo": {
+            "analyzer": {"model": "large", "max_tokens": 1000},
+            "generator": {"model": "large", "max_tokens": 3000},
+            "filter": {"model": "small", "max_tokens": 400},
+            "ranker": {"model": "small", "max_tokens": 400},
+            "evaluator": {"model": "small", "max_tokens": 900},
+            "refiner": {"model": "large", "max_tokens": 2000},
+            "repair": {"model": "small", "max_tokens": 600}
+        }
+    }
+}
+
 # Content Refinement Workflow
 REFINEMENT_WORKFLOW_CONFIG = {
     "target_quality": 0.85,  # Qualidade alvo (0-1)
     "max_iterations": 5,  # Máximo de ciclos de refinamento
-    "convergence_threshold": 0.02,  # Melhoria mínima para continuar
+    "convergence_threshold": 0.02,  # Melhoria mínima para continuar (abaixo disso: platô)
+    # Refinamento por seção (avalia o roteiro inteiro): opt-in, custa mais que a
+    # avaliação do documento (que lê só o início) — ~1,5x chamadas e ~2x tokens de entrada
+    "section_mode": os.getenv("REFINEMENT_SECTION_MODE", "false").lower() == "true",
+    "max_sections": 8,  # Seções avaliadas/reescritas isoladamente (vizinhas agrupadas acima disso)
+    "max_sections_per_pass": 3,  # Seções piores reescritas por iteração
     "quality_dimensions": [
         "clarity",
         "relevance",
         "structure",
         "applicability",
         "language"
-    ]
+    ],
+    # Pesos da nota agregada (calculada localmente a partir das notas por dimensão)
+    "dimension_weights": {
+        "clarity": 0.2,
+        "relevance": 0.2,
+        "structure": 0.2,
+        "applicability": 0.2,
+        "language": 0.2
+    },
+    "weak_dimensions_per_section": 2  # Dimensões mais fracas destacadas no prompt de reescrita
+}
+
+# Aprimoramento especulativo de roteiro (src/services/speculation_service.py):
+# enquanto o gestor escolhe, as opções mais bem ranqueadas têm o roteiro
+# aprimorado em tasks de baixa prioridade; o resultado fica no Redis por opção
+SPECULATION_CONFIG = {
+    "enabled": os.getenv("SPECULATIVE_ENHANCEMENT", "true").lower() == "true",
+    "top_k": int(os.getenv("SPECULATIVE_TOP_K", "2")),  # Opções do topo do ranking
+    "priority": 9,  # Prioridade Celery/Redis (0 = mais alta)
+    "ttl_seconds": int(os.getenv("SPECULATIVE_TTL_SECONDS", str(6 * 3600))),
+    # Orçamento diário de tokens especulativos por usuário (gestor dono do briefing)
+    "daily_token_budget": int(os.getenv("SPECULATIVE_DAILY_TOKEN_BUDGET", "20000")),
+    "estimated_tokens": 2500  # Reserva por roteiro (prompt + max_tokens=1500), ajustada ao consumo real
+}
+
+# Instrumentação por nó dos workflows (src/workflows/instrumentation.py)
+INSTRUMENTATION_CONFIG = {
+    "enabled": os.getenv("WORKFLOW_INSTRUMENTATION", "true").lower() == "true",
+    # Diretório do textfile collector do node_exporter (um .prom por processo); vazio = desligado
+    "textfile_dir": os.getenv("WORKFLOW_METRICS_TEXTFILE_DIR") or None,
+    "buckets": {
+        "wall_seconds": [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300],
+        "cpu_seconds": [0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300],
+        "peak_rss_delta_bytes": [0, 1 << 20, 8 << 20, 32 << 20, 128 << 20, 512 << 20]
+    }
 }
 
 # LangSmith Tracing (opcional)
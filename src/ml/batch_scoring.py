@@ -0,0 +1,148 @@
+"""
+Similaridade em lote entre o objetivo do treinamento e as opções (ranker)
+
+Os modos "bm25" e "tfidf" do ContentRankerAgent dependem do lote inteiro
+(frequência dos termos entre as opções, tamanho médio): as opções são
+tokenizadas uma única vez e a similaridade de todas sai de operações NumPy.
+No modo "legacy" (padrão) o ranker pontua opção a opção, sem este módulo:
+com 4 a 50 opções o laço em Python é mais rápido que o custo fixo do NumPy.
+
+A matriz termo-documento é esparsa em formato COO (linhas, colunas, contagens),
+sem depender de scipy.
+"""
+from functools import cached_property
+from itertools import chain
+from typing import Dict, Iterable, List, Sequence
+import numpy as np
+from src.ml.keyword_matcher import tokenize
+
+RELEVANCE_MODES = ("legacy", "bm25", "tfidf")
+
+# Campos da opção usados na similaridade BM25/TF-IDF
+SIMILARITY_FIELDS = ('title', 'summary', 'key_points')
+
+# Palavras funcionais ignoradas nos modos BM25/TF-IDF
+STOPWORDS = {
+    'a', 'o', 'as', 'os', 'e', 'de', 'da', 'do', 'das', 'dos', 'em', 'na', 'no',
+    'nas', 'nos', 'um', 'uma', 'para', 'por', 'com', 'que', 'se', 'ao', 'aos',
+    'como', 'mais', 'sua', 'seu', 'suas', 'seus', 'entre', 'sobre'
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class TermMatrix:
+    """
+    Matriz termo-documento esparsa (COO)
+
+    Os ids dos termos saem de um dicionário percorrido em C (map), e as
+    contagens por (documento, termo) de um np.unique sobre chaves inteiras.
+    """
+
+    def __init__(self, documents: Sequence[Iterable[str]]):
+        documents = [list(tokens) for tokens in documents]
+        tokens = list(chain.from_iterable(documents))
+        self.vocabulary: Dict[str, int] = {term: j for j, term in enumerate(dict.fromkeys(tokens))}
+        self.shape = (len(documents), len(self.vocabulary))
+
+        term_ids = np.fromiter(map(self.vocabulary.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        doc_ids = np.repeat(np.arange(len(documents), dtype=np.int64), [len(d) for d in documents])
+
+        # Agregar termos repetidos no mesmo documento (chave linha * V + coluna)
+        width = max(self.shape[1], 1)
+        keys, counts = np.unique(doc_ids * width + term_ids, return_counts=True)
+        self.rows = keys // width
+        self.cols = keys % width
+        self.counts = counts.astype(float)
+
+    def doc_lengths(self) -> np.ndarray:
+        """Número de tokens por documento"""
+        return np.bincount(self.rows, weights=self.counts, minlength=self.shape[0])
+
+    def doc_freq(self) -> np.ndarray:
+        """Número de documentos que contêm cada termo"""
+        return np.bincount(self.cols, minlength=self.shape[1])
+
+    def term_ids(self, query: Sequence[str]) -> np.ndarray:
+        """Coluna de cada termo da consulta (-1 se ausente do lote)"""
+        return np.fromiter((self.vocabulary.get(term, -1) for term in query), dtype=np.int64, count=len(query))
+
+    def columns(self, query: Sequence[str]) -> np.ndarray:
+        """Contagens densas (documentos × termos da consulta)"""
+        position = np.full(self.shape[1], -1)
+        ids = self.term_ids(query)
+        position[ids[ids >= 0]] = np.flatnonzero(ids >= 0)
+        dense = np.zeros((self.shape[0], len(query)))
+        selected = position[self.cols] >= 0
+        dense[self.rows[selected], position[self.cols[selected]]] = self.counts[selected]
+        return dense
+
+
+class BatchScorer:
+    """
+    Similaridade objetivo × opção de todas as opções de um briefing
+
+    Os tokens das opções são extraídos uma vez, na primeira vez em que são usados.
+
+    Uso:
+        similarity = BatchScorer(options).goal_similarity(briefing_data['training_goal'], "bm25")
+    """
+
+    def __init__(self, options: List[Dict]):
+        self.options = options
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    @cached_property
+    def _similarity_tokens(self) -> TermMatrix:
+        """Tokens normalizados (sem acento e sem stopwords) de título, resumo e key points"""
+        return TermMatrix([
+            [
+                token
+                for field in SIMILARITY_FIELDS
+                for token in tokenize(str(option.get(field, '')))
+                if token not in STOPWORDS
+            ]
+            for option in self.options
+        ])
+
+    def goal_similarity(self, goal: str, mode: str = "bm25") -> np.ndarray:
+        """
+        Similaridade objetivo × opção em 0-1
+
+        - bm25: BM25 normalizado pela pontuação de um documento de tamanho médio
+          com cada termo do objetivo uma vez
+        - tfidf: cosseno entre vetores TF-IDF (IDF suavizado no lote)
+        """
+        if mode not in ("bm25", "tfidf"):
+            raise ValueError(f"Modo de similaridade inválido: {mode}")
+
+        query = [token for token in dict.fromkeys(tokenize(goal)) if token not in STOPWORDS]
+        if not query or not self.options:
+            return np.zeros(len(self))
+
+        matrix = self._similarity_tokens
+        if not matrix.shape[1]:
+            return np.zeros(len(self))
+        tf = matrix.columns(query)
+        df = (tf > 0).sum(axis=0)
+        n_docs = len(self)
+
+        if mode == "bm25":
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            lengths = matrix.doc_lengths()
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+            scores = (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).sum(axis=1)
+            return np.clip(scores / idf.sum(), 0.0, 1.0)
+
+        idf = np.log((1 + n_docs) / (1 + matrix.doc_freq())) + 1
+        doc_norms = np.sqrt(np.bincount(
+            matrix.rows, weights=(matrix.counts * idf[matrix.cols]) ** 2, minlength=n_docs
+        ))
+        query_ids = matrix.term_ids(query)
+        query_weights = np.where(query_ids >= 0, idf[query_ids], np.log(1 + n_docs) + 1)
+        dots = (tf * query_weights ** 2).sum(axis=1)
+        denominators = doc_norms * np.linalg.norm(query_weights)
+        return np.divide(dots, denominators, out=np.zeros(n_docs), where=denominators > 0)
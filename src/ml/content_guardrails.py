@@ -2,8 +2,18 @@
 Content Guardrails - Validação de briefings educacionais
 Garante que apenas conteúdo relacionado a educação/treinamento seja aceito
 """
-from typing import Dict, Tuple
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import redis
+
+from src.config.settings import settings
 from src.ml.llm_service import LLMService
+from src.ml.keyword_matcher import KeywordMatcher
 
 
 class ContentGuardrails:
@@ -61,8 +71,49 @@ class ContentGuardrails:
         'supremacia', 'inferioridade racial', 'ódio', 'preconceito explícito'
     }
     
-    def __init__(self):
-        self.llm_service = LLMService()
+    # Matcher único (educacionais + proibidas), compilado na importação
+    KEYWORD_MATCHER = KeywordMatcher(EDUCATIONAL_KEYWORDS | FORBIDDEN_KEYWORDS)
+    
+    # Vereditos do LLM por hash do conteúdo: LRU no processo (1º nível) e Redis
+    # compartilhado entre API e workers (2º nível, ver _llm_validate_educational_content)
+    _verdict_cache: "OrderedDict[str, Dict]" = OrderedDict()
+    _verdict_lock = threading.Lock()
+    REDIS_PREFIX = "guardrails"
+    REDIS_RETRY_SECONDS = 30  # Redis indisponível: tenta de novo só depois disso
+    
+    def __init__(self, llm_service: Optional[LLMService] = None, redis_client: Optional[redis.Redis] = None):
+        self._llm_service = llm_service
+        self._redis = redis_client
+        self._redis_retry_at = 0.0
+    
+    @property
+    def redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                settings.get_redis_url(),
+                socket_timeout=2,
+                socket_connect_timeout=2,
+                decode_responses=True
+            )
+        return self._redis
+    
+    def _redis_call(self, operation, default=None):
+        """Executa no Redis; em erro, segue só com o cache do processo por um tempo"""
+        if time.monotonic() < self._redis_retry_at:
+            return default
+        try:
+            return operation(self.redis)
+        except redis.RedisError as e:
+            print(f"   ⚠️ Cache compartilhado de vereditos indisponível (Redis): {e}")
+            self._redis_retry_at = time.monotonic() + self.REDIS_RETRY_SECONDS
+            return default
+    
+    @property
+    def llm_service(self) -> LLMService:
+        """Cliente LLM criado só na primeira validação contextual"""
+        if self._llm_service is None:
+            self._llm_service = LLMService()
+        return self._llm_service
     
     def validate_briefing(
         self, 
@@ -87,54 +138,85 @@ class ContentGuardrails:
             - confidence_score: 0-1, quão confiante está a validação
         """
         
-        # Combinar todos os textos
-        full_text = f"{title} {description} {subject_area} {target_audience}".lower()
+        verdict = self.screen_briefing(title, description, subject_area, target_audience)
+        if verdict is None:
+            verdict = self.confirm_with_llm(title, description, subject_area, target_audience)
+        return verdict
+    
+    def screen_briefing(
+        self,
+        title: str,
+        description: str,
+        subject_area: str = "",
+        target_audience: str = ""
+    ) -> Optional[Tuple[bool, str, float]]:
+        """
+        Etapa síncrona da validação (somente keywords, sem LLM)
+        
+        Returns:
+            Veredito (is_valid, reason, confidence), ou None quando a relevância
+            educacional é baixa e o briefing precisa de confirm_with_llm()
+        """
+        
+        # Combinar todos os textos e buscar todas as keywords em uma passada
+        full_text = f"{title} {description} {subject_area} {target_audience}"
+        found_keywords = self.KEYWORD_MATCHER.matched_keywords(full_text)
         
         # 1. Verificação rápida: palavras proibidas
-        forbidden_check = self._check_forbidden_keywords(full_text)
+        forbidden_check = self._check_forbidden_keywords(found_keywords)
         if not forbidden_check['is_valid']:
             return (False, forbidden_check['reason'], 0.95)
         
         # 2. Verificação de relevância educacional (keywords)
-        relevance_score = self._calculate_educational_relevance(full_text)
-        
-        if relevance_score < 0.3:
-            # Muito baixa relevância educacional, consultar LLM
-            llm_validation = self._llm_validate_educational_content(
-                title, description, subject_area, target_audience
-            )
-            
-            if not llm_validation['is_valid']:
-                return (
-                    False, 
-                    llm_validation['reason'],
-                    llm_validation['confidence']
-                )
+        relevance_score = self._calculate_educational_relevance(found_keywords)
         
         # 3. Aprovado
         if relevance_score >= 0.7:
-            reason = "Briefing claramente educacional com alta relevância"
-            confidence = 0.95
+            return (True, "Briefing claramente educacional com alta relevância", 0.95)
         elif relevance_score >= 0.5:
-            reason = "Briefing educacional com relevância moderada"
-            confidence = 0.85
+            return (True, "Briefing educacional com relevância moderada", 0.85)
         elif relevance_score >= 0.3:
-            reason = "Briefing educacional com relevância aceitável"
-            confidence = 0.75
-        else:
-            # Passou na validação LLM mas tem baixa relevância keyword
-            reason = "Aprovado por análise contextual (LLM)"
-            confidence = 0.70
+            return (True, "Briefing educacional com relevância aceitável", 0.75)
         
-        return (True, reason, confidence)
+        # Muito baixa relevância educacional, consultar LLM
+        return None
     
-    def _check_forbidden_keywords(self, text: str) -> Dict:
-        """Verifica se há palavras proibidas"""
-        found_forbidden = []
+    def confirm_with_llm(
+        self,
+        title: str,
+        description: str,
+        subject_area: str = "",
+        target_audience: str = ""
+    ) -> Tuple[bool, str, float]:
+        """
+        Veredito contextual (LLM) para briefings de baixa relevância por keywords
         
-        for keyword in self.FORBIDDEN_KEYWORDS:
-            if keyword in text:
-                found_forbidden.append(keyword)
+        Chamada bloqueante: nas rotas async, executar em thread pool com timeout.
+        """
+        llm_validation = self._llm_validate_educational_content(
+            title, description, subject_area, target_audience
+        )
+        
+        if not llm_validation['is_valid']:
+            return (
+                False,
+                llm_validation['reason'],
+                llm_validation['confidence']
+            )
+        
+        # Passou na validação LLM mas tem baixa relevância keyword
+        return (True, "Aprovado por análise contextual (LLM)", 0.70)
+    
+    @staticmethod
+    def content_hash(title: str, description: str, subject_area: str = "", target_audience: str = "") -> str:
+        """Hash do conteúdo validado (caixa e espaços normalizados)"""
+        fields = (title, description, subject_area or "", target_audience or "")
+        normalized = "\x1f".join(" ".join(field.lower().split()) for field in fields)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    
+    def _check_forbidden_keywords(self, found_keywords: List[str]) -> Dict:
+        """Verifica se há palavras proibidas entre as keywords encontradas"""
+        found_forbidden = [k for k in found_keywords if k in self.FORBIDDEN_KEYWORDS]
         
         if found_forbidden:
             return {
@@ -145,13 +227,9 @@ class ContentGuardrails:
         
         return {'is_valid': True}
     
-    def _calculate_educational_relevance(self, text: str) -> float:
+    def _calculate_educational_relevance(self, found_keywords: List[str]) -> float:
         """Calcula score de relevância educacional (0-1)"""
-        matches = 0
-        
-        for keyword in self.EDUCATIONAL_KEYWORDS:
-            if keyword in text:
-                matches += 1
+        matches = sum(1 for k in found_keywords if k in self.EDUCATIONAL_KEYWORDS)
         
         # Normalizar (assumindo que ter 5+ keywords = 100% relevância)
         score = min(matches / 5.0, 1.0)
@@ -167,8 +245,75 @@ class ContentGuardrails:
     ) -> Dict:
         """
         Usa LLM para validação contextual quando keywords não são suficientes
+        
+        Vereditos são cacheados por hash do conteúdo (erros não são cacheados),
+        no processo e no Redis. Quem chama o LLM marca o hash como pendente:
+        a rota que estourou o timeout continua a chamada em background e o
+        worker (generate_options com validate_content) espera o veredito dela
+        em vez de pagar uma segunda chamada.
         """
         
+        cache_key = self.content_hash(title, description, subject_area, target_audience)
+        cached = self._cached_verdict(cache_key)
+        if cached is not None:
+            return cached
+        
+        pending_key = f"{self.REDIS_PREFIX}:pending:{cache_key}"
+        pending_seconds = settings.GUARDRAILS_PENDING_WAIT_SECONDS
+        claimed = self._redis_call(lambda r: r.set(pending_key, "1", nx=True, ex=int(pending_seconds) + 1), True)
+        if not claimed:
+            cached = self._wait_for_verdict(cache_key, pending_key, pending_seconds)
+            if cached is not None:
+                return cached
+        
+        try:
+            return self._ask_llm(cache_key, title, description, subject_area, target_audience)
+        finally:
+            self._redis_call(lambda r: r.delete(pending_key))
+    
+    def _cached_verdict(self, cache_key: str) -> Optional[Dict]:
+        """Veredito do LRU do processo ou, se ausente, do Redis (copiado para o LRU)"""
+        with self._verdict_lock:
+            cached = self._verdict_cache.get(cache_key)
+            if cached is not None:
+                self._verdict_cache.move_to_end(cache_key)
+                return cached
+        
+        raw = self._redis_call(lambda r: r.get(f"{self.REDIS_PREFIX}:verdict:{cache_key}"))
+        if not raw:
+            return None
+        verdict = json.loads(raw)
+        self._remember(cache_key, verdict)
+        return verdict
+    
+    def _wait_for_verdict(self, cache_key: str, pending_key: str, timeout: float) -> Optional[Dict]:
+        """Espera o veredito de outra chamada em andamento (None se ela sumir sem gravar)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.2)
+            cached = self._cached_verdict(cache_key)
+            if cached is not None:
+                return cached
+            if not self._redis_call(lambda r: r.exists(pending_key), 0):
+                return self._cached_verdict(cache_key)
+        return None
+    
+    def _remember(self, cache_key: str, verdict: Dict):
+        with self._verdict_lock:
+            self._verdict_cache[cache_key] = verdict
+            self._verdict_cache.move_to_end(cache_key)
+            while len(self._verdict_cache) > settings.GUARDRAILS_VERDICT_CACHE_SIZE:
+                self._verdict_cache.popitem(last=False)
+    
+    def _ask_llm(
+        self,
+        cache_key: str,
+        title: str,
+        description: str,
+        subject_area: str,
+        target_audience: str
+    ) -> Dict:
+        """Chamada LLM do veredito (gravado no LRU e no Redis)"""
         prompt = f"""
 Você é um validador de conteúdo educacional. Analise se o briefing abaixo é apropriado para uma plataforma de treinamento de professores.
 
@@ -203,13 +348,13 @@ Público: {target_audience}
             response = self.llm_service.chat(
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                agent="guardrails"
             )
             
-            import json
             result = json.loads(response)
             
-            return {
+            verdict = {
                 'is_valid': result.get('is_valid', False),
                 'reason': result.get('reason', 'Validação inconclusiva'),
                 'confidence': result.get('confidence', 0.5)
@@ -223,7 +368,16 @@ Público: {target_audience}
                 'reason': "Não foi possível validar o conteúdo educacional",
                 'confidence': 0.6
             }
-    
+
+        self._remember(cache_key, verdict)
+        self._redis_call(lambda r: r.set(
+            f"{self.REDIS_PREFIX}:verdict:{cache_key}",
+            json.dumps(verdict, ensure_ascii=False),
+            ex=settings.GUARDRAILS_VERDICT_TTL_SECONDS
+        ))
+
+        return verdict
+
     def get_educational_suggestions(self, rejected_briefing: str) -> str:
         """
         Sugere como reformular um briefing rejeitado para ser educacional
@@ -246,9 +400,21 @@ Seja breve (máx 200 caracteres por sugestão).
         try:
             response = self.llm_service.chat(
                 messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
+                temperature=0.7,
+                agent="guardrails_suggestions"
             )
             return response
             
         except Exception as e:
             return "Não foi possível gerar sugestões no momento."
+
+
+_guardrails: Optional[ContentGuardrails] = None
+
+
+def get_guardrails() -> ContentGuardrails:
+    """Instância compartilhada (LLMService criado sob demanda)"""
+    global _guardrails
+    if _guardrails is None:
+        _guardrails = ContentGuardrails()
+    return _guardrails
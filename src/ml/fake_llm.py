@@ -0,0 +1,419 @@
+"""
+Provider LLM local e determinístico (LLM_PROVIDER=fake)
+
+Substitui ChatOpenAI/OpenAI em testes de carga e regressão sem custo de API.
+A resposta depende apenas do hash do prompt (+ FAKE_LLM_SEED) e segue os
+formatos esperados por cada agente: análise, opções, roteiro, avaliação,
+refinamento, guardrails e reparo de saída estruturada.
+
+Latência e falhas são configuráveis:
+- FAKE_LLM_LATENCY_MS / FAKE_LLM_LATENCY_JITTER_MS: latência base + jitter uniforme
+- FAKE_LLM_FAILURE_RATE: probabilidade de erro por chamada (0-1)
+
+FakeOpenAIClient aceita stream=True (chunks delta.content + chunk final com usage).
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.config.settings import settings
+
+APPROACHES = ["Casos reais", "Passo a passo", "Problematização", "Storytelling", "Teórico-prático"]
+TONES = ["prático", "formal", "inspiracional", "conversacional", "técnico"]
+TOPICS = [
+    "escuta ativa", "acordos de convivência", "avaliação formativa", "metodologias ativas",
+    "gestão do tempo", "feedback aos alunos", "planejamento por objetivos", "BNCC",
+    "aprendizagem colaborativa", "mediação de conflitos", "rotinas de sala", "engajamento"
+]
+
+
+class FakeLLMError(RuntimeError):
+    """Falha simulada (equivalente a erro de API/timeout)"""
+
+
+class FakeLLMEngine:
+    """
+    Gera respostas determinísticas a partir do prompt
+
+    Latência/falhas usam RNG próprio (semente fixa) para que o mesmo prompt
+    possa falhar numa chamada e funcionar no retry, como na API real.
+    """
+
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        failure_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = settings.FAKE_LLM_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = settings.FAKE_LLM_LATENCY_JITTER_MS if jitter_ms is None else jitter_ms
+        self.failure_rate = settings.FAKE_LLM_FAILURE_RATE if failure_rate is None else failure_rate
+        self.seed = settings.FAKE_LLM_SEED if seed is None else seed
+        self._runtime_rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ API
+
+    def complete(self, messages: List[Dict[str, str]], json_mode: bool = False, max_tokens: Optional[int] = None) -> Dict:
+        """
+        Responde a uma lista de mensagens {role, content}
+
+        Returns:
+            Dict com content, prompt_tokens e completion_tokens
+        """
+        self._simulate_latency_and_failure()
+
+        prompt = "\n".join(message["content"] for message in messages)
+        rng = random.Random(f"{self.seed}:{hashlib.sha256(prompt.encode()).hexdigest()}")
+        content = self._respond(prompt, rng, json_mode)
+
+        completion_tokens = self.count_tokens(content)
+        if max_tokens and completion_tokens > max_tokens and not json_mode:
+            # Simula corte por max_tokens (só texto livre; JSON cortado quebraria o contrato do fake)
+            content = content[:max_tokens * 4]
+            completion_tokens = max_tokens
+
+        return {
+            "content": content,
+            "prompt_tokens": self.count_tokens(prompt),
+            "completion_tokens": completion_tokens
+        }
+
+    def stream(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None, chunk_chars: int = 24):
+        """
+        Mesma resposta de complete() em pedaços de texto (resposta em streaming)
+
+        A latência simulada é distribuída entre os pedaços, como a geração
+        token a token da API; a falha simulada acontece antes do primeiro.
+
+        Yields:
+            Pedaços do conteúdo; ao final, o dict de uso (prompt/completion tokens)
+        """
+        delay = self._simulate_latency_and_failure(sleep=False)
+
+        prompt = "\n".join(message["content"] for message in messages)
+        rng = random.Random(f"{self.seed}:{hashlib.sha256(prompt.encode()).hexdigest()}")
+        content = self._respond(prompt, rng, json_mode=False)
+
+        completion_tokens = self.count_tokens(content)
+        if max_tokens and completion_tokens > max_tokens:
+            content = content[:max_tokens * 4]
+            completion_tokens = max_tokens
+
+        pieces = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+        for piece in pieces:
+            if delay > 0:
+                time.sleep(delay / len(pieces))
+            yield piece
+
+        yield {"prompt_tokens": self.count_tokens(prompt), "completion_tokens": completion_tokens}
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """Aproximação usual: ~4 caracteres por token"""
+        return max(1, len(text) // 4)
+
+    def _simulate_latency_and_failure(self, sleep: bool = True) -> float:
+        """Sorteia latência/falha; sleep=False devolve a latência para quem a distribui"""
+        with self._lock:
+            jitter = self._runtime_rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._runtime_rng.random() < self.failure_rate if self.failure_rate else False
+
+        delay = (self.latency_ms + jitter) / 1000
+        if sleep and delay > 0:
+            time.sleep(delay)
+        if fail:
+            raise FakeLLMError("Falha simulada do provider fake")
+        return delay
+
+    # ------------------------------------------------------------ Respostas
+
+    def _respond(self, prompt: str, rng: random.Random, json_mode: bool) -> str:
+        """Detecta o tipo de prompt e gera a resposta no formato esperado"""
+        lowered = prompt.lower()
+
+        if "corrige campos inválidos" in lowered:
+            return json.dumps(self._repair(prompt, rng), ensure_ascii=False)
+        if '"sections"' in prompt and '"content"' in prompt:
+            return json.dumps(self._refine_sections(prompt, rng), ensure_ascii=False)
+        if '"sections"' in prompt and '"clarity"' in prompt:
+            return json.dumps(self._evaluate_sections(prompt), ensure_ascii=False)
+        if '"is_valid"' in prompt:
+            return json.dumps({
+                "is_valid": True,
+                "reason": "Conteúdo educacional voltado a professores",
+                "confidence": round(rng.uniform(0.8, 0.98), 2),
+                "educational_relevance": "high"
+            }, ensure_ascii=False)
+        if '"score"' in prompt:
+            return json.dumps(self._evaluation(prompt, rng), ensure_ascii=False)
+        if '"analysis"' in prompt and '"options"' in prompt:
+            return json.dumps({
+                "analysis": self._structured_analysis(prompt, rng),
+                "options": self._options(prompt, rng, 4)
+            }, ensure_ascii=False)
+        if '"options"' in prompt or "gere 3-5 opções" in lowered:
+            options = self._options(prompt, rng, 4)
+            return json.dumps({"options": options} if json_mode else options, ensure_ascii=False)
+        if "refine este" in lowered:
+            return self._refine(prompt, rng)
+        if "roteiro" in lowered and ("expanda" in lowered or "roteiro completo" in lowered):
+            return self._script(prompt, rng)
+        if "analise este briefing" in lowered:
+            return self._text_analysis(prompt, rng)
+        if "sugira" in lowered:
+            return "1. Foque em práticas de sala de aula; 2. Defina o público docente; 3. Explicite o objetivo pedagógico."
+
+        if json_mode:
+            return json.dumps({"result": self._sentence(rng)}, ensure_ascii=False)
+        return self._sentence(rng)
+
+    def _field(self, prompt: str, label: str, default: str) -> str:
+        match = re.search(rf"{label}:\**\s*(.+)", prompt)
+        return match.group(1).strip() if match else default
+
+    def _duration_minutes(self, prompt: str) -> int:
+        match = re.search(r"(\d+)\s*minutos", prompt)
+        return int(match.group(1)) if match else 5
+
+    def _sentence(self, rng: random.Random) -> str:
+        topics = rng.sample(TOPICS, 2)
+        return f"Professores podem aplicar {topics[0]} junto com {topics[1]} no dia a dia da escola."
+
+    def _options(self, prompt: str, rng: random.Random, count: int) -> List[Dict]:
+        title = self._field(prompt, "Título", "") or prompt.split("**Briefing:**")[-1].strip().split("\n")[0][:60] or "Formação docente"
+        tone = self._field(prompt, "Tom", rng.choice(TONES))
+        duration = self._duration_minutes(prompt) * 60
+        options = []
+        for i in range(count):
+            approach = APPROACHES[(i + rng.randrange(len(APPROACHES))) % len(APPROACHES)]
+            points = rng.sample(TOPICS, 4)
+            options.append({
+                "title": f"{title} - {approach}",
+                "summary": (
+                    f"Vídeo com abordagem de {approach.lower()} sobre {points[0]}. "
+                    f"Apresenta {points[1]} e {points[2]} com exemplos aplicáveis à sala de aula."
+                ),
+                "script_outline": (
+                    f"Abertura com situação real → Conceito de {points[0]} → "
+                    f"Exemplos de {points[1]} → Passo a passo de {points[2]} → Síntese e desafio prático"
+                ),
+                "key_points": "; ".join(points),
+                "estimated_duration": duration + rng.choice([-60, 0, 0, 30]),
+                "tone": tone if i == 0 else rng.choice(TONES),
+                "approach": approach
+            })
+        return options
+
+    def _structured_analysis(self, prompt: str, rng: random.Random) -> Dict:
+        return {
+            "objective": self._field(prompt, "Objetivo", "Desenvolver práticas docentes"),
+            "audience": self._field(prompt, "Público", "Professores"),
+            "depth": rng.choice(["introdutório", "intermediário", "aprofundado"]),
+            "key_concepts": rng.sample(TOPICS, 4),
+            "gaps": [] if rng.random() < 0.7 else ["Contexto da escola não informado"],
+            "suggestions": ["Incluir exemplo de sala de aula", "Propor atividade de aplicação"]
+        }
+
+    def _text_analysis(self, prompt: str, rng: random.Random) -> str:
+        structured = self._structured_analysis(prompt, rng)
+        return "\n".join([
+            f"1. Objetivo: {structured['objective']}",
+            f"2. Público-alvo: {structured['audience']}",
+            f"3. Profundidade: {structured['depth']}",
+            f"4. Conceitos: {', '.join(structured['key_concepts'])}",
+            f"5. Lacunas: {', '.join(structured['gaps']) or 'nenhuma relevante'}",
+            f"6. Sugestões: {'; '.join(structured['suggestions'])}"
+        ])
+
+    def _script(self, prompt: str, rng: random.Random) -> str:
+        """Roteiro em cenas com ~150 palavras por minuto de duração"""
+        target_words = self._duration_minutes(prompt) * 150
+        scenes, words, index = [], 0, 1
+        while words < target_words:
+            topics = rng.sample(TOPICS, 3)
+            paragraph = (
+                f"Nesta parte, vamos falar sobre {topics[0]}. Imagine uma turma em que {topics[1]} "
+                f"ainda não faz parte da rotina. O primeiro passo é observar os alunos e registrar "
+                f"o que acontece. Em seguida, combine com a turma como {topics[2]} vai funcionar "
+                f"e retome esse combinado ao longo da semana."
+            )
+            scenes.append(f"CENA {index}:\n{paragraph}")
+            words += len(paragraph.split())
+            index += 1
+        return "\n\n".join(scenes)
+
+    def _refine(self, prompt: str, rng: random.Random) -> str:
+        match = re.search(r"\*\*Conteúdo Atual:\*\*\s*(.+?)\s*\*\*Feedback", prompt, re.DOTALL)
+        content = match.group(1).strip() if match else self._sentence(rng)
+        # Marca no início: o avaliador só vê os primeiros 500 caracteres
+        return f"Na prática: {self._sentence(rng)}\n\n{content}"
+
+    def _prompt_sections(self, prompt: str) -> List[tuple]:
+        """Blocos "### Seção N" do prompt → [(N, texto)]"""
+        return [
+            (int(number), text.strip())
+            for number, text in re.findall(r"### Seção (\d+)\n(.+?)(?=\n### Seção |\n\*\*|\Z)", prompt, re.DOTALL)
+        ]
+
+    def _refine_sections(self, prompt: str, rng: random.Random) -> Dict:
+        sections = []
+        for number, text in self._prompt_sections(prompt):
+            heading, _, body = text.partition("\n")
+            body = body.strip() if body.strip() else heading
+            heading = heading if body is not heading else ""
+            # Marca após o título: mantém a seção reconhecível pelo splitter
+            refined = f"Na prática: {self._sentence(rng)} {body}"
+            sections.append({"index": number, "content": f"{heading}\n{refined}" if heading else refined})
+        return {"sections": sections}
+
+    def _evaluate_sections(self, prompt: str) -> Dict:
+        # Nota depende só do texto da seção: seções iguais recebem a mesma nota
+        sections = []
+        for number, text in self._prompt_sections(prompt):
+            rng = random.Random(f"{self.seed}:{hashlib.sha256(text.encode()).hexdigest()}")
+            bonus = min(text.count("Na prática:") * 0.06, 0.25)
+            dimensions = {
+                dimension: round(min(rng.uniform(0.6, 0.95) + bonus, 1.0), 2)
+                for dimension in ("clarity", "relevance", "structure", "applicability", "language")
+            }
+            sections.append({
+                "index": number,
+                **dimensions,
+                "feedback": f"Incluir exemplo concreto de {rng.choice(TOPICS)}."
+            })
+        return {"sections": sections}
+
+    def _evaluation(self, prompt: str, rng: random.Random) -> Dict:
+        # Cada refinamento aplicado eleva a nota (convergência realista do ciclo)
+        bonus = min(prompt.count("Na prática:") * 0.06, 0.25)
+        return {
+            "score": round(min(rng.uniform(0.65, 0.85) + bonus, 1.0), 2),
+            "feedback": f"Incluir exemplo concreto de {rng.choice(TOPICS)} e reforçar a síntese final."
+        }
+
+    def _repair(self, prompt: str, rng: random.Random) -> Dict:
+        """Preenche os campos pedidos em "fix" com valores plausíveis"""
+        match = re.search(r"(\[\s*\{.*\}\s*\])", prompt, re.DOTALL)
+        try:
+            requests = json.loads(match.group(1)) if match else []
+        except ValueError:
+            requests = []
+
+        repairs = []
+        for request in requests:
+            fields = {}
+            for name in request.get("fix", {}):
+                if name == "estimated_duration":
+                    fields[name] = 300
+                elif name == "score":
+                    fields[name] = round(rng.uniform(0.6, 0.9), 2)
+                elif name == "key_points":
+                    fields[name] = "; ".join(rng.sample(TOPICS, 3))
+                else:
+                    fields[name] = self._sentence(rng)
+            repairs.append({"index": request.get("index"), "fields": fields})
+        return {"repairs": repairs}
+
+
+_engine: Optional[FakeLLMEngine] = None
+
+
+def get_fake_engine() -> FakeLLMEngine:
+    """Engine compartilhada (RNG de latência/falhas único por processo)"""
+    global _engine
+    if _engine is None:
+        _engine = FakeLLMEngine()
+    return _engine
+
+
+_ROLES = {"human": "user", "ai": "assistant", "system": "system"}
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model LangChain com respostas do FakeLLMEngine (substitui ChatOpenAI)"""
+
+    model_name: str = "fake"
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-ensinalab"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        json_mode = (kwargs.get("response_format") or {}).get("type") == "json_object"
+        result = get_fake_engine().complete(
+            [{"role": _ROLES.get(m.type, m.type), "content": m.content} for m in messages],
+            json_mode=json_mode,
+            max_tokens=self.max_tokens
+        )
+        message = AIMessage(
+            content=result["content"],
+            usage_metadata={
+                "input_tokens": result["prompt_tokens"],
+                "output_tokens": result["completion_tokens"],
+                "total_tokens": result["prompt_tokens"] + result["completion_tokens"]
+            },
+            response_metadata={"model_name": self.model_name}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeOpenAIClient:
+    """Imitação mínima de openai.OpenAI (chat.completions.create) para o LLMService"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str, messages: List[Dict], temperature: float = 0.7,
+                max_tokens: Optional[int] = None, response_format: Optional[Dict] = None,
+                stream: bool = False, **kwargs):
+        if stream:
+            return self._stream(model, messages, max_tokens)
+        result = get_fake_engine().complete(
+            messages,
+            json_mode=(response_format or {}).get("type") == "json_object",
+            max_tokens=max_tokens
+        )
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=result["content"]))],
+            usage=SimpleNamespace(
+                prompt_tokens=result["prompt_tokens"],
+                completion_tokens=result["completion_tokens"],
+                total_tokens=result["prompt_tokens"] + result["completion_tokens"],
+                prompt_tokens_details=None
+            )
+        )
+
+    def _stream(self, model: str, messages: List[Dict], max_tokens: Optional[int]):
+        """Chunks no formato da API (delta.content); o último traz só `usage`"""
+        for item in get_fake_engine().stream(messages, max_tokens=max_tokens):
+            if isinstance(item, str):
+                yield SimpleNamespace(
+                    model=model,
+                    choices=[SimpleNamespace(delta=SimpleNamespace(content=item))],
+                    usage=None
+                )
+            else:
+                yield SimpleNamespace(
+                    model=model,
+                    choices=[],
+                    usage=SimpleNamespace(
+                        prompt_tokens=item["prompt_tokens"],
+                        completion_tokens=item["completion_tokens"],
+                        total_tokens=item["prompt_tokens"] + item["completion_tokens"],
+                        prompt_tokens_details=None
+                    )
+                )
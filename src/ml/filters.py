@@ -2,6 +2,7 @@
 Filtros para validação e scoring de opções
 """
 from typing import Dict, List
+from src.ml.keyword_matcher import SAFETY_MATCHER
 
 class ContentFilter:
     """Filtros para validar e pontuar opções de conteúdo"""
@@ -32,16 +33,10 @@ class ContentFilter:
         """
         Filtro de segurança - bloqueia conteúdo impróprio
         """
-        # Lista de palavras bloqueadas (expandir conforme necessário)
-        blocked_keywords = ['violência', 'discriminação', 'político-partidário']
+        # Palavras bloqueadas compartilhadas com o ContentFilterAgent (keyword_matcher.py)
+        text = f"{option.get('title', '')} {option.get('summary', '')}"
         
-        text = f"{option.get('title', '')} {option.get('summary', '')}".lower()
-        
-        for keyword in blocked_keywords:
-            if keyword in text:
-                return False
-        
-        return True
+        return not SAFETY_MATCHER.contains_any(text)
     
     def _calculate_relevance(self, option: Dict, context: Dict) -> float:
         """
@@ -0,0 +1,161 @@
+"""
+Matcher de palavras-chave compilado (guardrails e filtros de segurança)
+
+Substitui testes `keyword in text` repetidos por keyword:
+- Acentos e caixa normalizados ("Educação" == "educacao")
+- Fronteira de palavra: "eja" não casa com "deseja", "ódio" não casa com "episódio"
+- Hífens separam palavras ("político-partidário" == "político partidário")
+- Plurais comuns aceitos ("professor" casa com "professores", "avaliação" com "avaliações")
+- Expressões de várias palavras ("gestor escolar") e keywords contidas em
+  outras ("educação" dentro de "educação física") reportadas juntas
+
+Todas as keywords viram uma única regex em forma de trie (prefixos
+compartilhados), compilada na importação do módulo: uma passada sobre o
+texto, executada no motor de regex em C.
+"""
+import itertools
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SEPARATOR = "[^a-z0-9]+"
+
+# Terminações de plural aceitas para cada palavra das keywords
+_PLURAL_RULES: Tuple[Tuple[str, str], ...] = (
+    ("ao", "oes"),  # avaliação → avaliações
+    ("al", "ais"),  # nacional → nacionais
+    ("el", "eis"),
+    ("il", "is"),
+    ("m", "ns"),
+)
+
+
+def fold_accents(text: str) -> str:
+    """Remove acentos e converte para minúsculas (caracteres não-latinos são descartados)"""
+    return unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens normalizados (sem acento, minúsculos, separados por não-alfanuméricos)"""
+    return _WORD_RE.findall(fold_accents(text))
+
+
+def _plural_variants(word: str) -> Set[str]:
+    """Formas singular/plural aceitas para uma palavra"""
+    variants = {word, word + "s"}
+    if word[-1] not in "aeiou":
+        variants.add(word + "es")  # professor → professores
+    for suffix, plural in _PLURAL_RULES:
+        if word.endswith(suffix):
+            variants.add(word[: -len(suffix)] + plural)
+            break
+    return variants
+
+
+def _trie_pattern(phrases: Iterable[Tuple[str, ...]]) -> str:
+    """Regex em forma de trie (caractere a caractere) para as frases tokenizadas"""
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in " ".join(phrase):
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = []
+        optional = False
+        for char in sorted(node):
+            if char == "":
+                optional = True
+                continue
+            prefix = _SEPARATOR if char == " " else re.escape(char)
+            branches.append(prefix + build(node[char]))
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if optional else pattern
+
+    return build(trie)
+
+
+class KeywordHit(NamedTuple):
+    """Ocorrência de uma keyword (posições no texto normalizado)"""
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """
+    Regex única com todas as keywords
+
+    Uso:
+        matcher = KeywordMatcher({'professor', 'gestor escolar'})
+        matcher.find_all("Professores e gestores escolares")  # [KeywordHit(...), ...]
+        matcher.matched_keywords(text)  # ['professor', 'gestor escolar']
+    """
+
+    def __init__(self, keywords: Iterable[str], plurals: bool = True):
+        self.keywords = sorted(set(keywords))
+
+        # Forma tokenizada (com plurais) → keyword original
+        variants: Dict[Tuple[str, ...], str] = {}
+        for keyword in self.keywords:
+            tokens = tokenize(keyword)
+            if not tokens:
+                continue
+            forms = [_plural_variants(token) if plurals else {token} for token in tokens]
+            for variant in itertools.product(*forms):  # "gestor escolar" → "gestores escolares", ...
+                variants.setdefault(variant, keyword)
+
+        # Variante ("gestores escolares") → keywords que ela representa, incluindo
+        # as contidas nela ("educação física" também conta "educação")
+        self._lookup: Dict[str, Tuple[str, ...]] = {}
+        for variant, keyword in variants.items():
+            found = [keyword]
+            for size in range(len(variant) - 1, 0, -1):
+                for start in range(len(variant) - size + 1):
+                    inner = variants.get(variant[start:start + size])
+                    if inner and inner not in found:
+                        found.append(inner)
+            self._lookup[" ".join(variant)] = tuple(found)
+
+        pattern = _trie_pattern(variants) if variants else "(?!)"
+        self._regex = re.compile(rf"(?<![a-z0-9]){pattern}(?![a-z0-9])")
+
+    def _keywords_at(self, match: re.Match) -> Tuple[str, ...]:
+        """Keywords representadas por um trecho casado pela regex"""
+        matched = match.group()
+        if not matched.isalnum():  # Separadores variados entre palavras ("-", " ", ...)
+            matched = " ".join(_WORD_RE.findall(matched))
+        return self._lookup[matched]
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """Todas as ocorrências na ordem do texto (keywords contidas logo após a que as contém)"""
+        return [
+            KeywordHit(keyword, match.start(), match.end())
+            for match in self._regex.finditer(fold_accents(text))
+            for keyword in self._keywords_at(match)
+        ]
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Keywords distintas encontradas, na ordem da primeira ocorrência"""
+        found: Dict[str, None] = {}
+        for match in self._regex.finditer(fold_accents(text)):
+            for keyword in self._keywords_at(match):
+                found[keyword] = None
+        return list(found)
+
+    def contains_any(self, text: str) -> bool:
+        """True se ao menos uma keyword ocorre no texto (para na primeira)"""
+        return self._regex.search(fold_accents(text)) is not None
+
+
+# Conteúdo bloqueado em opções geradas (ContentFilterAgent e ContentFilter)
+SAFETY_BLOCKED_KEYWORDS = {
+    'político-partidário', 'discriminação', 'violência',
+    'conteúdo inadequado', 'ofensivo'
+}
+
+SAFETY_MATCHER = KeywordMatcher(SAFETY_BLOCKED_KEYWORDS)
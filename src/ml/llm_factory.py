@@ -0,0 +1,45 @@
+"""
+Fábrica de clientes LLM
+
+Ponto único de criação de ChatOpenAI (workflows) e OpenAI (LLMService),
+selecionando o provider por settings.LLM_PROVIDER:
+- "openai": APIs reais
+- "fake": src/ml/fake_llm.py (determinístico, sem custo)
+"""
+from typing import Optional
+from src.config.settings import settings
+
+PROVIDERS = ("openai", "fake")
+
+
+def _provider() -> str:
+    provider = settings.LLM_PROVIDER.lower()
+    if provider not in PROVIDERS:
+        raise ValueError(f"LLM_PROVIDER '{provider}' não suportado. Use um de: {', '.join(PROVIDERS)}")
+    return provider
+
+
+def create_chat_model(model: str, temperature: float, max_tokens: Optional[int] = None, http_client=None):
+    """Cria chat model LangChain (ChatOpenAI ou FakeChatModel)"""
+    if _provider() == "fake":
+        from src.ml.fake_llm import FakeChatModel
+        return FakeChatModel(model_name=model, temperature=temperature, max_tokens=max_tokens)
+
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        openai_api_key=settings.OPENAI_API_KEY,
+        http_client=http_client
+    )
+
+
+def create_openai_client(http_client=None):
+    """Cria cliente estilo SDK OpenAI (OpenAI ou FakeOpenAIClient)"""
+    if _provider() == "fake":
+        from src.ml.fake_llm import FakeOpenAIClient
+        return FakeOpenAIClient()
+
+    from openai import OpenAI
+    return OpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
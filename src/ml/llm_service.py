@@ -1,17 +1,45 @@
 """
 Service de LLM - integração com OpenAI/outros modelos
 """
-from typing import List, Dict
-from openai import OpenAI
+import re
+from typing import Iterator, List, Dict, Optional
 from src.config.settings import settings
+from src.ml.llm_factory import create_openai_client
+from src.ml.usage_tracker import build_http_client, track_llm_call, track_llm_stream
+
+# Fim de parágrafo no texto em streaming (linha em branco)
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
 
 class LLMService:
     """Serviço para interação com modelos de linguagem"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = create_openai_client(http_client=build_http_client())
         self.model = settings.OPENAI_MODEL
     
+    def chat(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,
+        response_format: Optional[Dict] = None,
+        max_tokens: Optional[int] = None,
+        agent: str = "chat"
+    ) -> str:
+        """
+        Chamada genérica de chat (usada pelos guardrails)
+        
+        Returns:
+            Conteúdo textual da resposta
+        """
+        params = {"model": self.model, "messages": messages, "temperature": temperature}
+        if response_format:
+            params["response_format"] = response_format
+        if max_tokens:
+            params["max_tokens"] = max_tokens
+        
+        response = track_llm_call(agent, self.model, lambda: self.client.chat.completions.create(**params))
+        return response.choices[0].message.content
+    
     def generate_options(self, briefing_data: Dict) -> List[Dict]:
         """
         Gera múltiplas opções de conteúdo a partir de um briefing
@@ -21,7 +49,7 @@ class LLMService:
         prompt = self._build_options_prompt(briefing_data)
         
         try:
-            response = self.client.chat.completions.create(
+            response = track_llm_call("options", self.model, lambda: self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": self._get_system_prompt()},
@@ -29,7 +57,7 @@ class LLMService:
                 ],
                 temperature=0.8,  # Maior criatividade para gerar opções variadas
                 max_tokens=2000
-            )
+            ))
             
             # Parse da resposta e extração das opções
             options_text = response.choices[0].message.content
@@ -116,10 +144,14 @@ Gere as opções no seguinte formato JSON:
             "estimated_duration": 300
         }]
     
-    def enhance_script(self, script_outline: str, context: Dict) -> str:
-        """
-        Aprimora um roteiro esboçado em roteiro completo
-        """
+    def _enhance_script_messages(self, script_outline: str, context: Dict, feedback: Optional[List[str]] = None) -> List[Dict]:
+        """Mensagens do aprimoramento de roteiro (com e sem streaming)"""
+        adjustments = ""
+        if feedback:
+            adjustments = "\n**Ajustes necessários (versão anterior reprovada):**\n" + "\n".join(
+                f"- {item}" for item in feedback
+            ) + "\n"
+        
         prompt = f"""
 Expanda este roteiro esboçado em um roteiro completo para narração de vídeo de TREINAMENTO DE PROFESSORES:
 
@@ -131,25 +163,66 @@ Expanda este roteiro esboçado em um roteiro completo para narração de vídeo
 - Área/Disciplina: {context.get('subject_area', 'Geral')}
 - Duração: {context.get('duration_minutes')} minutos
 - Tom: {context.get('tone')}
-
+{adjustments}
 Gere um roteiro completo, pronto para narração, dividido em cenas.
 Use linguagem profissional mas acessível, adequada para professores.
 Inclua exemplos práticos e aplicáveis à sala de aula quando relevante.
 """
+        return [
+            {"role": "system", "content": "Você é um roteirista de vídeos educacionais."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def enhance_script(self, script_outline: str, context: Dict, feedback: Optional[List[str]] = None) -> str:
+        """
+        Aprimora um roteiro esboçado em roteiro completo
+        
+        Args:
+            feedback: Ajustes pedidos pela validação/revisão da versão anterior
+        """
+        messages = self._enhance_script_messages(script_outline, context, feedback)
         
         try:
-            response = self.client.chat.completions.create(
+            response = track_llm_call("enhancer", self.model, lambda: self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "Você é um roteirista de vídeos educacionais."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=1500
-            )
+            ))
             
             return response.choices[0].message.content
             
         except Exception as e:
             print(f"Erro ao aprimorar roteiro: {e}")
             return script_outline
+    
+    def stream_enhance_script(self, script_outline: str, context: Dict, feedback: Optional[List[str]] = None) -> Iterator[str]:
+        """
+        enhance_script em streaming: produz cada parágrafo do roteiro assim que
+        o modelo o termina (linha em branco), para a narração começar antes
+        do fim da resposta
+        
+        Sem fallback: erros propagam para quem consome o stream decidir.
+        """
+        messages = self._enhance_script_messages(script_outline, context, feedback)
+        stream = track_llm_stream("enhancer", self.model, lambda: self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=1500,
+            stream=True,
+            stream_options={"include_usage": True}
+        ))
+        
+        pending = ""
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            pending += chunk.choices[0].delta.content or ""
+            *paragraphs, pending = _PARAGRAPH_BREAK.split(pending)
+            for paragraph in paragraphs:
+                if paragraph.strip():
+                    yield paragraph.strip()
+        
+        if pending.strip():
+            yield pending.strip()
@@ -0,0 +1,314 @@
+"""
+Contabilidade de tokens e latência das chamadas LLM
+
+Cada chamada registra tokens de prompt/completion, latência, modelo,
+cache hit e número de retries, com as tags ativas no contexto
+(workflow, nó, briefing_id, video_id). Os registros ficam em buffer
+e são persistidos em lote na tabela llm_usage por flush_usage().
+
+Uso:
+    with usage_context(workflow="briefing_analysis", briefing_id=42):
+        response = track_llm_call("analyzer", model, lambda: llm.invoke(messages))
+    flush_usage(db)
+"""
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+
+# Tags da execução atual (workflow, node, briefing_id, video_id)
+_usage_tags: ContextVar[Dict[str, Any]] = ContextVar("llm_usage_tags", default={})
+
+# Contador de requisições HTTP da chamada LLM em andamento (retries = requisições - 1)
+_http_requests: ContextVar[Optional[List[int]]] = ContextVar("llm_http_requests", default=None)
+
+# Contadores do bloco count_calls() em andamento (ex.: um nó de workflow)
+_call_counts: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_call_counts", default=None)
+
+# Buffer em memória até o próximo flush
+MAX_BUFFERED_RECORDS = 5000
+_buffer: List[Dict] = []
+_buffer_lock = threading.Lock()
+
+GROUP_BY_FIELDS = ("workflow", "node", "agent", "model", "briefing_id", "video_id")
+
+
+@contextmanager
+def usage_context(**tags):
+    """Adiciona tags (workflow, node, briefing_id, video_id) às chamadas do bloco"""
+    token = _usage_tags.set({**_usage_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _usage_tags.reset(token)
+
+
+def current_tags() -> Dict[str, Any]:
+    """Tags ativas no contexto atual"""
+    return dict(_usage_tags.get())
+
+
+@contextmanager
+def count_calls():
+    """
+    Conta chamadas LLM, requisições HTTP dos clientes LLM e tokens do bloco
+
+    Uso:
+        with count_calls() as counts:
+            ...
+        counts  # {"llm_calls": 2, "http_requests": 3, "tokens": 1800}
+    """
+    counts = {"llm_calls": 0, "http_requests": 0, "tokens": 0}
+    token = _call_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _call_counts.reset(token)
+
+
+def _count_request(request: httpx.Request):
+    """Event hook do httpx: conta tentativas da chamada LLM atual"""
+    counter = _http_requests.get()
+    if counter is not None:
+        counter[0] += 1
+    counts = _call_counts.get()
+    if counts is not None:
+        counts["http_requests"] += 1
+
+
+def build_http_client() -> httpx.Client:
+    """Cliente HTTP para SDKs OpenAI/LangChain que contabiliza retries"""
+    return httpx.Client(event_hooks={"request": [_count_request]})
+
+
+def _extract_usage(response: Any) -> Dict[str, int]:
+    """Extrai tokens de AIMessage (LangChain) ou ChatCompletion (SDK OpenAI)"""
+    usage_metadata = getattr(response, "usage_metadata", None)
+    if usage_metadata:
+        details = usage_metadata.get("input_token_details") or {}
+        return {
+            "prompt_tokens": usage_metadata.get("input_tokens", 0),
+            "completion_tokens": usage_metadata.get("output_tokens", 0),
+            "cached_tokens": details.get("cache_read", 0) or 0
+        }
+
+    usage = getattr(response, "usage", None)
+    if usage:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        }
+
+    return {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+
+
+def track_llm_call(agent: str, model: str, call: Callable[[], Any]) -> Any:
+    """
+    Executa uma chamada LLM registrando consumo e latência
+
+    Args:
+        agent: Nome do agente/uso (analyzer, enhancer, guardrails, ...)
+        model: Modelo utilizado
+        call: Função sem argumentos que faz a chamada e retorna a resposta
+
+    Returns:
+        Resposta da chamada (exceções são registradas e propagadas)
+    """
+    counter_token = _http_requests.set([0])
+    start = time.perf_counter()
+    response = None
+    success = False
+    try:
+        response = call()
+        success = True
+        return response
+    finally:
+        latency_ms = (time.perf_counter() - start) * 1000
+        requests_made = _http_requests.get()[0]
+        _http_requests.reset(counter_token)
+
+        usage = _extract_usage(response) if response is not None else _extract_usage(None)
+        record_llm_call(
+            agent=agent,
+            model=model,
+            latency_ms=latency_ms,
+            retries=max(requests_made - 1, 0),
+            success=success,
+            **usage
+        )
+
+
+def track_llm_stream(agent: str, model: str, call: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+    """
+    Versão de track_llm_call para respostas em streaming
+
+    Repassa os chunks e registra a chamada ao fim do stream (tokens do chunk
+    com `usage`, enviado pela API com stream_options={"include_usage": True};
+    latência até o último chunk). Stream interrompido conta como falha.
+    """
+    start = time.perf_counter()
+    usage_chunk = None
+    success = False
+    try:
+        for chunk in call():
+            if getattr(chunk, "usage", None):
+                usage_chunk = chunk
+            yield chunk
+        success = True
+    finally:
+        record_llm_call(
+            agent=agent,
+            model=model,
+            latency_ms=(time.perf_counter() - start) * 1000,
+            success=success,
+            **_extract_usage(usage_chunk)
+        )
+
+
+def record_llm_call(
+    agent: str,
+    model: str,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    cached_tokens: int = 0,
+    latency_ms: float = 0,
+    cache_hit: bool = False,
+    retries: int = 0,
+    success: bool = True
+) -> Dict:
+    """Registra uma chamada no buffer com as tags do contexto atual"""
+    tags = _usage_tags.get()
+    record = {
+        "created_at": datetime.utcnow(),
+        "workflow": tags.get("workflow"),
+        "node": tags.get("node"),
+        "agent": agent,
+        "model": model,
+        "briefing_id": tags.get("briefing_id"),
+        "video_id": tags.get("video_id"),
+        "prompt_tokens": prompt_tokens or 0,
+        "completion_tokens": completion_tokens or 0,
+        "cached_tokens": cached_tokens or 0,
+        "latency_ms": int(round(latency_ms)),
+        "cache_hit": cache_hit or bool(cached_tokens),
+        "retries": retries,
+        "success": success
+    }
+
+    counts = _call_counts.get()
+    if counts is not None:
+        counts["llm_calls"] += 1
+        counts["tokens"] += record["prompt_tokens"] + record["completion_tokens"]
+
+    with _buffer_lock:
+        _buffer.append(record)
+        if len(_buffer) > MAX_BUFFERED_RECORDS:
+            del _buffer[:len(_buffer) - MAX_BUFFERED_RECORDS]
+
+    return record
+
+
+def pending_records() -> List[Dict]:
+    """Cópia dos registros ainda não persistidos"""
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def flush_usage(db) -> int:
+    """
+    Persiste registros em buffer na tabela llm_usage (um único insert em lote)
+
+    Returns:
+        Número de registros gravados
+    """
+    from src.models.llm_usage import LLMUsage
+
+    with _buffer_lock:
+        records = list(_buffer)
+        _buffer.clear()
+
+    if not records:
+        return 0
+
+    try:
+        if not db.is_active:
+            db.rollback()  # Sessão ficou inválida após erro da task
+        db.bulk_insert_mappings(LLMUsage, records)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Erro ao gravar consumo de LLM ({len(records)} registros): {e}")
+        return 0
+
+    return len(records)
+
+
+def summarize_usage(
+    db,
+    group_by: str = "agent",
+    since_hours: Optional[int] = 24,
+    briefing_id: Optional[int] = None,
+    video_id: Optional[int] = None
+) -> List[Dict]:
+    """
+    Agrega consumo de LLM por workflow/nó/agente/modelo/briefing/vídeo
+
+    Returns:
+        Lista ordenada por tokens totais (desc)
+    """
+    from sqlalchemy import func, case
+    from src.models.llm_usage import LLMUsage
+
+    if group_by not in GROUP_BY_FIELDS:
+        raise ValueError(f"group_by inválido: {group_by}. Use um de: {', '.join(GROUP_BY_FIELDS)}")
+
+    key = getattr(LLMUsage, group_by)
+    total_tokens = func.sum(LLMUsage.prompt_tokens + LLMUsage.completion_tokens)
+
+    query = db.query(
+        key.label("key"),
+        func.count(LLMUsage.id).label("calls"),
+        func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+        func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+        func.sum(LLMUsage.cached_tokens).label("cached_tokens"),
+        total_tokens.label("total_tokens"),
+        func.avg(LLMUsage.latency_ms).label("avg_latency_ms"),
+        func.max(LLMUsage.latency_ms).label("max_latency_ms"),
+        func.sum(LLMUsage.latency_ms).label("total_latency_ms"),
+        func.sum(case((LLMUsage.cache_hit.is_(True), 1), else_=0)).label("cache_hits"),
+        func.sum(LLMUsage.retries).label("retries"),
+        func.sum(case((LLMUsage.success.is_(False), 1), else_=0)).label("failures")
+    )
+
+    if since_hours:
+        query = query.filter(LLMUsage.created_at >= datetime.utcnow() - timedelta(hours=since_hours))
+    if briefing_id is not None:
+        query = query.filter(LLMUsage.briefing_id == briefing_id)
+    if video_id is not None:
+        query = query.filter(LLMUsage.video_id == video_id)
+
+    rows = query.group_by(key).order_by(total_tokens.desc()).all()
+
+    return [
+        {
+            group_by: row.key,
+            "calls": row.calls,
+            "prompt_tokens": int(row.prompt_tokens or 0),
+            "completion_tokens": int(row.completion_tokens or 0),
+            "cached_tokens": int(row.cached_tokens or 0),
+            "total_tokens": int(row.total_tokens or 0),
+            "avg_latency_ms": round(float(row.avg_latency_ms or 0), 1),
+            "max_latency_ms": int(row.max_latency_ms or 0),
+            "total_latency_ms": int(row.total_latency_ms or 0),
+            "cache_hit_rate": round((row.cache_hits or 0) / row.calls, 3) if row.calls else 0.0,
+            "retries": int(row.retries or 0),
+            "failures": int(row.failures or 0)
+        }
+        for row in rows
+    ]
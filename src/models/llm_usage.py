@@ -0,0 +1,40 @@
+"""
+Model LLMUsage - registro compacto de cada chamada a LLM
+"""
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, DateTime
+from sqlalchemy.sql import func
+from src.config.database import Base
+
+class LLMUsage(Base):
+    """
+    Tabela de consumo de LLM
+
+    Uma linha por chamada: tokens, latência, modelo, cache e retries,
+    com tags de workflow/nó/agente e briefing/vídeo de origem.
+    Sem foreign keys para manter inserts baratos e preservar histórico
+    quando briefings/vídeos são deletados.
+    """
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    # Tags
+    workflow = Column(String(40), index=True)  # briefing_analysis, video_generation, ...
+    node = Column(String(40))  # analyze, generate, enhance_script, ...
+    agent = Column(String(40), index=True)  # analyzer, generator, evaluator, ...
+    model = Column(String(60))
+    briefing_id = Column(Integer, index=True)
+    video_id = Column(Integer, index=True)
+
+    # Consumo
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cached_tokens = Column(Integer, default=0)  # Tokens de prompt servidos do cache
+    latency_ms = Column(Integer, default=0)
+    cache_hit = Column(Boolean, default=False)
+    retries = Column(SmallInteger, default=0)
+    success = Column(Boolean, default=True)
+
+    def __repr__(self):
+        return f"<LLMUsage(id={self.id}, agent='{self.agent}', model='{self.model}')>"
@@ -11,6 +11,7 @@ class VideoStatus(str, enum.Enum):
     """Status da geração do vídeo"""
     QUEUED = "queued"  # Na fila
     PROCESSING = "processing"  # Sendo gerado
+    PENDING_APPROVAL = "pending_approval"  # Aguardando aprovação humana (checkpoint salvo)
     COMPLETED = "completed"  # Pronto
     FAILED = "failed"  # Erro
     CANCELLED = "cancelled"  # Cancelado pelo usuário
@@ -39,6 +40,7 @@ class Video(Base):
     
     # Generator usado
     generator_type = Column(String(20), default='simple')  # simple, avatar, ai
+    generator_provider = Column(String(50))  # Provider do gerador (ex.: elevenlabs, heygen); None = padrão
     
     # Status de geração
     status = Column(SQLEnum(VideoStatus), default=VideoStatus.QUEUED)
@@ -1,8 +1,8 @@
 """
 Schemas para Video
 """
-from pydantic import BaseModel, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Literal, Optional
 from datetime import datetime
 
 class VideoResponse(BaseModel):
@@ -32,3 +32,23 @@ class VideoResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class VideoBatchReview(BaseModel):
+    """Schema para aprovar/rejeitar vários vídeos aguardando revisão"""
+    video_ids: List[str] = Field(..., min_length=1, max_length=100, description="Hashes dos vídeos (máx. 100)")
+    action: Literal["approve", "reject"] = Field(..., description="'approve' finaliza; 'reject' regenera com o feedback")
+    feedback: Optional[str] = Field(None, description="Feedback aplicado a todos os vídeos rejeitados")
+
+class VideoBatchReviewItem(BaseModel):
+    """Resultado de um vídeo do lote"""
+    id: str  # Hash do vídeo, como enviado
+    status: Literal["queued", "not_found", "not_pending"]
+    detail: Optional[str] = None
+    task_id: Optional[str] = None
+
+class VideoBatchReviewResponse(BaseModel):
+    """Resposta da revisão em lote (um item por hash, na ordem enviada)"""
+    action: str
+    group_id: Optional[str]  # Grupo Celery das retomadas disparadas
+    queued: int
+    results: List[VideoBatchReviewItem]
@@ -0,0 +1,163 @@
+"""
+Service para aprimoramento especulativo de roteiros
+
+Depois de generate_options, as opções do topo do ranking têm o roteiro
+aprimorado (LLMService.enhance_script) em tasks de baixa prioridade enquanto
+o gestor escolhe. O roteiro fica no Redis por opção e o generate_video o usa
+no lugar da primeira chamada de enhance_script.
+
+- Cache por option_id, válido só para o mesmo esboço + dados do briefing (fingerprint)
+- Ao selecionar uma opção, as tasks das outras opções do briefing são revogadas
+  e marcadas como canceladas (a task confere antes e depois da chamada LLM)
+- Orçamento diário de tokens especulativos por usuário (reserva + ajuste ao real)
+- Redis indisponível: especulação desligada (nunca quebra o fluxo principal)
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import redis
+
+from src.config.settings import settings
+from src.config.workflows import SPECULATION_CONFIG
+
+KEY_PREFIX = "speculation"
+
+
+class SpeculationService:
+    """Cache, cancelamento e orçamento do aprimoramento especulativo"""
+
+    def __init__(self, client: Optional[redis.Redis] = None, config: Optional[Dict] = None):
+        self._client = client
+        self.config = config or SPECULATION_CONFIG
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.get_redis_url(),
+                socket_timeout=2,
+                socket_connect_timeout=2,
+                decode_responses=True
+            )
+        return self._client
+
+    def _safe(self, operation: Callable, default=None):
+        """Executa no Redis; em erro, especulação é ignorada"""
+        try:
+            return operation()
+        except redis.RedisError as e:
+            print(f"   ⚠️ Especulação indisponível (Redis): {e}")
+            return default
+
+    @staticmethod
+    def fingerprint(script_outline: str, briefing_data: Dict) -> str:
+        """Identifica a entrada do enhance_script (esboço + dados do briefing)"""
+        payload = json.dumps([script_outline, briefing_data], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------ Cache
+
+    def store_script(self, option_id: int, script: str, fingerprint: str, tokens: int) -> bool:
+        value = json.dumps({
+            "script": script,
+            "fingerprint": fingerprint,
+            "tokens": tokens,
+            "created_at": datetime.utcnow().isoformat()
+        }, ensure_ascii=False)
+        return bool(self._safe(
+            lambda: self.client.set(f"{KEY_PREFIX}:script:{option_id}", value, ex=self.config["ttl_seconds"]),
+            False
+        ))
+
+    def get_script(self, option_id: int, fingerprint: str) -> Optional[str]:
+        """Roteiro especulativo da opção (None se ausente ou feito para outra entrada)"""
+        raw = self._safe(lambda: self.client.get(f"{KEY_PREFIX}:script:{option_id}"))
+        if not raw:
+            return None
+        cached = json.loads(raw)
+        if cached.get("fingerprint") != fingerprint:
+            return None
+        return cached["script"]
+
+    # ------------------------------------------------------------ Tasks e cancelamento
+
+    def register_task(self, briefing_id: int, option_id: int, task_id: str):
+        key = f"{KEY_PREFIX}:tasks:{briefing_id}"
+
+        def register():
+            pipe = self.client.pipeline()
+            pipe.hset(key, str(option_id), task_id)
+            pipe.expire(key, self.config["ttl_seconds"])
+            pipe.delete(f"{KEY_PREFIX}:cancelled:{option_id}")
+            pipe.execute()
+
+        self._safe(register)
+
+    def is_cancelled(self, option_id: int) -> bool:
+        return bool(self._safe(lambda: self.client.exists(f"{KEY_PREFIX}:cancelled:{option_id}"), False))
+
+    def cancel_others(self, briefing_id: int, selected_option_id: int) -> List[int]:
+        """
+        Cancela a especulação das opções não escolhidas do briefing
+
+        Returns:
+            IDs das opções canceladas
+        """
+        from src.workers.celery_config import celery_app
+
+        key = f"{KEY_PREFIX}:tasks:{briefing_id}"
+        tasks = self._safe(lambda: self.client.hgetall(key), {}) or {}
+        others = {int(option_id): task_id for option_id, task_id in tasks.items() if int(option_id) != selected_option_id}
+        if not others:
+            return []
+
+        def mark_cancelled():
+            pipe = self.client.pipeline()
+            for option_id in others:
+                pipe.set(f"{KEY_PREFIX}:cancelled:{option_id}", 1, ex=self.config["ttl_seconds"])
+                pipe.hdel(key, str(option_id))
+            pipe.execute()
+
+        self._safe(mark_cancelled)
+
+        # Tasks na fila não chegam a rodar; as em execução param no próximo is_cancelled()
+        for task_id in others.values():
+            try:
+                celery_app.control.revoke(task_id)
+            except Exception as e:
+                print(f"   ⚠️ Erro ao revogar task especulativa {task_id}: {e}")
+
+        print(f"🛑 Especulação cancelada para {len(others)} opção(ões) do briefing {briefing_id}")
+        return sorted(others)
+
+    # ------------------------------------------------------------ Orçamento
+
+    def _budget_key(self, user_id: int) -> str:
+        return f"{KEY_PREFIX}:budget:{user_id}:{datetime.utcnow():%Y%m%d}"
+
+    def reserve_tokens(self, user_id: int, tokens: Optional[int] = None) -> bool:
+        """Reserva tokens do orçamento diário do usuário (False = orçamento esgotado)"""
+        tokens = tokens or self.config["estimated_tokens"]
+        key = self._budget_key(user_id)
+
+        def reserve():
+            pipe = self.client.pipeline()
+            pipe.incrby(key, tokens)
+            pipe.expire(key, 2 * 86400)
+            spent = pipe.execute()[0]
+            if spent > self.config["daily_token_budget"]:
+                self.client.decrby(key, tokens)
+                return False
+            return True
+
+        return bool(self._safe(reserve, False))
+
+    def settle_tokens(self, user_id: int, reserved: int, used: int):
+        """Ajusta a reserva ao consumo real da chamada"""
+        if used != reserved:
+            self._safe(lambda: self.client.incrby(self._budget_key(user_id), used - reserved))
+
+    def spent_tokens(self, user_id: int) -> int:
+        return int(self._safe(lambda: self.client.get(self._budget_key(user_id)), 0) or 0)
@@ -2,7 +2,7 @@
 Service para Videos
 """
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from src.models.video import Video, VideoStatus
 
 class VideoService:
@@ -39,6 +39,27 @@ class VideoService:
         """Obtém um vídeo por ID"""
         return self.db.query(Video).filter(Video.id == video_id).first()
     
+    def get_owners_and_statuses(self, video_ids: List[int]) -> Dict[int, Tuple[int, VideoStatus]]:
+        """
+        Dono (user_id do briefing) e status de vários vídeos em uma única consulta
+        
+        Returns:
+            {video_id: (user_id, status)} (IDs inexistentes ficam de fora)
+        """
+        from src.models.option import Option
+        from src.models.briefing import Briefing
+        
+        if not video_ids:
+            return {}
+        
+        rows = self.db.query(Video.id, Briefing.user_id, Video.status).join(
+            Option, Video.option_id == Option.id
+        ).join(
+            Briefing, Option.briefing_id == Briefing.id
+        ).filter(Video.id.in_(video_ids)).all()
+        
+        return {video_id: (user_id, status) for video_id, user_id, status in rows}
+    
     def list_videos(self, skip: int = 0, limit: int = 20) -> List[Video]:
         """Lista vídeos com paginação"""
         return self.db.query(Video).order_by(
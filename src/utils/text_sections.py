@@ -0,0 +1,120 @@
+"""
+Divisão de roteiros em seções
+
+Regra de título compartilhada com o SimpleVideoGenerator (linha iniciada por
+'#' ou linha curta toda em maiúsculas, ex.: "CENA 1:"). Usada no refinamento
+por seção: join_sections(split_sections(texto)) devolve o mesmo texto, a
+menos de linhas em branco repetidas.
+
+parse_slide_sections: seções de slide (título + conteúdo) do SimpleVideoGenerator,
+também usada na validação pré-renderização do workflow de vídeo.
+"""
+import hashlib
+import re
+from typing import Dict, List
+
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+def is_heading(line: str) -> bool:
+    """Linha de título: markdown (#) ou curta e toda em maiúsculas"""
+    line = line.strip()
+    return line.startswith('#') or (len(line) < 50 and line.isupper())
+
+
+def split_sections(text: str, max_sections: int = 8) -> List[str]:
+    """
+    Divide o texto em seções
+
+    - Com títulos: cada título abre uma seção (parágrafos seguintes entram nela)
+    - Sem títulos: cada parágrafo é uma seção
+    - Acima de max_sections: seções vizinhas são agrupadas
+    """
+    blocks = [block.strip() for block in _BLANK_LINES.split(text.strip()) if block.strip()]
+    has_headings = any(is_heading(block.split('\n', 1)[0]) for block in blocks)
+
+    sections: List[str] = []
+    for block in blocks:
+        if not sections or not has_headings or is_heading(block.split('\n', 1)[0]):
+            sections.append(block)
+        else:
+            sections[-1] += "\n\n" + block
+
+    if len(sections) > max_sections:
+        step = len(sections) / max_sections
+        sections = [
+            join_sections(sections[int(i * step):int((i + 1) * step)])
+            for i in range(max_sections)
+        ]
+
+    return sections
+
+
+def join_sections(sections: List[str]) -> str:
+    """Reconstrói o texto a partir das seções"""
+    return "\n\n".join(section.strip() for section in sections)
+
+
+def section_hash(section: str) -> str:
+    """Chave de cache de uma seção (conteúdo sem espaços nas pontas)"""
+    return hashlib.sha1(section.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def parse_slide_sections(script: str, main_title: str, max_slides: int = 10) -> List[Dict]:
+    """Quebra o roteiro em seções de slide: [{title, content}]"""
+    # Dividir por parágrafos vazios ou títulos
+    lines = script.strip().split('\n')
+    sections = []
+    current_section = {'title': '', 'content': ''}
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if current_section['content']:
+                sections.append(current_section)
+                current_section = {'title': '', 'content': ''}
+        elif is_heading(line):
+            # É um título
+            if current_section['content']:
+                sections.append(current_section)
+            current_section = {'title': line.replace('#', '').strip(), 'content': ''}
+        else:
+            current_section['content'] += line + ' '
+    
+    if current_section['content']:
+        sections.append(current_section)
+    
+    # Se não encontrou seções, dividir em partes iguais
+    # LIMITE: Máximo 10 slides para economizar memória (512MB free tier)
+    if not sections:
+        words = script.split()
+        chunk_size = max(50, len(words) // max_slides)
+        sections = [
+            {
+                'title': main_title if i == 0 else f'Parte {i+1}',
+                'content': ' '.join(words[i:i+chunk_size])
+            }
+            for i in range(0, len(words), chunk_size)
+        ]
+    
+    # SEGURANÇA: Limitar a 10 slides máximo (10 × 2.5MB = 25MB vs 23 × 6MB = 138MB)
+    if len(sections) > max_slides:
+        print(f"   ⚠️ Muitos slides ({len(sections)}), consolidando para {max_slides}...")
+        # Agrupar slides excedentes
+        step = len(sections) / max_slides
+        consolidated = []
+        for i in range(max_slides):
+            start_idx = int(i * step)
+            end_idx = int((i + 1) * step)
+            merged_content = ' '.join([s['content'] for s in sections[start_idx:end_idx]])
+            consolidated.append({
+                'title': sections[start_idx]['title'] or f'Parte {i+1}',
+                'content': merged_content
+            })
+        sections = consolidated
+    
+    # Garantir que primeira seção tenha título
+    if sections and not sections[0]['title']:
+        sections[0]['title'] = main_title
+    
+    return sections
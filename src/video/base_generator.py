@@ -43,6 +43,40 @@ class BaseVideoGenerator(ABC):
         """
         pass
     
+    # Etapas separadas (usadas pelo VideoGenerationWorkflow): prepare_audio e
+    # prepare_assets dependem só do roteiro e rodam em paralelo; render junta
+    # os dois. Geradores que não separam etapas retornam None nas preparações
+    # e fazem tudo em render() (via generate()).
+    
+    def prepare_audio(self, script: str, metadata: Dict, video_id: int) -> Optional[Dict]:
+        """Gera a narração (TTS); None se o gerador não tem etapa de áudio separada"""
+        return None
+    
+    def narration_stream(self, metadata: Dict, video_id: int):
+        """NarrationStream para sintetizar a narração durante o aprimoramento; None se não suportado"""
+        return None
+    
+    def prepare_assets(self, script: str, title: str, metadata: Dict, video_id: int) -> Optional[Dict]:
+        """Prepara slides/assets visuais; None se o gerador não tem etapa separada"""
+        return None
+    
+    def render(
+        self,
+        script: str,
+        title: str,
+        metadata: Dict,
+        video_id: int,
+        audio: Optional[Dict] = None,
+        assets: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Renderiza o vídeo a partir das etapas preparadas
+        
+        Returns:
+            Mesmo formato de generate()
+        """
+        return self.generate(script, title, metadata, video_id)
+    
     @abstractmethod
     def estimate_cost(self, script: str, duration_minutes: int) -> float:
         """Estima custo de geração em USD"""
@@ -75,7 +75,7 @@ class VideoGeneratorFactory:
         
         elif generator_type == 'simple':
             tts_provider = provider or kwargs.get('tts_provider', 'auto')
-            return generator_class(tts_provider=tts_provider)
+            return generator_class(tts_provider=tts_provider, render_engine=kwargs.get('render_engine'))
         
         elif generator_type == 'avatar':
             avatar_provider = provider or kwargs.get('avatar_provider', 'heygen')
@@ -0,0 +1,385 @@
+"""
+Renderização de slides estáticos direto no ffmpeg
+
+O caminho MoviePy decodifica cada slide em NumPy, compõe frame a frame em
+Python (24 fps × duração) e envia os frames ao ffmpeg por pipe. Aqui o
+ffmpeg faz tudo numa única passada:
+
+- concat demuxer: cada PNG é lido uma vez, com a duração da sua seção;
+- fps=24 repete o frame (referência, sem cópia) até a próxima seção;
+- as transições (fade do/para preto, como crossfadein/crossfadeout no
+  MoviePy) são um eq por frame habilitado só nas janelas das fronteiras;
+- narração entra como segundo input e é codificada no mesmo comando;
+- libx264 com -tune stillimage, mesmos codec/bitrates/fps do MoviePy.
+
+Um único input sequencial mantém a memória constante: com um input
+"-loop 1" por slide, o ffmpeg lê todos em paralelo e enfileira os frames
+dos slides seguintes antes do concat.
+
+SegmentedSlideRenderer divide o mesmo trabalho por slide: cada slide vira
+um segmento H.264 independente (mesmos parâmetros de codec), codificados
+em paralelo até a cota de CPU, e o concat demuxer junta os segmentos com
+cópia de stream (-c:v copy) no passo final, que só codifica o áudio. O
+fade do/para preto de cada fronteira fica dentro dos segmentos vizinhos
+(fim de um, início do outro), então nada é recodificado na junção.
+
+RawFrameSink tira o PNG do caminho: os slides desenhados em memória vão
+como RGB cru para o stdin do ffmpeg, uma única vez cada. A taxa do input
+é 1/duração do slide, então cada frame escrito já vale a seção inteira e
+o fps=24 do filtro faz as repetições (sem disco, sem encode/decode de PNG,
+sem frame por frame em Python).
+"""
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from src.config.workflows import VIDEO_RENDER_CONFIG
+from src.video.slide_raster import cpu_quota
+
+
+class FFmpegRenderError(RuntimeError):
+    """Falha do processo ffmpeg (inclui o fim do stderr)"""
+
+
+class FFmpegSlideRenderer:
+    """Monta slides PNG + narração num MP4 com um único processo ffmpeg"""
+
+    def __init__(self, config: Optional[Dict] = None, binary: Optional[str] = None):
+        self.config = config or VIDEO_RENDER_CONFIG
+        # Mesmo binário que o MoviePy usa (imageio-ffmpeg ou FFMPEG_BINARY)
+        self.binary = binary or get_setting("FFMPEG_BINARY")
+
+    def render(self, slide_paths: List[str], audio_path: str, output_path: str) -> Dict:
+        """
+        Renderiza o vídeo dividindo a duração da narração igualmente entre os slides
+
+        Returns:
+            Dict com duration (da narração) e render_seconds
+        """
+        if not slide_paths:
+            raise ValueError("Nenhum slide para renderizar")
+
+        start = time.perf_counter()
+        duration = ffmpeg_parse_infos(audio_path)['duration']
+        list_path = f"{output_path}.ffconcat"
+
+        try:
+            with open(list_path, 'w') as f:
+                f.write(self.concat_list(slide_paths, duration / len(slide_paths)))
+
+            self._run(self.build_command(list_path, audio_path, output_path, len(slide_paths), duration))
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+
+        return {'duration': duration, 'render_seconds': round(time.perf_counter() - start, 2)}
+
+    def render_frames(self, frames: Iterable[Union[Image.Image, np.ndarray]], slides_count: int,
+                      audio_path: str, output_path: str) -> Dict:
+        """
+        Mesmo vídeo de render(), a partir dos slides em memória (RawFrameSink, sem PNG)
+
+        Returns:
+            Dict com duration (da narração) e render_seconds
+        """
+        if slides_count < 1:
+            raise ValueError("Nenhum slide para renderizar")
+
+        start = time.perf_counter()
+        duration = ffmpeg_parse_infos(audio_path)['duration']
+        sink = RawFrameSink(output_path, duration / slides_count, audio_path=audio_path, duration=duration,
+                            video_filter=self.transition_filter(slides_count, duration / slides_count),
+                            config=self.config, binary=self.binary)
+        with sink:
+            for frame in frames:
+                sink.write(frame)
+
+        return {'duration': duration, 'render_seconds': round(time.perf_counter() - start, 2)}
+
+    @staticmethod
+    def _run(command: List[str]):
+        process = subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            stderr = process.stderr.decode('utf-8', errors='replace').strip()
+            raise FFmpegRenderError(f"ffmpeg saiu com código {process.returncode}: {stderr[-500:]}")
+
+    @staticmethod
+    def _quote(path: str) -> str:
+        """Caminho absoluto entre aspas simples (sintaxe do concat demuxer)"""
+        return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+    def encoder_args(self) -> List[str]:
+        """Parâmetros do libx264 (idênticos na passada única e em todos os segmentos)"""
+        config = self.config
+        return [
+            "-c:v", "libx264", "-preset", config['preset'], "-tune", "stillimage",
+            "-b:v", config['video_bitrate'], "-r", str(config['fps']), "-pix_fmt", "yuv420p"
+        ]
+
+    @staticmethod
+    def concat_list(slide_paths: List[str], section_duration: float) -> str:
+        """Script do concat demuxer (o último arquivo se repete para valer a sua duração)"""
+        quote = FFmpegSlideRenderer._quote
+        lines = ["ffconcat version 1.0"]
+        for slide_path in slide_paths:
+            lines += [f"file {quote(slide_path)}", f"duration {section_duration:.6f}"]
+        lines.append(f"file {quote(slide_paths[-1])}")
+        return "\n".join(lines) + "\n"
+
+    def build_command(self, list_path: str, audio_path: str, output_path: str,
+                      slides_count: int, duration: float) -> List[str]:
+        """Comando ffmpeg completo (vídeo + áudio numa passada)"""
+        config = self.config
+        # yuv420p antes do fps: a conversão roda uma vez por slide, não em cada repetição
+        video_filter = f"format=yuv420p,fps={config['fps']}"
+        transitions = self.transition_filter(slides_count, duration / slides_count)
+        if transitions:
+            video_filter += f",{transitions}"
+
+        return [
+            self.binary, "-y", "-nostdin", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", audio_path,
+            "-map", "0:v", "-map", "1:a",
+            "-vf", video_filter,
+            *self.encoder_args(),
+            "-c:a", "aac", "-b:a", config['audio_bitrate'],
+            "-threads", str(config['threads']),
+            "-t", f"{duration:.3f}", "-movflags", "+faststart",
+            output_path
+        ]
+
+    def transition_filter(self, slides_count: int, section_duration: float) -> str:
+        """
+        Fade do/para preto em cada fronteira entre slides
+
+        a(t) = min(1, distância até a fronteira mais próxima / duração do fade);
+        eq escala luma (contrast=a, brightness=(a-1)/2) e croma (saturation=a)
+        em direção ao preto, só nos frames dentro das janelas (enable).
+        """
+        fade = min(self.config['transition_seconds'], section_duration / 2)
+        if slides_count < 2 or fade <= 0:
+            return ""
+
+        distance = f"abs(t-{section_duration:.6f})/{fade}"
+        for index in range(2, slides_count):
+            distance = f"min({distance},abs(t-{section_duration * index:.6f})/{fade})"
+        alpha = f"min(1,{distance})"
+        return (f"eq=contrast='{alpha}':brightness='({alpha}-1)/2':saturation='{alpha}'"
+                f":eval=frame:enable='lt({distance},1)'")
+
+
+class SegmentedSlideRenderer(FFmpegSlideRenderer):
+    """Um segmento H.264 por slide, codificados em paralelo e unidos sem recodificar"""
+
+    def __init__(self, config: Optional[Dict] = None, binary: Optional[str] = None,
+                 max_workers: Optional[int] = None):
+        super().__init__(config, binary)
+        self.max_workers = max(1, max_workers or self.config['segment_workers'] or cpu_quota())
+
+    def render(self, slide_paths: List[str], audio_path: str, output_path: str) -> Dict:
+        """
+        Renderiza um segmento por slide e junta com a narração
+
+        Returns:
+            Dict com duration (da narração), render_seconds, encode_seconds
+            (segmentos em paralelo) e segments
+        """
+        if not slide_paths:
+            raise ValueError("Nenhum slide para renderizar")
+
+        start = time.perf_counter()
+        duration = ffmpeg_parse_infos(audio_path)['duration']
+        frames = self.segment_frames(len(slide_paths), duration)
+        segments_dir = f"{output_path}.segments"
+        os.makedirs(segments_dir, exist_ok=True)
+
+        try:
+            segment_paths = [os.path.join(segments_dir, f"segment_{index:03d}.mp4") for index in range(len(slide_paths))]
+            commands = [
+                self.segment_command(slide_path, segment_path, frames[index],
+                                     fade_in=index > 0, fade_out=index < len(slide_paths) - 1)
+                for index, (slide_path, segment_path) in enumerate(zip(slide_paths, segment_paths))
+            ]
+            # Cada worker só espera o seu processo ffmpeg (1 thread de encode por segmento)
+            workers = min(self.max_workers, len(commands))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="segment") as pool:
+                list(pool.map(self._run, commands))
+            encode_seconds = time.perf_counter() - start
+
+            list_path = os.path.join(segments_dir, "segments.ffconcat")
+            with open(list_path, 'w') as f:
+                f.write("ffconcat version 1.0\n" + "".join(f"file {self._quote(path)}\n" for path in segment_paths))
+            self._run(self.concat_command(list_path, audio_path, output_path, duration))
+        finally:
+            shutil.rmtree(segments_dir, ignore_errors=True)
+
+        return {
+            'duration': duration,
+            'render_seconds': round(time.perf_counter() - start, 2),
+            'encode_seconds': round(encode_seconds, 2),
+            'segments': len(segment_paths)
+        }
+
+    def segment_frames(self, slides_count: int, duration: float) -> List[int]:
+        """
+        Frames de cada segmento: fronteiras arredondadas na grade de frames do
+        vídeo inteiro (a soma dá exatamente round(duração × fps))
+        """
+        fps = self.config['fps']
+        bounds = [round(duration * fps * index / slides_count) for index in range(slides_count + 1)]
+        return [max(1, bounds[index + 1] - bounds[index]) for index in range(slides_count)]
+
+    def segment_command(self, slide_path: str, segment_path: str, frames: int,
+                        fade_in: bool, fade_out: bool) -> List[str]:
+        """Segmento só de vídeo: slide repetido por fps (lido 1×/s), fades da fronteira"""
+        fps = self.config['fps']
+        seconds = frames / fps
+        fade = min(self.config['transition_seconds'], seconds / 2)
+
+        video_filter = f"format=yuv420p,fps={fps}"
+        if fade_in and fade > 0:
+            video_filter += f",fade=t=in:st=0:d={fade}"
+        if fade_out and fade > 0:
+            video_filter += f",fade=t=out:st={seconds - fade:.6f}:d={fade}"
+
+        return [
+            self.binary, "-y", "-nostdin", "-loglevel", "error",
+            "-loop", "1", "-framerate", "1", "-i", slide_path,
+            "-vf", video_filter,
+            *self.encoder_args(),
+            "-threads", "1", "-frames:v", str(frames), "-an",
+            segment_path
+        ]
+
+    def concat_command(self, list_path: str, audio_path: str, output_path: str, duration: float) -> List[str]:
+        """Junta os segmentos com cópia de stream e codifica a narração"""
+        config = self.config
+        return [
+            self.binary, "-y", "-nostdin", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", audio_path,
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy",
+            "-c:a", "aac", "-b:a", config['audio_bitrate'],
+            "-t", f"{duration:.3f}", "-movflags", "+faststart",
+            output_path
+        ]
+
+
+class RawFrameSink:
+    """
+    Escreve frames RGB crus no stdin de um ffmpeg (libx264 + narração opcional)
+
+    Cada frame é estático e vale hold_seconds: entra uma vez no pipe e o
+    filtro fps=24 gera as repetições. O processo sobe no primeiro frame
+    (tamanho vem da imagem); todos os frames devem ter o mesmo tamanho.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        hold_seconds: float,
+        audio_path: Optional[str] = None,
+        duration: Optional[float] = None,
+        video_filter: str = "",
+        config: Optional[Dict] = None,
+        binary: Optional[str] = None
+    ):
+        self.output_path = output_path
+        # Duração em ms inteiros: taxa do input exata (1000/ms) e fronteiras no mesmo relógio
+        self.hold_ms = max(1, round(hold_seconds * 1000))
+        self.audio_path = audio_path
+        self.duration = duration
+        self.video_filter = video_filter
+        self.renderer = FFmpegSlideRenderer(config, binary)
+        self.frames_written = 0
+        self._size = None
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "RawFrameSink":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, frame: Union[Image.Image, np.ndarray]):
+        """Envia um frame (PIL RGB ou array HxWx3 uint8) sem cópia extra do lado NumPy"""
+        if isinstance(frame, Image.Image):
+            pixels = np.asarray(frame if frame.mode == 'RGB' else frame.convert('RGB'))
+        else:
+            pixels = np.ascontiguousarray(frame, dtype=np.uint8)
+
+        height, width = pixels.shape[:2]
+        if self._process is None:
+            self._size = (width, height)
+            self._process = subprocess.Popen(self.command(width, height), stdin=subprocess.PIPE,
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elif (width, height) != self._size:
+            raise ValueError(f"Frame {width}x{height} difere do primeiro ({self._size[0]}x{self._size[1]})")
+
+        try:
+            self._process.stdin.write(memoryview(pixels).cast('B'))
+        except BrokenPipeError:
+            self._raise_failure()
+        self.frames_written += 1
+
+    def close(self):
+        """Fecha o pipe e espera o encode terminar"""
+        if self._process is None:
+            raise ValueError("Nenhum frame escrito")
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self._process.wait() != 0:
+            self._raise_failure()
+
+    def abort(self):
+        """Interrompe o ffmpeg e remove a saída parcial"""
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def command(self, width: int, height: int) -> List[str]:
+        config = self.renderer.config
+        # yuv420p uma vez por frame recebido, antes do fps=24 repetir cada um pela sua duração
+        # (inclusive o último, até o fim do input): as repetições são só referências. Convertendo
+        # depois, cada repetição vira um buffer novo na fila do encoder (~1GB em 720p)
+        video_filter = f"format=yuv420p,fps={config['fps']}"
+        if self.video_filter:
+            video_filter += f",{self.video_filter}"
+
+        command = [
+            self.renderer.binary, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+            "-framerate", f"1000/{self.hold_ms}", "-i", "pipe:0"
+        ]
+        if self.audio_path:
+            command += ["-i", self.audio_path, "-map", "0:v", "-map", "1:a"]
+        command += ["-vf", video_filter, *self.renderer.encoder_args()]
+        if self.audio_path:
+            command += ["-c:a", "aac", "-b:a", config['audio_bitrate']]
+        if self.duration:
+            command += ["-t", f"{self.duration:.3f}"]
+        return command + ["-threads", str(config['threads']), "-movflags", "+faststart", self.output_path]
+
+    def _raise_failure(self):
+        self._process.wait()
+        stderr = self._process.stderr.read().decode('utf-8', errors='replace').strip()
+        raise FFmpegRenderError(f"ffmpeg saiu com código {self._process.returncode}: {stderr[-500:]}")
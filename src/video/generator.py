@@ -1,13 +1,13 @@
 """
-Gerador de vídeos usando MoviePy + FFmpeg
+Gerador de vídeos usando FFmpeg (cenas estáticas enviadas cruas pelo pipe)
 """
 import os
 from typing import Dict, Optional
-from moviepy.editor import (
-    ImageClip, AudioFileClip, TextClip, CompositeVideoClip,
-    concatenate_videoclips
-)
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from PIL import Image
 from src.config.settings import settings
+from src.video.ffmpeg_renderer import RawFrameSink
+from src.video.slide_raster import SlideRasterizer, draw_scene
 
 class VideoGenerator:
     """Gerador de vídeos educacionais"""
@@ -36,42 +36,23 @@ class VideoGenerator:
             Dict com informações do vídeo gerado
         """
         try:
-            # 1. Carregar áudio
-            audio = AudioFileClip(audio_path)
-            duration = audio.duration
+            # 1. Duração do áudio
+            duration = ffmpeg_parse_infos(audio_path)['duration']
             
-            # 2. Gerar slides com texto (simplificado)
+            # 2. Dividir roteiro em cenas (mesma duração cada)
             scenes = self._parse_script_to_scenes(script, duration)
-            video_clips = []
             
-            for scene in scenes:
-                clip = self._create_scene_clip(
-                    text=scene['text'],
-                    duration=scene['duration']
-                )
-                video_clips.append(clip)
-            
-            # 3. Concatenar cenas
-            final_video = concatenate_videoclips(video_clips, method="compose")
-            
-            # 4. Adicionar áudio
-            final_video = final_video.set_audio(audio)
-            
-            # 5. Salvar
+            # 3-5. Cenas desenhadas em paralelo e escritas uma vez cada no ffmpeg (+ áudio)
             output_path = os.path.join(self.output_dir, f"video_{video_id}.mp4")
-            final_video.write_videofile(
-                output_path,
-                fps=24,
-                codec="libx264",
-                audio_codec="aac"
-            )
-            
-            # 6. Gerar thumbnail
-            thumbnail_path = self._generate_thumbnail(final_video, video_id)
-            
-            # 7. Limpar recursos
-            audio.close()
-            final_video.close()
+            frames = SlideRasterizer().frames(draw_scene, [{'text': scene['text']} for scene in scenes])
+            thumbnail_path = None
+            with RawFrameSink(output_path, scenes[0]['duration'], audio_path=audio_path, duration=duration) as sink:
+                for index, frame in enumerate(frames):
+                    sink.write(frame)
+                    
+                    # 6. Thumbnail: cena no meio do vídeo
+                    if index == len(scenes) // 2:
+                        thumbnail_path = self._generate_thumbnail(frame, video_id)
             
             return {
                 "file_path": output_path,
@@ -105,57 +86,9 @@ class VideoGenerator:
         
         return scenes
     
-    def _create_scene_clip(self, text: str, duration: float) -> ImageClip:
-        """
-        Cria um clip de cena com texto sobre fundo
-        """
-        # Fundo simples (azul)
-        bg_clip = ImageClip(
-            self._create_solid_color((1920, 1080), (41, 128, 185)),
-            duration=duration
-        )
-        
-        # Texto
-        try:
-            txt_clip = TextClip(
-                text,
-                fontsize=48,
-                color='white',
-                size=(1600, 900),
-                method='caption',
-                align='center'
-            ).set_duration(duration).set_position('center')
-            
-            # Compor
-            return CompositeVideoClip([bg_clip, txt_clip])
-        except:
-            # Fallback se TextClip falhar
-            return bg_clip
-    
-    def _create_solid_color(self, size: tuple, color: tuple) -> str:
-        """
-        Cria imagem temporária de cor sólida
-        """
-        import numpy as np
-        from PIL import Image
-        
-        img = np.zeros((size[1], size[0], 3), dtype=np.uint8)
-        img[:] = color
-        
-        temp_path = f"/tmp/bg_{color[0]}_{color[1]}_{color[2]}.png"
-        Image.fromarray(img).save(temp_path)
-        
-        return temp_path
-    
-    def _generate_thumbnail(self, video_clip, video_id: int) -> str:
-        """Gera thumbnail do vídeo"""
+    def _generate_thumbnail(self, frame: Image.Image, video_id: int) -> str:
+        """Gera thumbnail do vídeo a partir do frame da cena"""
         thumbnail_path = os.path.join(self.output_dir, f"thumb_{video_id}.jpg")
-        
-        # Captura frame no meio do vídeo
-        frame_time = video_clip.duration / 2
-        frame = video_clip.get_frame(frame_time)
-        
-        from PIL import Image
-        Image.fromarray(frame).save(thumbnail_path, quality=85)
+        frame.save(thumbnail_path, quality=85)
         
         return thumbnail_path
@@ -0,0 +1,180 @@
+"""
+Narração em streaming: LLM → TTS por parágrafo
+
+LLMService.stream_enhance_script produz os parágrafos do roteiro à medida
+que o modelo escreve; cada trecho (parágrafos curtos agrupados até
+min_segment_chars) vai para o TTS na hora, em até tts_workers requisições
+simultâneas. As partes de áudio são anexadas em ordem num único arquivo,
+e a narração fica pronta logo depois do último parágrafo, em vez de uma
+segunda espera longa (roteiro inteiro → TTS inteiro).
+
+Com accept, o roteiro completo passa pela validação barata assim que o
+modelo termina: se reprovado, os trechos ainda não iniciados são
+cancelados e o restante não vai ao TTS (só o que já foi sintetizado
+enquanto o modelo escrevia é pago).
+
+Os trechos são sintetizados sem fallback: se o provider falhar num deles
+(ex.: ElevenLabs 429), nenhum trecho novo vai ao TTS, o roteiro continua
+sendo lido até o fim e a narração é descartada (audio_path None). O nó de
+aprimoramento segue então com a síntese normal do roteiro inteiro, em vez
+de um tom de fallback emendado no meio da fala real.
+
+As partes são MP3 do mesmo provider/voz: anexar os bytes em ordem gera um
+MP3 contínuo. Cada trecho leva o anterior como previous_text (entonação
+contínua no ElevenLabs).
+"""
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.config.workflows import VIDEO_WORKFLOW_CONFIG
+from src.video.tts import TTSProviderError, TTSService, estimate_speech_duration
+
+
+class NarrationStream:
+    """Sintetiza a narração enquanto o roteiro é escrito"""
+
+    def __init__(self, tts: TTSService, output_path: str, voice: str, config: Optional[Dict] = None):
+        self.tts = tts
+        self.output_path = output_path
+        self.voice = voice
+        self.config = config or VIDEO_WORKFLOW_CONFIG["streaming_narration"]
+
+    def run(self, paragraphs: Iterable[str], accept: Optional[Callable[[str], bool]] = None) -> Dict:
+        """
+        Consome os parágrafos do roteiro e gera a narração
+
+        Args:
+            paragraphs: Parágrafos do roteiro, na ordem em que o modelo escreve
+            accept: Validação do roteiro completo antes de sintetizar o resto;
+                False cancela a narração (audio_path None)
+
+        Falha do provider TTS num trecho também descarta a narração
+        (audio_path None), mantendo o roteiro completo.
+
+        Returns:
+            Dict com script (parágrafos unidos por linha em branco), audio_path,
+            paragraph_timings (por trecho enviado ao TTS, em segundos desde o
+            início), llm_seconds e total_seconds
+        """
+        start = time.perf_counter()
+        elapsed = lambda: round(time.perf_counter() - start, 3)
+
+        script: List[str] = []
+        pending: List[str] = []
+        previous_text: Optional[str] = None
+        futures = []
+
+        pool = ThreadPoolExecutor(max_workers=max(1, self.config["tts_workers"]), thread_name_prefix="narration")
+
+        def submit():
+            nonlocal previous_text
+            text = "\n\n".join(pending)
+            timing = {
+                "index": len(futures),
+                "paragraphs": len(pending),
+                "chars": len(text),
+                "estimated_audio_seconds": round(estimate_speech_duration(text), 1),
+                "text_ready_at": elapsed()
+            }
+            futures.append(pool.submit(self._synthesize, text, previous_text, timing, elapsed))
+            previous_text = text
+            pending.clear()
+
+        def provider_failed() -> bool:
+            return any(
+                future.done() and not future.cancelled() and isinstance(future.exception(), TTSProviderError)
+                for future in futures
+            )
+
+        def discard(reason: str) -> Dict:
+            cancelled = sum(future.cancel() for future in futures)
+            print(f"   🎙️ {reason}: narração descartada ({cancelled} trecho(s) cancelado(s), "
+                  f"{len(futures) - cancelled} já enviado(s) ao TTS)")
+            return {
+                "script": "\n\n".join(script),
+                "audio_path": None,
+                "paragraph_timings": [],
+                "llm_seconds": llm_seconds,
+                "total_seconds": elapsed()
+            }
+
+        try:
+            failed = False
+            for paragraph in paragraphs:
+                script.append(paragraph)
+                if failed:
+                    continue  # Provider falhou: só termina de ler o roteiro
+                pending.append(paragraph)
+                if sum(len(p) for p in pending) >= self.config["min_segment_chars"]:
+                    failed = provider_failed()
+                    if not failed:
+                        submit()
+            llm_seconds = elapsed()
+
+            if failed:
+                return discard("Provider TTS falhou")
+
+            if accept is not None and not accept("\n\n".join(script)):
+                # Roteiro volta ao aprimoramento: não pagar TTS pelo restante
+                return discard("Roteiro reprovado")
+
+            if pending:
+                submit()
+
+            # Anexar em ordem (cada parte espera só a sua síntese)
+            timings = []
+            with open(self.output_path, 'wb') as output:
+                for future in futures:
+                    try:
+                        part_path, timing = future.result()
+                    except TTSProviderError:
+                        failed = True
+                        break
+                    with open(part_path, 'rb') as part:
+                        shutil.copyfileobj(part, output)
+                    os.remove(part_path)
+                    timing["appended_at"] = elapsed()
+                    timings.append(timing)
+            if failed:
+                os.remove(self.output_path)
+                return discard("Provider TTS falhou")
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            for index in range(len(futures)):
+                if os.path.exists(self._part_path(index)):
+                    os.remove(self._part_path(index))
+
+        print(f"   🎙️ Narração em {len(timings)} trecho(s): roteiro em {llm_seconds:.1f}s, "
+              f"áudio pronto em {elapsed():.1f}s")
+
+        return {
+            "script": "\n\n".join(script),
+            "audio_path": self.output_path,
+            "paragraph_timings": timings,
+            "llm_seconds": llm_seconds,
+            "total_seconds": elapsed()
+        }
+
+    def _part_path(self, index: int) -> str:
+        base, ext = os.path.splitext(self.output_path)
+        return f"{base}.part{index:03d}{ext}"
+
+    def _synthesize(self, text: str, previous_text: Optional[str], timing: Dict, elapsed: Callable[[], float]) -> Tuple[str, Dict]:
+        """Sintetiza um trecho num arquivo próprio (worker do pool)"""
+        timing["tts_started_at"] = elapsed()
+        part_path = self.tts.generate(
+            text=text,
+            output_path=self._part_path(timing["index"]),
+            voice=self.voice,
+            previous_text=previous_text,
+            fallback=False
+        )
+        timing["tts_finished_at"] = elapsed()
+        return part_path, timing
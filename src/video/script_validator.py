@@ -0,0 +1,91 @@
+"""
+Validação do roteiro antes da renderização
+
+Checagens baratas (sem TTS, sem imagens) que antecipam as reprovações da
+revisão do workflow de vídeo:
+- Duração estimada da narração (palavras / velocidade de fala) contra o
+  mínimo da revisão e contra duration_minutes do briefing
+- Número de seções/slides (regra do SimpleVideoGenerator)
+- Texto de cada slide: cortado no limite de caracteres ou com mais linhas
+  do que cabem na área de conteúdo
+"""
+import textwrap
+from typing import Dict, List, Optional
+
+from src.config.workflows import VIDEO_WORKFLOW_CONFIG
+from src.utils.text_sections import parse_slide_sections
+from src.video.slide_templates import SLIDE_TEXT_LAYOUT
+from src.video.tts import estimate_speech_duration
+
+
+class ScriptValidator:
+    """Valida o roteiro aprimorado antes das etapas caras (TTS e renderização)"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = config or VIDEO_WORKFLOW_CONFIG["pre_render_validation"]
+
+    def validate(self, script: str, briefing_data: Dict) -> Dict:
+        """
+        Valida o roteiro
+
+        Returns:
+            Dict com valid, issues (feedback para o aprimoramento),
+            estimated_duration, target_duration, sections e overflowing_slides
+        """
+        script = script or ""
+        issues: List[str] = []
+
+        estimated = estimate_speech_duration(script, self.config["words_per_minute"]) if script.strip() else 0.0
+        target = (briefing_data.get('duration_minutes') or 0) * 60
+
+        if estimated < self.config["min_duration_seconds"]:
+            issues.append(
+                f"Narração estimada muito curta ({estimated:.0f}s, mínimo "
+                f"{self.config['min_duration_seconds']}s): desenvolva cada cena com texto narrado completo"
+            )
+        elif target:
+            low, high = self.config["duration_ratio"]
+            if estimated < target * low:
+                issues.append(
+                    f"Roteiro curto para a duração pedida (~{estimated / 60:.1f} min de narração "
+                    f"para {target / 60:.0f} min): aprofunde explicações e exemplos"
+                )
+            elif estimated > target * high:
+                issues.append(
+                    f"Roteiro longo para a duração pedida (~{estimated / 60:.1f} min de narração "
+                    f"para {target / 60:.0f} min): condense as cenas"
+                )
+
+        sections = parse_slide_sections(script, briefing_data.get('title', 'Video')) if script.strip() else []
+        if len(sections) < self.config["min_sections"]:
+            issues.append(
+                f"Apenas {len(sections)} seção(ões): divida o roteiro em cenas com títulos "
+                f"(mínimo {self.config['min_sections']})"
+            )
+
+        overflowing = self._overflowing_slides(sections, briefing_data.get('video_orientation', 'horizontal'))
+        if sections and len(overflowing) / len(sections) > self.config["max_overflow_ratio"]:
+            issues.append(
+                f"Texto demais nos slides {', '.join(str(i) for i in overflowing)}: "
+                f"divida essas cenas em parágrafos mais curtos"
+            )
+
+        return {
+            "valid": not issues,
+            "issues": issues,
+            "estimated_duration": round(estimated, 1),
+            "target_duration": target or None,
+            "sections": len(sections),
+            "overflowing_slides": overflowing
+        }
+
+    def _overflowing_slides(self, sections: List[Dict], orientation: str) -> List[int]:
+        """Slides (1-based) cujo conteúdo seria cortado ou não caberia na área"""
+        layout = SLIDE_TEXT_LAYOUT['vertical' if orientation == 'vertical' else 'horizontal']
+        overflowing = []
+        for index, section in enumerate(sections, 1):
+            content = section['content'].strip()
+            lines = textwrap.wrap(content[:layout['max_chars']], width=layout['content_wrap'])
+            if len(content) > layout['max_chars'] or len(lines) > layout['max_lines']:
+                overflowing.append(index)
+        return overflowing
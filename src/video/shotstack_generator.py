@@ -70,23 +70,48 @@ class ShotstackGenerator(BaseVideoGenerator):
         6. Aguardar conclusão (polling)
         7. Retornar URL do vídeo (CDN)
         """
+        return self.render(script, title, metadata, video_id)
+    
+    def prepare_audio(self, script: str, metadata: Dict, video_id: int) -> Dict:
+        """Etapa de áudio: TTS + upload (Shotstack requer URL público)"""
+        audio_path = self._generate_audio(script, video_id)
+        logger.info(f"   → Áudio gerado: {audio_path}")
+        
+        audio_url = self._upload_audio(audio_path)
+        logger.info(f"   → Áudio disponível: {audio_url}")
+        
+        return {'audio_path': audio_path, 'audio_url': audio_url}
+    
+    def prepare_assets(self, script: str, title: str, metadata: Dict, video_id: int) -> Dict:
+        """Etapa visual: slides (seções) que viram clips da timeline"""
+        slides = self._parse_script_to_slides(script)
+        logger.info(f"   → {len(slides)} slides identificados")
+        return {'slides': slides}
+    
+    def render(
+        self,
+        script: str,
+        title: str,
+        metadata: Dict,
+        video_id: int,
+        audio: Optional[Dict] = None,
+        assets: Optional[Dict] = None
+    ) -> Dict:
+        """Monta a timeline com as etapas preparadas e renderiza na Shotstack"""
         try:
             logger.info(f"🎬 [ShotstackGenerator] Gerando vídeo {video_id}...")
             
             # Armazenar metadata para uso nos métodos internos
             self.metadata = metadata
             
-            # 1. Parsear script em slides
-            slides = self._parse_script_to_slides(script)
-            logger.info(f"   → {len(slides)} slides identificados")
-            
-            # 2. Gerar áudio TTS
-            audio_path = self._generate_audio(script, video_id)
-            logger.info(f"   → Áudio gerado: {audio_path}")
+            # 1-3. Slides e áudio (do workflow, ou gerados aqui)
+            if assets is None:
+                assets = self.prepare_assets(script, title, metadata, video_id)
+            slides = assets['slides']
             
-            # 3. Upload áudio para CDN temporário (Shotstack requer URL público)
-            audio_url = self._upload_audio(audio_path)
-            logger.info(f"   → Áudio disponível: {audio_url}")
+            if audio is None:
+                audio = self.prepare_audio(script, metadata, video_id)
+            audio_url = audio['audio_url']
             
             # 4. Montar timeline Shotstack
             timeline = self._build_timeline(slides, audio_url, metadata)
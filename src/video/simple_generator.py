@@ -5,16 +5,31 @@ Mais barato e previsível
 import os
 import json
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from moviepy.editor import (
     AudioFileClip, TextClip, CompositeVideoClip,
     concatenate_videoclips, ImageClip
 )
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
 
+from src.config.workflows import VIDEO_RENDER_CONFIG
 from src.video.base_generator import BaseVideoGenerator
+from src.video.ffmpeg_renderer import FFmpegSlideRenderer, SegmentedSlideRenderer
+from src.video.slide_raster import SlideRasterizer
+from src.video.slide_templates import DEFAULT_THEME, draw_slide, render_slide
 from src.video.tts import TTSService
+from src.video.narration_stream import NarrationStream
+from src.utils.text_sections import parse_slide_sections
+
+# Engines ffmpeg (src/video/ffmpeg_renderer.py); 'moviepy' renderiza em _render_moviepy
+FFMPEG_RENDERERS = {
+    'ffmpeg': FFmpegSlideRenderer,  # Passada única
+    'segmented': SegmentedSlideRenderer,  # Um segmento por slide, em paralelo
+}
+
+RENDER_ENGINES = ('moviepy', *FFMPEG_RENDERERS)
+
+# Engines que recebem os slides em memória (RawFrameSink): prepare_assets não grava PNG
+FRAME_STREAM_ENGINES = ('ffmpeg',)
 
 
 class SimpleVideoGenerator(BaseVideoGenerator):
@@ -31,9 +46,13 @@ class SimpleVideoGenerator(BaseVideoGenerator):
     Custo: ~$0.30-1/vídeo
     """
     
-    def __init__(self, tts_provider: str = "auto"):
+    def __init__(self, tts_provider: str = "auto", render_engine: Optional[str] = None):
         super().__init__()
         self.tts = TTSService(provider=tts_provider)
+        self.render_engine = (render_engine or VIDEO_RENDER_CONFIG['engine']).lower()
+        if self.render_engine not in RENDER_ENGINES:
+            raise ValueError(f"Engine de renderização '{self.render_engine}' não suportada. "
+                             f"Use um de: {', '.join(RENDER_ENGINES)}")
         self.slides_dir = Path("generated_videos/slides")
         self.slides_dir.mkdir(exist_ok=True)
     
@@ -44,7 +63,56 @@ class SimpleVideoGenerator(BaseVideoGenerator):
         metadata: Dict,
         video_id: int
     ) -> Dict:
-        """Gera vídeo com TTS + slides"""
+        """Gera vídeo com TTS + slides (etapas em sequência)"""
+        return self.render(script, title, metadata, video_id)
+    
+    def prepare_audio(self, script: str, metadata: Dict, video_id: int) -> Dict:
+        """Etapa de áudio: narração TTS do roteiro"""
+        audio_path = self._generate_audio(script, video_id, metadata.get('tone', 'profissional'))
+        return {'audio_path': audio_path}
+    
+    def narration_stream(self, metadata: Dict, video_id: int) -> NarrationStream:
+        """Narração sintetizada por parágrafo enquanto o roteiro é escrito (mesmo arquivo de prepare_audio)"""
+        return NarrationStream(
+            self.tts,
+            str(self.output_dir / f"audio_{video_id}.mp3"),
+            self._voice_for(metadata.get('tone', 'profissional'))
+        )
+    
+    def prepare_assets(self, script: str, title: str, metadata: Dict, video_id: int) -> Dict:
+        """Etapa visual: seções do roteiro e o slide de cada seção"""
+        # 1. Quebrar script em seções
+        sections = self._parse_script_sections(script, title)
+        
+        # 2. Slides de cada seção: argumentos de draw_slide (JSON, vão no checkpoint)
+        slides = [
+            self._slide_job(
+                title=section['title'],
+                content=section['content'],
+                slide_num=i + 1,
+                total_slides=len(sections),
+                metadata=metadata
+            )
+            for i, section in enumerate(sections)
+        ]
+        assets = {'sections': sections, 'slides': slides}
+        
+        # 3. PNGs só para as engines que leem arquivos (em paralelo, um por seção na ordem do roteiro)
+        if self.render_engine not in FRAME_STREAM_ENGINES:
+            assets['slide_paths'] = self._rasterize_slides(slides, video_id)
+        
+        return assets
+    
+    def render(
+        self,
+        script: str,
+        title: str,
+        metadata: Dict,
+        video_id: int,
+        audio: Optional[Dict] = None,
+        assets: Optional[Dict] = None
+    ) -> Dict:
+        """Monta slides + áudio (gerando as etapas que não vieram prontas)"""
         
         try:
             print(f"📹 [SimpleGenerator] Gerando vídeo {video_id}...")
@@ -52,61 +120,31 @@ class SimpleVideoGenerator(BaseVideoGenerator):
             # Armazenar metadata para uso nos métodos internos
             self.metadata = metadata
             
-            # 1. Quebrar script em seções
-            sections = self._parse_script_sections(script, title)
+            # 1-2. Seções, slides e áudio (do workflow, ou gerados aqui)
+            if assets is None:
+                assets = self.prepare_assets(script, title, metadata, video_id)
+            sections = assets['sections']
             print(f"   → {len(sections)} seções identificadas")
             
-            # 2. Gerar áudio com TTS
-            audio_path = self._generate_audio(script, video_id, metadata.get('tone', 'profissional'))
+            if audio is None:
+                audio = self.prepare_audio(script, metadata, video_id)
+            audio_path = audio['audio_path']
             print(f"   → Áudio gerado: {audio_path}")
             
-            # 3. Criar slides para cada seção
-            slide_clips = []
-            audio = AudioFileClip(audio_path)
-            section_duration = audio.duration / len(sections)
-            
-            for i, section in enumerate(sections):
-                slide_path = self._create_slide(
-                    title=section['title'],
-                    content=section['content'],
-                    slide_num=i + 1,
-                    total_slides=len(sections),
-                    video_id=video_id
-                )
-                
-                slide_clip = (ImageClip(slide_path)
-                             .set_duration(section_duration)
-                             .crossfadein(0.5 if i > 0 else 0)
-                             .crossfadeout(0.5 if i < len(sections) - 1 else 0))
-                
-                slide_clips.append(slide_clip)
-                
-                # 🧹 LIMPEZA: Liberar memória após cada slide
-                import gc
-                gc.collect()
-            
-            print(f"   → {len(slide_clips)} slides criados")
-            
-            # 4. Concatenar slides
-            video_with_slides = concatenate_videoclips(slide_clips, method="compose")
-            
-            # 5. Sincronizar áudio
-            final_video = video_with_slides.set_audio(audio)
-            
-            # 6. Exportar (otimizado para baixo uso de memória)
+            # 3-6. Slides + áudio no MP4 (MoviePy ou ffmpeg)
             output_path = str(self.output_dir / f"video_{video_id}_simple.mp4")
-            final_video.write_videofile(
-                output_path,
-                fps=24,  # Mantido 24fps (padrão)
-                codec='libx264',
-                audio_codec='aac',
-                threads=2,  # Reduzido de 4 para 2 (menos memória paralela)
-                preset='ultrafast',  # Mudado de 'medium' para 'ultrafast' (menos RAM)
-                logger=None,  # Silenciar logs do moviepy
-                # Otimizações extras para baixa memória:
-                bitrate='1000k',  # Limitar bitrate (menos buffer)
-                audio_bitrate='128k'
-            )
+            if self.render_engine in FRAME_STREAM_ENGINES and assets.get('slides'):
+                # Slides desenhados em memória direto no pipe do ffmpeg (sem PNG)
+                frames = SlideRasterizer().frames(draw_slide, assets['slides'])
+                FFmpegSlideRenderer().render_frames(frames, len(assets['slides']), audio_path, output_path)
+            else:
+                # Checkpoints anteriores trazem só slide_paths
+                slide_paths = assets.get('slide_paths') or self._rasterize_slides(assets['slides'], video_id)
+                if self.render_engine in FFMPEG_RENDERERS:
+                    FFMPEG_RENDERERS[self.render_engine]().render(slide_paths, audio_path, output_path)
+                else:
+                    self._render_moviepy(slide_paths, audio_path, output_path)
+            print(f"   → {len(sections)} slides renderizados ({self.render_engine})")
             
             # 7. Gerar thumbnail
             thumbnail_path = self._create_thumbnail(output_path)
@@ -114,17 +152,6 @@ class SimpleVideoGenerator(BaseVideoGenerator):
             # 8. Obter informações do arquivo
             file_info = self._get_file_info(output_path)
             
-            # Limpar recursos
-            audio.close()
-            final_video.close()
-            for clip in slide_clips:
-                clip.close()
-            
-            # 🧹 LIMPEZA AGRESSIVA: Forçar garbage collection
-            import gc
-            del audio, final_video, slide_clips, video_with_slides
-            gc.collect()
-            
             print(f"✅ [SimpleGenerator] Vídeo gerado: {output_path}")
             
             return {
@@ -135,6 +162,7 @@ class SimpleVideoGenerator(BaseVideoGenerator):
                 'thumbnail_path': thumbnail_path,
                 'metadata': {
                     'generator': 'simple',
+                    'render_engine': self.render_engine,
                     'sections_count': len(sections),
                     'tts_provider': self.tts.provider,
                     'audio_path': audio_path,
@@ -151,71 +179,72 @@ class SimpleVideoGenerator(BaseVideoGenerator):
                 'error': str(e)
             }
     
-    def _parse_script_sections(self, script: str, main_title: str) -> List[Dict]:
-        """Quebra script em seções lógicas"""
-        # Dividir por parágrafos vazios ou títulos
-        lines = script.strip().split('\n')
-        sections = []
-        current_section = {'title': '', 'content': ''}
+    def _render_moviepy(self, slide_paths: List[str], audio_path: str, output_path: str):
+        """Renderiza com MoviePy: um clip por slide, com a duração do áudio dividida entre as seções"""
+        config = VIDEO_RENDER_CONFIG
+        slide_clips = []
+        audio = AudioFileClip(audio_path)
+        section_duration = audio.duration / len(slide_paths)
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                if current_section['content']:
-                    sections.append(current_section)
-                    current_section = {'title': '', 'content': ''}
-            elif line.startswith('#') or (len(line) < 50 and line.isupper()):
-                # É um título
-                if current_section['content']:
-                    sections.append(current_section)
-                current_section = {'title': line.replace('#', '').strip(), 'content': ''}
-            else:
-                current_section['content'] += line + ' '
-        
-        if current_section['content']:
-            sections.append(current_section)
+        for i, slide_path in enumerate(slide_paths):
+            slide_clip = (ImageClip(slide_path)
+                         .set_duration(section_duration)
+                         .crossfadein(config['transition_seconds'] if i > 0 else 0)
+                         .crossfadeout(config['transition_seconds'] if i < len(slide_paths) - 1 else 0))
+            
+            slide_clips.append(slide_clip)
+            
+            # 🧹 LIMPEZA: Liberar memória após cada slide
+            import gc
+            gc.collect()
         
-        # Se não encontrou seções, dividir em partes iguais
-        # LIMITE: Máximo 10 slides para economizar memória (512MB free tier)
-        if not sections:
-            words = script.split()
-            max_slides = 10  # Reduzido de 5 para 10 max
-            chunk_size = max(50, len(words) // max_slides)
-            sections = [
-                {
-                    'title': main_title if i == 0 else f'Parte {i+1}',
-                    'content': ' '.join(words[i:i+chunk_size])
-                }
-                for i in range(0, len(words), chunk_size)
-            ]
+        # Concatenar slides e sincronizar áudio
+        video_with_slides = concatenate_videoclips(slide_clips, method="compose")
+        final_video = video_with_slides.set_audio(audio)
         
-        # SEGURANÇA: Limitar a 10 slides máximo (10 × 2.5MB = 25MB vs 23 × 6MB = 138MB)
-        if len(sections) > 10:
-            print(f"   ⚠️ Muitos slides ({len(sections)}), consolidando para 10...")
-            # Agrupar slides excedentes
-            step = len(sections) / 10
-            consolidated = []
-            for i in range(10):
-                start_idx = int(i * step)
-                end_idx = int((i + 1) * step)
-                merged_content = ' '.join([s['content'] for s in sections[start_idx:end_idx]])
-                consolidated.append({
-                    'title': sections[start_idx]['title'] or f'Parte {i+1}',
-                    'content': merged_content
-                })
-            sections = consolidated
+        # Exportar (otimizado para baixo uso de memória)
+        final_video.write_videofile(
+            output_path,
+            fps=config['fps'],
+            codec='libx264',
+            audio_codec='aac',
+            threads=config['threads'],  # Menos memória paralela
+            preset=config['preset'],  # 'ultrafast' usa menos RAM que 'medium'
+            logger=None,  # Silenciar logs do moviepy
+            # Otimizações extras para baixa memória:
+            bitrate=config['video_bitrate'],  # Limitar bitrate (menos buffer)
+            audio_bitrate=config['audio_bitrate']
+        )
         
-        # Garantir que primeira seção tenha título
-        if sections and not sections[0]['title']:
-            sections[0]['title'] = main_title
+        # Limpar recursos
+        audio.close()
+        final_video.close()
+        for clip in slide_clips:
+            clip.close()
         
-        return sections
+        # 🧹 LIMPEZA AGRESSIVA: Forçar garbage collection
+        import gc
+        del audio, final_video, slide_clips, video_with_slides
+        gc.collect()
+    
+    def _parse_script_sections(self, script: str, main_title: str) -> List[Dict]:
+        """Quebra script em seções lógicas (regra em text_sections.parse_slide_sections)"""
+        return parse_slide_sections(script, main_title)
     
     def _generate_audio(self, script: str, video_id: int, tone: str) -> str:
         """Gera áudio com TTS"""
         audio_path = str(self.output_dir / f"audio_{video_id}.mp3")
         
-        # Mapear tom para voz
+        self.tts.generate(
+            text=script,
+            output_path=audio_path,
+            voice=self._voice_for(tone)
+        )
+        
+        return audio_path
+    
+    def _voice_for(self, tone: str) -> str:
+        """Mapear tom para voz"""
         voice_map = {
             'profissional': 'pt-BR-FranciscaNeural',
             'casual': 'pt-BR-AntonioNeural',
@@ -225,15 +254,7 @@ class SimpleVideoGenerator(BaseVideoGenerator):
             'prático': 'pt-BR-AntonioNeural'
         }
         
-        voice = voice_map.get(tone, 'pt-BR-FranciscaNeural')
-        
-        self.tts.generate(
-            text=script,
-            output_path=audio_path,
-            voice=voice
-        )
-        
-        return audio_path
+        return voice_map.get(tone, 'pt-BR-FranciscaNeural')
     
     def _create_slide(
         self, 
@@ -241,86 +262,44 @@ class SimpleVideoGenerator(BaseVideoGenerator):
         content: str, 
         slide_num: int, 
         total_slides: int,
-        video_id: int
+        video_id: int,
+        metadata: Optional[Dict] = None
     ) -> str:
         """Cria slide visual com PIL"""
-        
-        # Determinar dimensões baseado na orientação
-        orientation = getattr(self, 'metadata', {}).get('video_orientation', 'horizontal')
-        
-        if orientation == 'vertical':
-            # Vertical 9:16 (Stories/Reels/TikTok)
-            # HD vertical: 720x1280
-            width, height = 720, 1280
-        else:
-            # Horizontal 16:9 (YouTube/padrão)
-            # HD horizontal: 1280x720
-            width, height = 1280, 720
-        
-        # Criar imagem com gradiente
-        img = Image.new('RGB', (width, height), color='#1a1a2e')
-        draw = ImageDraw.Draw(img)
-        
-        # Adicionar gradiente simples (opcional)
-        for y in range(height):
-            opacity = int(255 * (1 - y / height * 0.3))
-            color = (26, 26, 46, opacity)
-            # Simular gradiente com linhas
-        
-        # Fontes - ajustar tamanho baseado na orientação
-        if orientation == 'vertical':
-            # Fontes menores para vertical (720px de largura)
-            try:
-                title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48)
-                content_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 36)
-                footer_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
-            except:
-                title_font = ImageFont.load_default()
-                content_font = ImageFont.load_default()
-                footer_font = ImageFont.load_default()
-            
-            # Configurações para wrap de texto vertical
-            title_wrap_width = 20
-            content_wrap_width = 35
-        else:
-            # Fontes padrão para horizontal (1280px de largura)
-            try:
-                title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 64)
-                content_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 42)
-                footer_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 28)
-            except:
-                title_font = ImageFont.load_default()
-                content_font = ImageFont.load_default()
-                footer_font = ImageFont.load_default()
-            
-            # Configurações para wrap de texto horizontal
-            title_wrap_width = 30
-            content_wrap_width = 55
-        
-        # Título (topo) com destaque
-        if title:
-            # Barra de destaque
-            draw.rectangle([0, 100, width, 200], fill='#00d9ff')
-            
-            wrapped_title = textwrap.fill(title, width=title_wrap_width)
-            draw.text((width//2, 150), wrapped_title, fill='#1a1a2e', font=title_font, anchor='mm')
-        
-        # Conteúdo (centro)
-        wrapped_content = textwrap.fill(content[:500], width=content_wrap_width)  # Limitar tamanho
-        draw.text((width//2, height//2 + 50), wrapped_content, fill='#ffffff', font=content_font, anchor='mm')
-        
-        # Rodapé (número do slide + logo)
-        footer_text = f"EnsinaLab | Slide {slide_num}/{total_slides}"
-        draw.text((width - 150, height - 60), footer_text, fill='#888888', font=footer_font, anchor='mm')
-        
-        # Linha decorativa inferior
-        draw.rectangle([0, height - 10, width, height], fill='#00d9ff')
-        
-        # Salvar
-        slide_path = str(self.slides_dir / f"slide_{video_id}_{slide_num:02d}.png")
-        img.save(slide_path, quality=95)
-        
-        return slide_path
+        slide = self._slide_job(title, content, slide_num, total_slides, metadata)
+        return render_slide(self._slide_path(video_id, slide_num), **slide)
+    
+    def _slide_job(
+        self,
+        title: str,
+        content: str,
+        slide_num: int,
+        total_slides: int,
+        metadata: Optional[Dict] = None
+    ) -> Dict:
+        """Argumentos de draw_slide/render_slide para um slide"""
+        # Orientação/tema da metadata explícita: prepare_assets pode rodar em paralelo com outras etapas
+        if metadata is None:
+            metadata = getattr(self, 'metadata', {})
+        return {
+            'title': title,
+            'content': content,
+            'slide_num': slide_num,
+            'total_slides': total_slides,
+            'orientation': metadata.get('video_orientation', 'horizontal'),
+            'theme': metadata.get('slide_theme', DEFAULT_THEME)
+        }
+    
+    def _slide_path(self, video_id: int, slide_num: int) -> str:
+        """Caminho determinístico do PNG por vídeo e número do slide"""
+        return str(self.slides_dir / f"slide_{video_id}_{slide_num:02d}.png")
+    
+    def _rasterize_slides(self, slides: List[Dict], video_id: int) -> List[str]:
+        """Salva os PNGs dos slides em paralelo (SlideRasterizer), na ordem recebida"""
+        return SlideRasterizer().render(render_slide, [
+            {'slide_path': self._slide_path(video_id, slide['slide_num']), **slide}
+            for slide in slides
+        ])
     
     def estimate_cost(self, script: str, duration_minutes: int) -> float:
         """Estima custo"""
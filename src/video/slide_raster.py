@@ -0,0 +1,214 @@
+"""
+Rasterização de slides em paralelo (pool de processos)
+
+Desenhar texto com PIL é CPU puro e segura o GIL: threads não ajudam.
+SlideRasterizer distribui os slides de um vídeo num ProcessPoolExecutor
+limitado à cota de CPU do container (cgroup), reaproveitado entre vídeos
+no mesmo processo.
+
+- Determinístico: o caminho de cada PNG vem do job (definido por quem
+  chama) e a lista de retorno segue a ordem dos jobs;
+- Memória limitada: cada worker segura um slide por vez e devolve só o
+  caminho do arquivo (nada de pixels voltando pelo pipe);
+- forkserver: os workers não herdam threads/conexões do worker Celery e
+  já sobem com PIL/NumPy/fontes importados (scripts que usam o pool
+  precisam da guarda if __name__ == "__main__");
+- Com 1 CPU (ou 1 slide) roda no próprio processo, sem custo de pool;
+- Processo daemônico (worker do pool prefork do Celery/billiard) não pode
+  ter filhos: roda no próprio processo. Falha ao subir o pool (ou pool
+  quebrado) também cai para a execução em sequência.
+
+Jobs são funções de módulo (picklable) + kwargs. render() grava arquivos
+(render_slide → PNG); frames() devolve as imagens em memória, em ordem e
+com no máximo max_workers + 1 em voo, para alimentar o RawFrameSink
+(draw_slide no SimpleVideoGenerator, draw_scene no VideoGenerator legado).
+"""
+import atexit
+import math
+import os
+import textwrap
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from src.config.workflows import VIDEO_RENDER_CONFIG
+from src.video.slide_templates import FONT_DIR
+
+# Erros ao subir/usar o pool: worker morto (BrokenProcessPool), processo
+# daemônico sem permissão para filhos (AssertionError) ou falta de recursos (OSError)
+POOL_ERRORS = (BrokenProcessPool, AssertionError, OSError)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def cpu_quota(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """
+    CPUs disponíveis para o processo: afinidade limitada pela cota do cgroup
+
+    cgroup v2 (cpu.max: "<quota> <period>" ou "max <period>") ou v1
+    (cpu.cfs_quota_us / cpu.cfs_period_us, -1 = sem limite). Cotas
+    fracionárias arredondam para cima (1.5 CPU → 2 workers).
+    """
+    available = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+
+    quota = None
+    try:
+        with open(os.path.join(cgroup_root, "cpu.max")) as f:
+            limit, period = f.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        for cpu_dir in ("cpu", "cpu,cpuacct", ""):
+            try:
+                with open(os.path.join(cgroup_root, cpu_dir, "cpu.cfs_quota_us")) as f:
+                    limit = int(f.read())
+                with open(os.path.join(cgroup_root, cpu_dir, "cpu.cfs_period_us")) as f:
+                    period = int(f.read())
+            except (OSError, ValueError):
+                continue
+            if limit > 0 and period > 0:
+                quota = limit / period
+            break
+
+    if quota:
+        available = min(available, math.ceil(quota))
+    return max(1, available)
+
+
+def _call(job: Tuple[Callable, Dict]):
+    render_fn, kwargs = job
+    return render_fn(**kwargs)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool compartilhado do processo (recriado se o tamanho mudar)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["src.video.slide_templates", "src.video.slide_raster"])
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor, wait: bool = False):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=wait)
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _discard_pool(_pool, wait=True)
+
+
+def _can_fork_workers() -> bool:
+    """Processos daemônicos (ex.: workers prefork do Celery) não podem criar filhos"""
+    return not multiprocessing.current_process().daemon
+
+
+class SlideRasterizer:
+    """Rasteriza slides concorrentemente num pool de processos limitado"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max(1, max_workers or VIDEO_RENDER_CONFIG['slide_workers'] or cpu_quota())
+        if not _can_fork_workers():
+            self.max_workers = 1
+
+    def render(self, render_fn: Callable[..., str], jobs: List[Dict]) -> List[str]:
+        """
+        Executa render_fn(**job) para cada job
+
+        Returns:
+            Caminhos retornados por render_fn, na ordem dos jobs
+        """
+        workers = min(self.max_workers, len(jobs))
+        if workers <= 1:
+            return [render_fn(**job) for job in jobs]
+
+        pool = None
+        try:
+            pool = _get_pool(self.max_workers)
+            return list(pool.map(_call, [(render_fn, job) for job in jobs]))
+        except POOL_ERRORS as e:
+            # Worker morto (ex.: OOM killer) ou pool que não sobe: refaz no próprio processo
+            print(f"⚠️  Pool de slides indisponível ({e!r}); renderizando em sequência")
+            if pool is not None:
+                _discard_pool(pool)
+            return [render_fn(**job) for job in jobs]
+
+    def frames(self, draw_fn: Callable[..., Image.Image], jobs: List[Dict]) -> Iterator[Image.Image]:
+        """
+        Desenha draw_fn(**job) para cada job e entrega as imagens na ordem dos jobs
+
+        Com pool, mantém no máximo max_workers + 1 imagens em voo: o consumidor
+        (ex.: pipe do ffmpeg) escreve uma enquanto os workers desenham as próximas.
+        """
+        if min(self.max_workers, len(jobs)) <= 1:
+            for job in jobs:
+                yield draw_fn(**job)
+            return
+
+        pool = None
+        pending = deque()
+        submitted = yielded = 0
+        try:
+            pool = _get_pool(self.max_workers)
+            while yielded < len(jobs):
+                while submitted < len(jobs) and len(pending) <= self.max_workers:
+                    pending.append(pool.submit(_call, (draw_fn, jobs[submitted])))
+                    submitted += 1
+                frame = pending.popleft().result()
+                yielded += 1
+                yield frame
+        except POOL_ERRORS as e:
+            print(f"⚠️  Pool de slides indisponível ({e!r}); desenhando em sequência")
+            if pool is not None:
+                _discard_pool(pool)
+            for job in jobs[yielded:]:
+                yield draw_fn(**job)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+@lru_cache(maxsize=None)
+def _scene_font(size: int):
+    try:
+        return ImageFont.truetype(f"{FONT_DIR}/DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def draw_scene(
+    text: str,
+    size: Tuple[int, int] = (1920, 1080),
+    background: Tuple[int, int, int] = (41, 128, 185),
+    font_size: int = 48,
+    text_box: Tuple[int, int] = (1600, 900)
+) -> Image.Image:
+    """Cena do VideoGenerator legado: fundo sólido + texto branco centralizado (caption)"""
+    img = Image.new('RGB', size, background)
+    draw = ImageDraw.Draw(img)
+    font = _scene_font(font_size)
+
+    # Quebra pela largura da caixa de texto (largura média de caractere da fonte)
+    char_width = max(1.0, draw.textlength("x" * 20, font=font) / 20)
+    wrapped = textwrap.fill(text, width=max(10, int(text_box[0] / char_width)))
+    draw.multiline_text((size[0] // 2, size[1] // 2), wrapped, fill='white', font=font, anchor='mm', align='center')
+
+    return img
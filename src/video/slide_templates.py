@@ -0,0 +1,140 @@
+"""
+Templates de slide pré-renderizados (SimpleVideoGenerator)
+
+Tudo que não depende do texto do slide é montado uma vez por
+(orientação, tema) e reaproveitado: fontes carregadas, fundo em gradiente
+(gerado com NumPy) e elementos fixos (barra do título, linha inferior).
+Cada slide só copia a base e desenha título, conteúdo e rodapé
+(draw_slide em memória; render_slide salva PNG), funções de módulo para
+rodar nos workers do SlideRasterizer.
+"""
+import textwrap
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+
+# Texto dos slides por orientação: wrap (caracteres por linha), limite de
+# caracteres do conteúdo e linhas que cabem entre a barra de título e o rodapé
+SLIDE_TEXT_LAYOUT = {
+    'horizontal': {'title_wrap': 30, 'content_wrap': 55, 'max_chars': 500, 'max_lines': 8},
+    'vertical': {'title_wrap': 20, 'content_wrap': 35, 'max_chars': 500, 'max_lines': 20},
+}
+
+# Dimensões HD por orientação: horizontal 16:9 (YouTube/padrão), vertical 9:16 (Stories/Reels/TikTok)
+SLIDE_SIZES = {
+    'horizontal': (1280, 720),
+    'vertical': (720, 1280),
+}
+
+# Tamanhos de fonte (título, conteúdo, rodapé): menores no vertical (720px de largura)
+SLIDE_FONT_SIZES = {
+    'horizontal': (64, 42, 28),
+    'vertical': (48, 36, 24),
+}
+
+SLIDE_THEMES = {
+    'default': {
+        'background': (26, 26, 46),  # #1a1a2e
+        'gradient_darkening': 0.3,  # Fundo escurece até 30% no rodapé
+        'accent': '#00d9ff',  # Barra do título e linha inferior
+        'title': '#1a1a2e',
+        'content': '#ffffff',
+        'footer': '#888888',
+    },
+}
+
+DEFAULT_THEME = 'default'
+
+
+class SlideTemplate:
+    """Base pré-renderizada de uma orientação + tema"""
+
+    def __init__(self, orientation: str = 'horizontal', theme: str = DEFAULT_THEME):
+        self.orientation = 'vertical' if orientation == 'vertical' else 'horizontal'
+        self.theme = theme if theme in SLIDE_THEMES else DEFAULT_THEME
+        self.colors = SLIDE_THEMES[self.theme]
+        self.width, self.height = SLIDE_SIZES[self.orientation]
+        self.title_font, self.content_font, self.footer_font = self._load_fonts(SLIDE_FONT_SIZES[self.orientation])
+
+        self._base = self._render_background()
+        draw = ImageDraw.Draw(self._base)
+        # Linha decorativa inferior
+        draw.rectangle([0, self.height - 10, self.width, self.height], fill=self.colors['accent'])
+
+        # Mesma base + barra de destaque do título
+        self._titled = self._base.copy()
+        ImageDraw.Draw(self._titled).rectangle([0, 100, self.width, 200], fill=self.colors['accent'])
+
+    def new_slide(self, with_title: bool = True) -> Image.Image:
+        """Cópia da base pronta para receber o texto do slide"""
+        return (self._titled if with_title else self._base).copy()
+
+    def _render_background(self) -> Image.Image:
+        """Gradiente vertical: cor do tema escurecendo linearmente até o rodapé"""
+        shade = 1 - np.arange(self.height) / self.height * self.colors['gradient_darkening']
+        rows = np.rint(np.outer(shade, self.colors['background'])).astype(np.uint8)
+        pixels = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (self.height, self.width, 3)))
+        return Image.fromarray(pixels)
+
+    @staticmethod
+    def _load_fonts(sizes: Tuple[int, int, int]) -> Tuple:
+        title_size, content_size, footer_size = sizes
+        try:
+            return (
+                ImageFont.truetype(f"{FONT_DIR}/DejaVuSans-Bold.ttf", title_size),
+                ImageFont.truetype(f"{FONT_DIR}/DejaVuSans.ttf", content_size),
+                ImageFont.truetype(f"{FONT_DIR}/DejaVuSans.ttf", footer_size),
+            )
+        except OSError:
+            default = ImageFont.load_default()
+            return default, default, default
+
+
+@lru_cache(maxsize=None)
+def get_slide_template(orientation: str = 'horizontal', theme: str = DEFAULT_THEME) -> SlideTemplate:
+    """Template em cache por processo, chave (orientação, tema)"""
+    return SlideTemplate(orientation, theme)
+
+
+def draw_slide(
+    title: str,
+    content: str,
+    slide_num: int,
+    total_slides: int,
+    orientation: str = 'horizontal',
+    theme: str = DEFAULT_THEME
+) -> Image.Image:
+    """Desenha o texto de um slide sobre a base do template (imagem em memória)"""
+    template = get_slide_template(orientation, theme)
+    width, height, colors = template.width, template.height, template.colors
+    layout = SLIDE_TEXT_LAYOUT[template.orientation]
+
+    # Base pré-renderizada (gradiente, barra do título, linha inferior): só o texto é desenhado aqui
+    img = template.new_slide(with_title=bool(title))
+    draw = ImageDraw.Draw(img)
+
+    # Título (topo) com destaque
+    if title:
+        wrapped_title = textwrap.fill(title, width=layout['title_wrap'])
+        draw.text((width // 2, 150), wrapped_title, fill=colors['title'], font=template.title_font, anchor='mm')
+
+    # Conteúdo (centro)
+    wrapped_content = textwrap.fill(content[:layout['max_chars']], width=layout['content_wrap'])  # Limitar tamanho
+    draw.text((width // 2, height // 2 + 50), wrapped_content, fill=colors['content'], font=template.content_font, anchor='mm')
+
+    # Rodapé (número do slide + logo)
+    footer_text = f"EnsinaLab | Slide {slide_num}/{total_slides}"
+    draw.text((width - 150, height - 60), footer_text, fill=colors['footer'], font=template.footer_font, anchor='mm')
+
+    return img
+
+
+def render_slide(slide_path: str, **slide) -> str:
+    """Desenha o slide (argumentos de draw_slide) e salva o PNG"""
+    # PNG intermediário, lido uma vez na renderização: compressão rápida
+    draw_slide(**slide).save(slide_path, compress_level=1)
+    return slide_path
@@ -3,10 +3,22 @@ Gerador de áudio (TTS - Text-to-Speech)
 Suporta múltiplos providers: Google Cloud TTS, ElevenLabs, Amazon Polly
 """
 import os
+import threading
 from typing import Optional
 from pathlib import Path
 
 
+def estimate_speech_duration(text: str, words_per_minute: int = 150) -> float:
+    """Duração estimada da narração em segundos (mínimo 1s), sem gerar áudio"""
+    word_count = len(text.split())
+    duration_minutes = word_count / words_per_minute
+    return max(duration_minutes * 60, 1.0)  # Mínimo 1 segundo
+
+
+class TTSProviderError(RuntimeError):
+    """Provider de TTS falhou numa chamada com fallback=False (sem áudio de fallback)"""
+
+
 class TTSService:
     """Serviço de conversão de texto para fala"""
     
@@ -25,6 +37,9 @@ class TTSService:
         # Verificar credenciais
         self.api_key = self._get_api_key(self.provider)
         
+        # Chamadas com fallback=False em andamento (por thread: narração em partes)
+        self._no_fallback = threading.local()
+        
         print(f"   🎤 TTS Provider selecionado: {self.provider}")
     
     def _detect_provider(self, requested_provider: str) -> str:
@@ -60,7 +75,9 @@ class TTSService:
         text: str, 
         output_path: str,
         voice: str = "pt-BR-FranciscaNeural",
-        speed: float = 1.0
+        speed: float = 1.0,
+        previous_text: Optional[str] = None,
+        fallback: bool = True
     ) -> str:
         """
         Gera áudio a partir de texto
@@ -70,6 +87,11 @@ class TTSService:
             output_path: Caminho de saída
             voice: ID da voz
             speed: Velocidade (0.5 - 2.0)
+            previous_text: Trecho narrado logo antes (narração em partes): mantém
+                a entonação contínua entre as partes (ElevenLabs)
+            fallback: Se False, falha do provider levanta TTSProviderError em
+                vez de devolver o tom de fallback (narração em partes: uma
+                parte de fallback no meio da fala real)
         
         Returns:
             Caminho do arquivo de áudio gerado
@@ -81,15 +103,20 @@ class TTSService:
             print("   → Gerando fallback (silêncio)...")
             return self._generate_fallback_audio(output_path, len(text))
         
-        if self.provider == "elevenlabs":
-            return self._generate_elevenlabs(text, output_path, voice)
-        elif self.provider == "amazon":
-            return self._generate_amazon(text, output_path, voice)
-        elif self.provider == "azure":
-            return self._generate_azure(text, output_path, voice, speed)
-        else:
-            # Fallback: gerar silêncio
-            return self._generate_fallback(text, output_path)
+        # Sem provider configurado o fallback é o áudio esperado
+        self._no_fallback.enabled = not fallback and self.provider in ("elevenlabs", "amazon", "azure")
+        try:
+            if self.provider == "elevenlabs":
+                return self._generate_elevenlabs(text, output_path, voice, previous_text)
+            elif self.provider == "amazon":
+                return self._generate_amazon(text, output_path, voice)
+            elif self.provider == "azure":
+                return self._generate_azure(text, output_path, voice, speed)
+            else:
+                # Fallback: gerar silêncio
+                return self._generate_fallback(text, output_path)
+        finally:
+            self._no_fallback.enabled = False
     
     def _generate_google(self, text: str, output_path: str, voice: str, speed: float) -> str:
         """
@@ -101,7 +128,7 @@ class TTSService:
         print(f"   → Gerando fallback (silêncio)...")
         return self._generate_fallback(text, output_path)
     
-    def _generate_elevenlabs(self, text: str, output_path: str, voice: str) -> str:
+    def _generate_elevenlabs(self, text: str, output_path: str, voice: str, previous_text: Optional[str] = None) -> str:
         """Gera com ElevenLabs (melhor qualidade para português)"""
         try:
             import requests
@@ -141,6 +168,8 @@ class TTSService:
                     "use_speaker_boost": True
                 }
             }
+            if previous_text:
+                data["previous_text"] = previous_text
             
             print(f"   🎤 Gerando áudio com ElevenLabs (voz: {voice_id})...")
             print(f"   🔗 URL: {url}")
@@ -248,6 +277,9 @@ class TTSService:
     
     def _generate_fallback(self, text: str, output_path: str) -> str:
         """Fallback: gera áudio de silêncio com duração estimada"""
+        if getattr(self._no_fallback, "enabled", False):
+            raise TTSProviderError(f"TTS {self.provider} falhou (chamada sem fallback)")
+        
         print(f"   ⚠️ Gerando áudio fallback (silêncio)")
         
         try:
@@ -283,6 +315,4 @@ class TTSService:
         Returns:
             Duração estimada em segundos
         """
-        word_count = len(text.split())
-        duration_minutes = word_count / words_per_minute
-        return max(duration_minutes * 60, 1.0)  # Mínimo 1 segundo
+        return estimate_speech_duration(text, words_per_minute)
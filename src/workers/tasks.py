@@ -17,12 +17,17 @@ from src.models.video import VideoStatus
 from src.services.briefing_service import BriefingService
 from src.services.option_service import OptionService
 from src.services.video_service import VideoService
+from src.services.speculation_service import SpeculationService
+from src.config.workflows import SPECULATION_CONFIG
 
 # Imports de ML e Video (não importam models)
 from src.ml.llm_service import LLMService
 from src.ml.filters import ContentFilter
+from src.ml.content_guardrails import get_guardrails
+from src.ml.usage_tracker import usage_context, count_calls, flush_usage
 from src.video.tts import TTSService
 from src.video.generator import VideoGenerator
+from src.utils.logger import log_security_event
 
 # LangGraph Workflows
 from src.workflows.briefing_workflow import BriefingAnalysisWorkflow
@@ -30,12 +35,84 @@ from src.workflows.video_workflow import VideoGenerationWorkflow
 from src.workflows.refinement_workflow import ContentRefinementWorkflow
 
 class DatabaseTask(Task):
-    """Base task com sessão de banco de dados"""
+    """Base task com sessão de banco de dados (grava consumo de LLM ao final)"""
     
     def __call__(self, *args, **kwargs):
         with SessionLocal() as db:
             self.db = db
-            return super().__call__(*args, **kwargs)
+            try:
+                return super().__call__(*args, **kwargs)
+            finally:
+                flush_usage(db)
+
+def _video_briefing_data(option) -> dict:
+    """Dados do briefing usados pelo workflow de vídeo (e pela especulação do roteiro)"""
+    briefing = option.briefing
+    return {
+        'target_audience': briefing.target_audience,
+        'subject_area': briefing.subject_area,
+        'duration_minutes': briefing.duration_minutes,
+        'tone': briefing.tone,
+        'title': option.title,
+        'video_orientation': briefing.video_orientation  # ✅ NOVO
+    }
+
+def _dispatch_speculation(briefing_id: int, options: list):
+    """Agenda o aprimoramento especulativo dos roteiros das opções do topo do ranking"""
+    if not SPECULATION_CONFIG["enabled"] or not options:
+        return
+    
+    speculation = SpeculationService()
+    for option in options[:SPECULATION_CONFIG["top_k"]]:
+        try:
+            task = enhance_script_speculatively.apply_async(
+                args=[option.id],
+                priority=SPECULATION_CONFIG["priority"]
+            )
+            speculation.register_task(briefing_id, option.id, task.id)
+        except Exception as e:
+            print(f"   ⚠️ Especulação não agendada para opção {option.id}: {e}")
+            return
+    print(f"🔮 Aprimoramento especulativo agendado para {min(len(options), SPECULATION_CONFIG['top_k'])} opção(ões)")
+
+def _store_video(video_service: VideoService, video_id: int, result: dict, title: str, generator_type: str) -> str:
+    """Envia vídeo e thumbnail para o storage (R2/S3) e conclui o vídeo; retorna a URL"""
+    from src.utils.storage import get_storage
+    
+    storage = get_storage()
+    
+    # Upload vídeo
+    print(f"📤 Fazendo upload do vídeo para storage...")
+    video_url = storage.upload_video(
+        local_path=result['video_path'],
+        video_id=video_id,
+        metadata={
+            'title': title,
+            'duration': result['metadata'].get('duration', 0),
+            'generator_type': generator_type
+        }
+    )
+    
+    # Upload thumbnail (se existir)
+    thumbnail_url = None
+    if result.get('thumbnail_path'):
+        print(f"📤 Fazendo upload da thumbnail...")
+        thumbnail_url = storage.upload_thumbnail(
+            local_path=result['thumbnail_path'],
+            video_id=video_id
+        )
+    
+    # Finalizar com URLs do storage
+    video_service.complete_video(
+        video_id=video_id,
+        file_path=video_url,  # URL do R2/S3 (não path local)
+        file_size=result['metadata'].get('file_size', 0),
+        duration=result['metadata'].get('duration', 0),
+        thumbnail_path=thumbnail_url
+    )
+    
+    return video_url
+
 
 @celery_app.task(
     base=DatabaseTask, 
@@ -48,11 +125,15 @@ class DatabaseTask(Task):
     acks_late=True,
     reject_on_worker_lost=True
 )
-def generate_options(self, briefing_id: int):
+def generate_options(self, briefing_id: int, validate_content: bool = False):
     """
     Task para gerar opções de conteúdo usando Multi-Agent Workflow (LangGraph)
     
-    Pipeline: Analyzer → Generator → Filter → Ranker
+    Pipeline: [Guardrail LLM] → Analyzer → Generator → Filter → Ranker
+    
+    Args:
+        briefing_id: ID do briefing
+        validate_content: Executa a validação LLM dos guardrails adiada pela rota
     """
     try:
         print(f"🔄 Gerando opções com LangGraph para briefing {briefing_id}...")
@@ -65,6 +146,28 @@ def generate_options(self, briefing_id: int):
             print(f"❌ Briefing {briefing_id} não encontrado")
             return
         
+        # 🛡️ Validação contextual adiada (timeout no request)
+        if validate_content:
+            with usage_context(workflow="briefing_guardrails", node="validate_briefing", briefing_id=briefing_id):
+                is_valid, reason, confidence = get_guardrails().confirm_with_llm(
+                    briefing.title,
+                    briefing.description,
+                    briefing.subject_area or "",
+                    briefing.target_audience or ""
+                )
+            
+            if not is_valid:
+                print(f"🚫 Briefing {briefing_id} rejeitado pelos guardrails: {reason}")
+                log_security_event("content_guardrail_rejection", {
+                    "user_id": briefing.user_id,
+                    "briefing_id": briefing_id,
+                    "reason": reason,
+                    "confidence": confidence,
+                    "deferred": True
+                })
+                briefing_service.update_status(briefing_id, BriefingStatus.FAILED)
+                return {"briefing_id": briefing_id, "rejected": True, "reason": reason}
+        
         # Atualizar status
         briefing_service.update_status(briefing_id, BriefingStatus.PROCESSING)
         
@@ -91,17 +194,21 @@ def generate_options(self, briefing_id: int):
         
         # Salvar opções no banco
         option_service = OptionService(self.db)
+        created_options = []
         for i, option_data in enumerate(ranked_options):
             # Adicionar metadata do workflow
             option_data['briefing_id'] = briefing_id
             option_data['rank'] = i + 1
             option_data['quality_score'] = option_data.get('score', 0.0)
             
-            option_service.create_option(option_data)
+            created_options.append(option_service.create_option(option_data))
         
         # Atualizar status
         briefing_service.update_status(briefing_id, BriefingStatus.OPTIONS_READY)
         
+        # 🔮 Aprimorar roteiros do topo do ranking enquanto o gestor escolhe
+        _dispatch_speculation(briefing_id, created_options)
+        
         print(f"✅ {len(ranked_options)} opções geradas (multi-agent) para briefing {briefing_id}")
         
         return {
@@ -131,7 +238,7 @@ def generate_video(self, video_id: int, generator_type: str = None):
     Task para gerar vídeo usando State Machine Workflow (LangGraph)
     
     Pipeline: Analyze → Enhance → Generate Audio → Generate Video → Review → Await Approval → Finalize
-    Suporta checkpointing e human-in-the-loop
+    Suporta checkpointing persistente e human-in-the-loop (VIDEO_REQUIRE_HUMAN_APPROVAL)
     
     Args:
         video_id: ID do vídeo
@@ -180,14 +287,14 @@ def generate_video(self, video_id: int, generator_type: str = None):
         print(f"   → Gerador selecionado: {generator_type}")
         
         # Preparar dados do briefing para o workflow
-        briefing_data = {
-            'target_audience': briefing.target_audience,
-            'subject_area': briefing.subject_area,
-            'duration_minutes': briefing.duration_minutes,
-            'tone': briefing.tone,
-            'title': option.title,
-            'video_orientation': briefing.video_orientation  # ✅ NOVO
-        }
+        briefing_data = _video_briefing_data(option)
+        
+        # Roteiro já aprimorado pela task especulativa (mesmo esboço e briefing)
+        speculative_script = None
+        if SPECULATION_CONFIG["enabled"]:
+            speculative_script = SpeculationService().get_script(
+                option.id, SpeculationService.fingerprint(option.script_outline, briefing_data)
+            )
         
         # 🎯 Executar Video Generation State Machine com gerador escolhido
         workflow = VideoGenerationWorkflow(
@@ -200,7 +307,8 @@ def generate_video(self, video_id: int, generator_type: str = None):
             video_id=video_id,
             option_id=option.id,
             briefing_data=briefing_data,
-            script_outline=option.script_outline
+            script_outline=option.script_outline,
+            speculative_script=speculative_script
         )
         
         # Verificar se precisa de aprovação humana
@@ -212,10 +320,9 @@ def generate_video(self, video_id: int, generator_type: str = None):
                 progress=0.8
             )
             
-            # Salvar checkpoint_id para poder retomar depois
-            video.metadata = video.metadata or {}
-            video.metadata['checkpoint_id'] = result['metadata'].get('thread_id')
-            video.metadata['generator_type'] = generator_type
+            # Checkpoint persistido na thread video_{video_id} (retomada via resume_video_generation)
+            video.generator_type = generator_type
+            video.generator_provider = provider
             self.db.commit()
             
             return {
@@ -229,39 +336,10 @@ def generate_video(self, video_id: int, generator_type: str = None):
         if result['success']:
             video_service.update_status(video_id, VideoStatus.PROCESSING, progress=0.9)
             
-            # Upload para storage (R2/S3)
-            from src.utils.storage import get_storage
-            
-            storage = get_storage()
-            
-            # Upload vídeo
-            print(f"📤 Fazendo upload do vídeo para storage...")
-            video_url = storage.upload_video(
-                local_path=result['video_path'],
-                video_id=video_id,
-                metadata={
-                    'title': briefing_data.get('title', f'Video {video_id}'),
-                    'duration': result['metadata'].get('duration', 0),
-                    'generator_type': generator_type
-                }
-            )
-            
-            # Upload thumbnail (se existir)
-            thumbnail_url = None
-            if result.get('thumbnail_path'):
-                print(f"📤 Fazendo upload da thumbnail...")
-                thumbnail_url = storage.upload_thumbnail(
-                    local_path=result['thumbnail_path'],
-                    video_id=video_id
-                )
-            
-            # Finalizar com URLs do storage
-            video_service.complete_video(
-                video_id=video_id,
-                file_path=video_url,  # URL do R2/S3 (não path local)
-                file_size=result['metadata'].get('file_size', 0),
-                duration=result['metadata'].get('duration', 0),
-                thumbnail_path=thumbnail_url
+            video_url = _store_video(
+                video_service, video_id, result,
+                title=briefing_data.get('title', f'Video {video_id}'),
+                generator_type=generator_type
             )
             
             print(f"✅ Vídeo {video_id} gerado e armazenado com sucesso!")
@@ -301,6 +379,55 @@ def generate_video(self, video_id: int, generator_type: str = None):
         raise
 
 
+@celery_app.task(base=DatabaseTask, bind=True, ignore_result=True)
+def enhance_script_speculatively(self, option_id: int):
+    """
+    Task especulativa (baixa prioridade): aprimora o roteiro de uma opção
+    antes da seleção e guarda no Redis para o generate_video
+    
+    Não roda (ou descarta o resultado) se a especulação da opção foi
+    cancelada pela seleção de outra opção, se a opção já foi escolhida ou
+    se o orçamento diário de tokens do usuário acabou.
+    """
+    speculation = SpeculationService()
+    if speculation.is_cancelled(option_id):
+        print(f"🛑 Especulação da opção {option_id} cancelada")
+        return {"option_id": option_id, "status": "cancelled"}
+    
+    option = OptionService(self.db).get_option(option_id)
+    if not option or option.is_selected:
+        return {"option_id": option_id, "status": "skipped"}
+    
+    briefing = option.briefing
+    briefing_data = _video_briefing_data(option)
+    fingerprint = SpeculationService.fingerprint(option.script_outline, briefing_data)
+    if speculation.get_script(option_id, fingerprint):
+        return {"option_id": option_id, "status": "cached"}
+    
+    reserved = SPECULATION_CONFIG["estimated_tokens"]
+    if not speculation.reserve_tokens(briefing.user_id, reserved):
+        print(f"💰 Orçamento especulativo do usuário {briefing.user_id} esgotado (opção {option_id})")
+        return {"option_id": option_id, "status": "budget_exhausted"}
+    
+    print(f"🔮 Aprimorando roteiro da opção {option_id} (especulativo)...")
+    with usage_context(workflow="speculative_enhancement", node="enhance_script", briefing_id=briefing.id), \
+            count_calls() as counts:
+        script = LLMService().enhance_script(option.script_outline, briefing_data)
+    speculation.settle_tokens(briefing.user_id, reserved, counts["tokens"])
+    
+    # enhance_script devolve o esboço quando a chamada falha
+    if not script or script == option.script_outline:
+        return {"option_id": option_id, "status": "failed"}
+    
+    if speculation.is_cancelled(option_id):
+        print(f"🛑 Especulação da opção {option_id} cancelada durante a chamada (resultado descartado)")
+        return {"option_id": option_id, "status": "cancelled", "tokens": counts["tokens"]}
+    
+    speculation.store_script(option_id, script, fingerprint, counts["tokens"])
+    print(f"   ✓ Roteiro especulativo pronto ({counts['tokens']} tokens)")
+    return {"option_id": option_id, "status": "stored", "tokens": counts["tokens"]}
+
+
 @celery_app.task(base=DatabaseTask, bind=True)
 def resume_video_generation(self, video_id: int, approved: bool, feedback: str = None):
     """
@@ -322,35 +449,43 @@ def resume_video_generation(self, video_id: int, approved: bool, feedback: str =
             print(f"❌ Vídeo {video_id} não encontrado")
             return
         
-        # Obter checkpoint_id
-        checkpoint_id = video.metadata.get('checkpoint_id') if video.metadata else None
-        
-        if not checkpoint_id:
-            raise Exception("Checkpoint não encontrado para retomar workflow")
-        
-        # Retomar workflow
-        workflow = VideoGenerationWorkflow()
-        result = workflow.resume(
-            checkpoint_id=checkpoint_id,
-            approved=approved,
-            feedback=feedback
+        # Retomar do checkpoint persistido (aprovação executa só o nó finalize)
+        workflow = VideoGenerationWorkflow(
+            generator_type=video.generator_type or 'simple',
+            provider=video.generator_provider,
+            require_human_approval=True
         )
+        with usage_context(video_id=video_id):
+            result = workflow.resume(
+                thread_id=f"video_{video_id}",
+                approval_status='approved' if approved else 'needs_revision',
+                feedback=feedback
+            )
+        
+        # Revisão solicitada: vídeo regenerado e novamente aguardando aprovação
+        if result.get('status') == 'awaiting_approval':
+            video_service.update_status(video_id, VideoStatus.PENDING_APPROVAL, progress=0.8)
+            print(f"⏸️  Vídeo {video_id} revisado, aguardando nova aprovação")
+            return {
+                "video_id": video_id,
+                "status": "awaiting_approval",
+                "preview_path": result.get('video_path')
+            }
         
         # Processar resultado
         if result['success']:
-            video_service.complete_video(
-                video_id=video_id,
-                file_path=result['file_path'],
-                file_size=result.get('file_size', 0),
-                duration=result.get('duration', 0),
-                thumbnail_path=result.get('thumbnail_path')
+            video_service.update_status(video_id, VideoStatus.PROCESSING, progress=0.9)
+            video_url = _store_video(
+                video_service, video_id, result,
+                title=video.title,
+                generator_type=video.generator_type
             )
             
             print(f"✅ Vídeo {video_id} finalizado após aprovação!")
             
             return {
                 "video_id": video_id,
-                "file_path": result['file_path']
+                "file_path": video_url
             }
         else:
             raise Exception(f"Retomada falhou: {result.get('error')}")
@@ -3,10 +3,22 @@ Agentes para workflow de análise de briefing (multi-agente)
 
 Fluxo: Analyzer → Generator → Filter → Ranker
 """
-from typing import Dict, List
-from langchain_openai import ChatOpenAI
+from typing import Dict, List, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
-from src.config.settings import settings
+from src.config.workflows import BRIEFING_WORKFLOW_CONFIG
+from src.workflows.model_router import ModelRouter
+from src.ml.keyword_matcher import SAFETY_MATCHER
+from src.ml.batch_scoring import BatchScorer
+from src.workflows.structured_output import (
+    StructuredOutputParser,
+    ContentOptionSchema,
+    BriefingAnalysisSchema,
+    validate_item,
+    extract_json
+)
+
+TEMPERATURES = BRIEFING_WORKFLOW_CONFIG["temperature"]
+NUM_OPTIONS = BRIEFING_WORKFLOW_CONFIG["num_options"]
 
 class BriefingAnalyzerAgent:
     """
@@ -19,15 +31,13 @@ class BriefingAnalyzerAgent:
     - Detectar gaps ou ambiguidades
     """
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=0.3,  # Mais determinístico para análise
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+    def __init__(self, router: Optional[ModelRouter] = None):
+        self.router = router or ModelRouter()
+        self.temperature = TEMPERATURES["analyzer"]  # Mais determinístico para análise
     
-    def analyze(self, briefing_data: Dict) -> Dict:
-        """Analisa um briefing"""
+    def analyze(self, briefing_data: Dict, complexity: Optional[str] = None) -> Dict:
+        """Analisa um briefing (modelo escolhido pela complexidade)"""
+        complexity = complexity or self._assess_complexity(briefing_data)
         
         system_prompt = """Você é um analista especializado em formação de professores.
 Sua tarefa é analisar briefings de capacitação docente e extrair:
@@ -61,7 +71,7 @@ Forneça uma análise estruturada.
             HumanMessage(content=user_prompt)
         ]
         
-        response = self.llm.invoke(messages)
+        response = self.router.invoke("analyzer", messages, complexity, self.temperature)
         
         # Parse da resposta (simplificado - em produção usar JSON)
         return {
@@ -69,7 +79,7 @@ Forneça uma análise estruturada.
             "is_clear": True,  # TODO: detectar clareza
             "missing_info": [],
             "keywords": self._extract_keywords(briefing_data),
-            "complexity": self._assess_complexity(briefing_data)
+            "complexity": complexity
         }
     
     def _extract_keywords(self, briefing_data: Dict) -> List[str]:
@@ -81,13 +91,7 @@ Forneça uma análise estruturada.
     
     def _assess_complexity(self, briefing_data: Dict) -> str:
         """Avalia complexidade do briefing"""
-        duration = briefing_data.get('duration_minutes', 5)
-        if duration <= 3:
-            return "simples"
-        elif duration <= 7:
-            return "médio"
-        else:
-            return "complexo"
+        return ModelRouter.assess_complexity(briefing_data)
 
 
 class ContentGeneratorAgent:
@@ -101,18 +105,17 @@ class ContentGeneratorAgent:
     - Esboçar roteiros
     """
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=0.8,  # Mais criativo
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+    def __init__(self, router: Optional[ModelRouter] = None):
+        self.router = router or ModelRouter()
+        self.temperature = TEMPERATURES["generator"]  # Mais criativo
+        self.last_parse_report: Dict[str, int] = {}
     
     def generate_options(self, briefing_data: Dict, analysis: Dict) -> List[Dict]:
         """Gera opções baseadas no briefing e análise"""
+        complexity = analysis.get('complexity') or ModelRouter.assess_complexity(briefing_data)
         
-        system_prompt = """Você é um especialista em criação de conteúdo para formação de professores.
-Gere 4 propostas DIFERENTES de vídeos de capacitação, variando:
+        system_prompt = f"""Você é um especialista em criação de conteúdo para formação de professores.
+Gere {NUM_OPTIONS} propostas DIFERENTES de vídeos de capacitação, variando:
 - Abordagem (teórica, prática, casos reais, passo-a-passo)
 - Tom (formal, inspiracional, técnico, conversacional)
 - Estrutura (linear, problematização, storytelling)
@@ -138,19 +141,21 @@ Cada proposta deve ter:
 - Nível: {briefing_data.get('teacher_experience_level')}
 - Duração alvo: {briefing_data.get('duration_minutes')} minutos
 
-Gere 4 propostas diversificadas em formato JSON:
+Gere {NUM_OPTIONS} propostas diversificadas. Responda APENAS com este objeto JSON:
 ```json
-[
-  {{
-    "title": "...",
-    "summary": "...",
-    "script_outline": "...",
-    "key_points": "ponto1; ponto2; ponto3",
-    "estimated_duration": 300,
-    "tone": "...",
-    "approach": "..."
-  }}
-]
+{{
+  "options": [
+    {{
+      "title": "...",
+      "summary": "...",
+      "script_outline": "...",
+      "key_points": "ponto1; ponto2; ponto3",
+      "estimated_duration": 300,
+      "tone": "...",
+      "approach": "..."
+    }}
+  ]
+}}
 ```
 """
 
@@ -159,22 +164,219 @@ Gere 4 propostas diversificadas em formato JSON:
             HumanMessage(content=user_prompt)
         ]
         
-        response = self.llm.invoke(messages)
+        response = self.router.invoke(
+            "generator", messages, complexity, self.temperature, json_mode=True
+        )
+        
+        options = self._parse_options(response.content, briefing_data, complexity)
+        
+        # Fallback apenas se nenhuma opção sobreviveu à validação/reparo
+        return options or self._generate_fallback_options(briefing_data)
+    
+    def _parse_options(self, content: str, briefing_data: Dict, complexity: str) -> List[Dict]:
+        """Valida opções contra o schema, reparando apenas campos inválidos"""
+        parser = StructuredOutputParser(self.router, complexity)
+        options = parser.parse_list(
+            content,
+            ContentOptionSchema,
+            key="options",
+            context=f"Briefing: {briefing_data.get('title')} ({briefing_data.get('duration_minutes', 5)} min)"
+        )
+        self.last_parse_report = parser.report
+        return options
+    
+    def generate_replacements(
+        self,
+        briefing_data: Dict,
+        analysis: Optional[Dict],
+        count: int,
+        accepted: List[Dict],
+        rejections: List[Dict],
+        complexity: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Gera apenas `count` opções para repor as descartadas pelo filtro
+        
+        As opções aceitas ficam como estão (títulos enviados para evitar
+        repetição) e os motivos de descarte entram no prompt. Sem fallback:
+        se nada for válido, a lista volta vazia.
+        """
+        complexity = complexity or (analysis or {}).get('complexity') or ModelRouter.assess_complexity(briefing_data)
+        
+        system_prompt = f"""Você é um especialista em criação de conteúdo para formação de professores.
+Algumas propostas de vídeo foram descartadas pelo controle de qualidade.
+Gere exatamente {count} proposta(s) NOVA(S) para substituí-las, corrigindo os motivos
+de descarte e diferentes das propostas já aceitas."""
+        
+        rejected = "\n".join(
+            f"- {item['title']}: {'; '.join(item['reasons'])}" for item in rejections
+        ) or "- (sem detalhes)"
+        kept = "\n".join(f"- {option.get('title')}" for option in accepted) or "- (nenhuma)"
+        
+        user_prompt = f"""
+**Briefing:**
+{briefing_data.get('title')}
+
+**Análise:**
+{(analysis or {}).get('analysis', 'N/A')}
+
+**Contexto:**
+- Público: {briefing_data.get('target_audience')}
+- Área: {briefing_data.get('subject_area')}
+- Duração alvo: {briefing_data.get('duration_minutes', 5)} minutos
+- Tom: {briefing_data.get('tone', 'Não especificado')}
+
+**Propostas descartadas (não repita estes problemas):**
+{rejected}
+
+**Propostas já aceitas (não repita):**
+{kept}
+
+Responda APENAS com este objeto JSON contendo {count} proposta(s):
+```json
+{{
+  "options": [
+    {{
+      "title": "...",
+      "summary": "...",
+      "script_outline": "...",
+      "key_points": "ponto1; ponto2; ponto3",
+      "estimated_duration": {briefing_data.get('duration_minutes', 5) * 60},
+      "tone": "...",
+      "approach": "..."
+    }}
+  ]
+}}
+```
+"""
         
-        # Parse JSON (simplificado)
-        import json
-        import re
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
         
-        json_match = re.search(r'\[.*\]', response.content, re.DOTALL)
-        if json_match:
-            try:
-                options = json.loads(json_match.group())
-                return options
-            except:
-                pass
+        response = self.router.invoke(
+            "generator", messages, complexity, self.temperature, json_mode=True
+        )
         
-        # Fallback
-        return self._generate_fallback_options(briefing_data)
+        parser = StructuredOutputParser(self.router, complexity)
+        options = parser.parse_list(
+            response.content,
+            ContentOptionSchema,
+            key="options",
+            context=f"Briefing: {briefing_data.get('title')} ({briefing_data.get('duration_minutes', 5)} min)"
+        )
+        return options[:count]
+    
+    def analyze_and_generate(self, briefing_data: Dict, complexity: Optional[str] = None) -> Dict:
+        """
+        Perfil "fast": análise + opções em uma única chamada estruturada
+        
+        Substitui a sequência Analyzer → Generator (2 chamadas LLM) por uma
+        resposta JSON com as duas partes.
+        
+        Returns:
+            Dict com 'analysis' (mesmo formato do BriefingAnalyzerAgent) e 'options'
+        """
+        complexity = complexity or ModelRouter.assess_complexity(briefing_data)
+        
+        system_prompt = f"""Você é um especialista em formação de professores e criação de conteúdo para capacitação docente.
+Em uma única resposta JSON você deve:
+
+1. Analisar o briefing: objetivo principal, público-alvo, nível de profundidade,
+   conceitos principais, lacunas/ambiguidades e sugestões de melhoria
+2. Gerar {NUM_OPTIONS} propostas DIFERENTES de vídeos de capacitação com base nessa análise, variando:
+   - Abordagem (teórica, prática, casos reais, passo-a-passo)
+   - Tom (formal, inspiracional, técnico, conversacional)
+   - Estrutura (linear, problematização, storytelling)
+
+Responda APENAS com o objeto JSON solicitado."""
+
+        user_prompt = f"""
+**Briefing:**
+- Título: {briefing_data.get('title')}
+- Descrição: {briefing_data.get('description')}
+- Público: {briefing_data.get('target_audience', 'Não especificado')}
+- Área: {briefing_data.get('subject_area', 'Não especificado')}
+- Nível: {briefing_data.get('teacher_experience_level', 'Não especificado')}
+- Objetivo: {briefing_data.get('training_goal', 'Não especificado')}
+- Duração alvo: {briefing_data.get('duration_minutes', 5)} minutos
+- Tom: {briefing_data.get('tone', 'Não especificado')}
+
+Formato da resposta:
+```json
+{{
+  "analysis": {{
+    "objective": "...",
+    "audience": "...",
+    "depth": "...",
+    "key_concepts": ["..."],
+    "gaps": ["..."],
+    "suggestions": ["..."]
+  }},
+  "options": [
+    {{
+      "title": "...",
+      "summary": "...",
+      "script_outline": "...",
+      "key_points": "ponto1; ponto2; ponto3",
+      "estimated_duration": 300,
+      "tone": "...",
+      "approach": "..."
+    }}
+  ]
+}}
+```
+"""
+
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+        
+        response = self.router.invoke(
+            "generator", messages, complexity, self.temperature, json_mode=True
+        )
+        
+        payload = extract_json(response.content)
+        raw_analysis = payload.get('analysis') if isinstance(payload, dict) else None
+        structured, _ = validate_item(raw_analysis or {}, BriefingAnalysisSchema)
+        structured = structured or {}
+        options = self._parse_options(response.content, briefing_data, complexity)
+        
+        analysis = {
+            "analysis": self._format_analysis(structured),
+            "structured": structured,
+            "is_clear": not structured.get('gaps'),
+            "missing_info": structured.get('gaps', []),
+            "keywords": structured.get('key_concepts', [])[:10],
+            "complexity": complexity
+        }
+        
+        return {
+            "analysis": analysis,
+            "options": options or self._generate_fallback_options(briefing_data)
+        }
+    
+    def _format_analysis(self, structured: Dict) -> str:
+        """Converte análise estruturada em texto (mesmo uso do Analyzer)"""
+        labels = {
+            'objective': 'Objetivo',
+            'audience': 'Público-alvo',
+            'depth': 'Profundidade',
+            'key_concepts': 'Conceitos principais',
+            'gaps': 'Lacunas',
+            'suggestions': 'Sugestões'
+        }
+        lines = []
+        for key, label in labels.items():
+            value = structured.get(key)
+            if not value:
+                continue
+            if isinstance(value, list):
+                value = "; ".join(str(item) for item in value)
+            lines.append(f"{label}: {value}")
+        return "\n".join(lines)
     
     def _generate_fallback_options(self, briefing_data: Dict) -> List[Dict]:
         """Gera opções fallback se parsing falhar"""
@@ -212,30 +414,31 @@ class ContentFilterAgent:
     - Verificar alinhamento com briefing
     """
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",  # Mais rápido para validação
-            temperature=0.1,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+    def __init__(self, router: Optional[ModelRouter] = None):
+        self.router = router or ModelRouter()  # Modelo pequeno em todos os níveis
+        self.temperature = TEMPERATURES["filter"]
+        # Opções descartadas na última chamada: [{title, reasons}]
+        self.last_rejections: List[Dict] = []
     
     def filter_options(self, options: List[Dict], briefing_data: Dict) -> List[Dict]:
-        """Filtra opções aplicando critérios de qualidade"""
-        
-        filtered = []
+        """Filtra opções aplicando critérios de qualidade (motivos em last_rejections)"""
+        self.last_rejections = []
         
+        # 1. Filtro de segurança / 2. Validação de completude
+        candidates = []
         for option in options:
-            # 1. Filtro de segurança
-            if not self._safety_check(option):
-                continue
-            
-            # 2. Validação de completude
-            if not self._completeness_check(option):
-                continue
-            
+            reasons = self._rejection_reasons(option)
+            if reasons:
+                self._reject(option, reasons)
+            else:
+                candidates.append(option)
+        
+        filtered = []
+        for option in candidates:
             # 3. Alinhamento com briefing
             alignment_score = self._check_alignment(option, briefing_data)
             if alignment_score < 0.5:
+                self._reject(option, self._alignment_reasons(option, briefing_data, alignment_score))
                 continue
             
             # Adicionar metadata
@@ -246,16 +449,44 @@ class ContentFilterAgent:
         
         return filtered
     
+    def _reject(self, option: Dict, reasons: List[str]):
+        self.last_rejections.append({"title": option.get('title') or "(sem título)", "reasons": reasons})
+    
+    def _rejection_reasons(self, option: Dict) -> List[str]:
+        """Motivos de descarte por segurança/completude (vazio = passou)"""
+        reasons = []
+        if not self._safety_check(option):
+            text = f"{option.get('title', '')} {option.get('summary', '')}"
+            terms = ", ".join(SAFETY_MATCHER.matched_keywords(text))
+            reasons.append(f"conteúdo inadequado para formação docente ({terms})")
+        if not self._completeness_check(option):
+            missing = [field for field in ('title', 'summary', 'script_outline', 'key_points') if not option.get(field)]
+            reasons.append(f"campos obrigatórios vazios: {', '.join(missing)}")
+        return reasons
+    
+    def _alignment_reasons(
+        self,
+        option: Dict,
+        briefing_data: Dict,
+        alignment_score: float
+    ) -> List[str]:
+        """Motivos de alinhamento baixo com o briefing"""
+        reasons = [f"alinhamento {alignment_score:.2f} abaixo de 0.50"]
+        target_duration = briefing_data.get('duration_minutes', 5) * 60
+        if abs(target_duration - option.get('estimated_duration', 300)) >= 120:
+            reasons.append(
+                f"duração de {option.get('estimated_duration', 300) / 60:.0f} min longe da alvo "
+                f"({briefing_data.get('duration_minutes', 5)} min)"
+            )
+        if briefing_data.get('tone') and briefing_data['tone'] != option.get('tone'):
+            reasons.append(f"tom '{option.get('tone')}' diferente do pedido ('{briefing_data['tone']}')")
+        return reasons
+    
     def _safety_check(self, option: Dict) -> bool:
         """Verifica segurança do conteúdo"""
-        blocked_keywords = [
-            'político-partidário', 'discriminação', 'violência',
-            'conteúdo inadequado', 'ofensivo'
-        ]
-        
-        text = f"{option.get('title', '')} {option.get('summary', '')}".lower()
+        text = f"{option.get('title', '')} {option.get('summary', '')}"
         
-        return not any(keyword in text for keyword in blocked_keywords)
+        return not SAFETY_MATCHER.contains_any(text)
     
     def _completeness_check(self, option: Dict) -> bool:
         """Verifica se opção está completa"""
@@ -294,19 +525,24 @@ class ContentRankerAgent:
     - Fornecer justificativas
     """
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=0.2,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+    def __init__(self, router: Optional[ModelRouter] = None):
+        self.router = router or ModelRouter()
+        self.temperature = TEMPERATURES["ranker"]
+        # legacy: sobreposição de palavras com o objetivo; bm25/tfidf: similaridade 0-1
+        self.relevance_mode = BRIEFING_WORKFLOW_CONFIG.get("relevance_mode", "legacy")
     
     def rank_options(self, options: List[Dict], briefing_data: Dict) -> List[Dict]:
         """Ranqueia opções por relevância e qualidade"""
         
-        for option in options:
+        # BM25/TF-IDF dependem do lote inteiro (IDF, tamanho médio): calculados uma vez
+        goal = briefing_data.get('training_goal')
+        similarities = [None] * len(options)
+        if goal and self.relevance_mode != "legacy":
+            similarities = BatchScorer(options).goal_similarity(goal, self.relevance_mode).tolist()
+        
+        for option, similarity in zip(options, similarities):
             # Calcular scores
-            option['relevance_score'] = self._calculate_relevance(option, briefing_data)
+            option['relevance_score'] = self._calculate_relevance(option, briefing_data, similarity)
             option['quality_score'] = self._calculate_quality(option)
             option['overall_score'] = (
                 option['relevance_score'] * 0.6 + 
@@ -321,16 +557,19 @@ class ContentRankerAgent:
         
         return ranked
     
-    def _calculate_relevance(self, option: Dict, briefing_data: Dict) -> float:
-        """Calcula relevância (0-1)"""
+    def _calculate_relevance(self, option: Dict, briefing_data: Dict, goal_similarity: Optional[float] = None) -> float:
+        """Calcula relevância (0-1); goal_similarity (0-1) vem do BatchScorer nos modos bm25/tfidf"""
         score = 0.5
         
         # Alinhamento com objetivo
         if briefing_data.get('training_goal'):
-            goal_words = set(briefing_data['training_goal'].lower().split())
-            summary_words = set(option.get('summary', '').lower().split())
-            overlap = len(goal_words & summary_words)
-            score += min(overlap * 0.1, 0.3)
+            if goal_similarity is not None:
+                score += 0.3 * goal_similarity
+            else:
+                goal_words = set(briefing_data['training_goal'].lower().split())
+                summary_words = set(option.get('summary', '').lower().split())
+                overlap = len(goal_words & summary_words)
+                score += min(overlap * 0.1, 0.3)
         
         # Alinhamento com tom
         if briefing_data.get('tone') == option.get('tone'):
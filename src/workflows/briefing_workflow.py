@@ -1,9 +1,14 @@
 """
 Workflow LangGraph para análise de briefing (multi-agente)
 
-Fluxo: Analyzer → Generator → Filter → Ranker
+Fluxo (standard): Analyzer → Generator → Filter → [Reposição] → Ranker
+Fluxo (fast):     Analyzer+Generator (1 chamada) → Filter → [Reposição] → Ranker
+
+Reposição: se o filtro descarta opções, pede ao gerador só as que faltam
+para num_options (com os motivos do descarte), mantendo as já aceitas,
+até max_rounds rodadas, dentro do prazo e do orçamento de tokens.
 """
-from typing import Dict
+from typing import Dict, Literal, Optional
 from datetime import datetime
 from langgraph.graph import StateGraph, END
 from src.workflows.states import BriefingAnalysisState
@@ -13,37 +18,82 @@ from src.workflows.briefing_agents import (
     ContentFilterAgent,
     ContentRankerAgent
 )
+from src.workflows.model_router import ModelRouter
+from src.ml.usage_tracker import usage_context
+from src.workflows.instrumentation import instrument_node, workflow_timings, summarize_timings
+from src.workflows.registry import compiled_graph, run_config, run_method
+from src.config.workflows import BRIEFING_WORKFLOW_CONFIG
+
+PIPELINE_PROFILES = ("standard", "fast")
+NUM_OPTIONS = BRIEFING_WORKFLOW_CONFIG["num_options"]
+REGENERATION = BRIEFING_WORKFLOW_CONFIG["regeneration"]
 
 class BriefingAnalysisWorkflow:
     """
     Workflow completo de análise de briefing usando múltiplos agentes
+    
+    Perfis (BRIEFING_WORKFLOW_CONFIG["pipeline_profile"]):
+    - standard: análise e geração em chamadas separadas
+    - fast: análise e opções em uma única resposta estruturada
     """
     
-    def __init__(self):
-        self.analyzer = BriefingAnalyzerAgent()
-        self.generator = ContentGeneratorAgent()
-        self.filter = ContentFilterAgent()
-        self.ranker = ContentRankerAgent()
-        
-        # Criar grafo
-        self.graph = self._build_graph()
+    def __init__(self, profile: Optional[str] = None):
+        self.profile = profile or BRIEFING_WORKFLOW_CONFIG.get("pipeline_profile", "standard")
+        if self.profile not in PIPELINE_PROFILES:
+            raise ValueError(
+                f"Perfil '{self.profile}' não suportado. Use um de: {', '.join(PIPELINE_PROFILES)}"
+            )
+        
+        # Roteador compartilhado: escolhe modelo por agente/complexidade
+        self.router = ModelRouter()
+        
+        self.analyzer = BriefingAnalyzerAgent(self.router)
+        self.generator = ContentGeneratorAgent(self.router)
+        self.filter = ContentFilterAgent(self.router)
+        self.ranker = ContentRankerAgent(self.router)
+        
+        # Grafo compilado uma vez por processo e perfil (src/workflows/registry.py);
+        # os agentes desta instância chegam aos nós pelo config da execução
+        self.graph = compiled_graph(
+            ("briefing_analysis", self.profile),
+            lambda: self._build_graph(self.profile)
+        )
     
-    def _build_graph(self) -> StateGraph:
-        """Constrói o grafo de estados"""
+    @staticmethod
+    def _build_graph(profile: str) -> StateGraph:
+        """Constrói o grafo de estados (sem dependências da execução)"""
         
         workflow = StateGraph(BriefingAnalysisState)
         
         # Adicionar nós (agentes)
-        workflow.add_node("analyze", self._analyze_node)
-        workflow.add_node("generate", self._generate_node)
-        workflow.add_node("filter", self._filter_node)
-        workflow.add_node("rank", self._rank_node)
+        if profile == "fast":
+            workflow.add_node("analyze_generate", instrument_node("analyze_generate", run_method("_analyze_generate_node")))
+        else:
+            workflow.add_node("analyze", instrument_node("analyze", run_method("_analyze_node")))
+            workflow.add_node("generate", instrument_node("generate", run_method("_generate_node")))
+        workflow.add_node("filter", instrument_node("filter", run_method("_filter_node")))
+        workflow.add_node("regenerate", instrument_node("regenerate", run_method("_regenerate_node")))
+        workflow.add_node("rank", instrument_node("rank", run_method("_rank_node")))
         
         # Definir fluxo
-        workflow.set_entry_point("analyze")
-        workflow.add_edge("analyze", "generate")
-        workflow.add_edge("generate", "filter")
-        workflow.add_edge("filter", "rank")
+        if profile == "fast":
+            workflow.set_entry_point("analyze_generate")
+            workflow.add_edge("analyze_generate", "filter")
+        else:
+            workflow.set_entry_point("analyze")
+            workflow.add_edge("analyze", "generate")
+            workflow.add_edge("generate", "filter")
+        
+        # Reposição das opções descartadas (repete enquanto faltar e houver prazo/orçamento)
+        for node in ("filter", "regenerate"):
+            workflow.add_conditional_edges(
+                node,
+                run_method("_needs_replacements"),
+                {
+                    "regenerate": "regenerate",
+                    "rank": "rank"
+                }
+            )
         workflow.add_edge("rank", END)
         
         return workflow.compile()
@@ -53,7 +103,7 @@ class BriefingAnalysisWorkflow:
         print(f"🔍 Analisando briefing {state['briefing_id']}...")
         
         try:
-            analysis = self.analyzer.analyze(state['briefing_data'])
+            analysis = self.analyzer.analyze(state['briefing_data'], state['complexity'])
             state['analysis_result'] = analysis
             state['current_step'] = 'analyzed'
         except Exception as e:
@@ -79,6 +129,25 @@ class BriefingAnalysisWorkflow:
         
         return state
     
+    def _analyze_generate_node(self, state: BriefingAnalysisState) -> BriefingAnalysisState:
+        """Nó 1+2 (perfil fast): análise e geração em uma única chamada"""
+        print(f"⚡ Analisando briefing {state['briefing_id']} e gerando opções (chamada única)...")
+        
+        try:
+            result = self.generator.analyze_and_generate(
+                state['briefing_data'],
+                state['complexity']
+            )
+            state['analysis_result'] = result['analysis']
+            state['generated_options'] = result['options']
+            state['current_step'] = 'generated'
+            print(f"   → {len(result['options'])} opções geradas")
+        except Exception as e:
+            state['errors'].append(f"Erro na análise/geração: {str(e)}")
+            state['generated_options'] = []
+        
+        return state
+    
     def _filter_node(self, state: BriefingAnalysisState) -> BriefingAnalysisState:
         """Nó 3: Filtragem de opções"""
         print(f"🔍 Filtrando opções...")
@@ -89,14 +158,91 @@ class BriefingAnalysisWorkflow:
                 state['briefing_data']
             )
             state['filtered_options'] = filtered
+            state['rejected_options'] = list(self.filter.last_rejections)
             state['current_step'] = 'filtered'
             print(f"   → {len(filtered)} opções aprovadas nos filtros")
+            for rejection in state['rejected_options']:
+                print(f"   ✗ {rejection['title']}: {'; '.join(rejection['reasons'])}")
         except Exception as e:
             state['errors'].append(f"Erro na filtragem: {str(e)}")
             state['filtered_options'] = state['generated_options']
         
         return state
     
+    def _regenerate_node(self, state: BriefingAnalysisState) -> BriefingAnalysisState:
+        """Nó 3b: Reposição só das opções que faltam (opções aceitas são mantidas)"""
+        stats = state['regeneration']
+        missing = NUM_OPTIONS - len(state['filtered_options'])
+        
+        elapsed = (datetime.utcnow() - state['started_at']).total_seconds()
+        if elapsed >= REGENERATION["deadline_seconds"]:
+            stats['stopped'] = 'deadline'
+            print(f"   ⏱️ Reposição cancelada: prazo de {REGENERATION['deadline_seconds']:.0f}s esgotado")
+            return state
+        
+        estimate = self._estimate_round_tokens(stats, missing)
+        if stats['tokens'] + estimate > REGENERATION["token_budget"]:
+            stats['stopped'] = 'token_budget'
+            print(
+                f"   💰 Reposição cancelada: orçamento de tokens "
+                f"({stats['tokens']} usados + ~{estimate} > {REGENERATION['token_budget']})"
+            )
+            return state
+        
+        print(f"♻️  Repondo {missing} opção(ões) faltante(s) (rodada {stats['rounds'] + 1}/{REGENERATION['max_rounds']})...")
+        
+        usage_before = self.router.usage_summary()
+        try:
+            replacements = self.generator.generate_replacements(
+                state['briefing_data'],
+                state['analysis_result'],
+                missing,
+                accepted=state['filtered_options'],
+                rejections=state['rejected_options'],
+                complexity=state['complexity']
+            )
+            accepted = self.filter.filter_options(replacements, state['briefing_data'])
+            
+            state['generated_options'] = state['generated_options'] + replacements
+            state['filtered_options'] = state['filtered_options'] + accepted
+            state['rejected_options'] = state['rejected_options'] + self.filter.last_rejections
+            stats['accepted'] += len(accepted)
+            print(f"   → {len(accepted)}/{missing} reposições aprovadas nos filtros")
+        except Exception as e:
+            state['errors'].append(f"Erro na reposição de opções: {str(e)}")
+            stats['stopped'] = 'error'
+        
+        usage_after = self.router.usage_summary()
+        stats['rounds'] += 1
+        stats['requested'] += missing
+        stats['tokens'] += (
+            usage_after['input_tokens'] + usage_after['output_tokens']
+            - usage_before['input_tokens'] - usage_before['output_tokens']
+        )
+        
+        return state
+    
+    def _estimate_round_tokens(self, stats: Dict, missing: int) -> int:
+        """Custo estimado de uma rodada: média das rodadas anteriores ou geração inicial proporcional"""
+        if stats['rounds']:
+            return stats['tokens'] // stats['rounds']
+        generation = next((d for d in self.router.decisions if d['agent'] == 'generator'), None)
+        if not generation:
+            return 0
+        return generation.get('input_tokens', 0) + generation.get('output_tokens', 0) * missing // NUM_OPTIONS
+    
+    def _needs_replacements(self, state: BriefingAnalysisState) -> Literal["regenerate", "rank"]:
+        """Decide se pede reposição das opções descartadas"""
+        stats = state['regeneration']
+        missing = NUM_OPTIONS - len(state['filtered_options'])
+        
+        if missing <= 0 or not REGENERATION["enabled"] or not state['generated_options']:
+            return "rank"
+        if stats['stopped'] or stats['rounds'] >= REGENERATION["max_rounds"]:
+            print(f"   ⚠️ Seguindo com {len(state['filtered_options'])}/{NUM_OPTIONS} opções")
+            return "rank"
+        return "regenerate"
+    
     def _rank_node(self, state: BriefingAnalysisState) -> BriefingAnalysisState:
         """Nó 4: Ranqueamento de opções"""
         print(f"📊 Ranqueando opções...")
@@ -129,13 +275,19 @@ class BriefingAnalysisWorkflow:
             Opções ranqueadas e metadata
         """
         
+        self.router.reset()
+        self.generator.last_parse_report = {}
+        
         # Estado inicial
         initial_state: BriefingAnalysisState = {
             "briefing_id": briefing_id,
             "briefing_data": briefing_data,
+            "complexity": ModelRouter.assess_complexity(briefing_data),
             "analysis_result": None,
             "generated_options": [],
             "filtered_options": [],
+            "rejected_options": [],
+            "regeneration": {"rounds": 0, "requested": 0, "accepted": 0, "tokens": 0, "stopped": None},
             "ranked_options": [],
             "current_step": "initializing",
             "errors": [],
@@ -144,14 +296,17 @@ class BriefingAnalysisWorkflow:
         }
         
         # Executar workflow
-        print(f"\n🚀 Iniciando workflow de análise de briefing #{briefing_id}")
+        print(f"\n🚀 Iniciando workflow de análise de briefing #{briefing_id} (perfil: {self.profile})")
         print("=" * 60)
         
-        final_state = self.graph.invoke(initial_state)
+        with usage_context(workflow="briefing_analysis", briefing_id=briefing_id), \
+                workflow_timings("briefing_analysis") as timings:
+            final_state = self.graph.invoke(initial_state, run_config(self))
         
         print("=" * 60)
         print(f"✅ Workflow concluído!")
         print(f"   Status: {final_state['current_step']}")
+        print(f"   Complexidade: {final_state['complexity']}")
         print(f"   Opções geradas: {len(final_state['generated_options'])}")
         print(f"   Opções filtradas: {len(final_state['filtered_options'])}")
         print(f"   Opções finais: {len(final_state['ranked_options'])}")
@@ -165,10 +320,18 @@ class BriefingAnalysisWorkflow:
             "metadata": {
                 "briefing_id": briefing_id,
                 "analysis": final_state['analysis_result'],
+                "complexity": final_state['complexity'],
+                "profile": self.profile,
+                "routing": list(self.router.decisions),
+                "llm_usage": self.router.usage_summary(),
+                "structured_output": dict(self.generator.last_parse_report),
                 "generated_count": len(final_state['generated_options']),
                 "filtered_count": len(final_state['filtered_options']),
+                "rejected_options": final_state['rejected_options'],
+                "regeneration": final_state['regeneration'],
                 "final_count": len(final_state['ranked_options']),
                 "errors": final_state['errors'],
+                "node_timings": summarize_timings(timings),
                 "completed_at": datetime.utcnow().isoformat()
             }
         }
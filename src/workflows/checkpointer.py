@@ -0,0 +1,756 @@
+"""
+Checkpointer persistente (SQLite) para os workflows LangGraph
+
+Substitui o MemorySaver: o estado de uma thread sobrevive ao fim do processo,
+e outro worker pode retomar a thread (ex.: aprovação humana do vídeo roda só
+o nó finalize, sem refazer o pipeline).
+
+- Um arquivo SQLite por workflow, no diretório do workflow em CHECKPOINT_BASE_DIR
+- Valores serializados em msgpack (serializer padrão do LangGraph) e
+  comprimidos com zlib acima de COMPRESS_MIN_BYTES
+- Canais gravados só quando mudam de versão (mesmo esquema do MemorySaver)
+- Strings grandes (roteiros, esboço, briefing) em qualquer canal, escrita ou
+  metadata ficam na tabela content, endereçadas por SHA-256 e referenciadas
+  por {"__blob__": hash}: gravadas uma vez por conteúdo, não a cada passo/thread
+- Checkpoints delta: só as versões de canal (channel_versions/versions_seen)
+  que mudaram em relação ao pai, com um checkpoint completo a cada
+  snapshot_every; a leitura reconstrói a partir do último completo
+- prune() remove threads antigas e checkpoints intermediários; replay()
+  reconstrói o estado passo a passo (scripts/replay_checkpoints.py)
+"""
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from src.config.workflows import CHECKPOINT_CONFIG
+
+# Valores menores que isso não compensam o zlib
+COMPRESS_MIN_BYTES = 256
+ZLIB_SUFFIX = "+zlib"
+
+# Referência a conteúdo externo e marcação de checkpoint delta
+BLOB_REF_KEY = "__blob__"
+DELTA_PARENT_KEY = "__delta_of__"
+DELTA_DEPTH_KEY = "__delta_depth__"
+_VERSION_KEYS = ("channel_versions", "versions_seen")
+
+# Entradas em memória: conteúdo externo decodificado e checkpoints reconstruídos
+CACHE_SIZE = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS content (
+    hash TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS content_refs (
+    thread_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (thread_id, hash)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints (created_at);
+CREATE INDEX IF NOT EXISTS idx_content_refs_hash ON content_refs (hash);
+"""
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    Checkpointer LangGraph em SQLite com valores msgpack + zlib
+
+    Uso:
+        saver = SQLiteCheckpointer(VIDEO_WORKFLOW_CONFIG["checkpoint_dir"] / "checkpoints.sqlite")
+        graph = workflow.compile(checkpointer=saver)
+        saver.prune(max_age_days=7)
+    """
+
+    def __init__(
+        self,
+        path,
+        blob_min_bytes: Optional[int] = None,
+        snapshot_every: Optional[int] = None,
+        **kwargs
+    ):
+        """
+        Args:
+            path: Arquivo SQLite (ou ":memory:")
+            blob_min_bytes: Strings/bytes a partir disso vão para a tabela content
+                (0 desliga; padrão CHECKPOINT_CONFIG)
+            snapshot_every: Checkpoint completo a cada N (1 desliga os deltas)
+        """
+        super().__init__(**kwargs)
+        self.blob_min_bytes = CHECKPOINT_CONFIG["blob_min_bytes"] if blob_min_bytes is None else blob_min_bytes
+        self.snapshot_every = max(1, CHECKPOINT_CONFIG["snapshot_every"] if snapshot_every is None else snapshot_every)
+        self._content_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._checkpoint_cache: "OrderedDict[Tuple[str, str, str], Tuple[Dict, int]]" = OrderedDict()
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    # ---------------------------------------------------------------
+    # Serialização
+    # ---------------------------------------------------------------
+
+    def _dumps(self, value: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < len(data):
+                return type_ + ZLIB_SUFFIX, compressed
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(ZLIB_SUFFIX):
+            type_, data = type_[:-len(ZLIB_SUFFIX)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _pack(self, value: Any, content: Dict[str, Tuple[str, bytes]]) -> Tuple[str, bytes]:
+        """_dumps com strings grandes trocadas por referências (acumuladas em content)"""
+        return self._dumps(self._externalize(value, content))
+
+    def _unpack(self, type_: str, data: bytes) -> Any:
+        return self._internalize(self._loads(type_, data))
+
+    def _externalize(self, value: Any, content: Dict[str, Tuple[str, bytes]]) -> Any:
+        if isinstance(value, (str, bytes)):
+            if not self.blob_min_bytes or len(value) < self.blob_min_bytes:
+                return value
+            raw = value.encode("utf-8") if isinstance(value, str) else value
+            digest = hashlib.sha256(type(value).__name__.encode() + b":" + raw).hexdigest()
+            if digest not in content:
+                content[digest] = self._dumps(value)
+            return {BLOB_REF_KEY: digest}
+        if isinstance(value, dict):
+            items = {key: self._externalize(item, content) for key, item in value.items()}
+            return value if all(items[key] is item for key, item in value.items()) else items
+        if isinstance(value, (list, tuple)):
+            items = [self._externalize(item, content) for item in value]
+            if all(new is old for new, old in zip(items, value)):
+                return value
+            return items if isinstance(value, list) else tuple(items)
+        return value
+
+    def _internalize(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and BLOB_REF_KEY in value:
+                return self._load_content(value[BLOB_REF_KEY])
+            items = {key: self._internalize(item) for key, item in value.items()}
+            return value if all(items[key] is item for key, item in value.items()) else items
+        if isinstance(value, (list, tuple)):
+            items = [self._internalize(item) for item in value]
+            if all(new is old for new, old in zip(items, value)):
+                return value
+            return items if isinstance(value, list) else tuple(items)
+        return value
+
+    def _load_content(self, digest: str) -> Any:
+        """Conteúdo externo por hash (imutável: cache LRU em memória)"""
+        if digest in self._content_cache:
+            self._content_cache.move_to_end(digest)
+            return self._content_cache[digest]
+        row = self.conn.execute("SELECT type, data FROM content WHERE hash=?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"Conteúdo {digest} ausente no checkpointer")
+        value = self._loads(row[0], row[1])
+        self._content_cache[digest] = value
+        if len(self._content_cache) > CACHE_SIZE:
+            self._content_cache.popitem(last=False)
+        return value
+
+    def _store_content(self, thread_id: str, content: Dict[str, Tuple[str, bytes]]) -> None:
+        """Grava conteúdo externo novo e as referências da thread (dentro da transação)"""
+        if not content:
+            return
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO content VALUES (?, ?, ?)",
+            [(digest, type_, data) for digest, (type_, data) in content.items()]
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO content_refs VALUES (?, ?)", [(thread_id, digest) for digest in content]
+        )
+
+    def _drop_threads(self, thread_ids: Sequence[str]) -> None:
+        """Remove threads e o conteúdo externo que nenhuma outra thread referencia (dentro da transação)"""
+        for thread_id in thread_ids:
+            digests = [row[0] for row in self.conn.execute(
+                "SELECT hash FROM content_refs WHERE thread_id=?", (thread_id,)
+            )]
+            for table in ("checkpoints", "blobs", "writes", "content_refs"):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id=?", (thread_id,))
+            self.conn.executemany(
+                "DELETE FROM content WHERE hash=? AND NOT EXISTS (SELECT 1 FROM content_refs WHERE hash=?)",
+                [(digest, digest) for digest in digests]
+            )
+        for key in [key for key in self._checkpoint_cache if key[0] in thread_ids]:
+            del self._checkpoint_cache[key]
+
+    # ---------------------------------------------------------------
+    # Checkpoints delta
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def _copy_versions(checkpoint: Dict) -> Dict:
+        return {
+            **checkpoint,
+            "channel_versions": dict(checkpoint["channel_versions"]),
+            "versions_seen": {node: dict(seen) for node, seen in checkpoint["versions_seen"].items()},
+        }
+
+    @staticmethod
+    def _delta(checkpoint: Dict, parent: Dict) -> Optional[Dict]:
+        """Só as versões que mudaram em relação ao pai (None se alguma chave sumiu)"""
+        if set(parent["channel_versions"]) - set(checkpoint["channel_versions"]):
+            return None
+        if set(parent["versions_seen"]) - set(checkpoint["versions_seen"]):
+            return None
+
+        versions_seen = {}
+        for node, seen in checkpoint["versions_seen"].items():
+            parent_seen = parent["versions_seen"].get(node, {})
+            if set(parent_seen) - set(seen):
+                return None
+            changed = {channel: version for channel, version in seen.items() if parent_seen.get(channel) != version}
+            if changed:
+                versions_seen[node] = changed
+
+        return {
+            **{key: value for key, value in checkpoint.items() if key not in _VERSION_KEYS},
+            "channel_versions": {
+                channel: version for channel, version in checkpoint["channel_versions"].items()
+                if parent["channel_versions"].get(channel) != version
+            },
+            "versions_seen": versions_seen,
+            DELTA_PARENT_KEY: parent["id"],
+        }
+
+    @staticmethod
+    def _apply_delta(parent: Dict, delta: Dict) -> Dict:
+        checkpoint = {
+            key: value for key, value in delta.items()
+            if key not in _VERSION_KEYS and key not in (DELTA_PARENT_KEY, DELTA_DEPTH_KEY)
+        }
+        checkpoint["channel_versions"] = {**parent["channel_versions"], **delta["channel_versions"]}
+        checkpoint["versions_seen"] = {
+            node: {**parent["versions_seen"].get(node, {}), **delta["versions_seen"].get(node, {})}
+            for node in {**parent["versions_seen"], **delta["versions_seen"]}
+        }
+        return checkpoint
+
+    def _cache_checkpoint(self, key: Tuple[str, str, str], checkpoint: Dict, depth: int) -> None:
+        self._checkpoint_cache[key] = (checkpoint, depth)
+        self._checkpoint_cache.move_to_end(key)
+        if len(self._checkpoint_cache) > CACHE_SIZE:
+            self._checkpoint_cache.popitem(last=False)
+
+    def _resolve(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str,
+                 stored: Optional[Dict] = None) -> Tuple[Dict, int]:
+        """
+        Checkpoint completo (sem channel_values) e sua profundidade na cadeia de deltas
+
+        Segue DELTA_PARENT_KEY até um checkpoint completo (ou em cache) e
+        aplica os deltas em ordem.
+        """
+        chain: List[Dict] = []
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        while key not in self._checkpoint_cache:
+            if stored is None:
+                row = self.conn.execute(
+                    "SELECT type, checkpoint FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                    key
+                ).fetchone()
+                if row is None:
+                    raise KeyError(f"Checkpoint base {key[2]} ausente na thread {thread_id}")
+                stored = self._loads(row[0], row[1])
+            if DELTA_PARENT_KEY not in stored:
+                self._cache_checkpoint(key, stored, 0)
+                break
+            chain.append(stored)
+            key, stored = (thread_id, checkpoint_ns, stored[DELTA_PARENT_KEY]), None
+
+        checkpoint, depth = self._checkpoint_cache[key]
+        for delta in reversed(chain):
+            checkpoint, depth = self._apply_delta(checkpoint, delta), depth + 1
+            self._cache_checkpoint((thread_id, checkpoint_ns, checkpoint["id"]), checkpoint, depth)
+        return self._copy_versions(checkpoint), depth
+
+    # ---------------------------------------------------------------
+    # Leitura
+    # ---------------------------------------------------------------
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        channel_values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = self.conn.execute(
+                "SELECT type, data FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?",
+                (thread_id, checkpoint_ns, channel, str(version))
+            ).fetchone()
+            if row and row[0] != "empty":
+                channel_values[channel] = self._unpack(row[0], row[1])
+        return channel_values
+
+    def _to_tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple) -> CheckpointTuple:
+        checkpoint_id, parent_checkpoint_id, type_, checkpoint_b, metadata_type, metadata_b = row
+        checkpoint, _ = self._resolve(thread_id, checkpoint_ns, checkpoint_id, self._loads(type_, checkpoint_b))
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, data FROM writes "
+            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self._unpack(metadata_type, metadata_b),
+            pending_writes=[
+                (task_id, channel, self._unpack(w_type, data)) for task_id, channel, w_type, data in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Checkpoint pedido em config (ou o mais recente da thread)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns)
+                ).fetchone()
+            if row is None:
+                return None
+            return self._to_tuple(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints do mais recente para o mais antigo"""
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        conditions, params = [], []
+        if config:
+            conditions.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                conditions.append("checkpoint_ns=?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id=?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id<?")
+            params.append(before_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+            results = []
+            for thread_id, checkpoint_ns, *row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self._unpack(row[4], row[5])
+                    if not all(metadata.get(key) == value for key, value in filter.items()):
+                        continue
+                results.append(self._to_tuple(thread_id, checkpoint_ns, tuple(row)))
+        yield from results
+
+    # ---------------------------------------------------------------
+    # Escrita
+    # ---------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Salva o checkpoint (delta do pai) e só os canais que mudaram de versão"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        checkpoint = self._copy_versions(checkpoint)
+        values: Dict[str, Any] = checkpoint.pop("channel_values")
+
+        content: Dict[str, Tuple[str, bytes]] = {}
+        blobs = []
+        for channel, version in new_versions.items():
+            type_, data = self._pack(values[channel], content) if channel in values else ("empty", None)
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), type_, data))
+
+        metadata_type, metadata_b = self._pack(get_checkpoint_metadata(config, metadata), content)
+
+        with self._lock, self.conn:
+            stored, depth = checkpoint, 0
+            if parent_id and self.snapshot_every > 1:
+                try:
+                    parent, parent_depth = self._resolve(thread_id, checkpoint_ns, parent_id)
+                except KeyError:
+                    parent = None
+                delta = self._delta(checkpoint, parent) if parent else None
+                if delta is not None and parent_depth + 1 < self.snapshot_every:
+                    stored, depth = {**delta, DELTA_DEPTH_KEY: parent_depth + 1}, parent_depth + 1
+            type_, checkpoint_b = self._dumps(stored)
+
+            self.conn.execute("BEGIN")
+            self._store_content(thread_id, content)
+            self.conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], parent_id,
+                    type_, checkpoint_b, metadata_type, metadata_b, time.time()
+                )
+            )
+            self._cache_checkpoint((thread_id, checkpoint_ns, checkpoint["id"]), checkpoint, depth)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Salva escritas pendentes de um nó (usadas na retomada)"""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # Escritas especiais (erro, interrupção...) substituem; as demais não são regravadas
+        verb = "INSERT OR REPLACE" if all(channel in WRITES_IDX_MAP for channel, _ in writes) else "INSERT OR IGNORE"
+        content: Dict[str, Tuple[str, bytes]] = {}
+        rows = [
+            (
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                WRITES_IDX_MAP.get(channel, idx), channel, *self._pack(value, content), task_path
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN")
+            self._store_content(thread_id, content)
+            self.conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Remove checkpoints, canais, escritas e conteúdo externo exclusivo de uma thread"""
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN")
+            self._drop_threads([thread_id])
+
+    def _latest_value(self, thread_id: str, channel: str, checkpoint_ns: str = "") -> Any:
+        """Valor de um canal no checkpoint mais recente da thread (None se ausente)"""
+        row = self.conn.execute(
+            "SELECT checkpoint_id, type, checkpoint FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? "
+            "ORDER BY checkpoint_id DESC LIMIT 1",
+            (thread_id, checkpoint_ns)
+        ).fetchone()
+        if row is None:
+            return None
+        checkpoint, _ = self._resolve(thread_id, checkpoint_ns, row[0], self._loads(row[1], row[2]))
+        version = checkpoint["channel_versions"].get(channel)
+        if version is None:
+            return None
+        return self._load_blobs(thread_id, checkpoint_ns, {channel: version}).get(channel)
+
+    def prune(self, max_age_days: Optional[float] = None, keep_last: Optional[int] = None) -> Dict[str, int]:
+        """
+        Limpeza do arquivo de checkpoints
+
+        Args:
+            max_age_days: Remove threads sem checkpoint novo há mais tempo que isso
+                (exceto as pausadas aguardando aprovação humana: ainda retomáveis)
+            keep_last: Mantém só os N checkpoints mais recentes de cada thread
+                (e os canais referenciados por eles); o mais antigo mantido
+                vira completo se era delta de um removido
+
+        Returns:
+            Contagem de threads e checkpoints removidos
+        """
+        stats = {"threads": 0, "checkpoints": 0}
+
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN")
+
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                stale = [
+                    row[0] for row in self.conn.execute(
+                        "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+                    )
+                    if self._latest_value(row[0], "current_step") != "awaiting_approval"
+                ]
+                self._drop_threads(stale)
+                stats["threads"] = len(stale)
+
+            if keep_last is not None:
+                old = self.conn.execute(
+                    "SELECT thread_id, checkpoint_ns, checkpoint_id FROM ("
+                    "  SELECT thread_id, checkpoint_ns, checkpoint_id, ROW_NUMBER() OVER ("
+                    "    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position"
+                    "  FROM checkpoints) WHERE position > ?",
+                    (keep_last,)
+                ).fetchall()
+
+                # Base da cadeia de deltas: o checkpoint mantido mais antigo de cada thread
+                oldest_kept = self.conn.execute(
+                    "SELECT thread_id, checkpoint_ns, checkpoint_id, type, checkpoint FROM ("
+                    "  SELECT *, ROW_NUMBER() OVER ("
+                    "    PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS position"
+                    "  FROM checkpoints) WHERE position = ?",
+                    (keep_last,)
+                ).fetchall() if old else []
+                for thread_id, checkpoint_ns, checkpoint_id, type_, data in oldest_kept:
+                    if DELTA_PARENT_KEY in self._loads(type_, data):
+                        full, _ = self._resolve(thread_id, checkpoint_ns, checkpoint_id)
+                        self.conn.execute(
+                            "UPDATE checkpoints SET type=?, checkpoint=? "
+                            "WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?",
+                            (*self._dumps(full), thread_id, checkpoint_ns, checkpoint_id)
+                        )
+                        self._cache_checkpoint((thread_id, checkpoint_ns, checkpoint_id), full, 0)
+
+                self.conn.executemany(
+                    "DELETE FROM checkpoints WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?", old
+                )
+                self.conn.executemany(
+                    "DELETE FROM writes WHERE thread_id=? AND checkpoint_ns=? AND checkpoint_id=?", old
+                )
+                stats["checkpoints"] = len(old)
+
+                # Versões de canal que nenhum checkpoint restante referencia
+                referenced = set()
+                for thread_id, checkpoint_ns, checkpoint_id, type_, data in self.conn.execute(
+                    "SELECT thread_id, checkpoint_ns, checkpoint_id, type, checkpoint FROM checkpoints"
+                ).fetchall():
+                    stored = self._loads(type_, data)
+                    versions = self._resolve(thread_id, checkpoint_ns, checkpoint_id, stored)[0]["channel_versions"]
+                    referenced.update(
+                        (thread_id, checkpoint_ns, channel, str(version)) for channel, version in versions.items()
+                    )
+                orphans = [
+                    row for row in self.conn.execute("SELECT thread_id, checkpoint_ns, channel, version FROM blobs")
+                    if row not in referenced
+                ]
+                self.conn.executemany(
+                    "DELETE FROM blobs WHERE thread_id=? AND checkpoint_ns=? AND channel=? AND version=?", orphans
+                )
+
+        if stats["threads"] or stats["checkpoints"]:
+            with self._lock:
+                self.conn.execute("VACUUM")
+        return stats
+
+    # ---------------------------------------------------------------
+    # Inspeção
+    # ---------------------------------------------------------------
+
+    def replay(self, thread_id: str, checkpoint_ns: str = "") -> Iterator[Dict[str, Any]]:
+        """
+        Reconstrói a thread do primeiro ao último checkpoint
+
+        Yields:
+            Dict por checkpoint com checkpoint_id, step, source, node (quem
+            gravou), changed (canais que mudaram de versão e o novo valor) e
+            values (estado completo reconstruído)
+        """
+        history = list(self.list({"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns}}))
+        previous: Dict[str, Any] = {}
+        for item in reversed(history):
+            versions = item.checkpoint["channel_versions"]
+            values = item.checkpoint["channel_values"]
+            changed = [channel for channel, version in versions.items() if previous.get(channel) != version]
+            previous = versions
+            yield {
+                "checkpoint_id": item.checkpoint["id"],
+                "step": item.metadata.get("step"),
+                "source": item.metadata.get("source"),
+                "node": ", ".join(item.metadata.get("writes") or {}) or None,
+                "changed": {channel: values.get(channel) for channel in changed},
+                "values": values,
+            }
+
+    def storage_stats(self) -> Dict[str, Dict[str, int]]:
+        """Linhas e bytes gravados por tabela"""
+        columns = {"checkpoints": "LENGTH(checkpoint) + LENGTH(metadata)", "blobs": "LENGTH(data)",
+                   "writes": "LENGTH(data)", "content": "LENGTH(data)"}
+        with self._lock:
+            return {
+                table: dict(zip(("rows", "bytes"), (value or 0 for value in self.conn.execute(
+                    f"SELECT COUNT(*), SUM({expression}) FROM {table}"
+                ).fetchone())))
+                for table, expression in columns.items()
+            }
+
+    # ---------------------------------------------------------------
+    # Versões e API async (o SQLite é local: as versões async delegam)
+    # ---------------------------------------------------------------
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
+
+
+_checkpointers: Dict[str, SQLiteCheckpointer] = {}
+_checkpointers_lock = threading.Lock()
+
+
+def get_checkpointer(checkpoint_dir: Path) -> SQLiteCheckpointer:
+    """
+    Checkpointer compartilhado no processo para um diretório de workflow
+    (ex.: VIDEO_WORKFLOW_CONFIG["checkpoint_dir"])
+
+    Na primeira abertura, remove threads mais antigas que
+    CHECKPOINT_CONFIG["retention_days"] (vídeos aguardando aprovação ficam).
+    """
+    path = str(Path(checkpoint_dir) / "checkpoints.sqlite")
+    with _checkpointers_lock:
+        if path not in _checkpointers:
+            saver = SQLiteCheckpointer(path)
+            try:
+                pruned = saver.prune(max_age_days=CHECKPOINT_CONFIG["retention_days"])
+                if pruned["threads"]:
+                    print(f"🧹 Checkpoints: {pruned['threads']} threads antigas removidas ({path})")
+            except sqlite3.Error as e:
+                print(f"⚠️ Erro ao limpar checkpoints ({path}): {e}")
+            _checkpointers[path] = saver
+        return _checkpointers[path]
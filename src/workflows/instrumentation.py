@@ -0,0 +1,243 @@
+"""
+Instrumentação por nó dos workflows LangGraph
+
+Cada execução de nó registra:
+- Tempo de parede e tempo de CPU (da thread do nó: ramos paralelos não se somam)
+- Aumento do pico de memória do processo (ru_maxrss) durante o nó
+- Chamadas LLM, requisições HTTP dos clientes LLM e tokens (usage_tracker.count_calls)
+- Resultado: ok, error (nó registrou erro no estado) ou exception
+
+Os registros alimentam histogramas por (workflow, nó, resultado) no processo,
+exportáveis em formato texto do Prometheus (render_prometheus / textfile
+collector), e o resumo por nó de cada execução vai para o metadata do
+resultado do workflow ("node_timings").
+
+Uso:
+    workflow.add_node("review", instrument_node("review", self._review_node))
+
+    with workflow_timings("video_generation") as timings:
+        final_state = self.graph.invoke(initial_state, config)
+    metadata["node_timings"] = summarize_timings(timings)
+"""
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from langchain_core.runnables import RunnableConfig
+
+from src.config.workflows import INSTRUMENTATION_CONFIG
+from src.ml.usage_tracker import usage_context, count_calls, current_tags
+
+# Workflow e registros da execução atual (workflow_timings)
+_current_run: ContextVar[Optional[Tuple[str, List[Dict]]]] = ContextVar("workflow_timings_run", default=None)
+
+METRIC_PREFIX = "ensinalab_workflow_node"
+
+# (nome, campo do registro, tipo, ajuda)
+_METRICS = (
+    ("duration_seconds", "wall_seconds", "histogram", "Tempo de parede por execução de nó"),
+    ("cpu_seconds", "cpu_seconds", "histogram", "Tempo de CPU (thread do nó) por execução"),
+    ("peak_rss_delta_bytes", "peak_rss_delta_bytes", "histogram", "Aumento do pico de memória do processo durante o nó"),
+    ("llm_calls_total", "llm_calls", "counter", "Chamadas LLM feitas pelos nós"),
+    ("http_requests_total", "http_requests", "counter", "Requisições HTTP dos clientes LLM (inclui retries)"),
+    ("llm_tokens_total", "tokens", "counter", "Tokens (prompt + completion) consumidos pelos nós"),
+)
+
+
+def _peak_rss_bytes() -> int:
+    """Pico de memória residente do processo (0 se indisponível)"""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux: KB
+
+
+class NodeMetrics:
+    """Histogramas e contadores por (workflow, nó, resultado), no processo"""
+
+    def __init__(self, buckets: Dict[str, List[float]]):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], Dict] = {}
+
+    def observe(self, record: Dict):
+        labels = (record["workflow"] or "unknown", record["node"], record["outcome"])
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {
+                    field: {"counts": [0] * (len(self.buckets[field]) + 1), "sum": 0.0}
+                    for field in self.buckets
+                }
+                series["executions"] = 0
+                series.update({field: 0 for _, field, kind, _ in _METRICS if kind == "counter"})
+
+            series["executions"] += 1
+            for field, bounds in self.buckets.items():
+                value = record[field]
+                series[field]["counts"][bisect_left(bounds, value)] += 1
+                series[field]["sum"] += value
+            for _, field, kind, _ in _METRICS:
+                if kind == "counter":
+                    series[field] += record[field]
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self) -> str:
+        """Métricas no formato texto do Prometheus (exposition format 0.0.4)"""
+        with self._lock:
+            series = {labels: _copy_series(data) for labels, data in self._series.items()}
+
+        lines = []
+        for name, field, kind, help_text in _METRICS:
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for (workflow, node, outcome), data in sorted(series.items()):
+                labels = f'workflow="{workflow}",node="{node}",outcome="{outcome}"'
+                if kind == "counter":
+                    lines.append(f"{metric}{{{labels}}} {data[field]}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets[field] + [float("inf")], data[field]["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_number(bound)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {_format_number(data[field]['sum'])}")
+                lines.append(f"{metric}_count{{{labels}}} {data['executions']}")
+        return "\n".join(lines) + "\n"
+
+
+def _copy_series(data: Dict) -> Dict:
+    return {
+        key: {"counts": list(value["counts"]), "sum": value["sum"]} if isinstance(value, dict) else value
+        for key, value in data.items()
+    }
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+NODE_METRICS = NodeMetrics(INSTRUMENTATION_CONFIG["buckets"])
+
+
+def instrument_node(node: str, fn: Callable) -> Callable:
+    """
+    Envolve um nó de workflow: marca as chamadas LLM com o nó (usage_context)
+    e mede a execução
+
+    Se `fn` recebe `config` (nós do registry), o config da execução é repassado.
+    """
+    if "config" in inspect.signature(fn).parameters:
+        call = fn
+    else:
+        call = lambda state, config: fn(state)
+
+    def wrapper(state, config: RunnableConfig = None):
+        if not INSTRUMENTATION_CONFIG["enabled"]:
+            with usage_context(node=node):
+                return call(state, config)
+
+        # Nós que retornam o estado inteiro alteram `errors` no lugar
+        errors_before = list(state.get("errors") or [])
+        outcome = "exception"
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        peak_before = _peak_rss_bytes()
+
+        try:
+            with usage_context(node=node), count_calls() as counts:
+                result = call(state, config)
+            outcome = "error" if _new_errors(result, errors_before) else "ok"
+            return result
+        finally:
+            run = _current_run.get()
+            record = {
+                "workflow": run[0] if run else current_tags().get("workflow"),
+                "node": node,
+                "outcome": outcome,
+                "wall_seconds": time.perf_counter() - wall_start,
+                "cpu_seconds": time.thread_time() - cpu_start,
+                "peak_rss_delta_bytes": max(_peak_rss_bytes() - peak_before, 0),
+                **counts,
+            }
+            NODE_METRICS.observe(record)
+            if run:
+                run[1].append(record)
+
+    wrapper.__name__ = getattr(fn, "__name__", node)
+    return wrapper
+
+
+def _new_errors(result, errors_before: List[str]) -> bool:
+    """True se o nó registrou erros (atualização parcial ou estado completo)"""
+    if not isinstance(result, dict) or not result.get("errors"):
+        return False
+    errors = result["errors"]
+    if errors[:len(errors_before)] == errors_before:
+        return len(errors) > len(errors_before)
+    return True  # Atualização parcial: só os erros novos
+
+
+@contextmanager
+def workflow_timings(workflow: str):
+    """
+    Coleta os registros dos nós executados no bloco (inclusive ramos paralelos)
+    e, ao final, atualiza o textfile do Prometheus se configurado
+    """
+    records: List[Dict] = []
+    token = _current_run.set((workflow, records))
+    try:
+        yield records
+    finally:
+        _current_run.reset(token)
+        if INSTRUMENTATION_CONFIG["textfile_dir"]:
+            write_textfile(INSTRUMENTATION_CONFIG["textfile_dir"])
+
+
+def summarize_timings(records: List[Dict]) -> Dict[str, Dict]:
+    """Resumo por nó de uma execução (para o metadata do resultado)"""
+    summary: Dict[str, Dict] = {}
+    for record in records:
+        node = summary.setdefault(record["node"], {
+            "executions": 0, "wall_ms": 0.0, "cpu_ms": 0.0, "peak_rss_delta_kb": 0,
+            "llm_calls": 0, "http_requests": 0, "tokens": 0, "outcomes": {}
+        })
+        node["executions"] += 1
+        node["wall_ms"] = round(node["wall_ms"] + record["wall_seconds"] * 1000, 1)
+        node["cpu_ms"] = round(node["cpu_ms"] + record["cpu_seconds"] * 1000, 1)
+        node["peak_rss_delta_kb"] += record["peak_rss_delta_bytes"] // 1024
+        node["llm_calls"] += record["llm_calls"]
+        node["http_requests"] += record["http_requests"]
+        node["tokens"] += record["tokens"]
+        node["outcomes"][record["outcome"]] = node["outcomes"].get(record["outcome"], 0) + 1
+    return dict(sorted(summary.items(), key=lambda item: item[1]["wall_ms"], reverse=True))
+
+
+def write_textfile(directory) -> Path:
+    """
+    Grava as métricas do processo para o textfile collector do node_exporter
+
+    Um arquivo por processo (workers Celery têm registros separados),
+    gravado de forma atômica (arquivo temporário + rename).
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"ensinalab_workflows_{os.getpid()}.prom"
+    tmp_path = path.with_suffix(".prom.tmp")
+    tmp_path.write_text(NODE_METRICS.render_prometheus())
+    os.replace(tmp_path, path)
+    return path
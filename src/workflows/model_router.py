@@ -0,0 +1,158 @@
+"""
+Roteamento de modelos para os agentes dos workflows
+
+Escolhe modelo e max_tokens por agente e por nível de complexidade
+(simples/médio/complexo), conforme MODEL_ROUTING_CONFIG.
+Cada chamada registra a decisão tomada e a latência observada, e é
+contabilizada em llm_usage (ver src/ml/usage_tracker.py).
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+from langchain_core.language_models.chat_models import BaseChatModel
+from src.config.settings import settings
+from src.ml.llm_factory import create_chat_model
+from src.config.workflows import MODEL_ROUTING_CONFIG
+from src.ml.usage_tracker import build_http_client, track_llm_call
+
+# Modelos usados antes do roteamento (mantidos quando o roteamento está desabilitado)
+LEGACY_MODELS = {
+    "filter": "gpt-3.5-turbo",
+    "evaluator": "gpt-3.5-turbo"
+}
+
+COMPLEXITY_TIERS = ("simples", "médio", "complexo")
+
+
+class ModelRouter:
+    """
+    Política de roteamento de modelos por agente e complexidade
+
+    Uso:
+        router = ModelRouter()
+        complexity = router.assess_complexity(briefing_data)
+        response = router.invoke("analyzer", messages, complexity, temperature=0.3)
+        router.decisions  # [{agent, complexity, model, max_tokens, latency_ms, ...}, ...]
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = config or MODEL_ROUTING_CONFIG
+        self.decisions: List[Dict] = []
+        self._clients: Dict[Tuple, BaseChatModel] = {}
+        self._http_client = None
+
+    @staticmethod
+    def assess_complexity(briefing_data: Dict) -> str:
+        """Avalia complexidade do briefing pela duração desejada"""
+        duration = briefing_data.get('duration_minutes') or 5
+        if duration <= 3:
+            return "simples"
+        elif duration <= 7:
+            return "médio"
+        else:
+            return "complexo"
+
+    @staticmethod
+    def assess_content_complexity(content: str) -> str:
+        """Avalia complexidade de um conteúdo pelo número de palavras"""
+        words = len(content.split())
+        if words <= 300:
+            return "simples"
+        elif words <= 900:
+            return "médio"
+        else:
+            return "complexo"
+
+    def route(self, agent: str, complexity: Optional[str] = None) -> Dict:
+        """
+        Decide modelo e max_tokens para um agente
+
+        Returns:
+            Dict com agent, complexity, model e max_tokens
+        """
+        tier = complexity if complexity in COMPLEXITY_TIERS else self.config["default_tier"]
+
+        if not self.config.get("enabled", True):
+            return {
+                "agent": agent,
+                "complexity": tier,
+                "model": LEGACY_MODELS.get(agent, settings.OPENAI_MODEL),
+                "max_tokens": None
+            }
+
+        rule = self.config["tiers"].get(tier, {}).get(agent, {"model": "large", "max_tokens": None})
+
+        return {
+            "agent": agent,
+            "complexity": tier,
+            "model": self._resolve_model(rule["model"]),
+            "max_tokens": rule.get("max_tokens")
+        }
+
+    def get_llm(self, model: str, temperature: float, max_tokens: Optional[int] = None) -> BaseChatModel:
+        """Obtém chat model do provider configurado (reutilizado por modelo/temperatura/max_tokens)"""
+        key = (model, temperature, max_tokens)
+        if key not in self._clients:
+            if self._http_client is None:
+                self._http_client = build_http_client()
+            self._clients[key] = create_chat_model(model, temperature, max_tokens, self._http_client)
+        return self._clients[key]
+
+    def invoke(
+        self,
+        agent: str,
+        messages: List,
+        complexity: Optional[str] = None,
+        temperature: float = 0.7,
+        json_mode: bool = False
+    ):
+        """
+        Executa chamada ao LLM com o modelo roteado, registrando decisão,
+        latência e tokens consumidos
+
+        Args:
+            json_mode: Se True, exige resposta em objeto JSON (response_format)
+
+        Returns:
+            Resposta do modelo (AIMessage)
+        """
+        decision = self.route(agent, complexity)
+        llm = self.get_llm(decision["model"], temperature, decision["max_tokens"])
+        if json_mode:
+            llm = llm.bind(response_format={"type": "json_object"})
+
+        start = time.perf_counter()
+        response = None
+        try:
+            response = track_llm_call(agent, decision["model"], lambda: llm.invoke(messages))
+            return response
+        finally:
+            decision["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            usage = getattr(response, "usage_metadata", None) or {}
+            decision["input_tokens"] = usage.get("input_tokens", 0)
+            decision["output_tokens"] = usage.get("output_tokens", 0)
+            self.decisions.append(decision)
+            print(
+                f"   → [{agent}] {decision['model']} "
+                f"({decision['complexity']}, max_tokens={decision['max_tokens']}) "
+                f"em {decision['latency_ms'] / 1000:.2f}s"
+            )
+
+    def reset(self):
+        """Limpa decisões registradas (início de uma nova execução)"""
+        self.decisions = []
+
+    def usage_summary(self) -> Dict:
+        """Totais de chamadas, tokens e latência das decisões registradas"""
+        return {
+            "llm_calls": len(self.decisions),
+            "input_tokens": sum(d.get("input_tokens", 0) for d in self.decisions),
+            "output_tokens": sum(d.get("output_tokens", 0) for d in self.decisions),
+            "latency_ms": round(sum(d.get("latency_ms", 0) for d in self.decisions), 1)
+        }
+
+    def _resolve_model(self, alias: str) -> str:
+        """Resolve aliases 'small'/'large' para nomes de modelo"""
+        models = self.config.get("models", {})
+        if alias in models:
+            return models[alias] or settings.OPENAI_MODEL
+        return alias
@@ -2,14 +2,41 @@
 Workflow LangGraph para refinamento iterativo de conteúdo
 
 Ciclo: Gerar → Avaliar → Refinar → Repetir até qualidade adequada
+
+Dois modos (REFINEMENT_WORKFLOW_CONFIG["section_mode"]):
+- Documento (padrão): uma nota para o início do conteúdo e reescrita completa
+- Seção (opt-in): mais preciso, porém mais caro, pois avalia o conteúdo inteiro
+
+Refinamento por seção:
+- O conteúdo é dividido em seções (src/utils/text_sections.py)
+- Só seções novas/alteradas são avaliadas (notas cacheadas por hash da seção)
+- Só as seções piores, abaixo da qualidade alvo, são reescritas
+- O avaliador devolve uma nota por dimensão (quality_dimensions) em uma única
+  resposta estruturada; a nota agregada usa dimension_weights e as dimensões
+  mais fracas de cada seção orientam a reescrita
+- Para quando a melhoria entre iterações fica abaixo de convergence_threshold
+  (platô) e devolve a melhor versão avaliada
 """
-from typing import Dict, Literal
+from typing import Dict, List, Literal
 from datetime import datetime
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
+from src.config.workflows import REFINEMENT_WORKFLOW_CONFIG
 from src.workflows.states import ContentRefinementState
-from src.config.settings import settings
+from src.workflows.model_router import ModelRouter
+from src.workflows.structured_output import (
+    StructuredOutputParser,
+    QualityEvaluationSchema,
+    SectionEvaluationSchema,
+    SectionRewriteSchema
+)
+from src.ml.usage_tracker import usage_context
+from src.workflows.instrumentation import instrument_node, workflow_timings, summarize_timings
+from src.workflows.registry import compiled_graph, run_config, run_method
+from src.utils.text_sections import split_sections, join_sections, section_hash
+
+DIMENSIONS = REFINEMENT_WORKFLOW_CONFIG["quality_dimensions"]
+DIMENSION_WEIGHTS = REFINEMENT_WORKFLOW_CONFIG["dimension_weights"]
 
 class ContentRefinementWorkflow:
     """
@@ -17,29 +44,22 @@ class ContentRefinementWorkflow:
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.OPENAI_MODEL,
-            temperature=0.7,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
-        
-        self.evaluator_llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.2,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        # Refinador (temperatura 0.7) e avaliador (0.2) roteados por complexidade
+        self.router = ModelRouter()
         
-        self.graph = self._build_graph()
+        # Grafo compilado uma vez por processo (src/workflows/registry.py)
+        self.graph = compiled_graph(("content_refinement",), self._build_graph)
     
-    def _build_graph(self) -> StateGraph:
-        """Constrói o grafo de refinamento"""
+    @staticmethod
+    def _build_graph() -> StateGraph:
+        """Constrói o grafo de refinamento (sem dependências da execução)"""
         
         workflow = StateGraph(ContentRefinementState)
         
         # Adicionar nós
-        workflow.add_node("evaluate", self._evaluate_node)
-        workflow.add_node("refine", self._refine_node)
-        workflow.add_node("complete", self._complete_node)
+        workflow.add_node("evaluate", instrument_node("evaluate", run_method("_evaluate_node")))
+        workflow.add_node("refine", instrument_node("refine", run_method("_refine_node")))
+        workflow.add_node("complete", instrument_node("complete", run_method("_complete_node")))
         
         # Definir fluxo
         workflow.set_entry_point("evaluate")
@@ -47,7 +67,7 @@ class ContentRefinementWorkflow:
         # Decisão após avaliação
         workflow.add_conditional_edges(
             "evaluate",
-            self._should_refine,
+            run_method("_should_refine"),
             {
                 "refine": "refine",
                 "complete": "complete"
@@ -61,62 +81,200 @@ class ContentRefinementWorkflow:
         return workflow.compile()
     
     def _evaluate_node(self, state: ContentRefinementState) -> ContentRefinementState:
-        """Avalia a qualidade do conteúdo atual"""
+        """Avalia a qualidade do conteúdo atual (somente seções sem nota em cache)"""
         print(f"📊 Avaliando qualidade (iteração {state['iteration']})...")
         
-        content = state['current_version'] if state['iteration'] > 0 else state['content']
+        if not REFINEMENT_WORKFLOW_CONFIG["section_mode"]:
+            return self._evaluate_document(state)
+        
+        content = state['current_version']
+        sections = split_sections(content, REFINEMENT_WORKFLOW_CONFIG["max_sections"])
+        cache = state['section_scores']
+        pending = [i for i, section in enumerate(sections) if section_hash(section) not in cache]
+        
+        state['section_stats']['cached'] += len(sections) - len(pending)
+        if pending:
+            try:
+                for index, evaluation in self._evaluate_sections(state, sections, pending).items():
+                    cache[section_hash(sections[index])] = evaluation
+                state['section_stats']['evaluated'] += len(pending)
+            except Exception as e:
+                print(f"   ⚠️ Erro na avaliação: {e}")
+        
+        # Seções sem avaliação (erro do LLM) ficam com score médio e não entram no cache
+        fallback = {"score": 0.7, "feedback": "Avaliação automática indisponível"}
+        evaluations = [cache.get(section_hash(section), fallback) for section in sections]
+        
+        # Nota do documento: média das seções ponderada pelo tamanho (também por dimensão)
+        lengths = [len(section) for section in sections]
+        score = sum(e['score'] * n for e, n in zip(evaluations, lengths)) / max(sum(lengths), 1)
+        scored = [(e['dimensions'], n) for e, n in zip(evaluations, lengths) if 'dimensions' in e]
+        total = sum(n for _, n in scored)
+        dimension_scores = {
+            dimension: round(sum(d[dimension] * n for d, n in scored) / total, 3)
+            for dimension in DIMENSIONS
+        } if total else {}
+        
+        # Seções piores abaixo da meta serão reescritas
+        flagged = sorted(
+            (i for i, e in enumerate(evaluations) if e['score'] < state['target_quality'] and e is not fallback),
+            key=lambda i: evaluations[i]['score']
+        )[:REFINEMENT_WORKFLOW_CONFIG["max_sections_per_pass"]]
+        feedback = "; ".join(
+            f"Seção {i + 1} ({', '.join(self._weak_dimensions(evaluations[i]))}): {evaluations[i]['feedback']}"
+            for i in flagged
+        )
+        
+        state['flagged_sections'] = flagged
+        state['quality_scores'].append(score)
+        state['dimension_scores'].append(dimension_scores)
+        state['quality_feedback'].append(feedback[:200] or (evaluations[0]['feedback'] if evaluations else ""))
+        
+        if score > state['best_quality']:
+            state['best_quality'] = score
+            state['best_version'] = content
+        
+        print(f"   → Score: {score:.2f} ({len(pending)}/{len(sections)} seções avaliadas)")
+        if dimension_scores:
+            print(f"   → Dimensões: {', '.join(f'{d}={v:.2f}' for d, v in dimension_scores.items())}")
+        print(f"   → Feedback: {state['quality_feedback'][-1][:80]}...")
+        
+        return state
+    
+    def _evaluate_document(self, state: ContentRefinementState) -> ContentRefinementState:
+        """Uma nota para o documento (o avaliador lê só o início do conteúdo)"""
+        content = state['current_version']
         
         try:
-            # Avaliar com LLM
-            evaluation_prompt = self._build_evaluation_prompt(content, state['content_type'])
-            
             messages = [
                 SystemMessage(content="Você é um avaliador de qualidade de conteúdo educacional para professores."),
-                HumanMessage(content=evaluation_prompt)
+                HumanMessage(content=self._build_document_evaluation_prompt(content, state['content_type']))
             ]
+            response = self.router.invoke(
+                "evaluator", messages, state['complexity'], temperature=0.2, json_mode=True
+            )
             
-            response = self.evaluator_llm.invoke(messages)
-            
-            # Parse score (simplificado)
-            score = self._parse_quality_score(response.content)
-            feedback = self._extract_feedback(response.content)
-            
-            state['quality_scores'].append(score)
-            state['quality_feedback'].append(feedback)
-            
-            print(f"   → Score: {score:.2f}")
-            print(f"   → Feedback: {feedback[:80]}...")
-            
+            # Parse estruturado (score/feedback validados; campos inválidos reparados)
+            parser = StructuredOutputParser(self.router, state['complexity'])
+            evaluation = parser.parse_object(
+                response.content,
+                QualityEvaluationSchema,
+                context=f"Avaliação de {state['content_type']} para professores"
+            )
+            if not evaluation:
+                raise ValueError("avaliação sem score/feedback válidos")
+            score = evaluation['score']
+            feedback = evaluation['feedback'][:200]
         except Exception as e:
             print(f"   ⚠️ Erro na avaliação: {e}")
             # Score médio como fallback
             score = 0.7
-            state['quality_scores'].append(score)
-            state['quality_feedback'].append("Avaliação automática indisponível")
+            feedback = "Avaliação automática indisponível"
+        
+        state['flagged_sections'] = []
+        state['quality_scores'].append(score)
+        state['dimension_scores'].append({})
+        state['quality_feedback'].append(feedback)
+        
+        if score > state['best_quality']:
+            state['best_quality'] = score
+            state['best_version'] = content
+        
+        print(f"   → Score: {score:.2f}")
+        print(f"   → Feedback: {feedback[:80]}...")
         
         return state
     
+    def _evaluate_sections(
+        self,
+        state: ContentRefinementState,
+        sections: List[str],
+        pending: List[int]
+    ) -> Dict[int, Dict]:
+        """Uma chamada LLM para as seções pendentes → {índice: {score, dimensions, feedback}}"""
+        evaluation_prompt = self._build_evaluation_prompt(sections, pending, state['content_type'])
+        
+        messages = [
+            SystemMessage(content="Você é um avaliador de qualidade de conteúdo educacional para professores."),
+            HumanMessage(content=evaluation_prompt)
+        ]
+        
+        response = self.router.invoke(
+            "evaluator", messages, state['complexity'], temperature=0.2, json_mode=True
+        )
+        
+        # Parse estruturado (notas por dimensão validadas; campos inválidos reparados)
+        parser = StructuredOutputParser(self.router, state['complexity'])
+        items = parser.parse_list(
+            response.content,
+            SectionEvaluationSchema,
+            key="sections",
+            context=f"Avaliação de seções de {state['content_type']} para professores"
+        )
+        
+        results = {}
+        for item in items:
+            index = item['index'] - 1
+            if index in pending:
+                dimensions = {dimension: item[dimension] for dimension in DIMENSIONS}
+                results[index] = {
+                    "score": self._aggregate(dimensions),
+                    "dimensions": dimensions,
+                    "feedback": item['feedback'][:200]
+                }
+        
+        return results
+    
+    @staticmethod
+    def _aggregate(dimensions: Dict[str, float]) -> float:
+        """Nota agregada: média ponderada das dimensões (dimension_weights)"""
+        total = sum(DIMENSION_WEIGHTS.get(d, 0.0) for d in dimensions)
+        if not total:
+            return sum(dimensions.values()) / max(len(dimensions), 1)
+        return sum(score * DIMENSION_WEIGHTS.get(d, 0.0) for d, score in dimensions.items()) / total
+    
+    @staticmethod
+    def _dimension_label(dimension: str) -> str:
+        """Rótulo da dimensão (descrição do campo no schema)"""
+        field = SectionEvaluationSchema.model_fields.get(dimension)
+        return (field.description or dimension).replace(" (0-1)", "").lower() if field else dimension
+    
+    def _weak_dimensions(self, evaluation: Dict) -> List[str]:
+        """Dimensões mais fracas da seção (rótulo e nota)"""
+        dimensions = evaluation.get('dimensions', {})
+        weakest = sorted(dimensions, key=dimensions.get)[:REFINEMENT_WORKFLOW_CONFIG["weak_dimensions_per_section"]]
+        return [f"{self._dimension_label(d)} {dimensions[d]:.2f}" for d in weakest]
+    
     def _refine_node(self, state: ContentRefinementState) -> ContentRefinementState:
-        """Refina o conteúdo baseado no feedback"""
+        """Refina o conteúdo baseado no feedback (só as seções sinalizadas)"""
         print(f"🔧 Refinando conteúdo...")
         
         try:
             # Pegar última avaliação
             latest_feedback = state['quality_feedback'][-1] if state['quality_feedback'] else "Melhorar clareza e estrutura"
             
-            refinement_prompt = self._build_refinement_prompt(
-                state['current_version'],
-                latest_feedback,
-                state['content_type']
-            )
-            
-            messages = [
-                SystemMessage(content="Você é um especialista em refinamento de conteúdo educacional."),
-                HumanMessage(content=refinement_prompt)
-            ]
+            sections = split_sections(state['current_version'], REFINEMENT_WORKFLOW_CONFIG["max_sections"])
+            flagged = [i for i in state['flagged_sections'] if i < len(sections)]
             
-            response = self.llm.invoke(messages)
-            refined = response.content
+            if flagged:
+                rewritten = self._refine_sections(state, sections, flagged)
+                for index, content in rewritten.items():
+                    sections[index] = content
+                refined = join_sections(sections)
+                state['section_stats']['rewritten'] += len(rewritten)
+            else:
+                # Sem avaliação por seção: reescrita do documento inteiro
+                refinement_prompt = self._build_refinement_prompt(
+                    state['current_version'],
+                    latest_feedback,
+                    state['content_type']
+                )
+                messages = [
+                    SystemMessage(content="Você é um especialista em refinamento de conteúdo educacional."),
+                    HumanMessage(content=refinement_prompt)
+                ]
+                response = self.router.invoke("refiner", messages, state['complexity'], temperature=0.7)
+                refined = response.content
             
             # Salvar versão refinada
             state['refined_versions'].append(refined)
@@ -127,6 +285,7 @@ class ContentRefinementWorkflow:
             improvement = {
                 "iteration": state['iteration'],
                 "feedback_applied": latest_feedback[:100],
+                "sections_rewritten": [i + 1 for i in flagged],
                 "timestamp": str(datetime.utcnow())
             }
             state['improvement_log'].append(improvement)
@@ -138,19 +297,61 @@ class ContentRefinementWorkflow:
         
         return state
     
+    def _refine_sections(
+        self,
+        state: ContentRefinementState,
+        sections: List[str],
+        flagged: List[int]
+    ) -> Dict[int, str]:
+        """Uma chamada LLM reescrevendo só as seções sinalizadas → {índice: novo texto}"""
+        feedback_by_section = {}
+        for i in flagged:
+            evaluation = state['section_scores'].get(section_hash(sections[i]), {})
+            weak = self._weak_dimensions(evaluation)
+            priority = f"Priorizar: {', '.join(weak)}. " if weak else ""
+            feedback_by_section[i] = priority + evaluation.get('feedback', '')
+        
+        messages = [
+            SystemMessage(content="Você é um especialista em refinamento de conteúdo educacional. Responda APENAS com JSON."),
+            HumanMessage(content=self._build_section_refinement_prompt(
+                sections, feedback_by_section, state['content_type']
+            ))
+        ]
+        
+        response = self.router.invoke("refiner", messages, state['complexity'], temperature=0.7, json_mode=True)
+        
+        parser = StructuredOutputParser(self.router, state['complexity'])
+        items = parser.parse_list(
+            response.content,
+            SectionRewriteSchema,
+            key="sections",
+            context=f"Reescrita de seções de {state['content_type']} para professores"
+        )
+        
+        return {
+            item['index'] - 1: item['content']
+            for item in items
+            if item['index'] - 1 in feedback_by_section
+        }
+    
     def _complete_node(self, state: ContentRefinementState) -> ContentRefinementState:
         """Finaliza o processo de refinamento"""
         print(f"✅ Refinamento concluído!")
         
-        state['final_content'] = state['current_version']
-        state['final_quality'] = state['quality_scores'][-1] if state['quality_scores'] else 0.0
+        # Melhor versão avaliada (uma reescrita pode piorar a nota)
+        state['final_content'] = state['best_version']
+        state['final_quality'] = state['best_quality'] if state['quality_scores'] else 0.0
         state['converged'] = True
         
         # Determinar razão de conclusão
-        if state['iteration'] >= state['max_iterations']:
+        latest = state['quality_scores'][-1] if state['quality_scores'] else 0.0
+        if latest >= state['target_quality']:
+            state['reason'] = f"Qualidade alvo atingida ({latest:.2f} >= {state['target_quality']:.2f})"
+        elif state['iteration'] >= state['max_iterations']:
             state['reason'] = f"Limite de iterações atingido ({state['max_iterations']})"
-        elif state['final_quality'] >= state['target_quality']:
-            state['reason'] = f"Qualidade alvo atingida ({state['final_quality']:.2f} >= {state['target_quality']:.2f})"
+        elif self._plateau(state):
+            threshold = REFINEMENT_WORKFLOW_CONFIG["convergence_threshold"]
+            state['reason'] = f"Platô de qualidade (melhoria < {threshold:.2f})"
         else:
             state['reason'] = "Convergência prematura"
         
@@ -160,6 +361,13 @@ class ContentRefinementWorkflow:
         
         return state
     
+    def _plateau(self, state: ContentRefinementState) -> bool:
+        """Melhoria da última iteração abaixo de convergence_threshold"""
+        scores = state['quality_scores']
+        if len(scores) < 2:
+            return False
+        return scores[-1] - scores[-2] < REFINEMENT_WORKFLOW_CONFIG["convergence_threshold"]
+    
     def _should_refine(self, state: ContentRefinementState) -> Literal["refine", "complete"]:
         """Decide se deve refinar ou completar"""
         
@@ -174,16 +382,44 @@ class ContentRefinementWorkflow:
                 return "complete"
         
         # Verificar convergência (score não melhora)
-        if len(state['quality_scores']) >= 2:
+        if self._plateau(state):
             improvement = state['quality_scores'][-1] - state['quality_scores'][-2]
-            if improvement < 0.02:  # Melhoria mínima
-                print(f"   → Convergência detectada (melhoria: {improvement:.3f})")
-                return "complete"
+            print(f"   → Platô detectado (melhoria: {improvement:.3f})")
+            return "complete"
         
         return "refine"
     
-    def _build_evaluation_prompt(self, content: str, content_type: str) -> str:
-        """Constrói prompt de avaliação"""
+    def _build_evaluation_prompt(self, sections: List[str], pending: List[int], content_type: str) -> str:
+        """Constrói prompt de avaliação das seções pendentes"""
+        outline = "\n".join(
+            f"{i + 1}. {section.split(chr(10), 1)[0][:60]}" for i, section in enumerate(sections)
+        )
+        blocks = "\n\n".join(f"### Seção {i + 1}\n{sections[i]}" for i in pending)
+        criteria = "\n".join(
+            f"- {dimension}: {self._dimension_label(dimension)}" for dimension in DIMENSIONS
+        )
+        example = ", ".join(f'"{dimension}": 0.0' for dimension in DIMENSIONS)
+        return f"""
+Avalie a qualidade das seções deste {content_type} para treinamento de professores:
+
+**Estrutura completa:**
+{outline}
+
+**Seções para avaliar:**
+{blocks}
+
+**Critérios de Avaliação (nota 0.0-1.0 para cada um):**
+{criteria}
+
+Responda APENAS com este objeto JSON (uma entrada por seção avaliada):
+{{"sections": [{{"index": 1, {example}, "feedback": "melhorias para as dimensões mais fracas (máx 120 caracteres)"}}]}}
+"""
+    
+    def _build_document_evaluation_prompt(self, content: str, content_type: str) -> str:
+        """Constrói prompt de avaliação do documento (só o início do conteúdo)"""
+        criteria = "\n".join(
+            f"{n}. {self._dimension_label(dimension).capitalize()}" for n, dimension in enumerate(DIMENSIONS, 1)
+        )
         return f"""
 Avalie a qualidade deste {content_type} para treinamento de professores:
 
@@ -191,17 +427,43 @@ Avalie a qualidade deste {content_type} para treinamento de professores:
 {content[:500]}...
 
 **Critérios de Avaliação:**
-1. Clareza e objetividade
-2. Relevância para professores
-3. Estrutura e organização
-4. Aplicabilidade prática
-5. Linguagem adequada
+{criteria}
 
-Forneça:
-- Score de 0 a 1 (formato: "SCORE: 0.XX")
-- Feedback específico para melhorias
+Responda APENAS com este objeto JSON:
+{{"score": 0.0-1.0, "feedback": "melhorias específicas"}}
+"""
+    
+    def _build_section_refinement_prompt(
+        self,
+        sections: List[str],
+        feedback_by_section: Dict[int, str],
+        content_type: str
+    ) -> str:
+        """Constrói prompt de refinamento das seções sinalizadas"""
+        outline = "\n".join(
+            f"{i + 1}. {section.split(chr(10), 1)[0][:60]}" for i, section in enumerate(sections)
+        )
+        blocks = "\n\n".join(
+            f"### Seção {i + 1}\n{sections[i]}\n**Feedback:** {feedback}"
+            for i, feedback in feedback_by_section.items()
+        )
+        return f"""
+Refine as seções indicadas deste {content_type} com base no feedback de cada uma:
+
+**Estrutura completa:**
+{outline}
+
+**Seções para refinar:**
+{blocks}
+
+**Instruções:**
+- Reescreva SOMENTE as seções acima, mantendo o título (primeira linha) de cada uma
+- Mantenha o mesmo tamanho aproximado
+- Aplique as sugestões do feedback, priorizando as dimensões indicadas
+- Mantenha foco em professores como público
 
-Responda em formato estruturado.
+Responda APENAS com este objeto JSON:
+{{"sections": [{{"index": 1, "content": "texto completo da seção reescrita"}}]}}
 """
     
     def _build_refinement_prompt(self, content: str, feedback: str, content_type: str) -> str:
@@ -224,33 +486,6 @@ Refine este {content_type} com base no feedback:
 Retorne APENAS o conteúdo refinado.
 """
     
-    def _parse_quality_score(self, evaluation: str) -> float:
-        """Extrai score da avaliação"""
-        import re
-        
-        # Procurar padrão "SCORE: 0.XX"
-        match = re.search(r'SCORE:\s*([0-9.]+)', evaluation, re.IGNORECASE)
-        if match:
-            try:
-                score = float(match.group(1))
-                return max(0.0, min(1.0, score))
-            except:
-                pass
-        
-        # Fallback: score médio
-        return 0.7
-    
-    def _extract_feedback(self, evaluation: str) -> str:
-        """Extrai feedback textual"""
-        # Simplificado: pegar tudo após "Feedback"
-        import re
-        
-        match = re.search(r'Feedback[:\s]*(.+)', evaluation, re.IGNORECASE | re.DOTALL)
-        if match:
-            return match.group(1).strip()[:200]
-        
-        return evaluation[:200]
-    
     def run(
         self, 
         content: str, 
@@ -271,19 +506,26 @@ Retorne APENAS o conteúdo refinado.
             Conteúdo refinado e metadata
         """
         
-        from datetime import datetime
+        self.router.reset()
         
         # Estado inicial
         initial_state: ContentRefinementState = {
             "content": content,
             "content_type": content_type,
+            "complexity": ModelRouter.assess_content_complexity(content),
             "target_quality": target_quality,
             "quality_scores": [],
             "quality_feedback": [],
+            "dimension_scores": [],
+            "section_scores": {},
+            "flagged_sections": [],
             "refined_versions": [],
             "current_version": content,
             "iteration": 0,
             "max_iterations": max_iterations,
+            "best_version": content,
+            "best_quality": -1.0,
+            "section_stats": {"evaluated": 0, "cached": 0, "rewritten": 0},
             "final_content": None,
             "final_quality": None,
             "improvement_log": [],
@@ -297,8 +539,9 @@ Retorne APENAS o conteúdo refinado.
         print(f"   Max iterações: {max_iterations}")
         print("=" * 60)
         
-        # Executar workflow
-        final_state = self.graph.invoke(initial_state)
+        # Executar workflow (herda briefing_id/video_id do contexto chamador, se houver)
+        with usage_context(workflow="content_refinement"), workflow_timings("content_refinement") as timings:
+            final_state = self.graph.invoke(initial_state, run_config(self))
         
         print("=" * 60)
         
@@ -309,7 +552,12 @@ Retorne APENAS o conteúdo refinado.
             "metadata": {
                 "iterations": final_state['iteration'],
                 "quality_progression": final_state['quality_scores'],
+                "dimension_progression": final_state['dimension_scores'],
                 "improvement_log": final_state['improvement_log'],
-                "reason": final_state['reason']
+                "reason": final_state['reason'],
+                "sections": final_state['section_stats'],
+                "complexity": final_state['complexity'],
+                "routing": list(self.router.decisions),
+                "node_timings": summarize_timings(timings)
             }
         }
@@ -0,0 +1,81 @@
+"""
+Registro de grafos compilados dos workflows
+
+Montar e compilar um StateGraph custa ~10-25ms por workflow, e as tasks
+instanciam um workflow novo a cada execução. Cada topologia agora é
+compilada uma vez por processo (por variante: perfil do briefing, aprovação
+humana, checkpointer) e reaproveitada por todas as execuções.
+
+O grafo compilado não guarda dependências: a instância do workflow da
+execução (gerador, provider, clientes LLM, roteador) vai no config
+(config["configurable"]["workflow"]) e cada nó delega para o método
+correspondente dessa instância.
+
+Uso:
+    self.graph = compiled_graph(("briefing_analysis", profile), lambda: self._build_graph(profile))
+
+    # em _build_graph:
+    workflow.add_node("filter", instrument_node("filter", run_method("_filter_node")))
+
+    # em run():
+    final_state = self.graph.invoke(initial_state, run_config(self))
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from langchain_core.runnables import RunnableConfig
+
+# Chave do config com a instância do workflow da execução
+WORKFLOW_KEY = "workflow"
+
+_graphs: Dict[Tuple, Any] = {}
+_lock = threading.Lock()
+
+
+def compiled_graph(key: Tuple[Hashable, ...], build: Callable[[], Any]):
+    """
+    Grafo compilado para a chave (compila na primeira chamada do processo)
+
+    Args:
+        key: Workflow + variante (ex.: ("video_generation", True, checkpointer))
+        build: Monta e compila o grafo; não deve capturar dependências por execução
+    """
+    graph = _graphs.get(key)
+    if graph is None:
+        with _lock:
+            graph = _graphs.get(key)
+            if graph is None:
+                graph = _graphs[key] = build()
+    return graph
+
+
+def clear_compiled_graphs():
+    """Descarta os grafos compilados (testes e benchmark)"""
+    with _lock:
+        _graphs.clear()
+
+
+def compiled_graph_count() -> int:
+    return len(_graphs)
+
+
+def run_config(workflow, **configurable) -> RunnableConfig:
+    """Config de uma execução: instância do workflow + chaves extras (ex.: thread_id)"""
+    return {"configurable": {WORKFLOW_KEY: workflow, **configurable}}
+
+
+def run_method(name: str) -> Callable:
+    """
+    Nó (ou função de decisão) que delega para o método `name` da instância
+    do workflow recebida no config da execução
+    """
+    def node(state, config: RunnableConfig):
+        workflow = config.get("configurable", {}).get(WORKFLOW_KEY)
+        if workflow is None:
+            raise RuntimeError(
+                f"'{name}': execução sem instância do workflow no config (use run_config)"
+            )
+        return getattr(workflow, name)(state)
+
+    node.__name__ = name
+    return node
@@ -1,7 +1,8 @@
 """
 Estados compartilhados dos workflows LangGraph
 """
-from typing import TypedDict, List, Dict, Optional, Literal
+import operator
+from typing import Annotated, TypedDict, List, Dict, Optional, Literal
 from datetime import datetime
 
 class BriefingAnalysisState(TypedDict):
@@ -9,11 +10,14 @@ class BriefingAnalysisState(TypedDict):
     # Input
     briefing_id: int
     briefing_data: Dict
+    complexity: str  # simples/médio/complexo (define roteamento de modelos)
     
     # Processamento
     analysis_result: Optional[Dict]
     generated_options: List[Dict]
     filtered_options: List[Dict]
+    rejected_options: List[Dict]  # Descartadas pelo filtro: [{title, reasons}]
+    regeneration: Dict  # Rodadas de reposição: rounds, requested, accepted, tokens, stopped
     ranked_options: List[Dict]
     
     # Metadata
@@ -29,6 +33,7 @@ class VideoGenerationState(TypedDict):
     option_id: int
     briefing_data: Dict
     script_outline: str
+    speculative_script: Optional[str]  # Roteiro já aprimorado pela task especulativa (1ª iteração)
     
     # Análise
     script_analysis: Optional[Dict]
@@ -36,7 +41,11 @@ class VideoGenerationState(TypedDict):
     
     # Geração
     enhanced_script: Optional[str]
+    script_validation: Optional[Dict]  # Relatório da validação pré-renderização (ScriptValidator)
     audio_path: Optional[str]
+    audio_assets: Optional[Dict]  # Resultado de prepare_audio() do gerador
+    streamed_narration: Optional[Dict]  # Narração sintetizada durante o aprimoramento (NarrationStream)
+    visual_assets: Optional[Dict]  # Resultado de prepare_assets() do gerador
     video_path: Optional[str]
     thumbnail_path: Optional[str]
     duration: Optional[float]  # Duração do vídeo em segundos
@@ -44,7 +53,7 @@ class VideoGenerationState(TypedDict):
     
     # Revisão e Aprovação
     revision_feedback: List[str]
-    approval_status: Literal["pending", "approved", "rejected", "needs_revision"]
+    approval_status: Literal["pending", "approved", "rejected", "needs_revision", "awaiting_approval"]
     human_feedback: Optional[str]
     
     # Refinamento
@@ -54,8 +63,7 @@ class VideoGenerationState(TypedDict):
     # Metadata
     current_step: str
     progress: float
-    errors: List[str]
-    checkpoints: List[Dict]
+    errors: Annotated[List[str], operator.add]  # Acumulado (ramos paralelos)
     started_at: datetime
     completed_at: Optional[datetime]
 
@@ -65,16 +73,23 @@ class ContentRefinementState(TypedDict):
     content: str
     content_type: Literal["script", "outline", "summary"]
     target_quality: float
+    complexity: str  # simples/médio/complexo (define roteamento de modelos)
     
     # Avaliação
     quality_scores: List[float]
     quality_feedback: List[str]
+    dimension_scores: List[Dict[str, float]]  # Notas por dimensão do documento, por iteração
+    section_scores: Dict[str, Dict]  # Cache: hash da seção → {score, dimensions, feedback}
+    flagged_sections: List[int]  # Seções (índices) a reescrever na próxima iteração
     
     # Refinamento
     refined_versions: List[str]
     current_version: str
     iteration: int
     max_iterations: int
+    best_version: str  # Versão com maior nota (resultado final)
+    best_quality: float
+    section_stats: Dict[str, int]  # evaluated / cached / rewritten
     
     # Resultado
     final_content: Optional[str]
@@ -0,0 +1,406 @@
+"""
+Saída estruturada dos agentes (JSON mode + validação Pydantic + reparo)
+
+Fluxo de parsing:
+1. Resposta pedida em JSON mode (objeto JSON garantido pela API)
+2. Cada item validado individualmente contra o schema Pydantic
+3. Itens inválidos: apenas os campos com erro são pedidos de novo ao LLM
+   (uma chamada curta para todos os itens), em vez de regenerar tudo
+4. Resposta truncada (max_tokens): objetos completos são recuperados
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from src.workflows.model_router import ModelRouter
+
+
+# ============================================================================
+# SCHEMAS
+# ============================================================================
+
+class ContentOptionSchema(BaseModel):
+    """Proposta de vídeo gerada pelo ContentGeneratorAgent"""
+
+    title: str = Field(min_length=3, description="Título atraente")
+    summary: str = Field(min_length=10, description="Resumo em 2-3 frases")
+    script_outline: str = Field(min_length=10, description="Roteiro esboçado")
+    key_points: str = Field(min_length=3, description="3-5 pontos-chave separados por ';'")
+    estimated_duration: Optional[int] = Field(default=None, gt=0, description="Duração em segundos (inteiro)")
+    tone: str = Field(default="", description="Tom do vídeo")
+    approach: str = Field(default="", description="Abordagem pedagógica")
+
+    @field_validator("title", "summary", "tone", "approach", mode="before")
+    @classmethod
+    def _strip(cls, value):
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator("script_outline", mode="before")
+    @classmethod
+    def _join_outline(cls, value):
+        if isinstance(value, list):
+            return " → ".join(str(item).strip() for item in value if str(item).strip())
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator("key_points", mode="before")
+    @classmethod
+    def _join_key_points(cls, value):
+        if isinstance(value, list):
+            return "; ".join(str(item).strip() for item in value if str(item).strip())
+        return value.strip() if isinstance(value, str) else value
+
+    @field_validator("estimated_duration", mode="before")
+    @classmethod
+    def _parse_duration(cls, value):
+        """Aceita 300, "300", "5 minutos" (convertido para segundos)"""
+        if value is None or isinstance(value, (int, float)):
+            return value
+        if isinstance(value, str):
+            match = re.search(r"\d+", value)
+            if not match:
+                return value  # Deixa o Pydantic acusar o erro
+            number = int(match.group())
+            return number * 60 if "min" in value.lower() else number
+        return value
+
+
+class BriefingAnalysisSchema(BaseModel):
+    """Análise estruturada do briefing (perfil fast)"""
+
+    objective: str = ""
+    audience: str = ""
+    depth: str = ""
+    key_concepts: List[str] = Field(default_factory=list)
+    gaps: List[str] = Field(default_factory=list)
+    suggestions: List[str] = Field(default_factory=list)
+
+    @field_validator("key_concepts", "gaps", "suggestions", mode="before")
+    @classmethod
+    def _split_list(cls, value):
+        if isinstance(value, str):
+            return [item.strip() for item in re.split(r"[;\n]", value) if item.strip()]
+        return value or []
+
+
+def normalize_score(value):
+    """Aceita 0.85, "0.85", 8.5 (escala 0-10) e 85 (escala 0-100)"""
+    if isinstance(value, str):
+        match = re.search(r"\d+(?:[.,]\d+)?", value)
+        if not match:
+            return value
+        value = float(match.group().replace(",", "."))
+    if isinstance(value, (int, float)):
+        if 1 < value <= 10:
+            return value / 10
+        if 10 < value <= 100:
+            return value / 100
+    return value
+
+
+class QualityEvaluationSchema(BaseModel):
+    """Avaliação do ContentRefinementWorkflow"""
+
+    score: float = Field(ge=0.0, le=1.0, description="Nota de 0 a 1")
+    feedback: str = Field(min_length=3, description="Melhorias específicas sugeridas")
+
+    @field_validator("score", mode="before")
+    @classmethod
+    def _normalize_score(cls, value):
+        return normalize_score(value)
+
+
+class SectionEvaluationSchema(BaseModel):
+    """
+    Avaliação de uma seção no refinamento por seção
+
+    Uma nota por dimensão (REFINEMENT_WORKFLOW_CONFIG["quality_dimensions"]);
+    a nota agregada é calculada localmente com "dimension_weights".
+    """
+
+    index: int = Field(ge=1, description="Número da seção avaliada")
+    clarity: float = Field(ge=0.0, le=1.0, description="Clareza e objetividade (0-1)")
+    relevance: float = Field(ge=0.0, le=1.0, description="Relevância para professores (0-1)")
+    structure: float = Field(ge=0.0, le=1.0, description="Estrutura e organização (0-1)")
+    applicability: float = Field(ge=0.0, le=1.0, description="Aplicabilidade prática (0-1)")
+    language: float = Field(ge=0.0, le=1.0, description="Linguagem adequada (0-1)")
+    feedback: str = Field(min_length=3, description="Melhorias específicas para as dimensões mais fracas")
+
+    @field_validator("clarity", "relevance", "structure", "applicability", "language", mode="before")
+    @classmethod
+    def _normalize_score(cls, value):
+        return normalize_score(value)
+
+
+class SectionRewriteSchema(BaseModel):
+    """Seção reescrita pelo refinador"""
+
+    index: int = Field(ge=1, description="Número da seção reescrita")
+    content: str = Field(min_length=10, description="Texto completo da seção reescrita")
+
+    @field_validator("content", mode="before")
+    @classmethod
+    def _strip(cls, value):
+        return value.strip() if isinstance(value, str) else value
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def extract_json(text: Optional[str]) -> Any:
+    """
+    Extrai o primeiro valor JSON de uma resposta
+
+    Aceita JSON puro, blocos ```json``` e texto antes/depois do JSON.
+
+    Returns:
+        Valor decodificado ou None
+    """
+    if not text:
+        return None
+
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            value, _ = decoder.raw_decode(text, match.start())
+            return value
+        except ValueError:
+            continue
+
+    return None
+
+
+def salvage_objects(text: Optional[str], key: str) -> List[Dict]:
+    """
+    Recupera objetos completos de uma lista JSON truncada
+
+    Ex.: '{"options": [{...}, {...}, {"title": "Corta' → os 2 primeiros objetos
+    """
+    if not text:
+        return []
+
+    match = re.search(rf'"{re.escape(key)}"\s*:\s*\[', text) or re.search(r"\[", text)
+    if not match:
+        return []
+
+    decoder = json.JSONDecoder()
+    objects = []
+    position = match.end()
+    while True:
+        start = text.find("{", position)
+        if start == -1:
+            break
+        try:
+            value, end = decoder.raw_decode(text, start)
+        except ValueError:
+            break
+        if isinstance(value, dict):
+            objects.append(value)
+        position = end
+
+    return objects
+
+
+def validate_item(item: Any, schema: Type[BaseModel]) -> Tuple[Optional[Dict], Dict[str, str]]:
+    """
+    Valida um item contra o schema
+
+    Returns:
+        (item validado ou None, {campo: erro} dos campos inválidos)
+    """
+    if not isinstance(item, dict):
+        return None, {"__root__": "item não é um objeto JSON"}
+
+    try:
+        return schema.model_validate(item).model_dump(exclude_none=True), {}
+    except ValidationError as e:
+        errors = {}
+        for error in e.errors():
+            field = str(error["loc"][0]) if error["loc"] else "__root__"
+            errors.setdefault(field, error["msg"])
+        return None, errors
+
+
+class StructuredOutputParser:
+    """
+    Parser de respostas estruturadas com reparo direcionado
+
+    Uso:
+        parser = StructuredOutputParser(router, complexity)
+        options = parser.parse_list(response.content, ContentOptionSchema, key="options")
+        parser.report  # {parsed, valid, repaired, dropped, truncated}
+    """
+
+    def __init__(self, router: Optional[ModelRouter] = None, complexity: Optional[str] = None, max_repairs: int = 1):
+        self.router = router or ModelRouter()
+        self.complexity = complexity
+        self.max_repairs = max_repairs
+        self.report: Dict[str, int] = {}
+
+    def parse_list(
+        self,
+        content: str,
+        schema: Type[BaseModel],
+        key: str,
+        context: str = ""
+    ) -> List[Dict]:
+        """
+        Extrai e valida a lista `key` da resposta
+
+        Args:
+            content: Texto da resposta do LLM
+            schema: Schema de cada item
+            key: Chave da lista no objeto JSON (ou lista no topo)
+            context: Contexto curto para o prompt de reparo (ex.: título do briefing)
+
+        Returns:
+            Itens válidos (na ordem original)
+        """
+        payload = extract_json(content)
+        truncated = False
+
+        if isinstance(payload, dict):
+            items = payload.get(key)
+        else:
+            items = payload
+        if not isinstance(items, list):
+            items = salvage_objects(content, key)
+            truncated = bool(items)
+
+        self.report = {"parsed": len(items), "valid": 0, "repaired": 0, "dropped": 0, "truncated": int(truncated)}
+
+        results: List[Optional[Dict]] = []
+        broken: Dict[int, Dict[str, str]] = {}
+        for index, item in enumerate(items):
+            valid, errors = validate_item(item, schema)
+            results.append(valid)
+            if valid is None:
+                broken[index] = errors
+
+        if broken:
+            repaired = self._repair(items, broken, schema, context)
+            for index, item in repaired.items():
+                results[index] = item
+            self.report["repaired"] = len(repaired)
+
+        valid_items = [item for item in results if item is not None]
+        self.report["valid"] = len(valid_items) - self.report["repaired"]
+        self.report["dropped"] = len(items) - len(valid_items)
+
+        if broken or truncated:
+            print(
+                f"   → Saída estruturada: {self.report['valid']} válidas, "
+                f"{self.report['repaired']} reparadas, {self.report['dropped']} descartadas"
+                + (" (resposta truncada)" if truncated else "")
+            )
+
+        return valid_items
+
+    def parse_object(self, content: str, schema: Type[BaseModel], context: str = "") -> Optional[Dict]:
+        """Extrai e valida um objeto único (reparando campos inválidos)"""
+        payload = extract_json(content)
+        if isinstance(payload, list) and payload:
+            payload = payload[0]
+
+        valid, errors = validate_item(payload, schema)
+        self.report = {"parsed": int(payload is not None), "valid": int(valid is not None), "repaired": 0, "dropped": 0}
+        if valid is not None:
+            return valid
+
+        if not isinstance(payload, dict):
+            return None
+
+        repaired = self._repair([payload], {0: errors}, schema, context)
+        self.report["repaired"] = len(repaired)
+        self.report["dropped"] = 1 - len(repaired)
+        return repaired.get(0)
+
+    def _repair(
+        self,
+        items: List[Any],
+        broken: Dict[int, Dict[str, str]],
+        schema: Type[BaseModel],
+        context: str
+    ) -> Dict[int, Dict]:
+        """
+        Pede ao LLM apenas os campos inválidos de cada item quebrado
+
+        Returns:
+            {índice: item validado} dos itens reparados com sucesso
+        """
+        # Itens que não são objetos não têm o que reparar
+        pending = {i: errors for i, errors in broken.items() if isinstance(items[i], dict) and "__root__" not in errors}
+        repaired: Dict[int, Dict] = {}
+
+        for _ in range(self.max_repairs):
+            if not pending:
+                break
+
+            requests = [
+                {
+                    "index": index,
+                    "item": {k: v for k, v in items[index].items() if k not in errors},
+                    "fix": errors
+                }
+                for index, errors in pending.items()
+            ]
+            field_specs = {
+                name: field.description or name
+                for name, field in schema.model_fields.items()
+            }
+
+            messages = [
+                SystemMessage(content="Você corrige campos inválidos de objetos JSON. Responda APENAS com JSON."),
+                HumanMessage(content=f"""
+Contexto: {context or 'conteúdo de formação de professores'}
+
+Campos do schema: {json.dumps(field_specs, ensure_ascii=False)}
+
+Para cada item abaixo, gere valores válidos SOMENTE para os campos em "fix"
+(o erro de validação está indicado), coerentes com os demais campos do item.
+
+{json.dumps(requests, ensure_ascii=False)}
+
+Formato da resposta:
+{{"repairs": [{{"index": 0, "fields": {{"campo": "valor"}}}}]}}
+""")
+            ]
+
+            try:
+                response = self.router.invoke("repair", messages, self.complexity, temperature=0.2, json_mode=True)
+                payload = extract_json(response.content) or {}
+            except Exception as e:
+                print(f"   ⚠️ Erro no reparo de saída estruturada: {e}")
+                break
+
+            # Modelo pode responder lista/escalar no lugar do objeto pedido
+            if not isinstance(payload, dict):
+                payload = {}
+            repairs = payload.get("repairs")
+            fixes = {
+                repair.get("index"): repair["fields"]
+                for repair in (repairs if isinstance(repairs, list) else [])
+                if isinstance(repair, dict) and isinstance(repair.get("fields"), dict)
+            }
+
+            still_broken = {}
+            for index, errors in pending.items():
+                patch = {k: v for k, v in fixes.get(index, {}).items() if k in errors}
+                merged = {**items[index], **patch}
+                valid, new_errors = validate_item(merged, schema)
+                if valid is not None:
+                    repaired[index] = valid
+                else:
+                    items[index] = merged
+                    still_broken[index] = new_errors
+            pending = still_broken
+
+        return repaired
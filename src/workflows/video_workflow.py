@@ -1,15 +1,30 @@
 """
 Workflow LangGraph para geração de vídeo com state machine
 
-Estados: análise → geração → revisão → aprovação → produção
+Estados: análise → aprimoramento → validação → (áudio ‖ visuais) → renderização → revisão → aprovação → produção
+
+A validação pré-renderização (ScriptValidator) é barata: roteiros com
+narração curta/longa demais, poucas seções ou slides com texto demais voltam
+para o aprimoramento com o feedback antes de pagar TTS e renderização.
+
+Com a narração em streaming ligada, o aprimoramento já sintetiza o áudio
+parágrafo a parágrafo (NarrationStream) e generate_audio o reaproveita se o
+roteiro que passou na validação for o mesmo.
 """
-from typing import Dict, Literal, Optional
+import hashlib
+from typing import Dict, List, Literal, Optional, Union
 from datetime import datetime
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from src.config.workflows import VIDEO_WORKFLOW_CONFIG
 from src.workflows.states import VideoGenerationState
+from src.workflows.checkpointer import get_checkpointer
 from src.ml.llm_service import LLMService
+from src.ml.usage_tracker import usage_context
+from src.workflows.instrumentation import instrument_node, workflow_timings, summarize_timings
+from src.workflows.registry import compiled_graph, run_config, run_method
 from src.video.factory import VideoGeneratorFactory
+from src.video.script_validator import ScriptValidator
 
 class VideoGenerationWorkflow:
     """
@@ -20,7 +35,9 @@ class VideoGenerationWorkflow:
     def __init__(
         self, 
         generator_type: str = 'simple',
-        provider: Optional[str] = None
+        provider: Optional[str] = None,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        require_human_approval: Optional[bool] = None
     ):
         self.llm_service = LLMService()
         
@@ -31,40 +48,70 @@ class VideoGenerationWorkflow:
         )
         
         self.generator_type = generator_type
+        self.script_validator = ScriptValidator()
         
-        # Checkpointer para salvar estado
-        self.checkpointer = MemorySaver()
+        # Checkpointer persistente (SQLite): a aprovação humana pode ser
+        # retomada por outro worker/processo a partir do checkpoint
+        self.checkpointer = checkpointer or get_checkpointer(VIDEO_WORKFLOW_CONFIG["checkpoint_dir"])
         
-        # Criar grafo
-        self.graph = self._build_graph()
+        if require_human_approval is None:
+            require_human_approval = VIDEO_WORKFLOW_CONFIG["require_human_approval"]
+        self.require_human_approval = require_human_approval
+        
+        # Grafo compilado uma vez por processo e variante (src/workflows/registry.py);
+        # gerador, provider e LLMService desta instância chegam aos nós pelo config
+        self.graph = compiled_graph(
+            ("video_generation", self.require_human_approval, self.checkpointer),
+            lambda: self._build_graph(self.checkpointer, self.require_human_approval)
+        )
     
-    def _build_graph(self) -> StateGraph:
-        """Constrói a state machine"""
+    @staticmethod
+    def _build_graph(checkpointer: BaseCheckpointSaver, require_human_approval: bool) -> StateGraph:
+        """Constrói a state machine (sem dependências da execução)"""
         
         workflow = StateGraph(VideoGenerationState)
         
         # Adicionar nós (estados)
-        workflow.add_node("analyze_script", self._analyze_script_node)
-        workflow.add_node("enhance_script", self._enhance_script_node)
-        workflow.add_node("generate_audio", self._generate_audio_node)
-        workflow.add_node("generate_video", self._generate_video_node)
-        workflow.add_node("review", self._review_node)
-        workflow.add_node("await_approval", self._await_approval_node)
-        workflow.add_node("finalize", self._finalize_node)
+        workflow.add_node("analyze_script", instrument_node("analyze_script", run_method("_analyze_script_node")))
+        workflow.add_node("enhance_script", instrument_node("enhance_script", run_method("_enhance_script_node")))
+        workflow.add_node("validate_script", instrument_node("validate_script", run_method("_validate_script_node")))
+        workflow.add_node("generate_audio", instrument_node("generate_audio", run_method("_generate_audio_node")))
+        workflow.add_node("prepare_visuals", instrument_node("prepare_visuals", run_method("_prepare_visuals_node")))
+        workflow.add_node("generate_video", instrument_node("generate_video", run_method("_generate_video_node")))
+        workflow.add_node("review", instrument_node("review", run_method("_review_node")))
+        workflow.add_node("await_approval", instrument_node("await_approval", run_method("_await_approval_node")))
+        workflow.add_node("finalize", instrument_node("finalize", run_method("_finalize_node")))
         
         # Definir fluxo
         workflow.set_entry_point("analyze_script")
         
-        # Fluxo principal
+        # Fluxo principal: roteiro aprimorado passa pela validação pré-renderização;
+        # áudio (TTS) e visuais rodam em paralelo e a renderização espera os dois ramos
         workflow.add_edge("analyze_script", "enhance_script")
-        workflow.add_edge("enhance_script", "generate_audio")
-        workflow.add_edge("generate_audio", "generate_video")
+        workflow.add_edge("enhance_script", "validate_script")
+        workflow.add_conditional_edges(
+            "validate_script",
+            run_method("_after_validation"),
+            ["enhance_script", "generate_audio", "prepare_visuals"]
+        )
+        workflow.add_edge(["generate_audio", "prepare_visuals"], "generate_video")
         workflow.add_edge("generate_video", "review")
         
-        # Decisão após revisão
+        # Decisão após revisão (com aprovação humana, vídeo aprovado pausa antes de finalizar)
         workflow.add_conditional_edges(
             "review",
-            self._should_finalize,
+            run_method("_should_finalize"),
+            {
+                "finalize": "await_approval" if require_human_approval else "finalize",
+                "needs_revision": "enhance_script",
+                "rejected": END
+            }
+        )
+        
+        # Decisão humana (aplicada por resume() no checkpoint pausado)
+        workflow.add_conditional_edges(
+            "await_approval",
+            run_method("_after_approval"),
             {
                 "finalize": "finalize",
                 "needs_revision": "enhance_script",
@@ -74,14 +121,19 @@ class VideoGenerationWorkflow:
         
         workflow.add_edge("finalize", END)
         
-        return workflow.compile(checkpointer=self.checkpointer)
+        return workflow.compile(
+            checkpointer=checkpointer,
+            interrupt_after=["await_approval"] if require_human_approval else None
+        )
+    
+    # Os nós retornam só os campos que alteram: generate_audio e prepare_visuals
+    # rodam no mesmo passo, e `errors` é acumulado pelo reducer do estado.
     
-    def _analyze_script_node(self, state: VideoGenerationState) -> VideoGenerationState:
+    def _analyze_script_node(self, state: VideoGenerationState) -> Dict:
         """Estado 1: Análise do roteiro"""
         print("📋 Analisando roteiro...")
         
-        state['current_step'] = 'analyzing'
-        state['progress'] = 0.1
+        update = {'current_step': 'analyzing', 'progress': 0.1}
         
         try:
             # Análise simplificada do roteiro
@@ -106,85 +158,207 @@ class VideoGenerationWorkflow:
             if analysis["quality_indicators"]["has_conclusion"]:
                 quality += 0.15
             
-            state['script_analysis'] = analysis
-            state['quality_score'] = min(quality, 1.0)
+            update['script_analysis'] = analysis
+            update['quality_score'] = min(quality, 1.0)
             
-            print(f"   ✓ Qualidade inicial: {state['quality_score']:.2f}")
+            print(f"   ✓ Qualidade inicial: {update['quality_score']:.2f}")
             
         except Exception as e:
-            state['errors'].append(f"Erro na análise: {str(e)}")
+            update['errors'] = [f"Erro na análise: {str(e)}"]
         
-        return state
+        return update
     
-    def _enhance_script_node(self, state: VideoGenerationState) -> VideoGenerationState:
+    def _enhance_script_node(self, state: VideoGenerationState) -> Dict:
         """Estado 2: Aprimoramento do roteiro"""
         print("✨ Aprimorando roteiro...")
         
-        state['current_step'] = 'enhancing'
-        state['progress'] = 0.3
+        update = {'current_step': 'enhancing', 'progress': 0.3}
         
         try:
-            # Se já foi refinado, verificar feedback
-            if state['refinement_iterations'] > 0 and state.get('human_feedback'):
-                print(f"   → Aplicando feedback: {state['human_feedback'][:50]}...")
+            # Se já foi refinado, repassar o feedback (validação, revisão e revisor humano)
+            feedback = []
+            if state['refinement_iterations'] > 0:
+                feedback = list(state.get('revision_feedback') or [])
+                if state.get('human_feedback'):
+                    print(f"   → Aplicando feedback: {state['human_feedback'][:50]}...")
+                    feedback.append(f"Revisor: {state['human_feedback']}")
             
-            enhanced = self.llm_service.enhance_script(
-                state['script_outline'],
-                state['briefing_data']
-            )
+            narration = None
+            if state['refinement_iterations'] == 0 and state.get('speculative_script'):
+                # Aprimorado enquanto o gestor escolhia a opção: sem chamada LLM
+                print("   ⚡ Usando roteiro aprimorado antecipadamente (especulação)")
+                enhanced = state['speculative_script']
+            else:
+                narration = self._stream_narration(state, feedback)
+                if narration:
+                    enhanced = narration['script']
+                    if narration['audio_path'] is None:
+                        narration = None  # Reprovado (volta ao aprimoramento) ou falha do TTS (áudio em generate_audio)
+                else:
+                    enhanced = self.llm_service.enhance_script(
+                        state['script_outline'],
+                        state['briefing_data'],
+                        feedback=feedback or None
+                    )
             
-            state['enhanced_script'] = enhanced
-            state['refinement_iterations'] += 1
+            update['enhanced_script'] = enhanced
+            update['streamed_narration'] = {
+                'audio_path': narration['audio_path'],
+                'script_hash': self._script_hash(enhanced),
+                'paragraph_timings': narration['paragraph_timings'],
+                'llm_seconds': narration['llm_seconds'],
+                'total_seconds': narration['total_seconds']
+            } if narration else None
+            update['refinement_iterations'] = state['refinement_iterations'] + 1
             
             # 🔧 FIX: Recalcular qualidade após refinamento
             # A cada iteração, a qualidade deve melhorar
-            if state['refinement_iterations'] > 1:
+            if update['refinement_iterations'] > 1:
                 # Incrementar qualidade baseado em melhorias
                 improvement = 0.15  # +15% por iteração
-                state['quality_score'] = min(state['quality_score'] + improvement, 1.0)
-                print(f"   → Qualidade atualizada: {state['quality_score']:.2f}")
+                update['quality_score'] = min(state['quality_score'] + improvement, 1.0)
+                print(f"   → Qualidade atualizada: {update['quality_score']:.2f}")
             
-            print(f"   ✓ Roteiro aprimorado (iteração {state['refinement_iterations']})")
+            print(f"   ✓ Roteiro aprimorado (iteração {update['refinement_iterations']})")
             
         except Exception as e:
-            state['errors'].append(f"Erro no aprimoramento: {str(e)}")
-            state['enhanced_script'] = state['script_outline']  # Fallback
+            update['errors'] = [f"Erro no aprimoramento: {str(e)}"]
+            update['enhanced_script'] = state['script_outline']  # Fallback
         
-        return state
+        return update
     
-    def _generate_audio_node(self, state: VideoGenerationState) -> VideoGenerationState:
-        """Estado 3: Geração de áudio (TTS) - REMOVIDO"""
-        # O gerador agora cuida do TTS internamente
-        print("🎤 Áudio será gerado pelo video generator...")
+    def _stream_narration(self, state: VideoGenerationState, feedback: List[str]) -> Optional[Dict]:
+        """
+        Aprimoramento em streaming com a narração sintetizada em paralelo
+        
+        Returns:
+            Resultado do NarrationStream, ou None (desligado, gerador sem
+            suporte ou falha: o nó faz o aprimoramento normal)
+        """
+        if not VIDEO_WORKFLOW_CONFIG["streaming_narration"]["enabled"]:
+            return None
         
-        state['current_step'] = 'generating_audio'
-        state['progress'] = 0.5
+        stream = self.video_generator.narration_stream(self._video_metadata(state), state['video_id'])
+        if stream is None:
+            return None
         
-        return state
+        # Enquanto a validação ainda pode devolver o roteiro, ela roda antes do
+        # restante do TTS: roteiro reprovado não paga a narração inteira
+        accept = None
+        if (VIDEO_WORKFLOW_CONFIG["pre_render_validation"]["enabled"]
+                and state['refinement_iterations'] + 1 < state['max_iterations']):
+            accept = lambda script: self.script_validator.validate(script, state['briefing_data'])['valid']
+        
+        try:
+            return stream.run(self.llm_service.stream_enhance_script(
+                state['script_outline'],
+                state['briefing_data'],
+                feedback=feedback or None
+            ), accept=accept)
+        except Exception as e:
+            print(f"   ⚠️ Narração em streaming falhou ({e}), aprimorando sem streaming")
+            return None
     
-    def _generate_video_node(self, state: VideoGenerationState) -> VideoGenerationState:
-        """Estado 4: Geração do vídeo usando factory pattern"""
-        print(f"🎥 Gerando vídeo com {self.generator_type}...")
+    @staticmethod
+    def _script_hash(script: str) -> str:
+        return hashlib.sha1((script or "").encode("utf-8")).hexdigest()
+    
+    def _validate_script_node(self, state: VideoGenerationState) -> Dict:
+        """Estado 2b: Validação pré-renderização (sem TTS nem imagens)"""
+        update = {'current_step': 'validating_script', 'progress': 0.35}
+        
+        if not VIDEO_WORKFLOW_CONFIG["pre_render_validation"]["enabled"]:
+            update['script_validation'] = None
+            return update
         
-        state['current_step'] = 'generating_video'
-        state['progress'] = 0.7
+        print("🧪 Validando roteiro antes da renderização...")
+        
+        report = self.script_validator.validate(state['enhanced_script'], state['briefing_data'])
+        update['script_validation'] = report
+        
+        if report['valid']:
+            update['revision_feedback'] = []
+            print(f"   ✓ ~{report['estimated_duration']:.0f}s de narração, {report['sections']} seções")
+        else:
+            update['revision_feedback'] = report['issues']
+            for issue in report['issues']:
+                print(f"   ⚠️ {issue}")
+        
+        return update
+    
+    def _video_metadata(self, state: VideoGenerationState) -> Dict:
+        """Metadata do briefing repassada ao gerador"""
+        return {
+            'tone': state['briefing_data'].get('tone', 'profissional'),
+            'target_audience': state['briefing_data'].get('target_audience'),
+            'subject_area': state['briefing_data'].get('subject_area'),
+            'video_orientation': state['briefing_data'].get('video_orientation', 'horizontal')
+        }
+    
+    def _generate_audio_node(self, state: VideoGenerationState) -> Dict:
+        """Estado 3a: Geração de áudio (TTS), em paralelo com prepare_visuals"""
+        print(f"🎤 Gerando áudio ({self.generator_type})...")
+        
+        narration = state.get('streamed_narration')
+        if narration and narration['script_hash'] == self._script_hash(state['enhanced_script']):
+            print(f"   ⚡ Narração já sintetizada durante o aprimoramento: {narration['audio_path']}")
+            audio = {'audio_path': narration['audio_path'], 'paragraph_timings': narration['paragraph_timings']}
+            return {'audio_assets': audio, 'audio_path': narration['audio_path']}
         
         try:
-            # Preparar metadata
-            metadata = {
-                'tone': state['briefing_data'].get('tone', 'profissional'),
-                'target_audience': state['briefing_data'].get('target_audience'),
-                'subject_area': state['briefing_data'].get('subject_area'),
-                'video_orientation': state['briefing_data'].get('video_orientation', 'horizontal')
-            }
-            
-            # Gerar vídeo usando factory
-            result = self.video_generator.generate(
+            audio = self.video_generator.prepare_audio(
+                script=state['enhanced_script'],
+                metadata=self._video_metadata(state),
+                video_id=state['video_id']
+            )
+        except Exception as e:
+            print(f"   ✗ Falha no áudio: {e}")
+            return {'audio_assets': None, 'errors': [f"Erro na geração de áudio: {str(e)}"]}
+        
+        if audio is None:
+            print("   → Gerador sem etapa de áudio separada (feito na renderização)")
+            return {'audio_assets': None}
+        
+        print(f"   ✓ Áudio pronto: {audio.get('audio_path')}")
+        return {'audio_assets': audio, 'audio_path': audio.get('audio_path')}
+    
+    def _prepare_visuals_node(self, state: VideoGenerationState) -> Dict:
+        """Estado 3b: Slides/assets visuais, em paralelo com generate_audio"""
+        print(f"🖼️  Preparando visuais ({self.generator_type})...")
+        
+        try:
+            assets = self.video_generator.prepare_assets(
                 script=state['enhanced_script'],
                 title=state['briefing_data'].get('title', 'Video'),
-                metadata=metadata,
+                metadata=self._video_metadata(state),
                 video_id=state['video_id']
             )
+        except Exception as e:
+            print(f"   ✗ Falha nos visuais: {e}")
+            return {'visual_assets': None, 'errors': [f"Erro na preparação dos visuais: {str(e)}"]}
+        
+        if assets is None:
+            print("   → Gerador sem etapa de visuais separada (feito na renderização)")
+        else:
+            print(f"   ✓ Visuais prontos")
+        return {'visual_assets': assets}
+    
+    def _generate_video_node(self, state: VideoGenerationState) -> Dict:
+        """Estado 4: Renderização (junção dos ramos de áudio e visuais)"""
+        print(f"🎥 Gerando vídeo com {self.generator_type}...")
+        
+        update = {'current_step': 'generating_video', 'progress': 0.7}
+        
+        try:
+            # Renderizar com as etapas já preparadas (ou gerar o que faltar)
+            result = self.video_generator.render(
+                script=state['enhanced_script'],
+                title=state['briefing_data'].get('title', 'Video'),
+                metadata=self._video_metadata(state),
+                video_id=state['video_id'],
+                audio=state.get('audio_assets'),
+                assets=state.get('visual_assets')
+            )
             
             # 🔧 DEBUG: Log do resultado antes de atualizar o state
             print(f"   [DEBUG] result keys: {list(result.keys())}")
@@ -192,40 +366,30 @@ class VideoGenerationWorkflow:
             print(f"   [DEBUG] result['file_size'] = {result.get('file_size', 'NOT_IN_RESULT')}")
             
             if result['success']:
-                state['video_path'] = result['file_path']
-                state['thumbnail_path'] = result.get('thumbnail_path', '')
-                state['file_size'] = result.get('file_size', 0)
-                state['duration'] = result.get('duration', 0)
-                
-                # 🔧 DEBUG: Log do state após atualização
-                print(f"   [DEBUG] state['duration'] after update = {state['duration']}")
-                print(f"   [DEBUG] state['file_size'] after update = {state['file_size']}")
-                
-                # Adicionar metadata do gerador
-                if 'metadata' not in state:
-                    state['metadata'] = {}
-                state['metadata'].update(result.get('metadata', {}))
+                update['video_path'] = result['file_path']
+                update['thumbnail_path'] = result.get('thumbnail_path', '')
+                update['file_size'] = result.get('file_size', 0)
+                update['duration'] = result.get('duration', 0)
                 
                 print(f"   ✓ Vídeo gerado: {result['file_path']}")
                 print(f"   → Duração: {result['duration']:.1f}s")
                 print(f"   → Tamanho: {result['file_size'] / 1024 / 1024:.1f}MB")
             else:
                 error_msg = result.get('error', 'Erro desconhecido')
-                state['errors'].append(f"Erro na geração de vídeo: {error_msg}")
+                update['errors'] = [f"Erro na geração de vídeo: {error_msg}"]
                 print(f"   ✗ Falha na geração: {error_msg}")
             
         except Exception as e:
-            state['errors'].append(f"Erro na geração de vídeo: {str(e)}")
+            update['errors'] = [f"Erro na geração de vídeo: {str(e)}"]
             print(f"   ✗ Exceção: {e}")
         
-        return state
+        return update
     
-    def _review_node(self, state: VideoGenerationState) -> VideoGenerationState:
+    def _review_node(self, state: VideoGenerationState) -> Dict:
         """Estado 5: Revisão automática com aprovação inteligente"""
         print("🔍 Revisando vídeo...")
         
-        state['current_step'] = 'reviewing'
-        state['progress'] = 0.85
+        update = {'current_step': 'reviewing', 'progress': 0.85}
         
         # 🔧 DEBUG: Log do estado antes da revisão
         print(f"   [DEBUG] state['duration'] = {state.get('duration', 'NOT_SET')}")
@@ -239,56 +403,69 @@ class VideoGenerationWorkflow:
         # 1. Vídeo deve ter sido gerado com sucesso
         if not state.get('video_path'):
             feedback.append("Vídeo não foi gerado")
-            state['approval_status'] = 'rejected'
+            update['approval_status'] = 'rejected'
             print(f"   ❌ Vídeo não foi gerado")
         
         # 2. Verificar duração mínima (evitar vídeos vazios)
-        elif state.get('duration', 0) < 10:
-            feedback.append(f"Duração muito curta: {state.get('duration', 0):.1f}s")
-            state['approval_status'] = 'needs_revision'
-            print(f"   ⚠️ Duração muito curta: {state.get('duration', 0):.1f}s")
+        elif (state.get('duration') or 0) < 10:
+            feedback.append(f"Duração muito curta: {state.get('duration') or 0:.1f}s")
+            update['approval_status'] = 'needs_revision'
+            print(f"   ⚠️ Duração muito curta: {state.get('duration') or 0:.1f}s")
         
         # 3. Aprovar se passou nas verificações básicas
         # Não usar quality_score como critério de rejeição automática
         else:
-            state['approval_status'] = 'approved'
+            update['approval_status'] = 'approved'
             print(f"   ✅ Vídeo aprovado automaticamente")
             print(f"      → Duração: {state.get('duration', 0):.1f}s")
             print(f"      → Tamanho: {state.get('file_size', 0) / 1024 / 1024:.1f}MB")
             print(f"      → Qualidade: {state['quality_score']:.2f}")
         
-        state['revision_feedback'] = feedback
+        update['revision_feedback'] = feedback
         
-        return state
+        return update
     
-    def _await_approval_node(self, state: VideoGenerationState) -> VideoGenerationState:
+    def _await_approval_node(self, state: VideoGenerationState) -> Dict:
         """Estado 6: Aguardando aprovação humana (checkpoint)"""
         print("⏸️  Aguardando aprovação humana...")
         
-        state['current_step'] = 'awaiting_approval'
-        state['progress'] = 0.9
-        
-        # Este nó cria um checkpoint - o workflow pausa aqui
-        # e pode ser retomado depois que o humano aprovar
+        # O grafo é compilado com interrupt_after neste nó: o checkpoint é
+        # persistido e resume() continua daqui (finalize ou nova revisão)
         
         print(f"   → Video ID: {state['video_id']}")
-        print(f"   → Status: {state['approval_status']}")
         print(f"   → Checkpoint salvo")
         
-        return state
+        return {
+            'current_step': 'awaiting_approval',
+            'progress': 0.9,
+            'approval_status': 'awaiting_approval'
+        }
     
-    def _finalize_node(self, state: VideoGenerationState) -> VideoGenerationState:
+    def _finalize_node(self, state: VideoGenerationState) -> Dict:
         """Estado 7: Finalização"""
         print("✅ Finalizando...")
         
-        state['current_step'] = 'completed'
-        state['progress'] = 1.0
-        state['completed_at'] = datetime.utcnow()
-        
         print(f"   ✓ Vídeo concluído!")
         print(f"   → Caminho: {state.get('video_path', 'N/A')}")
         
-        return state
+        return {
+            'current_step': 'completed',
+            'progress': 1.0,
+            'completed_at': datetime.utcnow()
+        }
+    
+    def _after_validation(self, state: VideoGenerationState) -> Union[str, List[str]]:
+        """Roteiro reprovado volta ao aprimoramento; aprovado segue para áudio ‖ visuais"""
+        report = state.get('script_validation')
+        
+        if report and not report['valid']:
+            if state['refinement_iterations'] < state['max_iterations']:
+                print(f"   🔄 Roteiro reprovado na validação, aprimorando novamente "
+                      f"(iteração {state['refinement_iterations'] + 1}/{state['max_iterations']})")
+                return "enhance_script"
+            print(f"   ⚠️ Limite de iterações atingido, seguindo para a renderização (a revisão decide)")
+        
+        return ["generate_audio", "prepare_visuals"]
     
     def _should_finalize(self, state: VideoGenerationState) -> Literal["finalize", "needs_revision", "rejected"]:
         """Decide próximo passo após revisão com logging detalhado"""
@@ -312,13 +489,32 @@ class VideoGenerationWorkflow:
             print(f"   ❌ Vídeo rejeitado: {', '.join(state['revision_feedback'])}")
             return "rejected"
     
+    def _after_approval(self, state: VideoGenerationState) -> Literal["finalize", "needs_revision", "rejected"]:
+        """Decide próximo passo após a decisão humana"""
+        status = state['approval_status']
+        
+        if status == 'awaiting_approval':
+            # Ainda sem decisão: o grafo pausa (interrupt_after) e a rota é
+            # recalculada quando resume() grava a decisão
+            return "rejected"
+        elif status == 'approved':
+            print(f"   ✅ Aprovado pelo revisor, finalizando")
+            return "finalize"
+        elif status == 'needs_revision':
+            print(f"   🔄 Revisão solicitada pelo revisor")
+            return "needs_revision"
+        else:
+            print(f"   ❌ Vídeo rejeitado pelo revisor")
+            return "rejected"
+    
     def run(
         self, 
         video_id: int, 
         option_id: int, 
         briefing_data: Dict, 
         script_outline: str,
-        thread_id: str = None
+        thread_id: str = None,
+        speculative_script: Optional[str] = None
     ) -> Dict:
         """
         Executa o workflow de geração de vídeo
@@ -329,6 +525,7 @@ class VideoGenerationWorkflow:
             briefing_data: Dados do briefing
             script_outline: Roteiro esboçado
             thread_id: ID da thread (para retomar checkpoint)
+            speculative_script: Roteiro já aprimorado (pula a 1ª chamada de enhance_script)
         
         Returns:
             Resultado e estado final
@@ -340,10 +537,15 @@ class VideoGenerationWorkflow:
             "option_id": option_id,
             "briefing_data": briefing_data,
             "script_outline": script_outline,
+            "speculative_script": speculative_script,
             "script_analysis": None,
             "quality_score": 0.0,
             "enhanced_script": None,
+            "script_validation": None,
             "audio_path": None,
+            "audio_assets": None,
+            "streamed_narration": None,
+            "visual_assets": None,
             "video_path": None,
             "thumbnail_path": None,
             "duration": None,  # 🔧 FIX: Adicionar duration ao estado inicial
@@ -356,62 +558,29 @@ class VideoGenerationWorkflow:
             "current_step": "initializing",
             "progress": 0.0,
             "errors": [],
-            "checkpoints": [],
             "started_at": datetime.utcnow(),
             "completed_at": None
         }
         
-        # Config para checkpointing
-        config = {
-            "configurable": {
-                "thread_id": thread_id or f"video_{video_id}"
-            }
-        }
+        # Config da execução: thread do checkpoint + esta instância (dependências dos nós)
+        config = run_config(self, thread_id=thread_id or f"video_{video_id}")
         
         print(f"\n🎬 Iniciando workflow de geração de vídeo #{video_id}")
         print("=" * 60)
         
         try:
+            # Nova execução: descartar checkpoints anteriores da thread (ex.: retry
+            # da task), senão o reducer de `errors` acumularia erros antigos
+            self.checkpointer.delete_thread(config["configurable"]["thread_id"])
+            
             # Executar workflow com checkpoint
-            final_state = self.graph.invoke(initial_state, config)
+            with usage_context(workflow="video_generation", video_id=video_id), \
+                    workflow_timings("video_generation") as timings:
+                final_state = self.graph.invoke(initial_state, config)
             
             print("=" * 60)
             
-            # 🔧 FIX: Adicionar mais contexto quando não completa
-            success = final_state['current_step'] == 'completed'
-            
-            result = {
-                "success": success,
-                "video_path": final_state.get('video_path'),
-                "thumbnail_path": final_state.get('thumbnail_path'),
-                "status": final_state['approval_status'],
-                "metadata": {
-                    "video_id": video_id,
-                    "current_step": final_state['current_step'],
-                    "progress": final_state['progress'],
-                    "refinement_iterations": final_state['refinement_iterations'],
-                    "quality_score": final_state['quality_score'],
-                    "errors": final_state['errors'],
-                    "thread_id": config["configurable"]["thread_id"],
-                    "file_size": final_state.get('file_size', 0),
-                    "duration": final_state.get('duration', 0)
-                }
-            }
-            
-            # Se não completou, adicionar razão detalhada
-            if not success:
-                if final_state['approval_status'] == 'rejected':
-                    result['error'] = f"Vídeo rejeitado após {final_state['refinement_iterations']} iterações"
-                elif final_state['approval_status'] == 'needs_revision':
-                    result['error'] = f"Limite de iterações ({final_state['max_iterations']}) atingido"
-                else:
-                    result['error'] = f"Workflow interrompido no estado: {final_state['current_step']}"
-                
-                # Adicionar feedback de revisão
-                if final_state.get('revision_feedback'):
-                    result['error'] += f" - {', '.join(final_state['revision_feedback'])}"
-            
-            return result
+            return self._build_result(final_state, config["configurable"]["thread_id"], timings)
             
         except Exception as e:
             print(f"❌ Erro no workflow: {e}")
@@ -420,45 +589,101 @@ class VideoGenerationWorkflow:
                 "error": str(e)
             }
     
+    def _build_result(
+        self,
+        final_state: VideoGenerationState,
+        thread_id: str,
+        timings: List[Dict],
+        resumed: bool = False
+    ) -> Dict:
+        """Resultado de run()/resume() a partir do estado final (ou pausado)"""
+        
+        # 🔧 FIX: Adicionar mais contexto quando não completa
+        success = final_state['current_step'] == 'completed'
+        
+        result = {
+            "success": success,
+            "video_path": final_state.get('video_path'),
+            "thumbnail_path": final_state.get('thumbnail_path'),
+            "status": final_state['approval_status'],
+            "metadata": {
+                "video_id": final_state['video_id'],
+                "current_step": final_state['current_step'],
+                "progress": final_state['progress'],
+                "refinement_iterations": final_state['refinement_iterations'],
+                "quality_score": final_state['quality_score'],
+                "errors": final_state['errors'],
+                "thread_id": thread_id,
+                "file_size": final_state.get('file_size', 0),
+                "duration": final_state.get('duration', 0),
+                "script_validation": final_state.get('script_validation'),
+                "streamed_narration": final_state.get('streamed_narration'),
+                "node_timings": summarize_timings(timings)
+            }
+        }
+        if resumed:
+            result['metadata']['resumed'] = True
+        
+        # Se não completou (e não está só aguardando aprovação), adicionar razão detalhada
+        if not success and final_state['approval_status'] != 'awaiting_approval':
+            if final_state['approval_status'] == 'rejected':
+                result['error'] = f"Vídeo rejeitado após {final_state['refinement_iterations']} iterações"
+            elif final_state['approval_status'] == 'needs_revision':
+                result['error'] = f"Limite de iterações ({final_state['max_iterations']}) atingido"
+            else:
+                result['error'] = f"Workflow interrompido no estado: {final_state['current_step']}"
+            
+            # Adicionar feedback de revisão
+            if final_state.get('revision_feedback'):
+                result['error'] += f" - {', '.join(final_state['revision_feedback'])}"
+        
+        return result
+    
     def resume(self, thread_id: str, approval_status: str, feedback: str = None) -> Dict:
         """
         Retoma workflow pausado após aprovação humana
         
+        O estado vem do checkpoint persistido: aprovação executa só o nó
+        finalize; revisão volta para enhance_script com o feedback.
+        
         Args:
-            thread_id: ID da thread salva
+            thread_id: ID da thread salva (video_{video_id})
             approval_status: 'approved', 'rejected', 'needs_revision'
             feedback: Feedback humano opcional
         
         Returns:
-            Resultado atualizado
+            Resultado atualizado (mesmo formato de run())
         """
         
-        config = {
-            "configurable": {
-                "thread_id": thread_id
-            }
-        }
+        config = run_config(self, thread_id=thread_id)
         
         print(f"\n🔄 Retomando workflow: {thread_id}")
         print(f"   Status: {approval_status}")
         if feedback:
             print(f"   Feedback: {feedback[:100]}...")
         
-        # Atualizar estado com aprovação
-        # (simplificado - em produção usar update_state do LangGraph)
-        current_state = self.graph.get_state(config)
-        current_state.values['approval_status'] = approval_status
-        if feedback:
-            current_state.values['human_feedback'] = feedback
+        snapshot = self.graph.get_state(config)
+        if not snapshot.values or snapshot.values.get('current_step') != 'awaiting_approval':
+            return {
+                "success": False,
+                "error": f"Nenhum checkpoint aguardando aprovação para {thread_id}"
+            }
         
-        # Continuar execução
-        result = self.graph.invoke(None, config)
+        # Registrar a decisão como saída de await_approval e continuar dali
+        update = {'approval_status': approval_status}
+        if feedback:
+            update['human_feedback'] = feedback
+        self.graph.update_state(config, update, as_node="await_approval")
         
-        return {
-            "success": result.get('current_step') == 'completed',
-            "status": result.get('approval_status'),
-            "metadata": {
-                "thread_id": thread_id,
-                "resumed": True
+        try:
+            with usage_context(workflow="video_generation", video_id=snapshot.values['video_id']), \
+                    workflow_timings("video_generation") as timings:
+                final_state = self.graph.invoke(None, config)
+        except Exception as e:
+            print(f"❌ Erro ao retomar workflow: {e}")
+            return {
+                "success": False,
+                "error": str(e)
             }
-        }
+        
+        return self._build_result(final_state, thread_id, timings, resumed=True)
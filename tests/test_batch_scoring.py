@@ -0,0 +1,45 @@
+"""
+Testes para o scoring em lote de opções
+"""
+from src.ml.batch_scoring import BatchScorer, TermMatrix
+from src.workflows.briefing_agents import ContentRankerAgent
+
+BRIEFING = {
+    'training_goal': 'Mediação de conflitos entre alunos',
+    'duration_minutes': 5,
+    'tone': 'prático'
+}
+
+OPTIONS = [
+    {'summary': 'Técnicas de mediação de conflitos com alunos', 'estimated_duration': 300, 'tone': 'prático'},
+    {'summary': 'Planejamento anual da escola', 'estimated_duration': 420, 'tone': 'formal'},
+]
+
+def test_term_matrix_counts_repeated_terms():
+    """Contagens e frequência de documentos na matriz esparsa"""
+    matrix = TermMatrix([["a", "b", "a"], ["b"]])
+    assert matrix.columns(["a", "b", "z"]).tolist() == [[2.0, 1.0, 0.0], [0.0, 1.0, 0.0]]
+    assert matrix.doc_freq().tolist() == [1, 2]
+
+def test_legacy_relevance_uses_word_overlap():
+    """Modo legacy: palavras em comum com o objetivo (até +0.3) e tom, opção a opção"""
+    ranker = ContentRankerAgent(router=object())
+    ranker.relevance_mode = "legacy"
+    ranked = ranker.rank_options([dict(o) for o in OPTIONS], BRIEFING)
+    # mediação, de, conflitos, alunos → +0.3 (limite); tom igual → +0.2
+    assert [o['relevance_score'] for o in ranked] == [1.0, 0.5]
+
+def test_similarity_is_bounded_and_zero_without_shared_terms():
+    """BM25 e TF-IDF em 0-1; opção sem termos do objetivo fica em 0"""
+    scorer = BatchScorer(OPTIONS)
+    for mode in ("bm25", "tfidf"):
+        similarity = scorer.goal_similarity(BRIEFING['training_goal'], mode)
+        assert 0.0 < similarity[0] <= 1.0 and similarity[1] == 0.0
+
+def test_bm25_ranks_matching_option_first():
+    """Modo BM25 ignora stopwords/acentos e ordena pela similaridade com o objetivo"""
+    ranker = ContentRankerAgent(router=object())
+    ranker.relevance_mode = "bm25"
+    ranked = ranker.rank_options([dict(o) for o in OPTIONS], BRIEFING)
+    assert ranked[0]['summary'] == OPTIONS[0]['summary']
+    assert 0.5 < ranked[0]['relevance_score'] <= 1.0
@@ -0,0 +1,93 @@
+"""
+Testes para a reposição das opções descartadas pelo filtro do briefing
+"""
+import json
+import pytest
+from langchain_core.messages import AIMessage
+from src.workflows.briefing_workflow import BriefingAnalysisWorkflow, REGENERATION
+from src.workflows.model_router import ModelRouter
+
+BRIEFING = {
+    'title': 'Gestão de Conflitos em Sala de Aula',
+    'target_audience': 'Professores de Ensino Fundamental',
+    'training_goal': 'Desenvolver habilidades de mediação de conflitos',
+    'duration_minutes': 5,
+    'tone': 'prático'
+}
+
+def option(title, summary="Vídeo prático sobre mediação de conflitos entre alunos na escola."):
+    return {
+        "title": title,
+        "summary": summary,
+        "script_outline": "Abertura → Caso real → Estratégias de mediação → Síntese",
+        "key_points": "escuta ativa; acordos; rotina",
+        "estimated_duration": 300,
+        "tone": "prático",
+        "approach": "Casos reais"
+    }
+
+class ScriptedRouter(ModelRouter):
+    """Roteador com respostas pré-definidas (registra prompts e tokens por chamada)"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+        self.prompts = []
+
+    def invoke(self, agent, messages, complexity=None, temperature=0.7, json_mode=False):
+        self.prompts.append(messages[-1].content)
+        self.decisions.append({"agent": agent, "model": "stub", "input_tokens": 600, "output_tokens": 400})
+        return AIMessage(content=json.dumps(self.responses.pop(0), ensure_ascii=False))
+
+def make_workflow(responses):
+    workflow = BriefingAnalysisWorkflow(profile="fast")
+    router = ScriptedRouter(responses)
+    workflow.router = router
+    for agent in (workflow.analyzer, workflow.generator, workflow.filter, workflow.ranker):
+        agent.router = router
+    return workflow, router
+
+FIRST = {
+    "analysis": {"objective": "Mediação de conflitos"},
+    "options": [
+        option("Mediação na Prática"),
+        option("Violência na Escola", "Vídeo sobre violência entre alunos e como punir os envolvidos."),
+        option("Acordos de Turma"),
+        option("Caso Real de Conflito", "Relato de violência no recreio sem proposta de mediação."),
+    ]
+}
+
+def test_only_missing_options_are_regenerated_with_reasons():
+    workflow, router = make_workflow([
+        FIRST,
+        {"options": [option("Escuta Ativa com a Turma"), option("Círculos de Diálogo")]}
+    ])
+
+    result = workflow.run(1, BRIEFING)
+
+    titles = {o['title'] for o in result['options']}
+    assert titles == {"Mediação na Prática", "Acordos de Turma", "Escuta Ativa com a Turma", "Círculos de Diálogo"}
+    assert len(router.prompts) == 2
+
+    prompt = router.prompts[1]
+    assert "2 proposta(s)" in prompt and "violência" in prompt
+    assert "- Mediação na Prática" in prompt  # Aceitas enviadas para não repetir
+
+    stats = result['metadata']['regeneration']
+    assert (stats['rounds'], stats['requested'], stats['accepted'], stats['stopped']) == (1, 2, 2, None)
+    assert stats['tokens'] == 1000
+    assert len(result['metadata']['rejected_options']) == 2
+
+@pytest.mark.parametrize("setting, value, reason", [
+    ("token_budget", 500, "token_budget"),
+    ("deadline_seconds", 0, "deadline"),
+])
+def test_regeneration_respects_budget_and_deadline(monkeypatch, setting, value, reason):
+    monkeypatch.setitem(REGENERATION, setting, value)
+    workflow, router = make_workflow([FIRST])
+
+    result = workflow.run(1, BRIEFING)
+
+    assert len(router.prompts) == 1
+    assert len(result['options']) == 2
+    assert result['metadata']['regeneration']['stopped'] == reason
@@ -0,0 +1,101 @@
+"""
+Testes para a validação em etapas dos guardrails
+"""
+import json
+import threading
+import time
+from src.ml.content_guardrails import ContentGuardrails
+
+class CountingLLM:
+    """LLMService falso que conta as chamadas"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, messages, temperature=0.7, response_format=None, max_tokens=None, agent="chat"):
+        self.calls += 1
+        return json.dumps({"is_valid": True, "reason": "Tema de formação docente", "confidence": 0.8})
+
+class MemoryRedis:
+    """Subconjunto do cliente Redis usado pelo cache de vereditos"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def exists(self, key):
+        return int(key in self.data)
+
+def test_keyword_screen_does_not_need_llm():
+    """Briefings com keywords suficientes são decididos sem criar o LLMService"""
+    guardrails = ContentGuardrails()
+    verdict = guardrails.screen_briefing(
+        "Alfabetização na educação infantil",
+        "Metodologia de leitura e escrita para professores",
+        "Alfabetização",
+        "Professores"
+    )
+    assert verdict[0] is True
+    assert guardrails._llm_service is None
+    assert guardrails.screen_briefing("Oficina de xadrez", "Jogadas de abertura") is None
+
+def test_llm_verdict_is_cached_by_content():
+    """Mesmo conteúdo (ignorando caixa e espaços) consulta o LLM uma única vez"""
+    ContentGuardrails._verdict_cache.clear()
+    llm = CountingLLM()
+    guardrails = ContentGuardrails(llm_service=llm, redis_client=MemoryRedis())
+
+    first = guardrails.confirm_with_llm("Oficina de xadrez", "Jogadas de abertura")
+    second = guardrails.confirm_with_llm("oficina de  XADREZ", "Jogadas de abertura ")
+
+    assert first == second == (True, "Aprovado por análise contextual (LLM)", 0.70)
+    assert llm.calls == 1
+
+
+def test_llm_verdict_is_shared_through_redis():
+    """Veredito gravado pela API é reaproveitado pelo worker (outro processo, LRU vazio)"""
+    ContentGuardrails._verdict_cache.clear()
+    shared = MemoryRedis()
+    api_llm, worker_llm = CountingLLM(), CountingLLM()
+
+    ContentGuardrails(llm_service=api_llm, redis_client=shared).confirm_with_llm("Oficina de xadrez", "Jogadas")
+    ContentGuardrails._verdict_cache.clear()
+    verdict = ContentGuardrails(llm_service=worker_llm, redis_client=shared).confirm_with_llm("Oficina de xadrez", "Jogadas")
+
+    assert verdict[0] is True
+    assert (api_llm.calls, worker_llm.calls) == (1, 0)
+    assert not [key for key in shared.data if key.startswith("guardrails:pending:")]
+
+def test_worker_waits_for_verdict_still_running_in_api():
+    """Chamada da rota que estourou o timeout segue em andamento: o worker espera por ela"""
+    ContentGuardrails._verdict_cache.clear()
+    shared = MemoryRedis()
+    api = ContentGuardrails(llm_service=CountingLLM(), redis_client=shared)
+    cache_key = api.content_hash("Oficina de xadrez", "Jogadas", "", "")
+    shared.set(f"guardrails:pending:{cache_key}", "1")
+
+    def finish_api_call():
+        time.sleep(0.3)
+        api._ask_llm(cache_key, "Oficina de xadrez", "Jogadas", "", "")
+        ContentGuardrails._verdict_cache.clear()
+        shared.delete(f"guardrails:pending:{cache_key}")
+
+    thread = threading.Thread(target=finish_api_call)
+    thread.start()
+    worker_llm = CountingLLM()
+    verdict = ContentGuardrails(llm_service=worker_llm, redis_client=shared).confirm_with_llm("Oficina de xadrez", "Jogadas")
+    thread.join()
+
+    assert verdict[0] is True
+    assert worker_llm.calls == 0
@@ -0,0 +1,34 @@
+"""
+Testes para o provider LLM fake
+"""
+import json
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.ml.fake_llm import FakeChatModel, FakeLLMEngine, FakeLLMError
+from src.workflows.structured_output import validate_item, ContentOptionSchema
+
+PROMPT = [
+    SystemMessage(content="Gere 4 propostas DIFERENTES de vídeos de capacitação"),
+    HumanMessage(content='**Briefing:**\nGestão de Conflitos\n- Duração alvo: 5 minutos\n{"options": [...]}')
+]
+
+def test_same_prompt_same_answer_and_valid_schema():
+    """Resposta determinística e compatível com o schema de opções"""
+    llm = FakeChatModel(model_name="gpt-4o-mini").bind(response_format={"type": "json_object"})
+
+    first = llm.invoke(PROMPT)
+    second = llm.invoke(PROMPT)
+
+    assert first.content == second.content
+    assert first.usage_metadata["input_tokens"] > 0
+
+    options = json.loads(first.content)["options"]
+    assert len(options) == 4
+    assert all(validate_item(option, ContentOptionSchema)[0] for option in options)
+    assert options[0]["estimated_duration"] in (240, 300, 330)
+
+def test_failure_rate():
+    """Taxa de falha 1.0 sempre levanta erro simulado"""
+    engine = FakeLLMEngine(latency_ms=0, jitter_ms=0, failure_rate=1.0, seed=1)
+    with pytest.raises(FakeLLMError):
+        engine.complete([{"role": "user", "content": "oi"}])
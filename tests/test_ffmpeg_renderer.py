@@ -0,0 +1,97 @@
+"""
+Testes para a renderização de slides direto no ffmpeg
+"""
+import subprocess
+import wave
+
+import billiard
+import numpy as np
+import pytest
+from imageio_ffmpeg import count_frames_and_secs
+from PIL import Image
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from src.config.workflows import VIDEO_RENDER_CONFIG
+from src.video.ffmpeg_renderer import FFmpegSlideRenderer, SegmentedSlideRenderer
+from src.video.generator import VideoGenerator
+
+COLORS = [(200, 40, 40), (40, 200, 40), (40, 40, 200)]
+
+
+def frame_at(renderer, video_path, seconds, tmp_path):
+    frame_path = tmp_path / f"frame_{seconds}.png"
+    subprocess.run([renderer.binary, "-y", "-loglevel", "error", "-ss", str(seconds), "-i", str(video_path),
+                    "-frames:v", "1", str(frame_path)], check=True)
+    return np.asarray(Image.open(frame_path).convert("RGB"), dtype=float).mean(axis=(0, 1))
+
+
+def write_silence(audio_path, seconds):
+    with wave.open(str(audio_path), "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(16000)
+        audio.writeframes(b"\x00\x00" * 16000 * seconds)
+
+
+@pytest.mark.parametrize("renderer_class,raw_frames", [
+    (FFmpegSlideRenderer, False),
+    (SegmentedSlideRenderer, False),
+    (FFmpegSlideRenderer, True),  # Frames RGB em memória pelo pipe, sem PNG
+])
+def test_slides_and_narration_render_with_ffmpeg(tmp_path, renderer_class, raw_frames):
+    slides = [Image.new("RGB", (320, 180), color) for color in COLORS]
+    slide_paths = []
+    for index, slide in enumerate(slides):
+        slide_path = tmp_path / f"slide_{index:02d}.png"
+        if not raw_frames:
+            slide.save(slide_path)
+        slide_paths.append(str(slide_path))
+
+    audio_path = tmp_path / "audio.wav"
+    write_silence(audio_path, 3)  # 3s de silêncio
+
+    renderer = renderer_class()
+    output_path = tmp_path / "video.mp4"
+    if raw_frames:
+        result = renderer.render_frames(iter(slides), len(slides), str(audio_path), str(output_path))
+    else:
+        result = renderer.render(slide_paths, str(audio_path), str(output_path))
+
+    infos = ffmpeg_parse_infos(str(output_path))
+    assert abs(result["duration"] - 3.0) < 0.05
+    assert abs(infos["duration"] - 3.0) < 0.1
+    assert infos["video_size"] == [320, 180] and infos["video_fps"] == 24
+    assert infos["audio_found"]
+    assert count_frames_and_secs(str(output_path))[0] == 72  # 3s × 24fps, sem frame sobrando nas junções
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name.startswith("video")) == ["video.mp4"]
+
+    # Cada seção mostra o seu slide; a fronteira entre seções passa pelo preto
+    for index, color in enumerate(COLORS):
+        assert np.abs(frame_at(renderer, output_path, index + 0.5, tmp_path) - color).max() < 20
+    assert frame_at(renderer, output_path, 1.0, tmp_path).max() < 20
+
+
+def _generate_in_daemon(output_dir, audio_path, results):
+    """VideoGenerator legado dentro de um processo daemônico (worker prefork do Celery)"""
+    VIDEO_RENDER_CONFIG["slide_workers"] = 2  # Pediria um pool se o processo pudesse ter filhos
+    generator = VideoGenerator()
+    generator.output_dir = output_dir
+    try:
+        results.put(generator.generate_video("Primeira cena.\n\nSegunda cena.\n\nTerceira cena.", audio_path, {}, 7))
+    except Exception as e:
+        results.put(repr(e))
+
+
+def test_legacy_generator_streams_scenes_inside_prefork_worker(tmp_path):
+    audio_path = tmp_path / "audio.wav"
+    write_silence(audio_path, 3)
+
+    results = billiard.Queue()
+    process = billiard.Process(target=_generate_in_daemon, args=(str(tmp_path), str(audio_path), results), daemon=True)
+    process.start()
+    result = results.get(timeout=120)
+    process.join(timeout=10)
+
+    assert isinstance(result, dict), result
+    assert count_frames_and_secs(result["file_path"])[0] == 72
+    assert (tmp_path / "thumb_7.jpg").exists()
@@ -0,0 +1,67 @@
+"""
+Testes para a instrumentação por nó dos workflows
+"""
+import re
+from typing import List, TypedDict
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, END
+from src.ml.usage_tracker import track_llm_call
+from src.workflows.instrumentation import (
+    NODE_METRICS,
+    instrument_node,
+    workflow_timings,
+    summarize_timings,
+    write_textfile
+)
+
+class _State(TypedDict):
+    text: str
+    errors: List[str]
+
+def _fake_call():
+    return AIMessage(content="ok", usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+
+def _analyze(state):
+    track_llm_call("analyzer", "small-model", _fake_call)
+    track_llm_call("analyzer", "small-model", _fake_call)
+    return state
+
+def _review(state):
+    state["errors"].append("Duração muito curta")
+    return state
+
+def _build_graph():
+    graph = StateGraph(_State)
+    graph.add_node("analyze", instrument_node("analyze", _analyze))
+    graph.add_node("review", instrument_node("review", _review))
+    graph.set_entry_point("analyze")
+    graph.add_edge("analyze", "review")
+    graph.add_edge("review", END)
+    return graph.compile()
+
+def test_node_timings_summary_and_prometheus_export(tmp_path):
+    NODE_METRICS.reset()
+
+    with workflow_timings("briefing_analysis") as timings:
+        _build_graph().invoke({"text": "x", "errors": []})
+
+    summary = summarize_timings(timings)
+    assert set(summary) == {"analyze", "review"}
+    assert summary["analyze"]["llm_calls"] == 2
+    assert summary["analyze"]["tokens"] == 240
+    assert summary["analyze"]["outcomes"] == {"ok": 1}
+    assert summary["review"]["outcomes"] == {"error": 1}
+    assert summary["analyze"]["wall_ms"] >= 0 and summary["analyze"]["cpu_ms"] >= 0
+
+    text = write_textfile(tmp_path).read_text()
+    labels = 'workflow="briefing_analysis",node="analyze",outcome="ok"'
+    assert f"ensinalab_workflow_node_llm_calls_total{{{labels}}} 2" in text
+    assert f'ensinalab_workflow_node_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"ensinalab_workflow_node_duration_seconds_count{{{labels}}} 1" in text
+    assert "# TYPE ensinalab_workflow_node_cpu_seconds histogram" in text
+
+    # Buckets cumulativos (não decrescentes) até o +Inf
+    buckets = [int(v) for v in re.findall(
+        rf'ensinalab_workflow_node_duration_seconds_bucket\{{{labels},le="[^"]+"\}} (\d+)', text
+    )]
+    assert buckets == sorted(buckets) and buckets[-1] == 1
@@ -0,0 +1,27 @@
+"""
+Testes para o matcher de palavras-chave dos guardrails
+"""
+from src.ml.content_guardrails import ContentGuardrails
+from src.ml.keyword_matcher import KeywordMatcher, SAFETY_MATCHER
+
+def test_word_boundaries_accents_and_plurals():
+    """Casa palavras inteiras, sem acento e no plural"""
+    matcher = KeywordMatcher({'professor', 'avaliação', 'gestor escolar', 'eja'})
+    found = matcher.matched_keywords("PROFESSORES e gestores escolares discutem avaliacoes; quem deseja?")
+    assert found == ['professor', 'gestor escolar', 'avaliação']
+
+def test_contained_keywords_are_reported():
+    """'educação física' também conta 'educação'"""
+    matcher = KeywordMatcher({'educação', 'educação física'})
+    assert set(matcher.matched_keywords("Aulas de Educação Física")) == {'educação', 'educação física'}
+
+def test_guardrails_no_longer_flag_substrings():
+    """'episódio' não dispara a keyword proibida 'ódio'"""
+    found = ContentGuardrails.KEYWORD_MATCHER.matched_keywords("Episódio 3: leitura com professores")
+    assert 'ódio' not in found
+    assert 'professor' in found
+
+def test_safety_matcher_splits_hyphens():
+    """'político-partidário' é bloqueado com ou sem hífen"""
+    assert SAFETY_MATCHER.contains_any("Debate político partidário na escola")
+    assert not SAFETY_MATCHER.contains_any("Política de convivência escolar")
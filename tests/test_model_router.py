@@ -0,0 +1,47 @@
+"""
+Testes para o roteamento de modelos dos agentes
+"""
+from src.config.settings import settings
+from src.workflows.model_router import ModelRouter
+
+ROUTING = {
+    "enabled": True,
+    "models": {"small": "small-model", "large": None},
+    "default_tier": "médio",
+    "tiers": {
+        "simples": {"analyzer": {"model": "small", "max_tokens": 600}},
+        "médio": {"analyzer": {"model": "small", "max_tokens": 800}},
+        "complexo": {"analyzer": {"model": "large", "max_tokens": 1000}}
+    }
+}
+
+def test_assess_complexity_by_duration():
+    """Complexidade segue a duração do briefing"""
+    assert ModelRouter.assess_complexity({"duration_minutes": 3}) == "simples"
+    assert ModelRouter.assess_complexity({"duration_minutes": 5}) == "médio"
+    assert ModelRouter.assess_complexity({"duration_minutes": 12}) == "complexo"
+
+def test_route_by_tier():
+    """Briefings simples vão para o modelo pequeno, complexos para o grande"""
+    router = ModelRouter(ROUTING)
+    
+    simple = router.route("analyzer", "simples")
+    assert simple["model"] == "small-model"
+    assert simple["max_tokens"] == 600
+    
+    complex_ = router.route("analyzer", "complexo")
+    assert complex_["model"] == settings.OPENAI_MODEL
+    assert complex_["max_tokens"] == 1000
+
+def test_route_unknown_tier_uses_default():
+    """Nível desconhecido cai no nível padrão"""
+    router = ModelRouter(ROUTING)
+    decision = router.route("analyzer", None)
+    assert decision["complexity"] == "médio"
+    assert decision["max_tokens"] == 800
+
+def test_route_disabled_keeps_legacy_models():
+    """Com roteamento desabilitado, mantém os modelos anteriores"""
+    router = ModelRouter({**ROUTING, "enabled": False})
+    assert router.route("evaluator", "complexo")["model"] == "gpt-3.5-turbo"
+    assert router.route("generator", "simples")["model"] == settings.OPENAI_MODEL
@@ -0,0 +1,110 @@
+"""
+Testes para o refinamento por seção
+"""
+import json
+import re
+import pytest
+from langchain_core.messages import AIMessage
+from src.utils.text_sections import split_sections, join_sections
+from src.workflows.refinement_workflow import ContentRefinementWorkflow
+
+SCRIPT = "CENA 1:\nAbertura com um caso real.\n\nCENA 2:\nConceito central.\n\nDetalhe do conceito.\n\nCENA 3:\nSíntese e desafio."
+
+class ScriptedRouter:
+    """Avalia toda seção com nota fixa e reescreve as seções pedidas"""
+
+    def __init__(self, score: float, weak: str = "applicability"):
+        self.score = score
+        self.weak = weak
+        self.prompts = []
+        self.evaluated = []
+        self.decisions = []
+
+    def reset(self):
+        pass
+
+    def invoke(self, agent, messages, complexity=None, temperature=0.7, json_mode=False):
+        prompt = messages[-1].content
+        self.prompts.append((agent, prompt))
+        numbers = [int(n) for n in re.findall(r"### Seção (\d+)", prompt)]
+        if agent == "evaluator":
+            self.evaluated.append(numbers)
+            dimensions = {d: self.score for d in ("clarity", "relevance", "structure", "applicability", "language")}
+            dimensions[self.weak] = self.score - 0.2
+            reply = {"sections": [{"index": n, **dimensions, "feedback": "Mais exemplos"} for n in numbers]}
+        else:
+            reply = {"sections": [{"index": n, "content": f"CENA {n}:\nReescrita da seção {n}."} for n in numbers]}
+        return AIMessage(content=json.dumps(reply))
+
+@pytest.fixture(autouse=True)
+def section_mode(monkeypatch):
+    """Refinamento por seção é opt-in (REFINEMENT_SECTION_MODE)"""
+    from src.config import workflows
+    monkeypatch.setitem(workflows.REFINEMENT_WORKFLOW_CONFIG, "section_mode", True)
+
+def test_split_sections_by_heading_round_trip():
+    """Títulos abrem seções e o texto é reconstruído sem perdas"""
+    sections = split_sections(SCRIPT)
+    assert len(sections) == 3
+    assert sections[1] == "CENA 2:\nConceito central.\n\nDetalhe do conceito."
+    assert join_sections(sections) == SCRIPT
+
+def test_plateau_stops_and_only_rewritten_sections_are_reevaluated():
+    """Nota estável encerra por platô; seções inalteradas usam a nota em cache"""
+    workflow = ContentRefinementWorkflow()
+    workflow.router = ScriptedRouter(score=0.7)
+
+    result = workflow.run(content=SCRIPT, content_type="script")
+
+    assert workflow.router.evaluated == [[1, 2, 3], [1, 2, 3]]  # Todas reescritas (3 por passada)
+    assert result['metadata']['iterations'] == 1
+    assert result['metadata']['reason'].startswith("Platô")
+    assert result['content'] == SCRIPT  # Sem melhoria: mantém a melhor versão (original)
+
+def test_only_flagged_sections_are_rewritten(monkeypatch):
+    """Com limite de 1 seção por passada, só a seção sinalizada é reescrita e reavaliada"""
+    from src.config import workflows
+    monkeypatch.setitem(workflows.REFINEMENT_WORKFLOW_CONFIG, "max_sections_per_pass", 1)
+    workflow = ContentRefinementWorkflow()
+    workflow.router = ScriptedRouter(score=0.7)
+
+    result = workflow.run(content=SCRIPT, content_type="script", max_iterations=1)
+
+    assert workflow.router.evaluated == [[1, 2, 3], [1]]
+    assert result['metadata']['sections'] == {"evaluated": 4, "cached": 2, "rewritten": 1}
+
+def test_dimension_scores_are_aggregated_and_weak_ones_targeted():
+    """Nota agregada local (pesos iguais) e dimensão mais fraca citada na reescrita"""
+    workflow = ContentRefinementWorkflow()
+    workflow.router = ScriptedRouter(score=0.8, weak="applicability")
+
+    result = workflow.run(content=SCRIPT, content_type="script", max_iterations=1)
+
+    assert abs(result['metadata']['quality_progression'][0] - 0.76) < 1e-9  # (4 × 0.8 + 0.6) / 5
+    assert result['metadata']['dimension_progression'][0]['applicability'] == 0.6
+    refine_prompt = next(prompt for agent, prompt in workflow.router.prompts if agent == "refiner")
+    assert "Priorizar: aplicabilidade prática 0.60" in refine_prompt
+
+def test_document_mode_evaluates_only_the_opening(monkeypatch):
+    """Modo padrão: uma nota para o início do documento e reescrita completa"""
+    from src.config import workflows
+    monkeypatch.setitem(workflows.REFINEMENT_WORKFLOW_CONFIG, "section_mode", False)
+    prompts = []
+
+    class DocumentRouter(ScriptedRouter):
+        def invoke(self, agent, messages, complexity=None, temperature=0.7, json_mode=False):
+            prompts.append((agent, messages[-1].content))
+            if agent == "evaluator":
+                return AIMessage(content=json.dumps({"score": 0.9, "feedback": "Bom roteiro"}))
+            return AIMessage(content="Reescrito")
+
+    workflow = ContentRefinementWorkflow()
+    workflow.router = DocumentRouter(score=0.9)
+    long_script = SCRIPT + "\n\nCENA 4:\n" + "Fechamento. " * 60
+
+    result = workflow.run(content=long_script, content_type="script")
+
+    assert [agent for agent, _ in prompts] == ["evaluator"]  # Meta atingida na 1ª avaliação
+    assert "Fechamento. " * 60 not in prompts[0][1]  # Só os primeiros 500 caracteres
+    assert result['quality'] == 0.9 and result['content'] == long_script
+    assert result['metadata']['sections'] == {"evaluated": 0, "cached": 0, "rewritten": 0}
@@ -0,0 +1,114 @@
+"""
+Testes para a rasterização de slides em pool de processos
+"""
+import os
+
+import billiard
+
+from src.video import slide_raster
+from src.video.slide_raster import SlideRasterizer, cpu_quota
+from src.video.slide_templates import draw_slide, render_slide
+
+
+def test_cpu_quota_reads_cgroup_v2_and_v1_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(8)))
+
+    v2 = tmp_path / "v2"
+    v2.mkdir()
+    (v2 / "cpu.max").write_text("150000 100000\n")
+    assert cpu_quota(str(v2)) == 2
+    (v2 / "cpu.max").write_text("max 100000\n")
+    assert cpu_quota(str(v2)) == 8
+
+    v1 = tmp_path / "v1" / "cpu,cpuacct"
+    v1.mkdir(parents=True)
+    (v1 / "cpu.cfs_quota_us").write_text("300000\n")
+    (v1 / "cpu.cfs_period_us").write_text("100000\n")
+    assert cpu_quota(str(tmp_path / "v1")) == 3
+    (v1 / "cpu.cfs_quota_us").write_text("-1\n")
+    assert cpu_quota(str(tmp_path / "v1")) == 8
+    assert cpu_quota(str(tmp_path / "missing")) == 8
+
+
+def test_pool_renders_slides_in_job_order_identical_to_inline(tmp_path):
+    def jobs(directory):
+        directory.mkdir()
+        return [
+            {
+                'slide_path': str(directory / f"slide_7_{index:02d}.png"),
+                'title': f"Seção {index}",
+                'content': "Ouça cada lado sem interromper e repita o que entendeu. " * index,
+                'slide_num': index,
+                'total_slides': 4,
+                'orientation': 'vertical' if index % 2 else 'horizontal'
+            }
+            for index in range(1, 5)
+        ]
+
+    inline_jobs, pool_jobs = jobs(tmp_path / "inline"), jobs(tmp_path / "pool")
+    inline = SlideRasterizer(max_workers=1).render(render_slide, inline_jobs)
+    try:
+        pooled = SlideRasterizer(max_workers=2).render(render_slide, pool_jobs)
+    finally:
+        slide_raster._discard_pool(slide_raster._pool)
+
+    assert pooled == [job['slide_path'] for job in pool_jobs]
+    for inline_path, pooled_path in zip(inline, pooled):
+        with open(inline_path, 'rb') as a, open(pooled_path, 'rb') as b:
+            assert a.read() == b.read()
+
+
+def _render_in_daemon(directory, force_pool, results):
+    """Corpo do processo daemônico (como um worker prefork do Celery)"""
+    if force_pool:
+        slide_raster._can_fork_workers = lambda: True  # Tenta subir o pool mesmo assim
+    jobs = [
+        {'slide_path': os.path.join(directory, f"slide_{index}.png"), 'title': f"Seção {index}",
+         'content': "Escuta ativa.", 'slide_num': index, 'total_slides': 3}
+        for index in range(1, 4)
+    ]
+    try:
+        results.put(SlideRasterizer(max_workers=2).render(render_slide, jobs))
+    except Exception as e:
+        results.put(repr(e))
+
+
+def _frames_in_daemon(force_pool, results):
+    """frames() (SimpleVideoGenerator "ffmpeg" e VideoGenerator legado) num processo daemônico"""
+    if force_pool:
+        slide_raster._can_fork_workers = lambda: True
+    jobs = [{'title': f"Seção {index}", 'content': "Escuta ativa.", 'slide_num': index, 'total_slides': 3}
+            for index in range(1, 4)]
+    try:
+        results.put([frame.tobytes() for frame in SlideRasterizer(max_workers=2).frames(draw_slide, jobs)])
+    except Exception as e:
+        results.put(repr(e))
+
+
+def run_in_daemon(target, *args):
+    """Roda target num processo daemônico do billiard e devolve o que ele publicou"""
+    results = billiard.Queue()
+    process = billiard.Process(target=target, args=(*args, results), daemon=True)
+    process.start()
+    result = results.get(timeout=60)
+    process.join(timeout=10)
+    return result
+
+
+def test_daemonic_worker_renders_inline(tmp_path):
+    """Dentro de um worker prefork (daemônico) não há pool: mesmos PNGs, sem erro"""
+    for force_pool in (False, True):
+        directory = tmp_path / f"force_{force_pool}"
+        directory.mkdir()
+        paths = run_in_daemon(_render_in_daemon, str(directory), force_pool)
+        assert paths == [str(directory / f"slide_{index}.png") for index in range(1, 4)]
+        assert all(os.path.exists(path) for path in paths)
+
+
+def test_daemonic_worker_streams_frames_inline():
+    """frames() num worker prefork entrega os slides em ordem, iguais aos desenhados no processo"""
+    expected = [
+        draw_slide(f"Seção {index}", "Escuta ativa.", index, 3).tobytes() for index in range(1, 4)
+    ]
+    for force_pool in (False, True):
+        assert run_in_daemon(_frames_in_daemon, force_pool) == expected
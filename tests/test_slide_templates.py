@@ -0,0 +1,30 @@
+"""
+Testes para os templates de slide pré-renderizados
+"""
+import numpy as np
+
+from src.video.slide_templates import SLIDE_THEMES, get_slide_template
+
+
+def test_template_is_cached_per_orientation_and_theme():
+    horizontal = get_slide_template('horizontal', 'default')
+
+    assert get_slide_template('horizontal', 'default') is horizontal
+    assert get_slide_template('vertical', 'default') is not horizontal
+    assert (horizontal.width, horizontal.height) == (1280, 720)
+    assert (get_slide_template('vertical').width, get_slide_template('vertical').height) == (720, 1280)
+
+
+def test_new_slide_copies_gradient_and_chrome():
+    template = get_slide_template('horizontal')
+    slide = template.new_slide()
+    slide.paste((255, 255, 255), (0, 300, 1280, 400))  # Texto desenhado num slide não vaza para a base
+
+    pixels = np.asarray(template.new_slide())
+    background = SLIDE_THEMES['default']['background']
+    assert tuple(pixels[0, 0]) == background
+    assert tuple(pixels[650, 0]) == tuple(np.rint(np.array(background) * (1 - 650 / 720 * 0.3)).astype(int))
+    assert tuple(pixels[350, 640]) != (255, 255, 255)
+    assert tuple(pixels[150, 640]) == (0, 217, 255)  # Barra do título
+    assert tuple(pixels[715, 640]) == (0, 217, 255)  # Linha inferior
+    assert tuple(np.asarray(template.new_slide(with_title=False))[150, 640]) != (0, 217, 255)
@@ -0,0 +1,93 @@
+"""
+Testes para o aprimoramento especulativo de roteiros (cache, cancelamento e orçamento)
+"""
+from src.services.speculation_service import SpeculationService
+from src.workers.celery_config import celery_app
+
+class MemoryRedis:
+    """Subconjunto do cliente Redis usado pelo SpeculationService (sem expiração)"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return MemoryPipeline(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+        return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def expire(self, key, seconds):
+        return True
+
+    def incrby(self, key, amount):
+        self.data[key] = str(int(self.data.get(key, 0)) + amount)
+        return int(self.data[key])
+
+    def decrby(self, key, amount):
+        return self.incrby(key, -amount)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = value
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hdel(self, key, field):
+        self.data.get(key, {}).pop(field, None)
+
+class MemoryPipeline:
+    def __init__(self, client):
+        self.client, self.calls = client, []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+CONFIG = {"ttl_seconds": 60, "daily_token_budget": 5000, "estimated_tokens": 2500}
+
+def test_cache_is_bound_to_outline_and_briefing():
+    service = SpeculationService(MemoryRedis(), CONFIG)
+    fingerprint = service.fingerprint("Introdução → Prática", {"tone": "prático", "duration_minutes": 3})
+
+    service.store_script(7, "CENA 1: ...", fingerprint, tokens=900)
+
+    assert service.get_script(7, fingerprint) == "CENA 1: ..."
+    assert service.get_script(7, service.fingerprint("Introdução → Prática", {"tone": "formal", "duration_minutes": 3})) is None
+    assert service.get_script(8, fingerprint) is None
+
+def test_daily_budget_reserves_and_settles_real_usage():
+    service = SpeculationService(MemoryRedis(), CONFIG)
+
+    assert service.reserve_tokens(user_id=1)
+    assert service.reserve_tokens(user_id=1)
+    assert not service.reserve_tokens(user_id=1)  # 7500 > 5000: reserva desfeita
+    assert service.spent_tokens(1) == 5000
+
+    service.settle_tokens(1, reserved=2500, used=1200)
+    assert service.spent_tokens(1) == 3700
+    assert service.reserve_tokens(user_id=1) is False
+    assert service.reserve_tokens(user_id=2)  # Orçamento por usuário
+
+def test_selecting_an_option_cancels_the_others(monkeypatch):
+    revoked = []
+    monkeypatch.setattr(celery_app.control, "revoke", lambda task_id, **kwargs: revoked.append(task_id))
+    service = SpeculationService(MemoryRedis(), CONFIG)
+    for option_id in (11, 12, 13):
+        service.register_task(briefing_id=5, option_id=option_id, task_id=f"task-{option_id}")
+
+    assert service.cancel_others(briefing_id=5, selected_option_id=12) == [11, 13]
+    assert sorted(revoked) == ["task-11", "task-13"]
+    assert service.is_cancelled(11) and service.is_cancelled(13)
+    assert not service.is_cancelled(12)
@@ -0,0 +1,81 @@
+"""
+Testes para o parsing estruturado das respostas dos agentes
+"""
+import json
+from langchain_core.messages import AIMessage
+from src.workflows.structured_output import (
+    StructuredOutputParser,
+    ContentOptionSchema,
+    QualityEvaluationSchema,
+    salvage_objects
+)
+
+OPTION = {
+    "title": "Mediação de Conflitos",
+    "summary": "Estratégias práticas para mediar conflitos entre alunos.",
+    "script_outline": "Introdução → Casos → Técnicas → Conclusão",
+    "key_points": ["Escuta ativa", "Acordos", "Acompanhamento"],
+    "estimated_duration": "5 minutos",
+    "tone": "prático",
+    "approach": "Casos reais"
+}
+
+class FakeRouter:
+    """Responde às chamadas de reparo com uma resposta fixa"""
+
+    def __init__(self, reply: dict):
+        self.reply = reply
+        self.calls = []
+
+    def invoke(self, agent, messages, complexity=None, temperature=0.7, json_mode=False):
+        self.calls.append((agent, messages[-1].content))
+        return AIMessage(content=json.dumps(self.reply))
+
+def test_valid_options_are_normalized_without_repair():
+    """Listas e durações em texto são convertidas sem chamar o LLM"""
+    router = FakeRouter({})
+    parser = StructuredOutputParser(router)
+
+    options = parser.parse_list(json.dumps({"options": [OPTION]}), ContentOptionSchema, key="options")
+
+    assert options[0]["key_points"] == "Escuta ativa; Acordos; Acompanhamento"
+    assert options[0]["estimated_duration"] == 300
+    assert router.calls == []
+
+def test_only_invalid_fields_are_repaired():
+    """Somente o campo inválido é pedido ao LLM; o resto é preservado"""
+    broken = {**OPTION, "summary": ""}
+    router = FakeRouter({"repairs": [{"index": 1, "fields": {"summary": "Resumo corrigido da proposta.", "title": "Outro"}}]})
+    parser = StructuredOutputParser(router)
+
+    options = parser.parse_list(json.dumps({"options": [OPTION, broken]}), ContentOptionSchema, key="options")
+
+    assert len(options) == 2
+    assert options[1]["summary"] == "Resumo corrigido da proposta."
+    assert options[1]["title"] == OPTION["title"]  # Campo válido não é sobrescrito
+    assert len(router.calls) == 1 and router.calls[0][0] == "repair"
+    assert parser.report["repaired"] == 1
+
+def test_malformed_repair_responses_drop_item_without_crashing():
+    """Reparo em lista (sem o objeto "repairs") ou com fields fora de dict não derruba o parsing"""
+    broken = {**OPTION, "summary": ""}
+    for reply in ([{"index": 1, "fields": {"summary": "Resumo corrigido."}}],
+                  {"repairs": [{"index": 1, "fields": "Resumo corrigido."}]}):
+        router = FakeRouter(reply)
+        parser = StructuredOutputParser(router)
+
+        options = parser.parse_list(json.dumps({"options": [OPTION, broken]}), ContentOptionSchema, key="options")
+
+        assert [option["title"] for option in options] == [OPTION["title"]]
+        assert router.calls and parser.report["repaired"] == 0
+
+def test_truncated_response_keeps_complete_objects():
+    """Resposta cortada por max_tokens mantém as opções completas"""
+    content = json.dumps({"options": [OPTION, OPTION]})[:-40]
+    assert len(salvage_objects(content, "options")) == 1
+
+def test_quality_score_scales_are_normalized():
+    """Notas em 0-10 ou 0-100 viram 0-1"""
+    parser = StructuredOutputParser(FakeRouter({}))
+    evaluation = parser.parse_object('{"score": 8.5, "feedback": "Mais exemplos"}', QualityEvaluationSchema)
+    assert evaluation["score"] == 0.85
@@ -0,0 +1,55 @@
+"""
+Testes para a contabilidade de consumo de LLM
+"""
+from typing import TypedDict
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, END
+from src.models.llm_usage import LLMUsage
+from src.ml import usage_tracker
+from src.ml.usage_tracker import usage_context, track_llm_call, flush_usage, summarize_usage
+from src.workflows.instrumentation import instrument_node
+
+class _State(TypedDict):
+    text: str
+
+def _fake_call():
+    return AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": 120,
+            "output_tokens": 30,
+            "total_tokens": 150,
+            "input_token_details": {"cache_read": 64}
+        }
+    )
+
+def _node(state):
+    track_llm_call("analyzer", "small-model", _fake_call)
+    return state
+
+def test_tags_propagate_through_graph_nodes(db):
+    """Chamadas dentro de nós herdam workflow, nó e briefing_id"""
+    usage_tracker._buffer.clear()
+
+    graph = StateGraph(_State)
+    graph.add_node("analyze", instrument_node("analyze", _node))
+    graph.set_entry_point("analyze")
+    graph.add_edge("analyze", END)
+
+    with usage_context(workflow="briefing_analysis", briefing_id=7):
+        graph.compile().invoke({"text": "x"})
+
+    record = usage_tracker.pending_records()[-1]
+    assert record["workflow"] == "briefing_analysis"
+    assert record["node"] == "analyze"
+    assert record["briefing_id"] == 7
+    assert record["cached_tokens"] == 64
+    assert record["cache_hit"] is True
+
+    assert flush_usage(db) == 1
+    assert usage_tracker.pending_records() == []
+    assert db.query(LLMUsage).count() == 1
+
+    summary = summarize_usage(db, group_by="node", since_hours=None)
+    assert summary[0]["node"] == "analyze"
+    assert summary[0]["total_tokens"] == 150
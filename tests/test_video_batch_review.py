@@ -0,0 +1,111 @@
+"""
+Testes para a revisão em lote de vídeos aguardando aprovação e a retomada
+"""
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.app import app
+from src.api.routes import videos as video_routes
+from src.config.database import get_db
+from src.models.briefing import Briefing
+from src.models.option import Option
+from src.models.user import User
+from src.models.video import Video, VideoStatus
+from src.services.auth_service import get_current_user
+from src.utils.hashid import decode_id, encode_id
+from src.workers import tasks
+from tests.conftest import TestingSessionLocal, engine
+
+class FakeGroup:
+    """Substitui celery.group: registra as assinaturas e devolve IDs previsíveis"""
+    dispatched = []
+
+    def __init__(self, signatures):
+        self.signatures = list(signatures)
+
+    def apply_async(self):
+        FakeGroup.dispatched = [signature.kwargs for signature in self.signatures]
+        return SimpleNamespace(
+            id="group-1",
+            children=[SimpleNamespace(id=f"task-{kwargs['video_id']}") for kwargs in FakeGroup.dispatched]
+        )
+
+def add_video(db, user, status):
+    briefing = Briefing(user_id=user.id, title="Mediação de conflitos", description="Como mediar conflitos")
+    db.add(briefing)
+    db.flush()
+    option = Option(briefing_id=briefing.id, title="Mediação na prática")
+    db.add(option)
+    db.flush()
+    video = Video(option_id=option.id, title="Mediação", script="CENA 1", status=status)
+    db.add(video)
+    db.commit()
+    return encode_id(video.id)
+
+def test_batch_review_checks_ownership_in_one_query_and_resumes_as_group(db, monkeypatch):
+    owner = User(email="coord@escola.br", username="coord", hashed_password="x")
+    other = User(email="outro@escola.br", username="outro", hashed_password="x")
+    db.add_all([owner, other])
+    db.commit()
+    pending = [add_video(db, owner, VideoStatus.PENDING_APPROVAL) for _ in range(3)]
+    completed = add_video(db, owner, VideoStatus.COMPLETED)
+    foreign = add_video(db, other, VideoStatus.PENDING_APPROVAL)
+
+    monkeypatch.setattr(video_routes, "group", FakeGroup)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: owner
+    db.refresh(owner)  # Usuário já carregado pela autenticação
+    selects = []
+    count = lambda conn, cursor, statement, *args: selects.append(statement) if statement.startswith("SELECT") else None
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = TestClient(app).post("/api/v1/videos/review-batch", json={
+            "video_ids": pending + [completed, foreign, "invalido", pending[0]],
+            "action": "reject",
+            "feedback": "Mais exemplos práticos"
+        })
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(selects) == 1
+    assert body["group_id"] == "group-1" and body["queued"] == 3
+    assert [(item["id"], item["status"]) for item in body["results"]] == (
+        [(video_hash, "queued") for video_hash in pending]
+        + [(completed, "not_pending"), (foreign, "not_found"), ("invalido", "not_found")]
+    )
+    assert all(item["task_id"] for item in body["results"][:3])
+    assert [kwargs["approved"] for kwargs in FakeGroup.dispatched] == [False] * 3
+    assert {kwargs["feedback"] for kwargs in FakeGroup.dispatched} == {"Mais exemplos práticos"}
+
+def test_resume_rebuilds_workflow_with_persisted_provider(db, monkeypatch):
+    """Revisão retomada usa o mesmo gerador/provider escolhido antes da pausa"""
+    class FakeWorkflow:
+        created = []
+
+        def __init__(self, **kwargs):
+            FakeWorkflow.created.append(kwargs)
+
+        def resume(self, thread_id, approval_status, feedback=None):
+            return {"status": "awaiting_approval", "video_path": "/tmp/preview.mp4"}
+
+    owner = User(email="coord@escola.br", username="coord", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    video_id = decode_id(add_video(db, owner, VideoStatus.PENDING_APPROVAL))
+    video = db.get(Video, video_id)
+    video.generator_type, video.generator_provider = "avatar", "heygen"
+    db.commit()
+
+    monkeypatch.setattr(tasks, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(tasks, "VideoGenerationWorkflow", FakeWorkflow)
+    result = tasks.resume_video_generation(video_id, False, "Mais exemplos práticos")
+
+    assert result["status"] == "awaiting_approval"
+    assert FakeWorkflow.created == [
+        {"generator_type": "avatar", "provider": "heygen", "require_human_approval": True}
+    ]
@@ -0,0 +1,302 @@
+"""
+Testes para o grafo de geração de vídeo: checkpointer persistente,
+retomada após aprovação humana, ramos paralelos de áudio/visuais,
+grafo compilado compartilhado entre execuções e narração em streaming
+"""
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.config.workflows import VIDEO_WORKFLOW_CONFIG
+from src.workflows.checkpointer import SQLiteCheckpointer
+from src.workflows.video_workflow import VideoGenerationWorkflow
+from src.video.narration_stream import NarrationStream
+from src.video.tts import TTSProviderError, TTSService
+
+class StubGenerator:
+    """Gerador de vídeo falso (etapas separadas) que conta as renderizações"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def prepare_audio(self, script, metadata, video_id):
+        time.sleep(self.delay)
+        return {"audio_path": f"/tmp/audio_{video_id}.mp3"}
+
+    def prepare_assets(self, script, title, metadata, video_id):
+        time.sleep(self.delay)
+        return {"slide_paths": [f"/tmp/slide_{video_id}_01.png"]}
+
+    def render(self, script, title, metadata, video_id, audio=None, assets=None):
+        assert audio and assets
+        self.calls += 1
+        return {
+            "success": True,
+            "file_path": f"/tmp/video_{video_id}.mp4",
+            "duration": 42.0,
+            "file_size": 1024,
+            "metadata": {}
+        }
+
+SCENE = (
+    "Nesta cena o professor apresenta um conflito real entre alunos, escuta as duas partes "
+    "com calma e conduz a turma a um acordo coletivo registrado no quadro."
+)
+
+class StubLLM:
+    """LLMService falso (só enhance_script); as primeiras `short` versões são curtas demais"""
+
+    def __init__(self, short: int = 0):
+        self.calls = 0
+        self.short = short
+        self.feedback = []
+
+    def enhance_script(self, script, briefing_data, feedback=None):
+        self.calls += 1
+        self.feedback.append(feedback)
+        if self.calls <= self.short:
+            return f"{script}\n\nRoteiro aprimorado {self.calls}"
+        return f"CENA 1:\n{SCENE}\n\nCENA 2:\n{SCENE}\n\nRoteiro aprimorado {self.calls}"
+
+    def stream_enhance_script(self, script, briefing_data, feedback=None):
+        yield from self.enhance_script(script, briefing_data, feedback).split("\n\n")
+
+def make_workflow(path, generator, llm, require_human_approval=True):
+    workflow = VideoGenerationWorkflow(
+        checkpointer=SQLiteCheckpointer(path),
+        require_human_approval=require_human_approval
+    )
+    workflow.video_generator = generator
+    workflow.llm_service = llm
+    return workflow
+
+def run(workflow, video_id=1):
+    return workflow.run(video_id, 10, {"title": "Mediação de conflitos"}, "Introdução → prática → conclusão")
+
+def test_approval_resumes_in_new_process_with_only_finalize(tmp_path):
+    """Outro processo (novo saver no mesmo arquivo) retoma sem refazer o pipeline"""
+    path = tmp_path / "checkpoints.sqlite"
+    generator, llm = StubGenerator(), StubLLM()
+
+    paused = run(make_workflow(path, generator, llm))
+    assert paused["status"] == "awaiting_approval"
+    assert not paused["success"] and "error" not in paused
+
+    result = make_workflow(path, generator, llm).resume("video_1", "approved")
+    assert result["success"]
+    assert result["video_path"] == "/tmp/video_1.mp4"
+    assert result["metadata"]["duration"] == 42.0
+    assert (generator.calls, llm.calls) == (1, 1)
+
+def test_revision_feedback_reruns_pipeline_and_pauses_again(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    generator, llm = StubGenerator(), StubLLM()
+    run(make_workflow(path, generator, llm))
+
+    result = make_workflow(path, generator, llm).resume("video_1", "needs_revision", "Mais exemplos")
+    assert result["status"] == "awaiting_approval"
+    assert (generator.calls, llm.calls) == (2, 2)
+
+    missing = make_workflow(path, generator, llm).resume("video_99", "approved")
+    assert not missing["success"]
+
+def test_without_human_approval_finalizes_directly(tmp_path):
+    result = run(make_workflow(tmp_path / "checkpoints.sqlite", StubGenerator(), StubLLM(), False))
+    assert result["success"] and result["status"] == "approved"
+
+def test_values_are_compressed_and_old_threads_pruned(tmp_path):
+    path = tmp_path / "checkpoints.sqlite"
+    saver = SQLiteCheckpointer(path)
+    value = {"script": "Roteiro de formação docente. " * 200}
+    type_, data = saver._dumps(value)
+    assert type_ == "msgpack+zlib" and len(data) < len(value["script"]) / 10
+    assert saver._loads(type_, data) == value
+
+    run(make_workflow(path, StubGenerator(), StubLLM(), False), video_id=1)
+    run(make_workflow(path, StubGenerator(), StubLLM(), False), video_id=2)
+    assert len(list(saver.list({"configurable": {"thread_id": "video_1"}}))) > 3
+
+    stats = saver.prune(keep_last=1)
+    assert stats["checkpoints"] > 0
+    assert len(list(saver.list({"configurable": {"thread_id": "video_1"}}))) == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "video_1"}}).checkpoint["channel_values"]["video_id"] == 1
+
+    saver.conn.execute("UPDATE checkpoints SET created_at=? WHERE thread_id='video_1'", (time.time() - 30 * 86400,))
+    assert saver.prune(max_age_days=7)["threads"] == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "video_1"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "video_2"}}) is not None
+
+def test_prune_keeps_threads_awaiting_approval(tmp_path):
+    """Vídeo pausado há mais que a retenção continua retomável após a limpeza"""
+    path = tmp_path / "checkpoints.sqlite"
+    generator, llm = StubGenerator(), StubLLM()
+    assert run(make_workflow(path, generator, llm), video_id=1)["status"] == "awaiting_approval"
+    run(make_workflow(path, StubGenerator(), StubLLM(), False), video_id=2)
+
+    saver = SQLiteCheckpointer(path)
+    saver.conn.execute("UPDATE checkpoints SET created_at=?", (time.time() - 30 * 86400,))
+    assert saver.prune(max_age_days=7)["threads"] == 1
+    assert saver.get_tuple({"configurable": {"thread_id": "video_2"}}) is None
+
+    result = make_workflow(path, generator, llm).resume("video_1", "approved")
+    assert result["success"] and result["status"] == "approved"
+
+def test_large_values_are_shared_and_checkpoints_store_deltas(tmp_path):
+    """Roteiro/esboço gravados uma vez por conteúdo; replay reconstrói cada passo"""
+    saver = SQLiteCheckpointer(tmp_path / "checkpoints.sqlite", blob_min_bytes=64, snapshot_every=4)
+    outline = "Introdução → escuta ativa das partes → acordo coletivo registrado → conclusão"
+    for video_id in (1, 2):
+        workflow = VideoGenerationWorkflow(checkpointer=saver, require_human_approval=True)
+        workflow.video_generator, workflow.llm_service = StubGenerator(), StubLLM()
+        workflow.run(video_id, 10, {"title": "Mediação de conflitos"}, outline)
+
+    stats = saver.storage_stats()
+    # Esboço compartilhado + roteiro por iteração: nunca uma cópia por canal/escrita/passo
+    assert stats["content"]["rows"] == 2
+    stored = [saver._loads(t, d) for t, d in saver.conn.execute("SELECT type, checkpoint FROM checkpoints")]
+    deltas = [c for c in stored if "__delta_of__" in c]
+    assert deltas and all(c["__delta_depth__"] < 4 for c in deltas)
+
+    steps = list(saver.replay("video_1"))
+    assert steps[-1]["values"] == saver.get_tuple({"configurable": {"thread_id": "video_1"}}).checkpoint["channel_values"]
+    enhance = next(step for step in steps if step["node"] == "enhance_script")
+    assert enhance["changed"]["enhanced_script"].startswith("CENA 1:")
+    assert steps[-1]["values"]["approval_status"] == "awaiting_approval"
+
+    saver.delete_thread("video_1")
+    assert saver.storage_stats()["content"]["rows"] == 2  # Ainda referenciado por video_2
+    saver.delete_thread("video_2")
+    assert saver.storage_stats()["content"]["rows"] == 0
+
+def test_audio_and_visuals_run_in_parallel(tmp_path):
+    """TTS e slides rodam no mesmo passo; a renderização espera os dois"""
+    generator = StubGenerator(delay=0.3)
+    workflow = make_workflow(tmp_path / "checkpoints.sqlite", generator, StubLLM(), False)
+    start = time.perf_counter()
+    result = run(workflow)
+    assert result["success"] and generator.calls == 1
+    assert time.perf_counter() - start < 0.55
+    timings = result["metadata"]["node_timings"]
+    assert timings["generate_audio"]["wall_ms"] >= 300 and timings["prepare_visuals"]["wall_ms"] >= 300
+
+def test_compiled_graph_is_shared_and_runs_use_their_own_dependencies(tmp_path):
+    """Um grafo compilado por variante; gerador/LLM vêm de cada instância"""
+    saver = SQLiteCheckpointer(tmp_path / "checkpoints.sqlite")
+    workflows = []
+    for _ in range(3):
+        workflow = VideoGenerationWorkflow(checkpointer=saver, require_human_approval=False)
+        workflow.video_generator, workflow.llm_service = StubGenerator(delay=0.05), StubLLM()
+        workflows.append(workflow)
+    assert workflows[0].graph is workflows[1].graph is workflows[2].graph
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(lambda item: run(item[1], video_id=item[0]), enumerate(workflows, 1)))
+
+    assert all(result["success"] for result in results)
+    assert [w.video_generator.calls for w in workflows] == [1, 1, 1]
+    assert [w.llm_service.calls for w in workflows] == [1, 1, 1]
+    assert [r["video_path"] for r in results] == [f"/tmp/video_{i}.mp4" for i in (1, 2, 3)]
+
+    approval = VideoGenerationWorkflow(checkpointer=saver, require_human_approval=True)
+    assert approval.graph is not workflows[0].graph
+
+def test_pre_render_validation_loops_back_before_tts_and_render(tmp_path):
+    """Roteiro curto volta ao aprimoramento com feedback sem passar por TTS/renderização"""
+    generator, llm = StubGenerator(), StubLLM(short=1)
+    result = run(make_workflow(tmp_path / "checkpoints.sqlite", generator, llm, False))
+
+    assert result["success"]
+    assert (llm.calls, generator.calls) == (2, 1)
+    assert llm.feedback[0] is None
+    assert any("muito curta" in item for item in llm.feedback[1])
+    assert result["metadata"]["script_validation"]["valid"]
+    assert result["metadata"]["node_timings"]["validate_script"]["executions"] == 2
+
+def test_speculative_script_skips_first_enhancement(tmp_path):
+    """Roteiro aprimorado antes da seleção dispensa a 1ª chamada de enhance_script"""
+    generator, llm = StubGenerator(), StubLLM()
+    workflow = make_workflow(tmp_path / "checkpoints.sqlite", generator, llm, False)
+    script = f"CENA 1:\n{SCENE}\n\nCENA 2:\n{SCENE}"
+
+    result = workflow.run(1, 10, {"title": "Mediação de conflitos"}, "Introdução → prática", speculative_script=script)
+
+    assert result["success"] and generator.calls == 1
+    assert llm.calls == 0
+
+class StubTTS:
+    """TTS falso: grava o texto como "áudio"; o primeiro trecho é o mais lento"""
+
+    def __init__(self):
+        self.previous = []
+
+    def generate(self, text, output_path, voice, previous_text=None, fallback=True):
+        assert fallback is False  # Trecho com tom de fallback não pode entrar na narração
+        time.sleep(0.1 if previous_text is None else 0.0)
+        self.previous.append(previous_text)
+        with open(output_path, "w") as f:
+            f.write(f"[{text}]")
+        return output_path
+
+class StreamingGenerator(StubGenerator):
+    def __init__(self, tmp_path):
+        super().__init__()
+        self.tmp_path, self.tts, self.audio_calls = tmp_path, StubTTS(), 0
+
+    def narration_stream(self, metadata, video_id):
+        config = {"min_segment_chars": 200, "tts_workers": 2}
+        return NarrationStream(self.tts, str(self.tmp_path / f"audio_{video_id}.mp3"), "voz", config)
+
+    def prepare_audio(self, script, metadata, video_id):
+        self.audio_calls += 1
+        return super().prepare_audio(script, metadata, video_id)
+
+def test_streaming_narration_is_reused_by_generate_audio(tmp_path, monkeypatch):
+    """Parágrafos vão ao TTS durante o aprimoramento; partes anexadas em ordem"""
+    monkeypatch.setitem(VIDEO_WORKFLOW_CONFIG["streaming_narration"], "enabled", True)
+    generator, llm = StreamingGenerator(tmp_path), StubLLM(short=1)
+
+    result = run(make_workflow(tmp_path / "checkpoints.sqlite", generator, llm, False))
+
+    assert result["success"] and generator.audio_calls == 0  # Sem segunda passada de TTS
+    assert len(generator.tts.previous) == 2  # Roteiro reprovado na validação não foi ao TTS
+    narration = result["metadata"]["streamed_narration"]
+    timings = narration["paragraph_timings"]
+    # Cenas agrupadas até min_segment_chars; o fechamento fica num trecho próprio
+    assert [t["paragraphs"] for t in timings] == [2, 1]
+    assert timings[0]["tts_finished_at"] > timings[1]["tts_finished_at"]  # Terminou por último...
+    with open(narration["audio_path"]) as f:  # ...mas foi anexado primeiro
+        assert f.read() == f"[CENA 1:\n{SCENE}\n\nCENA 2:\n{SCENE}][Roteiro aprimorado 2]"
+
+
+class RateLimitedTTS(StubTTS):
+    """Provider falha (ex.: 429) a partir do segundo trecho"""
+
+    def generate(self, text, output_path, voice, previous_text=None, fallback=True):
+        if previous_text is not None:
+            raise TTSProviderError("429 Too Many Requests")
+        return super().generate(text, output_path, voice, previous_text, fallback)
+
+def test_tts_failure_discards_streamed_narration(tmp_path, monkeypatch):
+    """Falha do provider num trecho: mesmo roteiro, narração inteira pela síntese normal"""
+    monkeypatch.setitem(VIDEO_WORKFLOW_CONFIG["streaming_narration"], "enabled", True)
+    generator, llm = StreamingGenerator(tmp_path), StubLLM()
+    generator.tts = RateLimitedTTS()
+    monkeypatch.setattr(generator, "narration_stream", lambda metadata, video_id: NarrationStream(
+        generator.tts, str(tmp_path / f"audio_{video_id}.mp3"), "voz", {"min_segment_chars": 1, "tts_workers": 1}
+    ))
+
+    result = run(make_workflow(tmp_path / "checkpoints.sqlite", generator, llm, False))
+
+    assert result["success"] and result["metadata"]["streamed_narration"] is None
+    assert generator.audio_calls == 1 and llm.calls == 1  # Sem segunda chamada ao LLM
+    assert not list(tmp_path.glob("audio_1*.mp3"))  # Partes e arquivo parcial removidos
+
+def test_tts_without_fallback_raises_on_provider_failure(tmp_path, monkeypatch):
+    """fallback=False: falha do provider levanta erro em vez de gerar o tom de fallback"""
+    monkeypatch.chdir(tmp_path)
+    tts = TTSService(provider="elevenlabs")
+    tts.api_key = None  # Falha antes de chamar a API
+
+    with pytest.raises(TTSProviderError):
+        tts.generate("Olá, professores", str(tmp_path / "parte.mp3"), "voz", fallback=False)
+    assert tts.generate("Olá, professores", str(tmp_path / "inteiro.mp3"), "voz") == str(tmp_path / "inteiro.mp3")